@@ -310,6 +310,10 @@ def _before_request_sentry_user():
         query_cache.start_request_stats()
     except Exception:
         pass
+    # Helper calls in this request share one lazily-opened Postgres
+    # connection (closed in _teardown_request_db_conn).
+    from app import db as _db
+    _db.begin_request_scope()
     if _sentry_dsn:
         _set_sentry_user()
     idle = _check_session_idle()
@@ -323,6 +327,12 @@ def _after_request_touch_session_activity(response):
     return response
 
 
+@app.teardown_request
+def _teardown_request_db_conn(exc):
+    from app import db as _db
+    _db.end_request_scope()
+
+
 import logging as _logging
 import sys as _sys
 
@@ -350,7 +360,14 @@ def _after_request_timing(response):
     is counted); ``slow=<label>:<ms>`` names the single slowest cold query;
     ``steps=chart:..,matrix:..`` breaks out the heavy Python builders. A
     cold page shows ``qmiss`` high and ``total_ms ≈ bq_ms + steps``; a warm
-    reload shows ``qhit`` high and a much smaller ``total_ms``. The
+    reload shows ``qhit`` high and a much smaller ``total_ms``. ``qwait``
+    counts misses that waited on another caller's identical in-flight query
+    instead of running it (single-flight; see ``app.query_cache``);
+    ``stale`` counts hits served past soft expiry while a refresh runs.
+    ``pg_conns``/``pg_ms`` are the Postgres connections opened and the time
+    spent in ``app.db`` helpers (one request-scoped connection serves them
+    all); with ``DATABASE_POOL=1``, ``pghit``/``pgmiss`` count pooled
+    checkouts that reused vs opened a connection (see ``app.db``). The
     ``Server-Timing`` header surfaces total_ms in the browser devtools
     Network tab (Timing) with no extra tooling.
     """
@@ -368,8 +385,9 @@ def _after_request_timing(response):
         stats = query_cache.get_request_stats()
         response.headers["Server-Timing"] = f"total;dur={total_ms:.0f}"
         had_work = stats is not None and bool(
-            stats.query_hits or stats.query_miss
+            stats.query_hits or stats.query_miss or stats.query_coalesced
             or stats.payload_hits or stats.payload_miss
+            or stats.pg_conns or stats.pg_hits or stats.pg_miss
         )
         # Only log pages that actually do data work or were slow, so the log
         # isn't flooded by trivial redirects / static-ish responses.
@@ -16,7 +16,7 @@ from urllib.parse import quote_plus
 
 from app import app
 from app.bigquery_client import get_bigquery_client
-from app.query_cache import cached_query_df, cached_payload, frame_fingerprint, timed
+from app.query_cache import cached_json, cached_query_df, frame_fingerprint, timed
 from app.skeleton import skeleton_page
 from app.tenant_scope import (
     filter_df_by_tenant_ids as _filter_df_by_tenant_ids,
@@ -594,17 +594,22 @@ def accounts():
         )
         chart_df = _filter_df_by_tenant_ids(chart_df, chart_tenant_ids)
         # tenant scope already narrowed chart_df to the selected account's tenant
+        # Cache the JSON the template injects rather than the dict: a warm
+        # render hands the stored string straight to Jinja with no unpickle
+        # and no json.dumps of a multi-year series.
         with timed("acct_chart"):
-            summary_chart = cached_payload(
-                ("acct_chart", str(date.today()), frame_fingerprint(chart_df, current_df)),
-                lambda: _build_account_chart_from_daily_pnl(chart_df, current_df),
+            summary_chart_json = cached_json(
+                ("acct_chart_json", str(date.today()), frame_fingerprint(chart_df, current_df)),
+                lambda: json.dumps(_build_account_chart_from_daily_pnl(chart_df, current_df)),
             )
     except Exception as exc:
         app.logger.exception(
             "accounts chart query or build failed for account=%r: %s",
             selected_account, exc,
         )
-        summary_chart = {"dates": [], "equity": [], "options": [], "dividends": [], "total": []}
+        summary_chart_json = json.dumps(
+            {"dates": [], "equity": [], "options": [], "dividends": [], "total": []}
+        )
 
     # ------------------------------------------------------------------
     # Windowed P&L cards (only when a time frame other than ALL is active).
@@ -618,6 +623,8 @@ def accounts():
     # is summed straight from groups CLOSED within the window.
     # ------------------------------------------------------------------
     period_kpis = None
+    # Only the windowed cards need the series back as Python values.
+    summary_chart = json.loads(summary_chart_json) if range_start is not None else {}
     if range_start is not None and summary_chart.get("dates"):
         dts = summary_chart["dates"]
         # Anchor the window on the LAST chart date (not today) so the card
@@ -718,7 +725,7 @@ def accounts():
     return render_template(
         "accounts.html",
         kpis=kpis,
-        summary_chart_json=json.dumps(summary_chart),
+        summary_chart_json=summary_chart_json,
         strategy_chart_json=json.dumps(strategy_chart),
         realized_events_json=json.dumps(realized_events),
         net_deposit_events_json=json.dumps(net_deposit_events),
@@ -0,0 +1,165 @@
+"""Run a page's read-only queries as ONE BigQuery script job.
+
+``_bq_parallel`` normally submits one job per query from a thread pool:
+N job creations, N polling loops and N result downloads per page, all
+sharing the client's HTTP connection pool, and each paying BigQuery's
+fixed per-job overhead. With ``BQ_SCRIPT_BATCH=1`` the queries that miss
+the query cache are packed into a single multi-statement job instead.
+BigQuery runs every statement as a child job; ``run_script`` lists the
+children and downloads each one's result.
+
+Each query is wrapped in its own ``BEGIN ... EXCEPTION`` block, so a
+failing query yields an exception for ITS key only while the rest of the
+script keeps running — the same per-key isolation as the thread pool.
+A script that fails as a whole (e.g. a parse error, which BigQuery
+reports before running anything) raises, and ``_bq_parallel`` reruns the
+batch the normal way. ``run_batch`` is that dispatch, shared by both
+``_bq_parallel`` copies (app/routes.py, app/weekly_review.py).
+
+Statements in a script run ONE AFTER ANOTHER, so the mode trades the
+parallel wave for one job's overhead. It pays off when per-job overhead
+dominates (many small queries); it is opt-in for that reason.
+
+Named query parameters are renamed per statement (``@day`` ->
+``@q3_day``) so two queries can bind the same name to different values.
+Only a job config's query parameters carry over into the script.
+"""
+import copy
+import logging
+import os
+import re
+
+import pandas as pd
+from google.cloud import bigquery
+
+_log = logging.getLogger(__name__)
+
+_HANDLER_SQL = "  SELECT @@error.message AS error_message;"
+
+
+def script_batch_enabled() -> bool:
+    """``BQ_SCRIPT_BATCH=1`` turns on script execution for ``_bq_parallel``."""
+    return os.environ.get("BQ_SCRIPT_BATCH", "").strip().lower() in (
+        "1", "true", "yes", "on",
+    )
+
+
+class ScriptQueryError(RuntimeError):
+    """One statement of a script batch failed (message from ``@@error``)."""
+
+
+def _rename_params(index, sql, job_config):
+    """``sql`` and its query parameters with names prefixed ``q<index>_``."""
+    params = []
+    for param in getattr(job_config, "query_parameters", None) or []:
+        name = getattr(param, "name", None)
+        if not name:
+            raise ValueError("script batches need named query parameters")
+        renamed = copy.copy(param)
+        renamed.name = f"q{index}_{name}"
+        sql = re.sub(
+            r"(?<![@\w])@" + re.escape(name) + r"\b", "@" + renamed.name, sql,
+        )
+        params.append(renamed)
+    return sql, params
+
+
+def build_script(specs):
+    """Pack ``{name: (sql, job_config)}`` into one script.
+
+    Returns ``(script, params, spans)``: ``spans`` maps each name to the
+    1-based ``(first_line, last_line, handler_line)`` of its statement and
+    its error handler, which is how child jobs are matched back to names.
+    """
+    lines, params, spans = [], [], {}
+    for index, (name, (sql, job_config)) in enumerate(specs.items()):
+        body, renamed = _rename_params(index, sql.strip().rstrip(";").rstrip(), job_config)
+        params.extend(renamed)
+        lines.append("BEGIN")
+        first = len(lines) + 1
+        lines.extend(body.splitlines())
+        # Own line: the query may end in a ``--`` comment.
+        lines.append(";")
+        last = len(lines)
+        lines.append("EXCEPTION WHEN ERROR THEN")
+        lines.append(_HANDLER_SQL)
+        spans[name] = (first, last, len(lines))
+        lines.append("END;")
+    return "\n".join(lines) + "\n", params, spans
+
+
+def _child_line(child):
+    stats = getattr(child, "script_statistics", None)
+    frames = getattr(stats, "stack_frames", None) or []
+    return frames[0].start_line if frames else None
+
+
+def _child_ms(child):
+    if child.started is None or child.ended is None:
+        return 0.0
+    return (child.ended - child.started).total_seconds() * 1000.0
+
+
+def run_script(client, specs):
+    """Execute ``{name: (sql, job_config)}`` as one script job.
+
+    Returns ``{name: (DataFrame | Exception, child_ms)}``. Raises when the
+    script job itself fails.
+    """
+    script, params, spans = build_script(specs)
+    job_config = bigquery.QueryJobConfig(query_parameters=params) if params else None
+    if job_config is None:
+        job = client.query(script)
+    else:
+        job = client.query(script, job_config=job_config)
+    job.result()
+
+    results = {}
+    for child in client.list_jobs(parent_job=job.job_id):
+        line = _child_line(child)
+        for name, (first, last, handler) in spans.items():
+            if line == handler:
+                row = next(iter(child.result()), None)
+                message = row[0] if row is not None else "unknown error"
+                results[name] = (ScriptQueryError(message), _child_ms(child))
+            elif line is not None and first <= line <= last:
+                if isinstance(results.get(name, (None,))[0], Exception):
+                    continue
+                if child.error_result:
+                    outcome = ScriptQueryError(child.error_result.get("message", ""))
+                else:
+                    outcome = child.to_dataframe()
+                results[name] = (outcome, _child_ms(child))
+
+    for name in specs:
+        results.setdefault(
+            name, (ScriptQueryError("no result from the script batch"), 0.0),
+        )
+    return results
+
+
+def run_batch(client, queries, log_failure):
+    """``_bq_parallel``'s script mode: ``{name: DataFrame}`` for ``queries``
+    run through the query cache as one script job, or ``None`` when the
+    caller should use its per-query pool instead (mode off, a single query,
+    or the script failed as a whole).
+
+    A query that fails on its own is passed to ``log_failure(name, exc)``
+    and comes back as an empty DataFrame, like the pool's per-key contract.
+    """
+    if not script_batch_enabled() or len(queries) < 2:
+        return None
+    from app.query_cache import cached_query_batch
+
+    try:
+        outcomes = cached_query_batch(client, queries)
+    except Exception as exc:
+        _log.warning("_bq_parallel: script batch failed, running per query: %s", exc)
+        return None
+    results = {}
+    for name, value in outcomes.items():
+        if isinstance(value, Exception):
+            log_failure(name, value)
+            value = pd.DataFrame()
+        results[name] = value
+    return results
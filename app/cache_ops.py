@@ -14,7 +14,15 @@ changes. This module provides that hook:
 called as the LAST step of ``bigquery_update.yml`` and
 ``prices_refresh.yml``. It clears the shared cache and then WARMS the
 hottest query sets in a background thread so even the first visit after a
-rebuild is fast.
+rebuild is fast. Scopes warm a few at a time, most recently active users
+first (``user_review_visits``), and each user's most-viewed
+``/position/<symbol>`` pages are warmed with them. Progress shows up in
+``CACHE_WARM`` log lines and under ``warm`` in ``/internal/cache/stats``.
+
+A rebuild scoped to some tenants (the per-tenant webhook sync) passes
+their ids — ``{"tenant_ids": [...]}`` or ``?tenant_ids=a,b`` — and only
+the cached queries that read those tenants (plus unscoped/admin ones) are
+dropped and re-warmed; every other tenant keeps its warm entries.
 
 TENANT SAFETY
 -------------
@@ -26,11 +34,13 @@ applies ``_filter_df_by_tenant_ids`` on top.
 
 STALENESS BOUND
 ---------------
-``query_cache.clear()`` empties this worker's in-process L1 and the shared
-Redis L2. The OTHER Gunicorn worker's L1 survives until its own TTL
-(default 10 min) — so post-rebuild staleness is bounded by the L1 TTL,
-same as before this module existed. The big win is the shared L2 TTL can
-now be a day instead of 10 minutes.
+``query_cache.clear()`` (or ``invalidate_tenants``) empties this worker's
+in-process L1 and the shared Redis L2, and bumps a generation counter in
+Redis. The OTHER Gunicorn worker reads that counter on its lookup path (at
+most once a second) and drops the same L1 entries, so post-rebuild
+staleness is about a second (stale-while-revalidate entries are dropped
+too) — which is what lets the L1 TTL be hours.
+Without Redis there is no second channel and the L1 TTL stays 10 min.
 """
 
 import hmac
@@ -39,6 +49,7 @@ import os
 import sys
 import threading
 import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
 from flask import abort, jsonify, request
 
@@ -62,11 +73,32 @@ if not _log.handlers:
 # Only one warm pass at a time; a second flush while warming just flushes.
 _warm_lock = threading.Lock()
 
+# Scopes warmed concurrently. Each scope fans out through ``_bq_parallel``
+# (up to 16 jobs at once), so 3 scopes stay under half of BigQuery's
+# default 100 concurrent interactive queries and leave live traffic room.
+_DEFAULT_WARM_WORKERS = 3
+
+# Position Detail pages warmed per user (their most-viewed symbols).
+_DEFAULT_WARM_SYMBOLS = 5
+
+# Progress of the current / last warm pass (served by the stats endpoint).
+_warm_progress = {}
+_progress_lock = threading.Lock()
+
+
+def _env_int(name, default):
+    try:
+        return max(0, int(os.environ.get(name, default)))
+    except (TypeError, ValueError):
+        return default
+
 
-def _warm_scopes():
+def _warm_scopes(targets=None):
     """(user_id, tenant_id list) pairs to warm: every user with linked
-    tenants, plus one unscoped pass (admin view / shared queries).
-    Filters are rendered per-query inside ``_warm_one_scope`` because
+    tenants, most recent Daily Review visit first (never-visited users
+    last), plus one unscoped pass (admin view / shared queries).
+    With ``targets``, only users holding one of those tenants (their
+    entries are the ones ``invalidate_tenants`` dropped). Filters are rendered per-query inside ``_warm_one_scope`` because
     different queries need different column prefixes (e.g. the trader
     story's ``h.tenant_id``)."""
     from app.db import fetch_all
@@ -75,8 +107,11 @@ def _warm_scopes():
     scopes = []
     try:
         rows = fetch_all(
-            "SELECT DISTINCT user_id FROM broker_tenants "
-            "WHERE user_id IS NOT NULL"
+            "SELECT b.user_id FROM broker_tenants b "
+            "LEFT JOIN user_review_visits v ON v.user_id = b.user_id "
+            "WHERE b.user_id IS NOT NULL "
+            "GROUP BY b.user_id "
+            "ORDER BY MAX(v.last_visit_at) DESC NULLS LAST, b.user_id"
         )
     except Exception as exc:
         _log.warning("cache warm: could not list users: %s", exc)
@@ -85,7 +120,7 @@ def _warm_scopes():
         uid = row.get("user_id")
         tenants = get_broker_tenants_for_user(uid) or []
         ids = [t["tenant_id"] for t in tenants if t.get("tenant_id")]
-        if ids:
+        if ids and (targets is None or targets.intersection(ids)):
             scopes.append((uid, ids))
     # Admin sees the unscoped variant (tenant_ids=None -> "" filter).
     scopes.append((None, None))
@@ -94,7 +129,8 @@ def _warm_scopes():
 
 def _warm_one_scope(client, uid, tenant_ids):
     """Run the hot query sets for one tenant scope through the cache."""
-    from app.models import get_user_profile
+    from app.models import get_user_profile, list_top_viewed_symbols
+    from app.position_detail import position_query_batch
     from app.query_cache import cached_query_df
     from app.tenant_scope import tenant_sql_and
     from app.weekly_review import (
@@ -104,7 +140,9 @@ def _warm_one_scope(client, uid, tenant_ids):
         _trades_as_of_date,
         _us_market_session,
         build_daily_review_batch,
+        daily_review_page_query,
     )
+    from app.daily_review_page import note_page_coverage, page_mart_enabled
     from app.positions_page import DEFAULT_QUERY as POSITIONS_DEFAULT_QUERY
     from app.trader_story import story_query_batch
 
@@ -118,10 +156,16 @@ def _warm_one_scope(client, uid, tenant_ids):
     this_week = _iso_week_start(today)
     trades_as_of = _trades_as_of_date(today, _us_market_session())
 
-    # Daily Review core batch (the primary landing page).
+    # Daily Review core batch (the primary landing page): the page-mart
+    # read the view tries first, plus the live batch it falls back to.
+    # The page read also tells the view whether the mart covers this scope.
     batch = build_daily_review_batch(
         tenant_filter, today, this_week, trades_as_of=trades_as_of)
-    _bq_parallel(client, batch)
+    if page_mart_enabled():
+        batch["page"] = daily_review_page_query(tenant_filter)
+    warmed = _bq_parallel(client, batch)
+    if "page" in batch:
+        note_page_coverage(warmed.get("page"))
 
     # Positions list default (all-time) query.
     cached_query_df(
@@ -137,32 +181,135 @@ def _warm_one_scope(client, uid, tenant_ids):
     # SQL text is guaranteed to match what a request looks up.
     _bq_parallel(client, story_query_batch(tenant_ids))
 
+    # Position Detail for the user's most-viewed symbols, with the page's
+    # default scope (every owned tenant for both filters). The unscoped
+    # admin pass has no per-user history to rank by.
+    if uid is not None:
+        limit = _env_int("CACHE_WARM_SYMBOLS", _DEFAULT_WARM_SYMBOLS)
+        for symbol in list_top_viewed_symbols(uid, limit) if limit else []:
+            _bq_parallel(client, position_query_batch(
+                symbol.replace("'", "''"), tenant_ids, tenant_ids))
+
+
+def _progress(**fields):
+    with _progress_lock:
+        _warm_progress.update(fields)
 
-def _warm_worker():
-    """Background warm pass. Never raises; logs a one-line summary."""
+
+def _timed_scope(client, uid, tenant_ids):
+    """Warm one scope; returns ``(elapsed_ms, error or None)``."""
+    t0 = time.perf_counter()
+    try:
+        _warm_one_scope(client, uid, tenant_ids)
+        err = None
+    except Exception as exc:
+        err = exc
+    return (time.perf_counter() - t0) * 1000.0, err
+
+
+def _warm_worker(targets=None):
+    """Background warm pass. Never raises; logs one line per scope and a
+    summary.
+
+    Scopes run ``CACHE_WARM_WORKERS`` at a time (default 3) in
+    ``_warm_scopes`` order, so the most active users are warm first.
+    """
     from app.bigquery_client import get_bigquery_client
 
     t0 = time.perf_counter()
     ok = failed = 0
+    _progress(running=True, total=0, done=0, failed=0, elapsed_ms=0)
     try:
+        from app.models import flush_symbol_views
+
+        # Pick up the rebuild's warehouse_builds stamps first: the token
+        # otherwise advances only on the background refresh, and entries
+        # warmed under the old token would be orphaned a minute later.
+        query_cache.refresh_warehouse_tokens()
+        # Land this worker's buffered Position Detail views before the
+        # most-viewed lists are read.
+        flush_symbol_views()
         client = get_bigquery_client()
-        for uid, tenant_ids in _warm_scopes():
-            try:
-                _warm_one_scope(client, uid, tenant_ids)
-                ok += 1
-            except Exception as exc:
-                failed += 1
-                _log.warning("cache warm: scope user=%r failed: %s", uid, exc)
+        scopes = _warm_scopes(targets)
+        total = len(scopes)
+        _progress(total=total)
+        workers = max(1, _env_int("CACHE_WARM_WORKERS", _DEFAULT_WARM_WORKERS))
+        with ThreadPoolExecutor(
+            max_workers=min(workers, total or 1), thread_name_prefix="cache-warm",
+        ) as pool:
+            futures = {
+                pool.submit(_timed_scope, client, uid, tenant_ids): uid
+                for uid, tenant_ids in scopes
+            }
+            for future in as_completed(futures):
+                uid = futures[future]
+                ms, err = future.result()
+                if err is None:
+                    ok += 1
+                else:
+                    failed += 1
+                    _log.warning("cache warm: scope user=%r failed: %s", uid, err)
+                _progress(done=ok + failed, failed=failed)
+                _log.info(
+                    "CACHE_WARM scope user=%r ok=%s ms=%.0f progress=%d/%d",
+                    uid, err is None, ms, ok + failed, total,
+                )
     except Exception as exc:
         _log.warning("cache warm: aborted: %s", exc)
     finally:
+        elapsed_ms = (time.perf_counter() - t0) * 1000.0
+        _progress(running=False, elapsed_ms=round(elapsed_ms))
         _warm_lock.release()
     _log.info(
         "CACHE_WARM done scopes_ok=%d scopes_failed=%d elapsed_ms=%.0f",
-        ok, failed, (time.perf_counter() - t0) * 1000.0,
+        ok, failed, elapsed_ms,
     )
 
 
+def _requested_tenant_ids():
+    """Tenant ids named by the flush call (JSON ``tenant_ids`` list or a
+    comma-separated ``tenant_ids`` arg), sanitized; ``None`` when absent."""
+    from app.tenant_scope import sanitize_tenant_id
+
+    body = request.get_json(silent=True) or {}
+    raw = body.get("tenant_ids") if isinstance(body, dict) else None
+    if raw is None:
+        arg = request.args.get("tenant_ids")
+        if arg is None:
+            return None
+        raw = arg.split(",")
+    if isinstance(raw, str):
+        raw = raw.split(",")
+    ids = [sanitize_tenant_id(str(t).strip()) for t in raw or []]
+    return sorted({t for t in ids if t})
+
+
+def _require_flush_token():
+    """403 unless ``X-Cache-Flush-Token`` matches ``CACHE_FLUSH_TOKEN``
+    (constant-time compare; fails closed when the env var is unset)."""
+    expected = (os.environ.get("CACHE_FLUSH_TOKEN") or "").strip()
+    provided = (request.headers.get("X-Cache-Flush-Token") or "").strip()
+    if not expected or not hmac.compare_digest(provided, expected):
+        abort(403)
+
+
+@app.route("/internal/cache/stats", methods=["GET"])
+@limiter.limit("60 per hour")
+def internal_cache_stats():
+    """This worker's L1 footprint: resident bytes per query label, plus the
+    progress of its current / last warm pass.
+
+    Same token as the flush hook. Each call reports whichever Gunicorn
+    worker served it; sample a few times to see both.
+    """
+    _require_flush_token()
+    stats = query_cache.l1_stats()
+    stats["pid"] = os.getpid()
+    with _progress_lock:
+        stats["warm"] = dict(_warm_progress)
+    return jsonify(stats)
+
+
 @app.route("/internal/cache/flush", methods=["POST"])
 @csrf.exempt
 @limiter.limit("30 per hour")
@@ -171,14 +318,21 @@ def internal_cache_flush():
 
     Auth: constant-time compare of ``X-Cache-Flush-Token`` against the
     ``CACHE_FLUSH_TOKEN`` env var. Fails closed when the env var is unset.
-    ``?warm=0`` skips the warm pass (flush only).
+    ``?warm=0`` skips the warm pass (flush only). ``tenant_ids`` narrows
+    the flush and the warm pass to those tenants; a list that sanitizes
+    to nothing is a 400 rather than a silent global flush.
     """
-    expected = (os.environ.get("CACHE_FLUSH_TOKEN") or "").strip()
-    provided = (request.headers.get("X-Cache-Flush-Token") or "").strip()
-    if not expected or not hmac.compare_digest(provided, expected):
-        abort(403)
+    _require_flush_token()
 
-    query_cache.clear()
+    tenant_ids = _requested_tenant_ids()
+    if tenant_ids is None:
+        query_cache.clear()
+        targets = None
+    elif not tenant_ids:
+        abort(400)
+    else:
+        query_cache.invalidate_tenants(tenant_ids)
+        targets = frozenset(tenant_ids)
 
     warming = False
     if request.args.get("warm", "1") != "0":
@@ -186,8 +340,14 @@ def internal_cache_flush():
         # (it started from a just-flushed cache at most a rebuild ago).
         if _warm_lock.acquire(blocking=False):
             threading.Thread(
-                target=_warm_worker, name="cache-warm", daemon=True
+                target=_warm_worker, args=(targets,), name="cache-warm",
+                daemon=True,
             ).start()
             warming = True
-    _log.info("CACHE_FLUSH ok warming=%s", warming)
-    return jsonify({"flushed": True, "warming": warming})
+    _log.info(
+        "CACHE_FLUSH ok warming=%s tenants=%s",
+        warming, ",".join(tenant_ids) if tenant_ids else "all",
+    )
+    return jsonify({
+        "flushed": True, "warming": warming, "tenant_ids": tenant_ids,
+    })
@@ -0,0 +1,341 @@
+"""Daily Review page mart — the page's batch from ONE BigQuery job.
+
+``build_daily_review_batch`` fans out ~16 small queries per Daily Review
+load. Each is dominated by BigQuery's ~1-2s fixed per-job latency, not by
+scan size, so a cold page costs the slowest of 16 jobs plus the
+contention of running them side by side. ``mart_daily_review_page``
+(dbt/models/marts/mart_daily_review_page.sql) precomputes every one of
+those results per tenant at build time as JSON rows keyed by batch name.
+The view reads its tenants' rows with ``PAGE_QUERY`` and
+``split_page_frame`` turns them back into the frames the live batch
+would have returned. The rest of the view does not know which path ran.
+
+WHEN THE MART CANNOT SERVE (``split_page_frame`` returns ``None``) the
+caller uses the live batch instead:
+  * any row built before today (UTC) — the queries' CURRENT_DATE()
+    windows only match on the build date (00:00 UTC until the nightly
+    build, or a tenant-scoped build that left the market rows behind);
+  * a requested tenant with no rows yet (connected after the last build);
+  * a week / year / fill date outside what the build precomputed
+    (the ``_meta`` row);
+  * ``DAILY_REVIEW_PAGE_MART=0`` (operator kill switch).
+
+The first two are routine, so the caller does not wait for the page read
+to find out: ``note_page_coverage`` remembers what the page reads showed
+(the build date and the tenants it covered) and ``page_likely_serves``
+says whether a request is covered. When it is not — or when nothing is
+known yet — the live batch runs in the same wave as the page read.
+
+TENANCY: ``PAGE_QUERY`` carries ``{tenant_filter}`` like every page query
+and the rows are re-filtered by ``tenant_ids`` here. Symbol-grain sections
+are stored as per-tenant partial sums and aggregated over the requested
+tenants only AFTER that filter; the per-row sections keep ``tenant_id``
+so the view's ``_filter_df_by_tenant_ids`` pass still applies.
+"""
+
+import json
+import os
+import threading
+from datetime import date, datetime, timezone
+
+import pandas as pd
+
+PAGE_QUERY = """
+SELECT tenant_id, section, row_json, built_on
+FROM `ccwj-dbt.analytics.mart_daily_review_page`
+WHERE tenant_id = '*'
+   OR (1=1 {tenant_filter})
+"""
+
+# Market-wide rows (benchmarks, SPY/QQQ context, the build's _meta).
+MARKET_TENANT = "*"
+
+# Columns of each section's JSON rows, in the live query's order (so an
+# empty section still comes back with its columns, like a live frame).
+_SECTION_COLUMNS = {
+    "account_value": ("tenant_id", "account", "account_value", "cash_balance"),
+    "snapshots": (
+        "account", "tenant_id", "date", "account_value",
+        "base_1d_date", "base_1d_value", "delta_1d", "delta_1d_pct",
+        "base_1w_date", "base_1w_value", "delta_1w", "delta_1w_pct",
+        "base_1m_date", "base_1m_value", "delta_1m", "delta_1m_pct",
+    ),
+    "positions": (
+        "account", "tenant_id", "symbol", "instrument_type", "trade_symbol",
+        "description", "quantity", "current_price", "market_value",
+        "cost_basis", "unrealized_pnl", "unrealized_pnl_pct", "option_expiry",
+        "option_strike", "option_type", "latest_stock_price",
+    ),
+    "earnings": (
+        "symbol", "next_earnings_date", "earnings_window_start",
+        "earnings_window_end", "long_name", "sector", "subsector",
+    ),
+    "today_moves": (
+        "symbol", "shares", "current_value", "today_close", "prev_close",
+        "today_date", "prev_date",
+    ),
+    "today_options_moves": ("symbol", "today_date", "day_change"),
+    "today_dividends": ("symbol", "trade_date", "amount"),
+    "upcoming_divs": (
+        "symbol", "last_ex_div_date", "last_amount_per_share",
+        "median_spacing_days", "projected_next_ex_div_date", "sector",
+        "subsector", "long_name",
+    ),
+    "weekly_trades": (
+        "week_start", "account", "tenant_id", "symbol", "strategy",
+        "trade_symbol", "open_date", "close_date", "status", "trade_cost",
+        "current_market_value", "current_unrealized_pnl", "total_pnl",
+        "num_trades",
+    ),
+    "today_trades": (
+        "tenant_id", "account", "user_id", "trade_date", "action",
+        "trade_symbol", "underlying_symbol", "description", "quantity",
+        "price", "amount", "instrument_type",
+    ),
+    "attribution": (
+        "week_start", "tenant_id", "account", "user_id", "symbol",
+        "equity_pnl", "option_pnl", "dividend_income", "net_pnl",
+        "equity_capital", "option_capital_paid", "option_premium_collected",
+        "current_equity_cost", "current_equity_value", "current_option_value",
+        "current_option_unrealized", "current_equity_unrealized",
+        "current_equity_shares", "num_equity_legs", "num_option_legs",
+        "num_open_groups", "num_closed_groups", "current_price",
+        "first_open_date", "last_activity_date", "days_held", "status",
+        "sector", "subsector", "company_name", "last_dividend_date",
+        "dividend_count",
+    ),
+    "exit_verdicts": (
+        "tenant_id", "account", "symbol", "trade_symbol", "option_type",
+        "option_strike", "option_expiry", "direction", "open_date",
+        "close_date", "close_type", "days_held", "dte_at_close", "contracts",
+        "premium_received", "cost_to_close", "proceeds_from_close",
+        "realized_pnl", "underlying_close_at_expiry", "intrinsic_at_expiry",
+        "expiry_settlement_value", "expired_worthless",
+        "gradeable_early_close", "early_close_vs_expiry_delta", "was_rolled",
+        "roll_new_strike", "roll_new_expiry", "net_roll_credit",
+        "peak_unrealized_pnl", "snapshot_count", "snapshot_density",
+        "data_reliable", "pnl_given_back", "giveback_pct",
+    ),
+    "open_options": (
+        "tenant_id", "account", "symbol", "trade_symbol", "option_type",
+        "option_strike", "option_expiry", "direction", "open_date",
+        "contracts_sold_to_open", "contracts_bought_to_open",
+        "premium_received", "premium_paid", "current_market_value",
+        "current_unrealized_pnl",
+    ),
+    "benchmark_snapshot": (
+        "symbol", "latest_close", "day_close", "week_close", "month_close",
+    ),
+    "market_perf": ("week_start", "ytd_start", "symbol", "week_pct", "ytd_pct"),
+}
+
+# DATE columns come back from JSON as ISO strings; the live frames carry
+# ``datetime.date`` values.
+_DATE_COLUMNS = frozenset({
+    "date", "base_1d_date", "base_1w_date", "base_1m_date", "option_expiry",
+    "next_earnings_date", "earnings_window_start", "earnings_window_end",
+    "today_date", "prev_date", "trade_date", "last_ex_div_date",
+    "projected_next_ex_div_date", "week_start", "open_date", "close_date",
+    "first_open_date", "last_activity_date", "last_dividend_date",
+    "roll_new_expiry", "ytd_start",
+})
+
+
+def page_mart_enabled():
+    """``DAILY_REVIEW_PAGE_MART=0`` sends every Daily Review load through
+    the live batch."""
+    return os.environ.get("DAILY_REVIEW_PAGE_MART", "1").strip().lower() not in (
+        "0", "false", "no", "off",
+    )
+
+
+# What the page reads showed about the mart: the UTC date it was built on
+# and the tenants it had rows for on that build. Per process; a rebuild on
+# the same day keeps the same date, and any read built on another day
+# (or mixed days) starts over.
+_coverage_lock = threading.Lock()
+_coverage = {"built_on": None, "tenants": frozenset()}
+
+
+def note_page_coverage(page_df):
+    """Remember the build date and tenants of a ``PAGE_QUERY`` result."""
+    needed = {"tenant_id", "section", "built_on"}
+    built_on, tenants = None, frozenset()
+    if page_df is not None and not page_df.empty and needed.issubset(page_df.columns):
+        days = {_as_date(v) for v in page_df["built_on"]}
+        if len(days) == 1 and (page_df["section"] == "_meta").any():
+            built_on = days.pop()
+            tenants = frozenset(page_df.loc[page_df["tenant_id"] != MARKET_TENANT, "tenant_id"])
+    with _coverage_lock:
+        if built_on is not None and built_on == _coverage["built_on"]:
+            tenants = tenants | _coverage["tenants"]
+        _coverage.update(built_on=built_on, tenants=tenants)
+
+
+def page_likely_serves(tenant_ids, utc_today=None):
+    """Whether the last page reads say the mart covers ``tenant_ids`` today
+    (UTC). ``False`` when nothing is known yet."""
+    utc_today = utc_today or datetime.now(timezone.utc).date()
+    with _coverage_lock:
+        if _coverage["built_on"] != utc_today:
+            return False
+        return tenant_ids is None or set(tenant_ids) <= _coverage["tenants"]
+
+
+def _as_date(value):
+    """A DATE cell (ISO string from JSON, or a date/timestamp) as a
+    ``datetime.date``; ``None`` for nulls."""
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    if isinstance(value, str) and value:
+        try:
+            return date.fromisoformat(value[:10])
+        except ValueError:
+            return None
+    return None
+
+
+def _section_frame(section, records):
+    """One section's rows as a frame shaped like the live query's."""
+    df = pd.DataFrame.from_records(records, columns=list(_SECTION_COLUMNS[section]))
+    for col in df.columns:
+        if col in _DATE_COLUMNS:
+            df[col] = [_as_date(v) for v in df[col]]
+    return df
+
+
+def _finish_today_moves(df):
+    """Per-tenant share counts -> TODAY_MOVES_QUERY's per-symbol rows."""
+    g = df.groupby("symbol", sort=False).agg(
+        shares=("shares", "sum"),
+        current_value=("current_value", "sum"),
+        today_close=("today_close", "first"),
+        prev_close=("prev_close", "first"),
+        today_date=("today_date", "first"),
+        prev_date=("prev_date", "first"),
+    ).reset_index()
+    change = g["today_close"] - g["prev_close"]
+    g["price_change"] = change.round(4)
+    g["price_change_pct"] = (change / g["prev_close"] * 100).round(2)
+    g["dollar_impact"] = (g["shares"] * change).round(2)
+    return g[g["shares"] > 0].reset_index(drop=True)
+
+
+def _finish_today_options_moves(df):
+    g = df.groupby("symbol", sort=False).agg(
+        today_date=("today_date", "max"),
+        dollar_impact=("day_change", "sum"),
+    ).reset_index()
+    g["dollar_impact"] = g["dollar_impact"].round(2)
+    return g[g["dollar_impact"].abs() >= 0.01].reset_index(drop=True)
+
+
+def _finish_today_dividends(df):
+    g = df.groupby(["symbol", "trade_date"], sort=False).agg(
+        amount=("amount", "sum"),
+    ).reset_index()
+    g["amount"] = g["amount"].round(2)
+    return g[g["amount"].abs() >= 0.01].reset_index(drop=True)
+
+
+def _finish_calendar(snapshots, cal_start, cal_end):
+    """DAILY_CALENDAR_QUERY from the snapshot rows: per-date sums across
+    the scope's accounts inside the calendar window."""
+    mask = [d is not None and cal_start <= d <= cal_end for d in snapshots["date"]]
+    in_window = snapshots.loc[pd.Series(mask, index=snapshots.index, dtype=bool)]
+    g = in_window.groupby("date").agg(
+        account_value=("account_value", lambda s: s.sum(min_count=1)),
+        daily_change=("delta_1d", lambda s: s.fillna(0).sum()),
+    ).reset_index()
+    g["daily_change"] = g["daily_change"].astype(float).round(2)
+    return g[["date", "account_value", "daily_change"]]
+
+
+def _sorted(df, by, ascending=True, na_position="last"):
+    return df.sort_values(
+        by, ascending=ascending, na_position=na_position, kind="stable",
+    ).reset_index(drop=True)
+
+
+def split_page_frame(page_df, tenant_ids, *, today, this_week, trades_as_of,
+                     cal_start, cal_end, utc_today=None):
+    """Rebuild the ``build_daily_review_batch`` frames from the page rows.
+
+    Returns a dict keyed like the live batch, or ``None`` when the mart
+    cannot answer this request exactly (see the module docstring) and the
+    caller must run the live batch.
+    """
+    needed = {"tenant_id", "section", "row_json", "built_on"}
+    if page_df is None or page_df.empty or not needed.issubset(page_df.columns):
+        return None
+    utc_today = utc_today or datetime.now(timezone.utc).date()
+    if {_as_date(v) for v in page_df["built_on"]} != {utc_today}:
+        return None
+
+    rows = page_df
+    if tenant_ids is not None:
+        wanted = set(tenant_ids)
+        seen = set(rows.loc[rows["tenant_id"] != MARKET_TENANT, "tenant_id"])
+        if not wanted.issubset(seen):
+            return None
+        rows = rows[(rows["tenant_id"] == MARKET_TENANT) | rows["tenant_id"].isin(wanted)]
+
+    records = {}
+    for section, row_json in zip(rows["section"], rows["row_json"]):
+        records.setdefault(section, []).append(json.loads(row_json))
+
+    meta = (records.get("_meta") or [None])[0]
+    if not meta:
+        return None
+    if (this_week.isoformat() not in meta.get("week_starts", ())
+            or date(today.year, 1, 1).isoformat() not in meta.get("ytd_starts", ())
+            or not meta.get("trades_from")
+            or trades_as_of < date.fromisoformat(meta["trades_from"])):
+        return None
+
+    f = {s: _section_frame(s, records.get(s, [])) for s in _SECTION_COLUMNS}
+
+    trades = f["today_trades"]
+    trades = trades[trades["trade_date"] == trades_as_of]
+    # ORDER BY underlying_symbol, ABS(amount) DESC — BigQuery sorts NULLs
+    # first ascending and last descending, hence the two stable passes.
+    trades = trades.assign(_abs_amount=trades["amount"].abs())
+    trades = _sorted(trades, "_abs_amount", ascending=False)
+    trades = _sorted(trades, "underlying_symbol", na_position="first")
+
+    weekly = f["weekly_trades"]
+    weekly = weekly[weekly["week_start"] == this_week].drop(columns="week_start")
+
+    attribution = f["attribution"]
+    attribution = attribution[attribution["week_start"] == this_week].drop(
+        columns="week_start").reset_index(drop=True)
+
+    market = f["market_perf"]
+    market = market[
+        (market["week_start"] == this_week)
+        & (market["ytd_start"] == date(today.year, 1, 1))
+    ].drop(columns=["week_start", "ytd_start"]).reset_index(drop=True)
+
+    return {
+        "account_value": f["account_value"],
+        "snapshots": _sorted(f["snapshots"], "date", ascending=False),
+        "positions": _sorted(f["positions"], ["symbol", "instrument_type"]),
+        "calendar": _finish_calendar(f["snapshots"], cal_start, cal_end),
+        "earnings": _sorted(
+            f["earnings"].drop_duplicates(), ["next_earnings_date", "symbol"]),
+        "today_moves": _finish_today_moves(f["today_moves"]),
+        "today_options_moves": _finish_today_options_moves(f["today_options_moves"]),
+        "today_dividends": _finish_today_dividends(f["today_dividends"]),
+        "upcoming_divs": _sorted(
+            f["upcoming_divs"].drop_duplicates(), "projected_next_ex_div_date"),
+        "weekly_trades": _sorted(
+            weekly, ["close_date", "open_date"], ascending=False),
+        "today_trades": trades.drop(columns="_abs_amount"),
+        "attribution": attribution,
+        "benchmark_snapshot": f["benchmark_snapshot"],
+        "market_perf": market,
+        "exit_verdicts": f["exit_verdicts"],
+        "open_options": f["open_options"],
+    }
@@ -9,6 +9,8 @@ import json
 import logging
 import os
 import secrets
+import threading
+import time
 
 from flask_login import UserMixin
 from werkzeug.security import generate_password_hash, check_password_hash
@@ -226,6 +228,18 @@ def init_db():
             prev_visit_at  TIMESTAMPTZ
         )
         """,
+        # Per-user Position Detail view counts. Only the cache warmer reads
+        # this (it pre-runs /position/<symbol> for each user's most-viewed
+        # symbols after a rebuild), so it is a plain counter, not a log.
+        """
+        CREATE TABLE IF NOT EXISTS user_symbol_views (
+            user_id         INTEGER NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+            symbol          TEXT NOT NULL,
+            view_count      INTEGER NOT NULL DEFAULT 0,
+            last_viewed_at  TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+            PRIMARY KEY (user_id, symbol)
+        )
+        """,
         # Idempotency log for outbound email. Every send the app initiates
         # (connection-dropped notice, weekly digest, re-engagement) records a
         # row keyed by (kind, dedupe_key). The UNIQUE constraint + INSERT ...
@@ -2575,6 +2589,76 @@ def bump_review_visit(user_id, now):
     return prior
 
 
+# Position Detail view counts are buffered per process and written by a
+# short-lived background flusher, so a page render never waits on the
+# upsert. Views are only a warming heuristic: a buffer lost to a worker
+# restart costs nothing but a slightly stale "most viewed" list.
+_SYMBOL_VIEW_FLUSH_S = float(os.environ.get("SYMBOL_VIEW_FLUSH_SECONDS", "10"))
+_symbol_views_lock = threading.Lock()
+_pending_symbol_views = {}  # (user_id, symbol) -> views since the last flush
+_symbol_view_flush_scheduled = False
+
+
+def bump_symbol_view(user_id, symbol):
+    """Count one Position Detail view of ``symbol``. Buffered (see above);
+    never raises — a failed counter must not break the page."""
+    global _symbol_view_flush_scheduled
+    key = (user_id, symbol)
+    with _symbol_views_lock:
+        _pending_symbol_views[key] = _pending_symbol_views.get(key, 0) + 1
+        if _symbol_view_flush_scheduled:
+            return
+        _symbol_view_flush_scheduled = True
+    try:
+        threading.Thread(
+            target=_flush_symbol_views_later, name="symbol-views", daemon=True,
+        ).start()
+    except Exception as exc:
+        with _symbol_views_lock:
+            _symbol_view_flush_scheduled = False
+        _log.warning("bump_symbol_view: could not schedule flush: %s", exc)
+
+
+def _flush_symbol_views_later():
+    time.sleep(_SYMBOL_VIEW_FLUSH_S)
+    flush_symbol_views()
+
+
+def flush_symbol_views():
+    """Write the buffered view counts in one upsert. Never raises."""
+    global _symbol_view_flush_scheduled
+    with _symbol_views_lock:
+        batch = dict(_pending_symbol_views)
+        _pending_symbol_views.clear()
+        _symbol_view_flush_scheduled = False
+    if not batch:
+        return
+    params = []
+    for (user_id, symbol), count in sorted(batch.items(), key=lambda kv: str(kv[0])):
+        params.extend((user_id, symbol, count))
+    try:
+        execute(
+            "INSERT INTO user_symbol_views (user_id, symbol, view_count, last_viewed_at) "
+            "VALUES " + ", ".join(["(%s, %s, %s, NOW())"] * len(batch)) + " "
+            "ON CONFLICT (user_id, symbol) DO UPDATE SET "
+            "view_count = user_symbol_views.view_count + EXCLUDED.view_count, "
+            "last_viewed_at = NOW()",
+            params,
+        )
+    except Exception as exc:
+        _log.warning("flush_symbol_views failed (%d keys dropped): %s", len(batch), exc)
+
+
+def list_top_viewed_symbols(user_id, limit=5):
+    """The user's most-viewed Position Detail symbols, most viewed first."""
+    rows = fetch_all(
+        "SELECT symbol FROM user_symbol_views WHERE user_id = %s "
+        "ORDER BY view_count DESC, last_viewed_at DESC LIMIT %s",
+        (user_id, int(limit)),
+    )
+    return [r["symbol"] for r in rows or []]
+
+
 # ──────────────────────────────────────────────────────────────────────────
 # Position leg tags — user-defined labels on a position leg (chapter of
 # trading activity). Freeform, reusable, multiple per leg. Isolation is
@@ -25,9 +25,16 @@ from urllib.parse import quote_plus
 from app import app
 from app.extensions import limiter
 from app.bigquery_client import get_bigquery_client
-from app.query_cache import cached_query_df, cached_payload, frame_fingerprint, timed
+from app.query_cache import (
+    cached_json,
+    cached_payload,
+    cached_query_df,
+    frame_fingerprint,
+    timed,
+    value_fingerprint,
+)
 from app.skeleton import skeleton_page
-from app.models import get_tenant_ids_for_user, is_admin
+from app.models import bump_symbol_view, get_tenant_ids_for_user, is_admin
 from app.utils import user_local_today
 from app.tenant_scope import (
     filter_df_by_tenant_ids as _filter_df_by_tenant_ids,
@@ -1181,6 +1188,191 @@ from app.execution_quality import (  # noqa: E402
 )
 
 
+def position_query_batch(safe_symbol, tenant_scope, all_owned_scope):
+    """The /position/<symbol> query set, keyed for `_bq_parallel`. Shared
+    with the cache warmer (app/cache_ops.py) so warmed keys are EXACTLY the
+    keys a request looks up — same discipline as story_query_batch.
+
+    ``safe_symbol`` is already quote-escaped; ``tenant_scope`` is the page's
+    account filter and ``all_owned_scope`` the viewer's full owned set.
+    """
+    _pos_acct = _tenant_sql_and(tenant_scope)
+    _pos_all_acct = _tenant_sql_and(all_owned_scope)
+    _pos_sc_acct = _tenant_sql_and(tenant_scope, col="sc.tenant_id")
+    # POSITION_TRADES_QUERY joins stg_history (alias h) to int_drip_fills (alias d);
+    # both tables have an `account` column so the filter must be scoped to h.
+    _pos_h_acct = _tenant_sql_and(tenant_scope, col="h.tenant_id")
+    # Single parallel wave. Every query below is a tiny (~MB) read whose
+    # cost is BigQuery's fixed per-job latency, so the win is running them
+    # ALL AT ONCE rather than in serial phases. The chart (mart_daily_pnl)
+    # and dividends (int_dividend_events) reads used to run serially AFTER
+    # this batch (a ~2s round trip each); they are URL-derived and
+    # independent of the batch, so they join the wave here. All the
+    # batch-result-dependent logic (summary narrowing, leg filtering)
+    # stays in Python after the fetch.
+    from app.upload import is_crypto_symbol
+    _is_crypto = is_crypto_symbol(safe_symbol)
+    queries = {
+        "summary": POSITION_SUMMARY_QUERY.format(
+            symbol=safe_symbol, tenant_filter=_pos_acct
+        ),
+        "trades": POSITION_TRADES_QUERY.format(
+            symbol=safe_symbol, tenant_filter=_pos_h_acct
+        ),
+        "current": POSITION_CURRENT_QUERY.format(
+            symbol=safe_symbol, tenant_filter=_pos_acct
+        ),
+        "closed_legs": POSITION_CLOSED_LEGS_QUERY.format(
+            symbol=safe_symbol, sc_tenant_filter=_pos_sc_acct
+        ),
+        "closed_equity": POSITION_CLOSED_EQUITY_QUERY.format(
+            symbol=safe_symbol, tenant_filter=_pos_acct
+        ),
+        "matrix": POSITION_MATRIX_QUERY.format(
+            symbol=safe_symbol, tenant_filter=_pos_acct
+        ),
+        "legs": POSITION_LEGS_QUERY.format(
+            symbol=safe_symbol, tenant_filter=_pos_acct
+        ),
+        # Account-toggle bar source: every account that traded this
+        # symbol across the viewer's FULL owned set (not the ?tenants=
+        # subset), so a toggled-off account is still listed.
+        "accounts_all": POSITION_ACCOUNTS_QUERY.format(
+            symbol=safe_symbol, tenant_filter=_pos_all_acct
+        ),
+        # Lightweight all-symbols rollup that powers the symbol tab strip
+        # at the top of the page. Scoped by `tenant_scope` so the
+        # tabs match the page's account filter (when ?account= is set the
+        # strip narrows; otherwise it spans the viewer's accounts).
+        "tabs": SYMBOL_TABS_QUERY.format(tenant_filter=_pos_acct),
+        # Symbol-level next-earnings date for the hero pill. No account
+        # filter — stg_earnings_calendar is symbol-grain public data.
+        "earnings": POSITION_EARNINGS_QUERY.format(symbol=safe_symbol),
+        # Cumulative daily P&L for the chart (post-processed below).
+        "chart": CHART_DATA_QUERY.format(
+            symbol=safe_symbol, tenant_filter=_pos_acct
+        ),
+        # Stock splits for the story engine: a split is both a story
+        # beat ("your 100 shares became 300") and required for correct
+        # running-share state — stg_history quantities are in the
+        # share-units of their fill date (see stock-splits rule). No
+        # tenant filter — stg_split_events is symbol-grain public
+        # market data (like earnings above); running it through the
+        # tenant filter would fail-closed to empty.
+        "splits": POSITION_SPLITS_QUERY.format(symbol=safe_symbol),
+        # Execution review (int_option_exit_quality): after-the-fact
+        # verdicts on early closes / rolls, graded against the
+        # underlying's close at each contract's expiry. Feeds the
+        # mirror sentences and the day-row verdict notes.
+        "execution": POSITION_EXECUTION_QUERY.format(
+            symbol=safe_symbol, tenant_filter=_pos_acct
+        ),
+        # Synthesized opening balances → "history starts here" banner.
+        "opening": POSITION_OPENING_BALANCES_QUERY.format(
+            symbol=safe_symbol, tenant_filter=_pos_acct
+        ),
+    }
+    # Crypto positions don't pay dividends in our pipeline, so
+    # _compute_breakdown_by_type skips them — don't fetch the frame.
+    if not _is_crypto:
+        queries["dividends"] = POSITION_DIVIDENDS_QUERY.format(
+            symbol=safe_symbol, tenant_filter=_pos_acct
+        )
+    return queries
+
+
+def _finalize_position_chart(
+    chart_data, *, kpis, breakdown_rows, trades_pre_leg, current_df,
+    closed_legs_pre_leg, closed_equity_pre_leg, sessions_list, leg_param,
+    selected_legs,
+):
+    """The mart chart after source substitution and KPI / breakdown
+    alignment — exactly what the page renders. Pure function of its
+    arguments, so the route caches its result (and the JSON of it).
+    """
+    # Prefer stg/leg when mart is unusably short — but NEVER replace a mart chart
+    # whose terminal agrees with KPI with ``_cumulative_pnl_from_*`` substitutes.
+    #
+    # Those substitutes are legacy cash-close stepping (only closed legs / raw
+    # stg HISTORY amounts): they omit open unrealized MTM, realize-on-close option
+    # shape, ``int_dividend_events``, etc. After a Schwab sync, ``trades_pre_leg``
+    # often spans *more calendar days than mart_daily_pnl* while the mart spine
+    # still reconciles KPI + breakdown. The naive rule ``best_n > n_m`` then
+    # threw away the correct mart series (~\$85k) for a truncated cash ladder
+    # (~\$20k) — reconciliation invariant explosion (May 2026 BE).
+    _chart_dates = chart_data.get("dates") or []
+    n_m = len(_chart_dates)
+    kp_ref = float(kpis.get("total_return") or 0) if kpis else None
+    mart_term = _chart_data_terminal(chart_data)
+
+    ch_stg = (
+        _cumulative_pnl_from_stg_trades(trades_pre_leg, current_df)
+        if not trades_pre_leg.empty else None
+    )
+    n_stg = len(ch_stg["dates"]) if ch_stg and ch_stg.get("dates") else 0
+    ch_leg = _cumulative_pnl_from_leg_closes(closed_legs_pre_leg, closed_equity_pre_leg)
+    n_leg = len(ch_leg["dates"]) if ch_leg and ch_leg.get("dates") else 0
+
+    cands_src = []
+    if ch_leg and n_leg >= 2:
+        cands_src.append(("leg", ch_leg, n_leg))
+    if ch_stg and n_stg >= 2:
+        cands_src.append(("stg", ch_stg, n_stg))
+
+    if cands_src:
+        # Tie-break: prefer candidates with more x-points, leg path over stg.
+        cands_src.sort(key=lambda t: (-t[2], 0 if t[0] == "leg" else 1))
+        _, cand_data, best_n = cands_src[0]
+        cand_term = _chart_data_terminal(cand_data)
+        mart_useless = n_m <= 2
+        substitute = False
+
+        if mart_useless:
+            # Mart spine is insufficient — pick whichever substitute lands closest to
+            # KPI (prefer longer tie-break among equally-close substitutes).
+            if kp_ref is not None:
+                scored = []
+                for _nm, cd, bn in cands_src:
+                    g = abs(_chart_data_terminal(cd) - kp_ref)
+                    scored.append((g, -bn, 0 if _nm == "leg" else 1, cd))
+                scored.sort(key=lambda z: z[:3])
+                chart_data = scored[0][3]
+            else:
+                chart_data = cand_data
+        elif kp_ref is not None:
+            gap_mart_k = abs(mart_term - kp_ref)
+            gap_cand_k = abs(cand_term - kp_ref)
+            materially_better_cand = gap_cand_k + 5 < gap_mart_k
+            extended_but_not_worse = (
+                best_n > n_m
+                and gap_cand_k <= gap_mart_k + CHART_SUBSTITUTION_KPI_MARGIN
+                and gap_cand_k
+                <= max(250.0, 0.01 * max(abs(kp_ref), 1.0))
+            )
+            substitute = materially_better_cand or extended_but_not_worse
+            # Never discard a KPI-aligned mart spine for cash-flow substitutes that
+            # miss open unreal / realize-on-close / synthesized dividends (~\$65k on BE).
+            if substitute and gap_cand_k > gap_mart_k + CHART_SUBSTITUTION_KPI_MARGIN:
+                substitute = False
+            if substitute:
+                chart_data = cand_data
+
+    # Chart.js needs at least two x values to draw a line; a single mart day
+    # (e.g. new option leg) would otherwise show only a blank chart.
+    _chart_dates = chart_data.get("dates") or []
+    if kpis and (not _chart_dates or len(_chart_dates) < 2):
+        chart_data = _synthetic_cumulative_pnl_for_position(
+            kpis, sessions_list, leg_param, selected_legs, current_df
+        )
+
+    if kpis:
+        _align_position_pnl_chart_with_kpi(chart_data, kpis)
+        _snap_position_chart_terminal_to_breakdown(
+            chart_data, breakdown_rows
+        )
+    return chart_data
+
+
 @app.route("/position/<symbol>")
 @login_required
 @skeleton_page
@@ -1206,89 +1398,12 @@ def position_detail(symbol):
     all_owned_scope = _user_tenant_list()
 
     try:
-        _pos_acct = _tenant_sql_and(tenant_scope)
-        _pos_all_acct = _tenant_sql_and(all_owned_scope)
-        _pos_sc_acct = _tenant_sql_and(tenant_scope, col="sc.tenant_id")
-        # POSITION_TRADES_QUERY joins stg_history (alias h) to int_drip_fills (alias d);
-        # both tables have an `account` column so the filter must be scoped to h.
-        _pos_h_acct = _tenant_sql_and(tenant_scope, col="h.tenant_id")
-        # Single parallel wave. Every query below is a tiny (~MB) read whose
-        # cost is BigQuery's fixed per-job latency, so the win is running them
-        # ALL AT ONCE rather than in serial phases. The chart (mart_daily_pnl)
-        # and dividends (int_dividend_events) reads used to run serially AFTER
-        # this batch (a ~2s round trip each); they are URL-derived and
-        # independent of the batch, so they join the wave here. All the
-        # batch-result-dependent logic (summary narrowing, leg filtering)
-        # stays in Python after the fetch.
-        from app.upload import is_crypto_symbol
-        _is_crypto = is_crypto_symbol(safe_symbol)
-        _pos_queries = {
-            "summary": POSITION_SUMMARY_QUERY.format(
-                symbol=safe_symbol, tenant_filter=_pos_acct
-            ),
-            "trades": POSITION_TRADES_QUERY.format(
-                symbol=safe_symbol, tenant_filter=_pos_h_acct
-            ),
-            "current": POSITION_CURRENT_QUERY.format(
-                symbol=safe_symbol, tenant_filter=_pos_acct
-            ),
-            "closed_legs": POSITION_CLOSED_LEGS_QUERY.format(
-                symbol=safe_symbol, sc_tenant_filter=_pos_sc_acct
-            ),
-            "closed_equity": POSITION_CLOSED_EQUITY_QUERY.format(
-                symbol=safe_symbol, tenant_filter=_pos_acct
-            ),
-            "matrix": POSITION_MATRIX_QUERY.format(
-                symbol=safe_symbol, tenant_filter=_pos_acct
-            ),
-            "legs": POSITION_LEGS_QUERY.format(
-                symbol=safe_symbol, tenant_filter=_pos_acct
-            ),
-            # Account-toggle bar source: every account that traded this
-            # symbol across the viewer's FULL owned set (not the ?tenants=
-            # subset), so a toggled-off account is still listed.
-            "accounts_all": POSITION_ACCOUNTS_QUERY.format(
-                symbol=safe_symbol, tenant_filter=_pos_all_acct
-            ),
-            # Lightweight all-symbols rollup that powers the symbol tab strip
-            # at the top of the page. Scoped by `tenant_scope` so the
-            # tabs match the page's account filter (when ?account= is set the
-            # strip narrows; otherwise it spans the viewer's accounts).
-            "tabs": SYMBOL_TABS_QUERY.format(tenant_filter=_pos_acct),
-            # Symbol-level next-earnings date for the hero pill. No account
-            # filter — stg_earnings_calendar is symbol-grain public data.
-            "earnings": POSITION_EARNINGS_QUERY.format(symbol=safe_symbol),
-            # Cumulative daily P&L for the chart (post-processed below).
-            "chart": CHART_DATA_QUERY.format(
-                symbol=safe_symbol, tenant_filter=_pos_acct
-            ),
-            # Stock splits for the story engine: a split is both a story
-            # beat ("your 100 shares became 300") and required for correct
-            # running-share state — stg_history quantities are in the
-            # share-units of their fill date (see stock-splits rule). No
-            # tenant filter — stg_split_events is symbol-grain public
-            # market data (like earnings above); running it through the
-            # tenant filter would fail-closed to empty.
-            "splits": POSITION_SPLITS_QUERY.format(symbol=safe_symbol),
-            # Execution review (int_option_exit_quality): after-the-fact
-            # verdicts on early closes / rolls, graded against the
-            # underlying's close at each contract's expiry. Feeds the
-            # mirror sentences and the day-row verdict notes.
-            "execution": POSITION_EXECUTION_QUERY.format(
-                symbol=safe_symbol, tenant_filter=_pos_acct
-            ),
-            # Synthesized opening balances → "history starts here" banner.
-            "opening": POSITION_OPENING_BALANCES_QUERY.format(
-                symbol=safe_symbol, tenant_filter=_pos_acct
-            ),
-        }
-        # Crypto positions don't pay dividends in our pipeline, so
-        # _compute_breakdown_by_type skips them — don't fetch the frame.
-        if not _is_crypto:
-            _pos_queries["dividends"] = POSITION_DIVIDENDS_QUERY.format(
-                symbol=safe_symbol, tenant_filter=_pos_acct
-            )
+        _pos_queries = position_query_batch(
+            safe_symbol, tenant_scope, all_owned_scope,
+        )
         dfs = _bq_parallel(client, _pos_queries)
+        # Feeds the post-rebuild cache warmer's most-viewed symbols.
+        bump_symbol_view(current_user.id, symbol)
         summary_df = dfs["summary"]
         trades_df = dfs["trades"]
         current_df = dfs["current"]
@@ -1583,6 +1698,8 @@ def position_detail(symbol):
     # For open equity positions: if cost_basis is missing/zero, derive from trade history
     # so unrealized P&L = market_value - cost_basis (true P/L for open positions)
     if not current_df.empty and not trades_df.empty and "action" in trades_df.columns:
+        # Written cell by cell below; cached frames are read-only.
+        current_df = current_df.copy()
         for idx, row in current_df.iterrows():
             if row.get("instrument_type") != "Equity":
                 continue
@@ -2009,8 +2126,9 @@ def position_detail(symbol):
                 break
 
     # Build chart data from pre-aggregated mart_daily_pnl
-    chart_data = {"dates": [], "equity": [], "options": [], "dividends": [], "total": [], "underlying_price": [], "has_underlying_price": False}
+    empty_chart = {"dates": [], "equity": [], "options": [], "dividends": [], "total": [], "underlying_price": [], "has_underlying_price": False}
     prices_through_date = None
+    _chart_key = None
     try:
         # chart_df was fetched in the parallel batch above (was a serial
         # ~2s BQ round trip here). Everything below is unchanged Python
@@ -2064,99 +2182,67 @@ def position_detail(symbol):
                 str(date.today()),
                 frame_fingerprint(chart_df, current_df),
             )
-            with timed("chart"):
-                chart_data = cached_payload(
-                    _chart_key,
-                    lambda: _build_chart_from_daily_pnl(chart_df, current_df),
-                )
             # Latest date we have close_price for (from pipeline); user can run current_position_stock_price.py to refresh
             if "date" in chart_df.columns:
                 prices_through_date = str(chart_df["date"].max())[:10]
     except Exception as exc:
+        _chart_key = None
         app.logger.exception(
             "position_detail chart query or build failed for %s: %s", safe_symbol, exc
         )
 
-    # Prefer stg/leg when mart is unusably short — but NEVER replace a mart chart
-    # whose terminal agrees with KPI with ``_cumulative_pnl_from_*`` substitutes.
-    #
-    # Those substitutes are legacy cash-close stepping (only closed legs / raw
-    # stg HISTORY amounts): they omit open unrealized MTM, realize-on-close option
-    # shape, ``int_dividend_events``, etc. After a Schwab sync, ``trades_pre_leg``
-    # often spans *more calendar days than mart_daily_pnl* while the mart spine
-    # still reconciles KPI + breakdown. The naive rule ``best_n > n_m`` then
-    # threw away the correct mart series (~\$85k) for a truncated cash ladder
-    # (~\$20k) — reconciliation invariant explosion (May 2026 BE).
-    _chart_dates = chart_data.get("dates") or []
-    n_m = len(_chart_dates)
-    kp_ref = float(kpis.get("total_return") or 0) if kpis else None
-    mart_term = _chart_data_terminal(chart_data)
-
-    ch_stg = (
-        _cumulative_pnl_from_stg_trades(trades_pre_leg, current_df)
-        if not trades_pre_leg.empty else None
-    )
-    n_stg = len(ch_stg["dates"]) if ch_stg and ch_stg.get("dates") else 0
-    ch_leg = _cumulative_pnl_from_leg_closes(closed_legs_pre_leg, closed_equity_pre_leg)
-    n_leg = len(ch_leg["dates"]) if ch_leg and ch_leg.get("dates") else 0
-
-    cands_src = []
-    if ch_leg and n_leg >= 2:
-        cands_src.append(("leg", ch_leg, n_leg))
-    if ch_stg and n_stg >= 2:
-        cands_src.append(("stg", ch_stg, n_stg))
-
-    if cands_src:
-        # Tie-break: prefer candidates with more x-points, leg path over stg.
-        cands_src.sort(key=lambda t: (-t[2], 0 if t[0] == "leg" else 1))
-        _, cand_data, best_n = cands_src[0]
-        cand_term = _chart_data_terminal(cand_data)
-        mart_useless = n_m <= 2
-        substitute = False
-
-        if mart_useless:
-            # Mart spine is insufficient — pick whichever substitute lands closest to
-            # KPI (prefer longer tie-break among equally-close substitutes).
-            if kp_ref is not None:
-                scored = []
-                for _nm, cd, bn in cands_src:
-                    g = abs(_chart_data_terminal(cd) - kp_ref)
-                    scored.append((g, -bn, 0 if _nm == "leg" else 1, cd))
-                scored.sort(key=lambda z: z[:3])
-                chart_data = scored[0][3]
-            else:
-                chart_data = cand_data
-        elif kp_ref is not None:
-            gap_mart_k = abs(mart_term - kp_ref)
-            gap_cand_k = abs(cand_term - kp_ref)
-            materially_better_cand = gap_cand_k + 5 < gap_mart_k
-            extended_but_not_worse = (
-                best_n > n_m
-                and gap_cand_k <= gap_mart_k + CHART_SUBSTITUTION_KPI_MARGIN
-                and gap_cand_k
-                <= max(250.0, 0.01 * max(abs(kp_ref), 1.0))
+    def _base_chart():
+        # Only runs when the final-form layer below misses.
+        if _chart_key is None:
+            return dict(empty_chart)
+        try:
+            with timed("chart"):
+                return cached_payload(
+                    _chart_key,
+                    lambda: _build_chart_from_daily_pnl(chart_df, current_df),
+                )
+        except Exception as exc:
+            app.logger.exception(
+                "position_detail chart query or build failed for %s: %s", safe_symbol, exc
             )
-            substitute = materially_better_cand or extended_but_not_worse
-            # Never discard a KPI-aligned mart spine for cash-flow substitutes that
-            # miss open unreal / realize-on-close / synthesized dividends (~\$65k on BE).
-            if substitute and gap_cand_k > gap_mart_k + CHART_SUBSTITUTION_KPI_MARGIN:
-                substitute = False
-            if substitute:
-                chart_data = cand_data
-
-    # Chart.js needs at least two x values to draw a line; a single mart day
-    # (e.g. new option leg) would otherwise show only a blank chart.
-    _chart_dates = chart_data.get("dates") or []
-    if kpis and (not _chart_dates or len(_chart_dates) < 2):
-        chart_data = _synthetic_cumulative_pnl_for_position(
-            kpis, sessions_list, leg_param, selected_legs, current_df
-        )
-
-    if kpis:
-        _align_position_pnl_chart_with_kpi(chart_data, kpis)
-        _snap_position_chart_terminal_to_breakdown(
-            chart_data, breakdown_rows
-        )
+            return dict(empty_chart)
+
+    # Final-form layer on top: the substituted + KPI-aligned chart and the
+    # JSON the template injects, keyed on every input that shapes them. A
+    # warm render unpickles the final dict (the story and reconciliation
+    # below read it) and drops the cached JSON string straight into the
+    # page — no base-chart lookup, substitution pass, NaN scrub or dumps.
+    _final_key = (
+        "pos_chart_final",
+        str(date.today()),
+        _chart_key[2] if _chart_key else "empty",
+        frame_fingerprint(
+            current_df, trades_pre_leg, closed_legs_pre_leg, closed_equity_pre_leg,
+        ),
+        value_fingerprint(
+            kpis, breakdown_rows, sessions_list, leg_param,
+            sorted(str(x) for x in (selected_legs or ())),
+        ),
+    )
+    chart_data = cached_payload(
+        _final_key,
+        lambda: _finalize_position_chart(
+            _base_chart(),
+            kpis=kpis,
+            breakdown_rows=breakdown_rows,
+            trades_pre_leg=trades_pre_leg,
+            current_df=current_df,
+            closed_legs_pre_leg=closed_legs_pre_leg,
+            closed_equity_pre_leg=closed_equity_pre_leg,
+            sessions_list=sessions_list,
+            leg_param=leg_param,
+            selected_legs=selected_legs,
+        ),
+    )
+    chart_data_json = cached_json(
+        _final_key + ("json",),
+        lambda: json.dumps(_chart_data_for_json(chart_data)),
+    )
 
     # Trade history rows
     trades_for_table = trades_df.copy()
@@ -2629,7 +2715,7 @@ def position_detail(symbol):
         tenants_param=tenants_param,
         selected_legs=selected_legs,
         leg_param=leg_param,
-        chart_data_json=json.dumps(_chart_data_for_json(chart_data)),
+        chart_data_json=chart_data_json,
         story_days=story_days,
         story_markers_json=json.dumps(story_markers),
         story_mirror=story_mirror,
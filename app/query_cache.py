@@ -26,13 +26,16 @@ bug. NEVER move caching to a layer that skips ``_filter_df_by_tenant_ids``.
 
 BACKEND
 -------
-In-process ``cachetools.TTLCache`` guarded by a lock. This is per-worker
+In-process ``cachetools.TTLCache`` guarded by a lock, sized in BYTES (see
+``QUERY_CACHE_MAX_BYTES`` below). This is per-worker
 (Gunicorn runs 2 workers x 4 gthread threads) and is wiped on deploy /
-``--max-requests`` recycle — acceptable for a short TTL. The public
+``--max-requests`` recycle; flushes reach every worker's L1 through a
+generation counter in the shared Redis (see "Cross-worker L1 coherence"). The public
 surface (``get`` / ``set`` / ``make_key`` / ``clear``) is intentionally
 backend-agnostic so a shared Redis backend can be dropped in later via an
 env var, mirroring the rate limiter's ``RATELIMIT_STORAGE_URI`` pattern.
 """
+import builtins
 import contextlib
 import contextvars
 import copy
@@ -40,10 +43,16 @@ import hashlib
 import logging
 import os
 import pickle
+import re
+import struct
 import sys
 import threading
 import time
+import uuid
 
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
 import pandas as pd
 from cachetools import TTLCache
 
@@ -61,14 +70,98 @@ def _env_int(name: str, default: int) -> int:
 
 # Default 10 min: reporting is close-based, so a few minutes of staleness
 # is invisible to users (even a manual "Sync now" waits on a dbt build
-# before data reaches BigQuery). Override with QUERY_CACHE_TTL_SECONDS.
-_TTL_SECONDS = _env_int("QUERY_CACHE_TTL_SECONDS", 600)
-_MAXSIZE = _env_int("QUERY_CACHE_MAXSIZE", 512)
-
-_cache = TTLCache(maxsize=_MAXSIZE, ttl=_TTL_SECONDS)
+# before data reaches BigQuery). With the shared Redis configured, every
+# worker drops its L1 when a flush bumps the invalidation generation (see
+# ``_sync_generation``), so staleness no longer rides on the TTL and the
+# default is 4 h. Override with QUERY_CACHE_TTL_SECONDS.
+_FALLBACK_TTL_SECONDS = 600
+_TTL_SECONDS = _env_int(
+    "QUERY_CACHE_TTL_SECONDS",
+    4 * 3600 if os.environ.get("QUERY_CACHE_REDIS_URL", "").strip() else _FALLBACK_TTL_SECONDS,
+)
+# The L1 is budgeted in BYTES, not entries: one day-trader's mart_daily_pnl
+# frame or the all-history story trades frame can outweigh hundreds of
+# 3-row KPI frames, so an entry cap left worker memory unpredictable. Each
+# entry is charged its DataFrame ``memory_usage(deep=True)`` (or pickled
+# size for payloads) and the least-recently-used entries are evicted once
+# the budget is exceeded (TTL expiry still applies). A value bigger than
+# the whole budget is simply not kept in L1. ``l1_stats()`` reports the
+# resident bytes per label.
+_MAX_BYTES = _env_int("QUERY_CACHE_MAX_BYTES", 256 * 1024 * 1024)
+
+# Stale-while-revalidate. The TTL above is the SOFT expiry; an entry stays
+# servable for QUERY_CACHE_STALE_SECONDS beyond it (the HARD expiry). A read
+# in that window returns the stale value immediately and refreshes it on a
+# small background executor, so the user after an expiry no longer eats the
+# BigQuery round trip in-line. 0 (the default) disables the mode: soft ==
+# hard, exactly the old behaviour. ``clear()`` (the rebuild flush) still
+# drops everything, stale or not.
+_STALE_SECONDS = _env_int("QUERY_CACHE_STALE_SECONDS", 0)
+
+
+def _entry_bytes(entry):
+    return entry[3]
+
+
+# L1 values are ``(value, soft_expires_at, label, nbytes, tenant_tags)``;
+# ``_cache.timer`` is the clock.
+_cache = TTLCache(
+    maxsize=_MAX_BYTES, ttl=_TTL_SECONDS + _STALE_SECONDS, getsizeof=_entry_bytes,
+)
 _lock = threading.Lock()
 
 
+def _sizeof(value) -> int:
+    """Resident-size estimate charged against the L1 byte budget."""
+    if isinstance(value, pd.DataFrame):
+        try:
+            return int(value.memory_usage(index=True, deep=True).sum())
+        except Exception:
+            pass
+    try:
+        return len(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL))
+    except Exception:
+        return sys.getsizeof(value)
+
+
+def _entry_label(key, label):
+    if label:
+        return label
+    if isinstance(key, tuple) and key and isinstance(key[0], str):
+        return key[0]
+    return "?"
+
+
+def _l1_put(key, value, soft_at, label, nbytes=None, tags=frozenset()):
+    """Store in L1; a value larger than the whole budget is skipped. Call
+    with ``_lock`` held."""
+    if nbytes is None:
+        nbytes = _sizeof(value)
+    try:
+        _cache[key] = (value, soft_at, _entry_label(key, label), nbytes, tags)
+    except ValueError:  # "value too large" for the budget
+        _cache.pop(key, None)
+
+
+def l1_stats() -> dict:
+    """This worker's L1 footprint: totals plus ``{label: {entries, bytes}}``."""
+    labels = {}
+    with _lock:
+        _cache.expire()
+        entries = list(_cache.values())
+        total = _cache.currsize
+    for _val, _soft, label, nbytes, _tags in entries:
+        slot = labels.setdefault(label, {"entries": 0, "bytes": 0})
+        slot["entries"] += 1
+        slot["bytes"] += nbytes
+    return {
+        "entries": len(entries),
+        "bytes": total,
+        "budget_bytes": _MAX_BYTES,
+        "labels": dict(sorted(labels.items(), key=lambda kv: -kv[1]["bytes"])),
+    }
+
+
 # ----------------------------------------------------------------------
 # Optional shared L2 cache (Redis / Render Key Value)
 # ----------------------------------------------------------------------
@@ -85,7 +178,12 @@ _lock = threading.Lock()
 # is wrapped so a missing / slow / broken instance silently degrades to L1
 # (and then to a live BQ query). We NEVER raise from a cache path.
 _REDIS_URL = os.environ.get("QUERY_CACHE_REDIS_URL", "").strip()
-_REDIS_TTL = _env_int("QUERY_CACHE_REDIS_TTL_SECONDS", _TTL_SECONDS)
+# A day by default: keys carry the warehouse generation token of their
+# tenants (see ``warehouse_token``), so a rebuild retires old entries even
+# if the flush webhook never arrives. Entries are only ever read within
+# ``_TTL_SECONDS`` (+ the stale window) of being stored, so that is the
+# effective cap.
+_REDIS_TTL = _env_int("QUERY_CACHE_REDIS_TTL_SECONDS", 24 * 3600)
 # Don't round-trip values too big to be worth (de)serialization + network,
 # or that would thrash a small shared store.
 _REDIS_MAX_BYTES = _env_int("QUERY_CACHE_REDIS_MAX_BYTES", 8 * 1024 * 1024)
@@ -93,6 +191,24 @@ _REDIS_MAX_BYTES = _env_int("QUERY_CACHE_REDIS_MAX_BYTES", 8 * 1024 * 1024)
 # by bumping the version; dev/prod use different URLs so they never collide.
 _REDIS_PREFIX = "qc:v1:"
 
+# L2 value format. DataFrames are stored as Arrow IPC streams with
+# compressed buffers instead of pickles: object-dtype frames unpickle slowly
+# and the big frames (exactly the ones worth sharing) used to blow
+# QUERY_CACHE_REDIS_MAX_BYTES and never reach Redis. Every value carries a
+# 4-byte header — b"QC", a format version, and a kind (b"A" Arrow frame,
+# b"P" pickled payload) — so the format can evolve under the same key
+# prefix: an unknown version reads as a miss. Frames Arrow can't represent
+# (mixed-type object columns) fall back to the pickle kind; headerless
+# values from before the header are still read as pickles. Version 2 puts
+# the writer's wall-clock insertion time (8 bytes) after the header, so a
+# promoted entry ages from when it was stored, exactly like an L1 entry.
+_L2_VERSION = 2
+_L2_ARROW = b"QC" + bytes([_L2_VERSION]) + b"A"
+_L2_PICKLE = b"QC" + bytes([_L2_VERSION]) + b"P"
+_L2_STAMP = struct.Struct(">d")
+_L2_BODY = 4 + _L2_STAMP.size
+_L2_CODEC = os.environ.get("QUERY_CACHE_L2_CODEC", "zstd").strip().lower() or None
+
 _redis_client = None
 _redis_init_done = False
 _redis_lock = threading.Lock()
@@ -136,6 +252,65 @@ def _get_redis():
     return _redis_client
 
 
+def _l2_codec():
+    codec = _L2_CODEC
+    if codec in (None, "none", "off"):
+        return None
+    try:
+        import pyarrow as pa
+
+        return codec if pa.Codec.is_available(codec) else None
+    except Exception:
+        return None
+
+
+def _encode_l2(value, inserted_at=None) -> bytes:
+    """Serialize a cache value for Redis (see the format note above);
+    ``inserted_at`` defaults to now."""
+    stamp = _L2_STAMP.pack(time.time() if inserted_at is None else inserted_at)
+    if isinstance(value, pd.DataFrame):
+        try:
+            import pyarrow as pa
+
+            table = pa.Table.from_pandas(value, preserve_index=True)
+            sink = pa.BufferOutputStream()
+            options = pa.ipc.IpcWriteOptions(compression=_l2_codec())
+            with pa.ipc.new_stream(sink, table.schema, options=options) as writer:
+                writer.write_table(table)
+            return _L2_ARROW + stamp + sink.getvalue().to_pybytes()
+        except Exception:
+            pass  # not Arrow-representable → pickle below
+    return _L2_PICKLE + stamp + pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+
+
+def _decode_l2(blob: bytes):
+    """Inverse of ``_encode_l2``; ``None`` for anything unreadable."""
+    head = bytes(blob[:4])
+    try:
+        if head == _L2_ARROW:
+            import pyarrow as pa
+
+            # The reader maps record batches straight onto ``blob`` (no
+            # copy); to_pandas then builds the frame from those buffers.
+            reader = pa.ipc.open_stream(pa.py_buffer(blob)[_L2_BODY:])
+            return reader.read_all().to_pandas(split_blocks=True)
+        if head == _L2_PICKLE:
+            return pickle.loads(memoryview(blob)[_L2_BODY:])
+        if head[:2] == b"QC":
+            return None  # a newer/older format version: treat as a miss
+        return pickle.loads(blob)  # pre-header value
+    except Exception:
+        return None
+
+
+def _l2_inserted_at(blob: bytes):
+    """The wall-clock time ``blob`` was written; ``None`` for values from
+    before the stamp (or unreadable ones)."""
+    if bytes(blob[:4]) not in (_L2_ARROW, _L2_PICKLE) or len(blob) < _L2_BODY:
+        return None
+    return _L2_STAMP.unpack_from(blob, 4)[0]
+
+
 def _redis_key(key) -> str:
     """Stringify an L1 key for Redis. ``make_key`` yields a sha256 hex str;
     ``cached_payload`` passes a tuple. Both hash to a bounded namespaced key."""
@@ -164,7 +339,9 @@ class _ReqStats:
     """
 
     __slots__ = ("lock", "query_hits", "query_miss", "payload_hits",
-                 "payload_miss", "bq_ms", "queries", "steps")
+                 "payload_miss", "bq_ms", "queries", "steps",
+                 "pg_hits", "pg_miss", "pg_conns", "pg_ms", "query_coalesced",
+                 "wait_ms", "stale")
 
     def __init__(self):
         self.lock = threading.Lock()
@@ -173,8 +350,15 @@ class _ReqStats:
         self.payload_hits = 0
         self.payload_miss = 0
         self.bq_ms = 0.0          # summed wall-clock of MISS executions
+        self.query_coalesced = 0  # misses served by another caller's flight
+        self.wait_ms = 0.0        # summed wall-clock of those waits
+        self.stale = 0            # hits served stale (refreshing behind)
         self.queries = []          # (label, ms, hit) per cached_query_df call
         self.steps = {}            # named step -> summed ms (chart/matrix/...)
+        self.pg_hits = 0           # pooled Postgres checkouts reused (app.db)
+        self.pg_miss = 0           # ... that had to open a new connection
+        self.pg_conns = 0          # Postgres connections opened (handshakes)
+        self.pg_ms = 0.0           # summed wall-clock of app.db helper calls
 
     def add_query(self, label, ms, hit):
         with self.lock:
@@ -185,6 +369,15 @@ class _ReqStats:
                 self.bq_ms += ms
             self.queries.append((label or "?", ms, hit))
 
+    def add_coalesced(self, label, ms):
+        with self.lock:
+            self.query_coalesced += 1
+            self.wait_ms += ms
+
+    def add_stale(self):
+        with self.lock:
+            self.stale += 1
+
     def add_payload(self, hit):
         with self.lock:
             if hit:
@@ -196,6 +389,18 @@ class _ReqStats:
         with self.lock:
             self.steps[name] = self.steps.get(name, 0.0) + ms
 
+    def add_pg(self, conns=0, ms=0.0):
+        with self.lock:
+            self.pg_conns += conns
+            self.pg_ms += ms
+
+    def add_pg_checkout(self, hit):
+        with self.lock:
+            if hit:
+                self.pg_hits += 1
+            else:
+                self.pg_miss += 1
+
 
 # Per-request stats live in a ContextVar (not flask.g) so they survive the
 # hop onto _bq_parallel worker threads when the request's context is copied.
@@ -251,12 +456,22 @@ def format_stats(stats) -> str:
     steps_str = ""
     if steps:
         steps_str = " steps=" + ",".join(f"{n}:{ms:.0f}" for n, ms in steps)
-    nq = stats.query_hits + stats.query_miss
+    nq = stats.query_hits + stats.query_miss + stats.query_coalesced
+    wait_str = ""
+    if stats.query_coalesced:
+        wait_str = f" qwait={stats.query_coalesced} wait_ms={stats.wait_ms:.0f}"
+    if stats.stale:
+        wait_str += f" stale={stats.stale}"
+    pg_str = ""
+    if stats.pg_conns or stats.pg_ms:
+        pg_str = f" pg_conns={stats.pg_conns} pg_ms={stats.pg_ms:.0f}"
+    if stats.pg_hits or stats.pg_miss:
+        pg_str += f" pghit={stats.pg_hits} pgmiss={stats.pg_miss}"
     return (
         f"bq_ms={stats.bq_ms:.0f} nq={nq} "
         f"qhit={stats.query_hits} qmiss={stats.query_miss} "
         f"chit={stats.payload_hits} cmiss={stats.payload_miss}"
-        f"{slow_str}{steps_str}"
+        f"{wait_str}{pg_str}{slow_str}{steps_str}"
     )
 
 
@@ -290,59 +505,261 @@ def _serialize_params(job_config) -> str:
     return "|".join(parts)
 
 
+# ----------------------------------------------------------------------
+# Warehouse generation token
+# ----------------------------------------------------------------------
+# Freshness used to rest entirely on the workflows' flush call: if that
+# webhook failed, users saw pre-rebuild data until the L2 TTL. Keys now
+# also fold in the build stamps dbt leaves in ``warehouse_builds``
+# (dbt/macros/warehouse_builds.sql): one row per tenant a scoped build
+# rebuilt, and ``*`` for every other build. A key takes the newest stamp
+# among ``*`` and the tenants its SQL is scoped to (every stamp for an
+# unscoped admin read), so a rebuild retires exactly the entries it made
+# stale — one tenant's sync leaves every other tenant's keys (and the
+# targeted flush / re-warm of ``invalidate_tenants``) alone.
+#
+# The stamps are re-read at most every QUERY_CACHE_WAREHOUSE_TOKEN_SECONDS
+# (default 60) on a background thread; ``make_key`` only ever reads the
+# in-memory copy. Until this worker's first read lands, keys carry a
+# per-process placeholder, so nothing it caches in that window can be
+# served from the shared L2 after a rebuild. A failed read keeps the
+# previous stamps (the flush still covers freshness). On by default
+# outside pytest; QUERY_CACHE_WAREHOUSE_TOKEN=0 turns it off.
+_WAREHOUSE_TOKEN_SQL = (
+    "SELECT tenant_key, built_at FROM `ccwj-dbt.analytics.warehouse_builds`"
+)
+_WAREHOUSE_TOKEN_S = _env_int("QUERY_CACHE_WAREHOUSE_TOKEN_SECONDS", 60)
+_wh_lock = threading.Lock()
+_wh_stamps = None  # tenant_key -> built_at string; None until the first read
+_wh_token_at = float("-inf")
+_wh_refreshing = False
+_wh_placeholder = f"boot:{uuid.uuid4().hex}"
+
+
+def _warehouse_token_enabled() -> bool:
+    raw = os.environ.get("QUERY_CACHE_WAREHOUSE_TOKEN")
+    if raw is not None:
+        return raw.strip().lower() in ("1", "true", "yes", "on")
+    return not _running_under_pytest()
+
+
+def refresh_warehouse_tokens():
+    """Re-read the build stamps (the background refresher's body)."""
+    global _wh_stamps, _wh_token_at, _wh_refreshing
+    try:
+        from app.bigquery_client import get_bigquery_client
+
+        rows = get_bigquery_client().query(_WAREHOUSE_TOKEN_SQL).result()
+        stamps = {
+            str(row[0]): str(row[1]) for row in rows if row[1] is not None
+        }
+        with _wh_lock:
+            _wh_stamps = stamps
+    except Exception as exc:
+        _log.warning(
+            "query-cache warehouse token read failed (keeping previous): %s", exc,
+        )
+        with _wh_lock:
+            if _wh_stamps is None:
+                _wh_stamps = {}
+    finally:
+        with _wh_lock:
+            _wh_token_at = time.monotonic()
+            _wh_refreshing = False
+
+
+def _maybe_refresh_warehouse_tokens():
+    """Start a background re-read when the stamps are older than the TTL."""
+    global _wh_refreshing
+    with _wh_lock:
+        if _wh_refreshing or time.monotonic() - _wh_token_at < _WAREHOUSE_TOKEN_S:
+            return
+        _wh_refreshing = True
+    try:
+        threading.Thread(
+            target=refresh_warehouse_tokens, name="qc-warehouse-token", daemon=True,
+        ).start()
+    except Exception:
+        with _wh_lock:
+            _wh_refreshing = False
+
+
+def warehouse_token(tags=frozenset()) -> str:
+    """Build generation covering ``tags`` (``""`` when disabled/unknown).
+
+    Never blocks on BigQuery (see "Warehouse generation token").
+    """
+    if not _warehouse_token_enabled():
+        return ""
+    _maybe_refresh_warehouse_tokens()
+    with _wh_lock:
+        stamps = _wh_stamps
+    if stamps is None:
+        return _wh_placeholder
+    if _ALL_TENANTS in tags:
+        relevant = stamps.values()
+    else:
+        relevant = [stamps.get(t) for t in (_ALL_TENANTS, *sorted(tags))]
+    return max((v for v in relevant if v), default="")
+
+
 def make_key(sql: str, job_config=None) -> str:
-    """Build the cache key from the effective SQL + serialized params.
+    """Build the cache key from the effective SQL + serialized params +
+    the warehouse generation token of the tenants the SQL is scoped to.
 
     We apply the dataset override so a dev build (``BQ_DATASET=analytics_dev``)
     and prod never collide on the same key, and hash the whole thing to
     keep keys small and bounded.
     """
     effective_sql = _apply_dataset_override(sql or "")
-    raw = f"{effective_sql}\x00{_serialize_params(job_config)}"
+    token = warehouse_token(tenant_tags(effective_sql))
+    raw = f"{effective_sql}\x00{_serialize_params(job_config)}\x00{token}"
     return hashlib.sha256(raw.encode("utf-8")).hexdigest()
 
 
-def get(key):
-    # L1 (per-worker, fast) first.
+# ----------------------------------------------------------------------
+# Tenant tags (targeted invalidation)
+# ----------------------------------------------------------------------
+# A webhook sync rebuilds ONE tenant's data, yet the flush used to drop
+# every tenant's entries and re-warm every scope. Query entries are now
+# tagged with the tenant ids ``tenant_sql_and`` inlined into their SQL, so
+# ``invalidate_tenants`` can drop just those. SQL with no tenant filter
+# (admin / unscoped reads) is tagged ``*`` and goes on ANY tenant's
+# invalidation, since it contains every tenant's rows. Computed payloads
+# are keyed on a fingerprint of their (tenant-scoped) input frames, so new
+# data already means a new key — they carry no tags.
+#
+# In Redis each tag is a set of the L2 keys holding it (``qc:v1:tag:<id>``),
+# expiring with the entries.
+_ALL_TENANTS = "*"
+_TENANT_IN_RE = re.compile(r"\b[\w.]*tenant_id\s+IN\s*\(([^)]*)\)", re.IGNORECASE)
+_TENANT_LITERAL_RE = re.compile(r"'([^']+)'")
+
+
+def tenant_tags(sql: str) -> frozenset:
+    """Tenant ids a query is scoped to (``{"*"}`` when unscoped)."""
+    matches = _TENANT_IN_RE.findall(sql or "")
+    if not matches:
+        if "1 = 0" in (sql or ""):
+            return frozenset()  # fail-closed read: no tenant's rows
+        return frozenset({_ALL_TENANTS})
+    return frozenset(t for m in matches for t in _TENANT_LITERAL_RE.findall(m))
+
+
+def _tag_key(tag: str) -> str:
+    return f"{_REDIS_PREFIX}tag:{tag}"
+
+
+def invalidate_tenants(tenant_ids) -> int:
+    """Drop cached queries that read any of ``tenant_ids`` (plus unscoped
+    ones) from L1 and L2. Returns the number of L1 entries dropped.
+
+    The targeted counterpart of ``clear()`` for a rebuild that changed only
+    these tenants' data.
+    """
+    tenants = {t for t in (tenant_ids or []) if t}
+    dropped = _drop_l1(tenants)
+    client = _get_redis()
+    if client is None:
+        return dropped
+    _publish_invalidation(client, ",".join(sorted(tenants)) or _ALL_TENANTS)
+    try:
+        for tag in tenants | {_ALL_TENANTS}:
+            members = client.smembers(_tag_key(tag))
+            if members:
+                client.delete(*members)
+            client.delete(_tag_key(tag))
+    except Exception as exc:
+        _log.warning(
+            "query-cache Redis tenant invalidation failed (stale L2 entries "
+            "expire via TTL): %s", exc,
+        )
+    return dropped
+
+
+def _lookup(key, label=None, tags=frozenset()):
+    """Return ``(value, stale)``; ``(None, False)`` on a miss.
+
+    ``stale`` is True past the soft expiry (only possible with
+    ``QUERY_CACHE_STALE_SECONDS`` > 0).
+    """
+    # L1 (per-worker, fast) first — after catching up with other workers'
+    # flushes.
+    _sync_generation()
     with _lock:
-        val = _cache.get(key)
-    if val is not None:
-        return val
+        entry = _cache.get(key)
+        now = _cache.timer()
+    if entry is not None:
+        val, soft_at = entry[0], entry[1]
+        # Can't hear other workers' flushes: only trust entries as old as
+        # the short TTL would have kept them.
+        if _coherent or now - (soft_at - _TTL_SECONDS) < _FALLBACK_TTL_SECONDS:
+            return val, now >= soft_at
     # L1 miss → shared L2 (cross-worker). Never hold ``_lock`` across the
     # network call. Any failure → treat as a miss.
     client = _get_redis()
     if client is None:
-        return None
+        return None, False
     try:
         blob = client.get(_redis_key(key))
     except Exception:
-        return None
+        return None, False
     if blob is None:
-        return None
-    try:
-        val = pickle.loads(blob)
-    except Exception:
-        return None
+        return None, False
+    # Age the entry from when it was stored, not from Redis' remaining TTL
+    # (which can run to the day-long ``_REDIS_TTL``): past the L1 hard
+    # expiry it is a miss, and the incoherent-worker guard above applies
+    # as-is.
+    # Values without a stamp predate it and are re-produced.
+    inserted_at = _l2_inserted_at(blob)
+    if inserted_at is None:
+        return None, False
+    age = max(0.0, time.time() - inserted_at)
+    if age >= _TTL_SECONDS + _STALE_SECONDS:
+        return None, False
+    if not _coherent and age >= _FALLBACK_TTL_SECONDS:
+        return None, False
+    val = _decode_l2(blob)
+    if val is None:
+        return None, False
+    fresh_for = _TTL_SECONDS - age
     # Promote into L1 so subsequent same-worker reads skip the round trip.
+    nbytes = _sizeof(val)
+    _freeze(val)
     with _lock:
-        _cache[key] = val
-    return val
+        _l1_put(key, val, _cache.timer() + fresh_for, label, nbytes, tags)
+    return val, fresh_for <= 0
+
+
+def get(key):
+    """The cached value for ``key`` (fresh or stale), or ``None``."""
+    return _lookup(key)[0]
 
 
-def set(key, value):  # noqa: A001 - deliberate cache-style API
+def set(key, value, label=None, tags=frozenset()):  # noqa: A001 - deliberate cache-style API
+    nbytes = _sizeof(value)  # before freezing: deep memory_usage needs writable object arrays
+    _freeze(value)
     with _lock:
-        _cache[key] = value
+        _l1_put(key, value, _cache.timer() + _TTL_SECONDS, label, nbytes, tags)
     client = _get_redis()
     if client is None:
         return
     try:
-        blob = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        blob = _encode_l2(value)
     except Exception:
         return
     if len(blob) > _REDIS_MAX_BYTES:
         return
+    rkey = _redis_key(key)
+    ttl = min(_REDIS_TTL, _TTL_SECONDS) + _STALE_SECONDS
     try:
-        client.setex(_redis_key(key), _REDIS_TTL, blob)
+        client.setex(rkey, ttl, blob)
+        if tags:
+            pipe = client.pipeline(transaction=False)
+            for tag in tags:
+                pipe.sadd(_tag_key(tag), rkey)
+                pipe.expire(_tag_key(tag), ttl)
+            pipe.execute()
     except Exception as exc:
         _warn_redis_once("setex", exc)
 
@@ -364,13 +781,13 @@ _redis_warned = False
 
 
 def clear():
-    with _lock:
-        _cache.clear()
+    _drop_l1(None)
     # Best-effort L2 flush of our namespace (used by tests / admin). TTL
     # expiry covers prod; this just makes an explicit clear immediate.
     client = _get_redis()
     if client is None:
         return
+    _publish_invalidation(client, _ALL_TENANTS)
     try:
         for k in client.scan_iter(match=_REDIS_PREFIX + "*", count=500):
             client.delete(k)
@@ -378,6 +795,267 @@ def clear():
         _log.warning("query-cache Redis clear failed (stale L2 entries expire via TTL): %s", exc)
 
 
+def _drop_l1(tenants):
+    """Drop this worker's L1 entries — all of them when ``tenants`` is
+    None, else those tagged with one of ``tenants`` or unscoped. Bumps
+    ``_generation`` so in-flight revalidations don't write back. Returns
+    the number dropped."""
+    global _generation
+    with _lock:
+        if tenants is None:
+            dropped = len(_cache)
+            _cache.clear()
+        else:
+            _cache.expire()
+            targets = builtins.set(tenants) | {_ALL_TENANTS}
+            doomed = [k for k, e in _cache.items() if e[4] & targets]
+            for k in doomed:
+                _cache.pop(k, None)
+            dropped = len(doomed)
+        _generation += 1
+    return dropped
+
+
+# ----------------------------------------------------------------------
+# Cross-worker L1 coherence
+# ----------------------------------------------------------------------
+# ``clear()`` / ``invalidate_tenants()`` run on whichever worker served the
+# flush; the other workers' L1s used to live on until their TTL. Each
+# invalidation now also INCRs a generation counter in Redis and records
+# what it dropped under ``qc:gen:<n>`` (``*`` or a comma-separated tenant
+# list). Every worker reads the counter at most once per
+# QUERY_CACHE_GEN_CHECK_MS on its lookup path — one GET, no subscriber
+# thread — and replays the events it missed; a gap it can't account for
+# (events expired, counter reset) drops the whole L1. Neither key lives
+# under ``_REDIS_PREFIX``, so ``clear()``'s SCAN never deletes them.
+#
+# While the counter can't be read (Redis configured but down), L1 entries
+# older than the old 10-minute TTL are treated as misses, so a long TTL
+# never outlives coherence.
+_GEN_KEY = "qc:gen"
+_GEN_EVENT_TTL = 24 * 3600
+_GEN_MAX_EVENTS = 64
+_GEN_CHECK_S = _env_int("QUERY_CACHE_GEN_CHECK_MS", 1000) / 1000.0
+_gen_lock = threading.Lock()
+_gen_seen = None  # last generation applied by this worker
+_gen_checked_at = float("-inf")
+_coherent = True
+
+
+def _gen_event_key(n) -> str:
+    return f"{_GEN_KEY}:{n}"
+
+
+def _publish_invalidation(client, payload):
+    """Announce a local invalidation to the other workers."""
+    global _gen_seen
+    try:
+        n = int(client.incr(_GEN_KEY))
+        client.setex(_gen_event_key(n), _GEN_EVENT_TTL, payload)
+    except Exception as exc:
+        _warn_redis_once("generation publish", exc)
+        return
+    with _gen_lock:
+        # Already applied locally; skip it on our next check unless other
+        # workers' events are interleaved (then replay them all).
+        if _gen_seen == n - 1:
+            _gen_seen = n
+
+
+def _sync_generation():
+    """Apply invalidations published by other workers since the last check."""
+    global _gen_seen, _gen_checked_at, _coherent
+    now = time.monotonic()
+    if now - _gen_checked_at < _GEN_CHECK_S or not _gen_lock.acquire(blocking=False):
+        return
+    try:
+        _gen_checked_at = now
+        client = _get_redis()
+        if client is None:
+            _coherent = not _REDIS_URL
+            return
+        try:
+            remote = int(client.get(_GEN_KEY) or 0)
+            events = None
+            if _gen_seen is not None and 0 < remote - _gen_seen <= _GEN_MAX_EVENTS:
+                events = client.mget(
+                    [_gen_event_key(n) for n in range(_gen_seen + 1, remote + 1)]
+                )
+        except Exception as exc:
+            _coherent = False
+            _warn_redis_once("generation check", exc)
+            return
+        _coherent = True
+        if _gen_seen is None:
+            # First check in this process: nothing cached from before it.
+            _gen_seen = remote
+            return
+        if remote == _gen_seen:
+            return
+        tenants = builtins.set()
+        for event in events or [None]:
+            ids = event.decode() if isinstance(event, bytes) else event
+            if not ids or ids == _ALL_TENANTS:
+                tenants = None
+                break
+            tenants.update(ids.split(","))
+        _drop_l1(tenants)
+        _gen_seen = remote
+    finally:
+        _gen_lock.release()
+
+
+# ----------------------------------------------------------------------
+# Single-flight (per-key in-flight deduplication)
+# ----------------------------------------------------------------------
+# Two callers that miss the same key at the same moment (a double-click, or
+# the warmer racing a real page load right after /internal/cache/flush)
+# would each run the identical BigQuery job. The first miss becomes the
+# LEADER and executes; concurrent callers in this process wait on its
+# result. Across Gunicorn workers the leader also takes a short Redis lease
+# (SET NX PX) when the L2 is configured, and other workers' misses poll the
+# L2 for the result while the lease is held.
+#
+# Followers never wait forever: if the leader fails (errors are never
+# cached) or the wait exceeds ``QUERY_CACHE_FLIGHT_WAIT_MS``, they run the
+# query themselves — exactly the pre-single-flight behaviour. Waits that
+# did get the leader's frame are counted as ``qwait`` in REQUEST_TIMING,
+# separately from hits and misses.
+_FLIGHT_WAIT_S = _env_int("QUERY_CACHE_FLIGHT_WAIT_MS", 30000) / 1000.0
+_LEASE_MS = _env_int("QUERY_CACHE_LEASE_MS", 15000)
+
+
+class _Flight:
+    __slots__ = ("done", "value")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+
+
+_inflight = {}  # key -> _Flight, guarded by _lock
+
+
+def _join_flight(key):
+    """Return ``(flight, is_leader)`` for ``key``."""
+    with _lock:
+        flight = _inflight.get(key)
+        if flight is not None:
+            return flight, False
+        flight = _inflight[key] = _Flight()
+        return flight, True
+
+
+def _land_flight(key, flight, value):
+    with _lock:
+        if _inflight.get(key) is flight:
+            del _inflight[key]
+    flight.value = value
+    flight.done.set()
+
+
+def _acquire_lease(key):
+    """Take the cross-worker lease for ``key``.
+
+    Returns ``(client, token)`` when we hold it, ``(client, None)`` when
+    another worker does, ``(None, None)`` with no L2 (or on any error —
+    a Redis hiccup must never block a query).
+    """
+    client = _get_redis()
+    if client is None:
+        return None, None
+    token = uuid.uuid4().hex
+    try:
+        if client.set(_redis_key(key) + ":lease", token, nx=True, px=_LEASE_MS):
+            return client, token
+        return client, None
+    except Exception as exc:
+        _warn_redis_once("lease", exc)
+        return None, None
+
+
+def _release_lease(client, key, token):
+    lease = _redis_key(key) + ":lease"
+    try:
+        held = client.get(lease)
+        if held is not None and held.decode() == token:
+            client.delete(lease)
+    except Exception:
+        pass  # the lease expires on its own
+
+
+def _wait_for_peer(client, key):
+    """Poll for another worker's result while its lease is held.
+
+    Returns the value, or ``None`` if the lease lapsed (peer finished
+    without storing, failed, or died) or the wait budget ran out.
+    """
+    lease = _redis_key(key) + ":lease"
+    deadline = time.monotonic() + _FLIGHT_WAIT_S
+    delay = 0.05
+    while time.monotonic() < deadline:
+        time.sleep(delay)
+        delay = min(delay * 2, 0.25)
+        val = get(key)
+        if val is not None:
+            return val
+        try:
+            if not client.exists(lease):
+                return get(key)
+        except Exception:
+            return None
+    return None
+
+
+# ----------------------------------------------------------------------
+# Background revalidation (stale-while-revalidate)
+# ----------------------------------------------------------------------
+# One refresh per key at a time, on a small shared executor. Every L1
+# invalidation (``_drop_l1``) bumps ``_generation``; a refresh that STARTED before a flush must not
+# write its (pre-rebuild) result back afterwards, so it only stores if the
+# generation is unchanged.
+_generation = 0
+_refreshing = builtins.set()  # keys with a refresh queued/running, under _lock
+_revalidate_pool = None
+
+
+def _revalidate(key, producer, label=None, tags=frozenset()):
+    """Queue ``producer()`` to replace ``key``'s stale value."""
+    global _revalidate_pool
+    with _lock:
+        if key in _refreshing:
+            return
+        _refreshing.add(key)
+        gen = _generation
+        if _revalidate_pool is None:
+            _revalidate_pool = ThreadPoolExecutor(
+                max_workers=_env_int("QUERY_CACHE_REVALIDATE_WORKERS", 2),
+                thread_name_prefix="qc-revalidate",
+            )
+        pool = _revalidate_pool
+    ctx = contextvars.copy_context()
+
+    def _run():
+        _req_stats.set(None)  # don't bill the request that served stale
+        try:
+            value = producer()
+            with _lock:
+                current = gen == _generation
+            if current:
+                set(key, value, label, tags)
+        except Exception as exc:
+            _log.warning("query-cache revalidate failed (stale kept): %s", exc)
+        finally:
+            with _lock:
+                _refreshing.discard(key)
+
+    try:
+        pool.submit(ctx.run, _run)
+    except Exception:
+        with _lock:
+            _refreshing.discard(key)
+
+
 def _execute(client, sql, job_config):
     """Run the query, passing ``job_config`` only when present.
 
@@ -390,41 +1068,210 @@ def _execute(client, sql, job_config):
     return client.query(sql, job_config=job_config).to_dataframe()
 
 
+# ----------------------------------------------------------------------
+# Shared read-only frames
+# ----------------------------------------------------------------------
+# Every hit used to return ``hit.copy()`` — on a warm Daily Review that is
+# ~15 full DataFrame copies before any rendering. Cached frames are now
+# FROZEN when stored (their arrays marked read-only) and callers get a
+# shallow ``copy(deep=False)``: it shares the frozen data but has its own
+# column set, so the usual whole-column rewrites (``df[c] = ...``, new
+# columns, rename) touch only the caller's frame. An in-place element
+# write (``.at[...] =``, ``.loc[mask, c] =``, ``fillna(inplace=True)``)
+# raises ``ValueError: assignment destination is read-only`` instead of
+# silently poisoning the cache — a caller that does that must take its own
+# ``.copy()`` first. Frames with array types we can't freeze (e.g. pyarrow-
+# backed columns) keep the old deep copy. QUERY_CACHE_SHARED_FRAMES=0
+# restores deep copies everywhere.
+def _shared_frames_enabled() -> bool:
+    return os.environ.get("QUERY_CACHE_SHARED_FRAMES", "1").strip().lower() not in (
+        "0", "false", "no", "off",
+    )
+
+
+def _frame_arrays(df):
+    """The ndarrays holding ``df``'s data, or None if some block's storage
+    isn't plain/masked/ndarray-backed (so it can't be frozen)."""
+    arrays = []
+    for block in df._mgr.blocks:
+        values = block.values
+        if isinstance(values, np.ndarray):
+            arrays.append(values)
+            continue
+        held = [getattr(values, a, None) for a in ("_ndarray", "_data", "_mask")]
+        held = [a for a in held if isinstance(a, np.ndarray)]
+        if not held:
+            return None
+        arrays.extend(held)
+    return arrays
+
+
+def _freeze(value):
+    """Mark a DataFrame's arrays read-only (in place); no-op otherwise."""
+    if isinstance(value, pd.DataFrame):
+        for arr in _frame_arrays(value) or ():
+            arr.flags.writeable = False
+    return value
+
+
+def _hand_out(df):
+    """A caller's view of a cached frame (see "Shared read-only frames")."""
+    if not _shared_frames_enabled():
+        return df.copy()
+    arrays = _frame_arrays(df)
+    if arrays is None or any(a.flags.writeable for a in arrays):
+        return df.copy()
+    return df.copy(deep=False)
+
+
 def cached_query_df(client, sql, job_config=None, label=None):
     """Run ``client.query(sql, job_config).to_dataframe()`` with caching.
 
     - Cache MISS (or disabled): execute against BigQuery, store the result,
-      return a copy.
-    - Cache HIT: return a copy of the stored DataFrame.
+      return it.
+    - Cache HIT: return the stored DataFrame.
 
-    A COPY is always returned because callers mutate the frame in place
-    (numeric coercion, adding columns); handing back the cached object
-    would poison every subsequent reader. Errors are never cached — they
+    Cached frames are handed out as shallow copies of read-only data (see
+    "Shared read-only frames"): replacing or adding columns is fine, but a
+    caller that writes elements in place must ``.copy()`` first. Errors are never cached — they
     propagate to the caller, preserving ``_bq_parallel``'s per-query
     empty-DataFrame-on-error contract.
 
     ``label`` (e.g. the ``_bq_parallel`` query name) is recorded with the
     execution time so the REQUEST_TIMING log can name the slowest cold
     query.
+
+    Concurrent misses on the same key are coalesced: one caller executes,
+    the rest wait for its frame (see "Single-flight" above).
     """
     if not cache_enabled():
         return _execute(client, sql, job_config)
 
     key = make_key(sql, job_config)
-    hit = get(key)
+    tags = tenant_tags(_apply_dataset_override(sql or ""))
+    hit, stale = _lookup(key, label, tags)
     stats = _req_stats.get()
     if hit is not None:
         if stats is not None:
             stats.add_query(label, 0.0, True)
-        return hit.copy()
+            if stale:
+                stats.add_stale()
+        if stale:
+            _revalidate(key, lambda: _execute(client, sql, job_config), label, tags)
+        return _hand_out(hit)
+
+    flight, leader = _join_flight(key)
+    if not leader:
+        t0 = time.perf_counter()
+        if flight.done.wait(_FLIGHT_WAIT_S) and flight.value is not None:
+            if stats is not None:
+                stats.add_coalesced(label, (time.perf_counter() - t0) * 1000.0)
+            return _hand_out(flight.value)
+        # Leader failed or is too slow: run it ourselves (uncoalesced).
+        return _run_and_store(client, sql, job_config, key, label, stats, tags=tags)
+
+    df = None
+    try:
+        redis_client, token = _acquire_lease(key)
+        if redis_client is not None and token is None:
+            t0 = time.perf_counter()
+            df = _wait_for_peer(redis_client, key)
+            if df is not None:
+                if stats is not None:
+                    stats.add_coalesced(label, (time.perf_counter() - t0) * 1000.0)
+                return _hand_out(df)
+        try:
+            df = _run_and_store(
+                client, sql, job_config, key, label, stats, copy_out=False, tags=tags,
+            )
+        finally:
+            if token is not None:
+                _release_lease(redis_client, key, token)
+        return _hand_out(df)
+    finally:
+        _land_flight(key, flight, df)
+
 
+def _run_and_store(
+    client, sql, job_config, key, label, stats, copy_out=True, tags=frozenset(),
+):
+    """Execute a miss, store it, record its timing."""
     t0 = time.perf_counter()
     df = _execute(client, sql, job_config)
     exec_ms = (time.perf_counter() - t0) * 1000.0
-    set(key, df)
+    set(key, df, label, tags)
     if stats is not None:
         stats.add_query(label, exec_ms, False)
-    return df.copy()
+    return _hand_out(df) if copy_out else df
+
+
+def cached_query_batch(client, queries):
+    """``cached_query_df`` over a whole ``_bq_parallel`` batch, with the
+    misses run as ONE script job (``app/bq_script.py``).
+
+    ``queries`` is ``{name: sql | (sql, job_config)}``; the result maps
+    each name to its DataFrame, or to the exception its statement raised.
+    Hits, stale refreshes and cache storage behave as in
+    ``cached_query_df`` and each miss is recorded under its own label
+    with its child job's execution time. Misses are NOT coalesced with
+    other callers' flights. Raises (recording nothing) when the script
+    job fails as a whole, so the caller can rerun the batch per query.
+    """
+    from app.bq_script import run_script
+
+    specs = {
+        name: spec if isinstance(spec, tuple) else (spec, None)
+        for name, spec in queries.items()
+    }
+    enabled = cache_enabled()
+    out, hits, misses = {}, [], {}
+    for name, (sql, job_config) in specs.items():
+        if not enabled:
+            misses[name] = (sql, job_config, None, frozenset())
+            continue
+        key = make_key(sql, job_config)
+        tags = tenant_tags(_apply_dataset_override(sql or ""))
+        hit, stale = _lookup(key, name, tags)
+        if hit is None:
+            misses[name] = (sql, job_config, key, tags)
+            continue
+        out[name] = _hand_out(hit)
+        hits.append((name, stale))
+        if stale:
+            _revalidate(
+                key, lambda s=sql, c=job_config: _execute(client, s, c), name, tags,
+            )
+
+    if len(misses) == 1:
+        # Nothing to pack: a lone miss runs as a plain query.
+        (name, (sql, job_config, _key, _tags)), = misses.items()
+        t0 = time.perf_counter()
+        try:
+            value = _execute(client, sql, job_config)
+        except Exception as exc:
+            value = exc
+        ran = {name: (value, (time.perf_counter() - t0) * 1000.0)}
+    elif misses:
+        ran = run_script(client, {n: (m[0], m[1]) for n, m in misses.items()})
+    else:
+        ran = {}
+
+    stats = _req_stats.get() if enabled else None
+    if stats is not None:
+        for name, stale in hits:
+            stats.add_query(name, 0.0, True)
+            if stale:
+                stats.add_stale()
+    for name, (value, exec_ms) in ran.items():
+        _sql, _cfg, key, tags = misses[name]
+        if isinstance(value, Exception) or key is None:
+            out[name] = value
+            continue
+        set(key, value, name, tags)
+        if stats is not None:
+            stats.add_query(name, exec_ms, False)
+        out[name] = _hand_out(value)
+    return {name: out[name] for name in specs}
 
 
 def frame_fingerprint(*frames) -> str:
@@ -455,24 +1302,92 @@ def frame_fingerprint(*frames) -> str:
     return "|".join(parts)
 
 
+def value_fingerprint(*values) -> str:
+    """Content fingerprint for plain Python inputs (KPI dicts, row lists,
+    leg selections) — the non-DataFrame half of a computed payload's key.
+    Never raises: anything unpicklable yields a one-off key (a miss)."""
+    try:
+        blob = pickle.dumps(values, protocol=pickle.HIGHEST_PROTOCOL)
+    except Exception:
+        return uuid.uuid4().hex
+    return hashlib.sha256(blob).hexdigest()
+
+
+class _PayloadBlob(bytes):
+    """A cached payload, stored pickled: immutable, compact, and one C-level
+    ``pickle.loads`` per hit instead of a Python-level ``copy.deepcopy``."""
+
+    __slots__ = ()
+
+    @classmethod
+    def pack(cls, value):
+        try:
+            return cls(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL))
+        except Exception:
+            return copy.deepcopy(value)  # unpicklable: keep a private copy
+
+    def unpack(self):
+        return pickle.loads(self)
+
+
+def _unpack_payload(hit):
+    if isinstance(hit, _PayloadBlob):
+        return hit.unpack()
+    return copy.deepcopy(hit)  # pre-blob L2 entry / unpicklable payload
+
+
 def cached_payload(key, producer):
     """Memoize a JSON-serializable computed payload (dict/list of scalars).
 
-    ``producer`` is a zero-arg callable that returns the payload. A DEEP
-    COPY is stored and returned so downstream mutation of the payload
-    (e.g. chart rebasing / KPI alignment) never corrupts the cached copy.
-    Disabled -> just calls ``producer()``.
+    ``producer`` is a zero-arg callable that returns the payload. It is
+    stored as pickled bytes and every hit unpickles a fresh object, so
+    downstream mutation of the payload (e.g. chart rebasing / KPI
+    alignment) never corrupts the cached value. A miss returns the
+    producer's own object. Disabled -> just calls ``producer()``.
     """
     if not cache_enabled():
         return producer()
-    hit = get(key)
+    hit, stale = _lookup(key)
     stats = _req_stats.get()
     if hit is not None:
         if stats is not None:
             stats.add_payload(True)
-        return copy.deepcopy(hit)
+            if stale:
+                stats.add_stale()
+        if stale:
+            _revalidate(key, lambda: _PayloadBlob.pack(producer()))
+        return _unpack_payload(hit)
+    if stats is not None:
+        stats.add_payload(False)
+    value = producer()
+    set(key, _PayloadBlob.pack(value))
+    return value
+
+
+def cached_json(key, producer):
+    """Memoize a FINAL-FORM JSON string (what a template injects verbatim,
+    e.g. ``chart_data_json``).
+
+    ``producer`` returns the serialized ``str``. Strings are immutable, so a
+    hit hands back the cached object itself: no unpickling, no NaN-scrubbing
+    walk, no ``json.dumps`` — the per-point chart lists never exist as
+    Python objects on a warm render. Key it like ``cached_payload`` (content
+    fingerprints of the tenant-scoped inputs). Disabled -> ``producer()``.
+    """
+    if not cache_enabled():
+        return producer()
+    hit, stale = _lookup(key)
+    stats = _req_stats.get()
+    if isinstance(hit, str):
+        if stats is not None:
+            stats.add_payload(True)
+            if stale:
+                stats.add_stale()
+        if stale:
+            _revalidate(key, producer)
+        return hit
     if stats is not None:
         stats.add_payload(False)
     value = producer()
-    set(key, copy.deepcopy(value))
-    return copy.deepcopy(value)
+    set(key, value)
+    return value
@@ -97,11 +97,29 @@ def _bq_parallel(client, queries):
     movers, breakdowns) rendered em-dashes. Per-key isolation here means
     one bad query produces one empty DataFrame, logged loudly, and the
     other eight sections still render real data.
+
+    ``BQ_SCRIPT_BATCH=1`` runs the batch's cache misses as ONE script job
+    (``app/bq_script.py``) with the same per-key contract; a script that
+    fails as a whole falls back to the per-query pool below.
     """
+    from app.bq_script import run_batch
     from app.query_cache import propagate_context
 
     results = {}
 
+    def _log_failure(name, exc):
+        try:
+            from flask import current_app
+            current_app.logger.error(
+                "_bq_parallel: query %r failed: %s", name, exc,
+            )
+        except Exception:
+            _log.error("_bq_parallel: query %r failed: %s", name, exc)
+
+    scripted = run_batch(client, queries, _log_failure)
+    if scripted is not None:
+        return scripted
+
     def _run(name, spec):
         try:
             if isinstance(spec, tuple):
@@ -127,13 +145,7 @@ def _bq_parallel(client, queries):
             name, df, exc = f.result()
             results[name] = df
             if exc is not None:
-                try:
-                    from flask import current_app
-                    current_app.logger.error(
-                        "_bq_parallel: query %r failed: %s", name, exc,
-                    )
-                except Exception:
-                    _log.error("_bq_parallel: query %r failed: %s", name, exc)
+                _log_failure(name, exc)
 
     return results
 
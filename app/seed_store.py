@@ -12,17 +12,19 @@ dataset, written directly by the sync:
 sets ``BQ_RAW_DATASET=analytics_raw_dev`` so dev syncs never touch prod
 rows (same discipline as the ``BQ_DATASET=analytics_dev`` read override).
 
-Design contract (mirrors the battle-tested GitHub path byte-for-byte so
-``_merge_seed_with_existing`` and every merge/dedup invariant in
-``app/upload.py`` carry over unchanged):
-
-- The unit of exchange is a CSV STRING. ``read_seed_csv`` serializes the
-  table back to exactly the CSV text that was last written;
-  ``write_seed_csvs`` parses CSV text and loads it. The merge layer never
-  knows the storage moved.
+Design contract (keeps ``_merge_seed_with_existing`` and every
+merge/dedup invariant in ``app/upload.py`` unchanged from the GitHub era):
+
+- The unit of exchange is a seed FRAME: a DataFrame whose cells are the
+  stored strings, ``""`` for NULL (``seed_cells``) — the same cell text
+  the CSV files carried, without a CSV serialize/parse on every hop.
+  ``read_seed_frame`` returns one; ``write_seed_frames`` stores any frame
+  by its ``seed_cells`` text. No-op detection compares
+  ``seed_frame_digest`` content hashes. ``read_seed_csv`` /
+  ``write_seed_csvs`` remain for admin tooling that works with files.
 - Row order is preserved via a hidden ``_row_seq`` INT64 column (BigQuery
   tables have no inherent order; the seed CSVs' append order is what the
-  cross-source dedup and the byte-exact no-op check rely on). ``_row_seq``
+  cross-source dedup and the content-hash no-op check rely on). ``_row_seq``
   is stripped on read and is invisible to dbt (staging models select
   named columns only).
 - All data columns are STRING and empty CSV cells round-trip through
@@ -35,11 +37,21 @@ Design contract (mirrors the battle-tested GitHub path byte-for-byte so
   ``WRITE_TRUNCATE`` either fully replaces the table or leaves it
   untouched. BigQuery time travel gives 7-day point-in-time recovery
   (``FOR SYSTEM_TIME AS OF``) on top.
+- Tenant syncs read (``read_seed_slice_frame``) and write
+  (``replace_seed_slices``) only their own SLICE: the rows under one
+  account label owned by the syncing tenant(s) plus legacy unowned rows
+  under that label — the exact rows the merge may rewrite.
+  The slice is staged, then swapped in with DELETE + INSERT inside one
+  BigQuery transaction (atomic per table, like the full rewrite), so a
+  sync costs one account's history instead of every tenant's. Tables are
+  clustered on ``tenant_id`` so the slice predicate prunes storage.
 """
 from __future__ import annotations
 
+import hashlib
 import logging
 import os
+import uuid
 from io import StringIO
 
 import pandas as pd
@@ -59,6 +71,17 @@ SEED_TABLES = {
 
 _ROW_SEQ_COL = "_row_seq"
 
+# The account label is ``Account`` on history/current and ``account`` on
+# balances. BigQuery column names are case-insensitive, so one spelling
+# addresses the label on every seed table.
+_ACCOUNT_COL = "account"
+_TENANT_COL = "tenant_id"
+
+# Slice writes stage their rows next to the target table under this
+# suffix. The staging table is dropped right after the swap; dbt never
+# sees it (sources.yml names the three tables explicitly).
+_SLICE_STAGING_SUFFIX = "__slice_"
+
 _PRODUCTION_RAW_DATASET = "analytics_raw"
 
 
@@ -97,10 +120,13 @@ def _get_client():
     return get_bigquery_client()
 
 
-def read_seed_csv(path: str, client=None, dataset: str | None = None) -> str | None:
-    """Return the seed's CSV text (header + rows, in original write order),
-    or ``None`` when the raw table does not exist yet (first-ever write —
-    the analogue of the GitHub 404).
+def read_seed_frame(
+    path: str, client=None, dataset: str | None = None,
+) -> pd.DataFrame | None:
+    """Return the seed as a seed frame (see ``seed_cells``: every cell a
+    string, ``""`` for NULL) in original write order, or ``None`` when the
+    raw table does not exist yet (first-ever write — the analogue of the
+    GitHub 404).
 
     Raises ``SeedStoreError`` on any other failure so the merge layer
     fails closed instead of treating a blip as an empty seed.
@@ -121,25 +147,71 @@ def read_seed_csv(path: str, client=None, dataset: str | None = None) -> str | N
         raise SeedStoreError(
             f"BigQuery read of {table_id} failed: {exc}"
         ) from exc
-    if _ROW_SEQ_COL in df.columns:
-        df = df.drop(columns=[_ROW_SEQ_COL])
-    # NULL cells were empty CSV cells on write; serialize them back to "".
-    df = df.astype(object).where(pd.notna(df), "")
-    return df.to_csv(index=False)
+    return _seed_frame_from_result(df)
+
+
+def read_seed_slice_frame(
+    path: str, account: str, tenant_ids, client=None, dataset: str | None = None,
+) -> pd.DataFrame | None:
+    """Return one merge slice of the seed as a seed frame: rows under the
+    ``account`` label whose ``tenant_id`` is in ``tenant_ids`` or blank
+    (legacy unowned rows), in write order. Same predicate
+    ``replace_seed_slices`` swaps, bound as query parameters, so the
+    merge reads and rewrites exactly the same rows and never parses
+    another tenant's history.
+
+    ``None`` when the raw table does not exist yet; a zero-row frame (with
+    the table's columns) when it exists but the slice is empty. Fails
+    closed like ``read_seed_frame``.
+    """
+    table_id = _table_id(path, dataset)
+    client = client or _get_client()
+    try:
+        df = client.query(
+            f"SELECT * FROM `{table_id}` WHERE {_slice_predicate()} "
+            f"ORDER BY {_ROW_SEQ_COL}",
+            job_config=_slice_job_config(account, tenant_ids),
+        ).to_dataframe()
+    except NotFound:
+        return None
+    except Exception as exc:
+        raise SeedStoreError(
+            f"BigQuery slice read of {table_id} failed: {exc}"
+        ) from exc
+    return _seed_frame_from_result(df)
 
 
-def write_seed_csvs(path_contents, client=None, dataset: str | None = None) -> None:
-    """Atomically replace each raw table with the given CSV content.
+def read_seed_csv(path: str, client=None, dataset: str | None = None) -> str | None:
+    """``read_seed_frame`` serialized as CSV text, for admin tooling that
+    diffs or mirrors seeds as files. App code exchanges frames."""
+    df = read_seed_frame(path, client=client, dataset=dataset)
+    return None if df is None else df.to_csv(index=False)
+
+
+def write_seed_frames(path_frames, client=None, dataset: str | None = None) -> None:
+    """Atomically replace each raw table with the given frame.
 
-    ``path_contents`` — iterable of ``(seed_path, csv_text)``. Each table
-    load is atomic (``WRITE_TRUNCATE``: a failed job leaves the previous
-    rows untouched). Raises ``SeedStoreError`` on the first failure; a
-    partially-applied batch is safe because every individual table is
-    still internally consistent and the next sync converges it.
+    ``path_frames`` — iterable of ``(seed_path, DataFrame)``. Cells are
+    stored as their ``seed_cells`` text. Each table load is atomic
+    (``WRITE_TRUNCATE``: a failed job leaves the previous rows untouched).
+    Raises ``SeedStoreError`` on the first failure; a partially-applied
+    batch is safe because every individual table is still internally
+    consistent and the next sync converges it.
 
     ``dataset`` overrides the env-derived raw dataset (admin tooling only).
     """
     client = client or _get_client()
+    for path, frame in path_frames:
+        table_id = _table_id(path, dataset)
+        df = _load_frame(frame)
+        _load_seed_frame(client, df, table_id, dataset)
+        _log.info("seed_store: wrote %s rows to %s", len(df), table_id)
+
+
+def write_seed_csvs(path_contents, client=None, dataset: str | None = None) -> None:
+    """``write_seed_frames`` for CSV text — admin tooling (seed migration,
+    dev mirroring) that starts from files."""
+    path_frames = []
     for path, content in path_contents:
         table_id = _table_id(path, dataset)
         try:
@@ -149,29 +221,201 @@ def write_seed_csvs(path_contents, client=None, dataset: str | None = None) -> N
                 f"Merged seed for {table_id} failed to parse — refusing to "
                 f"write: {exc}"
             ) from exc
-        # Empty cells -> NULL (matches how dbt seed loaded empty CSV cells).
-        df = df.astype(object).where(df != "", None)
-        df[_ROW_SEQ_COL] = range(len(df))
-        schema = [
-            bigquery.SchemaField(col, "STRING")
-            for col in df.columns
-            if col != _ROW_SEQ_COL
-        ] + [bigquery.SchemaField(_ROW_SEQ_COL, "INT64")]
-        job_config = bigquery.LoadJobConfig(
-            schema=schema,
-            write_disposition=bigquery.WriteDisposition.WRITE_TRUNCATE,
-        )
+        path_frames.append((path, df))
+    write_seed_frames(path_frames, client=client, dataset=dataset)
+
+
+def replace_seed_slices(slices, client=None, dataset: str | None = None) -> None:
+    """Replace one tenant slice of each raw table with the given frame.
+
+    ``slices`` — iterable of ``(seed_path, account, tenant_ids, DataFrame)``.
+    The slice is every row whose trimmed account label equals ``account``
+    and whose ``tenant_id`` is in ``tenant_ids`` or blank (legacy unowned
+    rows under that label) — the rows ``_merge_seed_with_existing`` is
+    allowed to rewrite. Every other row is left exactly as stored.
+
+    The replacement rows are loaded into a staging table and swapped in
+    with DELETE + INSERT inside one BigQuery transaction, so a failed job
+    leaves the previous slice untouched. They get ``_row_seq`` values past
+    the table's current maximum: the same "syncing tenant's rows move to
+    the end" order the full-table rewrite produces. A table that does not
+    exist yet is created with a plain load of the slice.
+    """
+    client = client or _get_client()
+    for path, account, tenant_ids, frame in slices:
+        table_id = _table_id(path, dataset)
+        df = _load_frame(frame)
         try:
-            _ensure_dataset(client, dataset)
-            job = client.load_table_from_dataframe(
-                df, table_id, job_config=job_config
+            table = client.get_table(table_id)
+        except NotFound:
+            table = None
+        except Exception as exc:
+            raise SeedStoreError(
+                f"BigQuery metadata read of {table_id} failed: {exc}"
+            ) from exc
+        if table is None:
+            _load_seed_frame(client, df, table_id, dataset)
+            _log.info("seed_store: created %s with %s rows", table_id, len(df))
+            continue
+
+        stored = {f.name.lower() for f in table.schema}
+        missing = [c for c in df.columns if c.lower() not in stored]
+        if missing:
+            raise SeedStoreError(
+                f"Slice for {table_id} carries columns {missing} the stored "
+                "table lacks — refusing a partial write; run a full rewrite."
+            )
+        _ensure_tenant_clustering(client, table)
+
+        staging_id = f"{table_id}{_SLICE_STAGING_SUFFIX}{uuid.uuid4().hex[:12]}"
+        cols = ", ".join(f"`{c}`" for c in df.columns if c != _ROW_SEQ_COL)
+        sql = f"""
+            BEGIN TRANSACTION;
+            DELETE FROM `{table_id}` WHERE {_slice_predicate()};
+            INSERT INTO `{table_id}` ({cols}, {_ROW_SEQ_COL})
+            SELECT {cols}, {_ROW_SEQ_COL} + (
+                SELECT COALESCE(MAX({_ROW_SEQ_COL}) + 1, 0) FROM `{table_id}`
             )
-            job.result()
+            FROM `{staging_id}`;
+            COMMIT TRANSACTION;
+        """
+        try:
+            _load_seed_frame(client, df, staging_id, dataset)
+            client.query(
+                sql, job_config=_slice_job_config(account, tenant_ids)
+            ).result()
+        except SeedStoreError:
+            raise
         except Exception as exc:
             raise SeedStoreError(
-                f"BigQuery load into {table_id} failed: {exc}"
+                f"BigQuery slice replace on {table_id} failed: {exc}"
             ) from exc
-        _log.info("seed_store: wrote %s rows to %s", len(df), table_id)
+        finally:
+            try:
+                client.delete_table(staging_id, not_found_ok=True)
+            except Exception as exc:  # pragma: no cover (cleanup only)
+                _log.warning(
+                    "seed_store: could not drop staging table %s: %s",
+                    staging_id, exc,
+                )
+        _log.info(
+            "seed_store: replaced %s slice (%r, %s) with %s rows",
+            table_id, account, ",".join(tenant_ids), len(df),
+        )
+
+
+def seed_cells(df: pd.DataFrame) -> pd.DataFrame:
+    """Every cell as the text the raw table stores: ``""`` for NULL/NaN,
+    otherwise ``str(value)`` — the same text ``DataFrame.to_csv`` wrote
+    when CSV was the exchange format, so stored rows are unchanged."""
+    return df.astype(str).where(df.notna(), "")
+
+
+def seed_frame_digest(df: pd.DataFrame | None) -> str | None:
+    """Stable content hash of a seed frame as it would be stored: column
+    names plus every row's ``seed_cells`` text, order-sensitive (row order
+    is part of the stored seed). ``None`` for a missing seed.
+
+    The no-op check compares digests of the stored and merged frames, so
+    value-equal frames with different dtypes (``"10"`` read back vs ``10``
+    freshly synced) compare by the text that would actually be written.
+    """
+    if df is None:
+        return None
+    cells = seed_cells(df)
+    h = hashlib.sha256()
+    h.update("\x1f".join(str(c) for c in cells.columns).encode())
+    h.update(str(len(cells)).encode())
+    if len(cells.columns) and len(cells):
+        h.update(
+            pd.util.hash_pandas_object(cells, index=False).to_numpy().tobytes()
+        )
+    return h.hexdigest()
+
+
+def _seed_frame_from_result(df: pd.DataFrame) -> pd.DataFrame:
+    """Raw-table query result → seed frame: drop ``_row_seq``; NULL cells
+    (empty on write) come back as ``""``."""
+    if _ROW_SEQ_COL in df.columns:
+        df = df.drop(columns=[_ROW_SEQ_COL])
+    return df.astype(object).where(pd.notna(df), "").reset_index(drop=True)
+
+
+def _slice_predicate() -> str:
+    """SQL predicate selecting one merge slice; binds ``@account`` and
+    ``@tenant_ids``. Must select exactly the rows
+    ``app.upload._merge_seed_with_existing`` scopes a tenant merge to
+    (label match AND own-or-blank ``tenant_id``); blank-tenant spellings
+    mirror ``app.upload._normalize_tid``."""
+    return (
+        f"TRIM(`{_ACCOUNT_COL}`) = @account AND ("
+        f"COALESCE(LOWER(TRIM(`{_TENANT_COL}`)), '') IN ('', 'nan', 'none', '<na>') "
+        f"OR TRIM(`{_TENANT_COL}`) IN UNNEST(@tenant_ids))"
+    )
+
+
+def _slice_job_config(account, tenant_ids):
+    return bigquery.QueryJobConfig(
+        query_parameters=[
+            bigquery.ScalarQueryParameter("account", "STRING", account),
+            bigquery.ArrayQueryParameter(
+                "tenant_ids", "STRING", [str(t) for t in tenant_ids]
+            ),
+        ]
+    )
+
+
+def _load_frame(frame: pd.DataFrame) -> pd.DataFrame:
+    """Seed frame → load frame: cells as stored text, empty cells as NULL,
+    plus the ``_row_seq`` order column."""
+    cells = seed_cells(frame)
+    # Empty cells -> NULL (matches how dbt seed loaded empty CSV cells).
+    df = cells.astype(object).where(cells != "", None).reset_index(drop=True)
+    df[_ROW_SEQ_COL] = range(len(df))
+    return df
+
+
+def _load_seed_frame(client, df, table_id: str, dataset: str | None) -> None:
+    """``WRITE_TRUNCATE`` load of a seed frame (STRING data columns plus
+    the INT64 ``_row_seq``). Raises ``SeedStoreError`` on failure."""
+    schema = [
+        bigquery.SchemaField(col, "STRING")
+        for col in df.columns
+        if col != _ROW_SEQ_COL
+    ] + [bigquery.SchemaField(_ROW_SEQ_COL, "INT64")]
+    job_config = bigquery.LoadJobConfig(
+        schema=schema,
+        write_disposition=bigquery.WriteDisposition.WRITE_TRUNCATE,
+    )
+    try:
+        _ensure_dataset(client, dataset)
+        job = client.load_table_from_dataframe(
+            df, table_id, job_config=job_config
+        )
+        job.result()
+    except Exception as exc:
+        raise SeedStoreError(
+            f"BigQuery load into {table_id} failed: {exc}"
+        ) from exc
+
+
+def _ensure_tenant_clustering(client, table) -> None:
+    """Cluster a raw table on ``tenant_id`` the first time a slice write
+    touches it, so slice DELETEs and reads prune to one tenant's blocks.
+    BigQuery re-clusters existing rows in the background."""
+    if table.clustering_fields:
+        return
+    if _TENANT_COL not in {f.name for f in table.schema}:
+        return
+    table.clustering_fields = [_TENANT_COL]
+    try:
+        client.update_table(table, ["clustering_fields"])
+    except Exception as exc:  # pragma: no cover (permissions edge)
+        # An unclustered table still answers slice writes correctly.
+        _log.warning(
+            "seed_store: clustering %s on tenant_id skipped: %s",
+            table.table_id, exc,
+        )
 
 
 def _ensure_dataset(client, dataset: str | None = None) -> None:
@@ -103,6 +103,23 @@ DIM_META = {
 }
 
 
+def _normalize_fit_columns(df, numeric_cols, label_cols):
+    """Coerce ``numeric_cols`` to numbers (NaN -> 0) and ``label_cols`` to
+    stripped strings ("Unknown" for blanks), where present.
+
+    Assigns whole columns (``df[col] = ...``) rather than writing through
+    ``.loc[:, col]``: frames served by the query cache share read-only
+    arrays, and an in-place write into them fails.
+    """
+    for col in numeric_cols:
+        if col in df.columns:
+            df[col] = pd.to_numeric(df[col], errors="coerce").fillna(0)
+    for col in label_cols:
+        if col in df.columns:
+            df[col] = df[col].fillna("Unknown").astype(str).str.strip().replace("", "Unknown")
+    return df
+
+
 def _build_strategy_fit_matrix(
     df,
     *,
@@ -505,15 +522,12 @@ def render_strategy_fit_view():
     summary_df = _filter_df_by_tenant_ids(summary_df, tenant_ids)
     # tenant scope already narrowed to the selected account's tenant_id
 
-    for col in ("total_pnl", "realized_pnl", "unrealized_pnl", "total_return",
-                "num_individual_trades", "num_winners", "num_losers"):
-        if col in summary_df.columns:
-            summary_df.loc[:, col] = pd.to_numeric(summary_df[col], errors="coerce").fillna(0)
-    for col in ("sector", "subsector", "strategy"):
-        if col in summary_df.columns:
-            summary_df.loc[:, col] = (
-                summary_df[col].fillna("Unknown").astype(str).str.strip().replace("", "Unknown")
-            )
+    summary_df = _normalize_fit_columns(
+        summary_df,
+        ("total_pnl", "realized_pnl", "unrealized_pnl", "total_return",
+         "num_individual_trades", "num_winners", "num_losers"),
+        ("sector", "subsector", "strategy"),
+    )
 
     accounts_for_filter = (
         sorted(user_accounts)
@@ -543,15 +557,12 @@ def render_strategy_fit_view():
         options_df = _filter_df_by_tenant_ids(options_df, tenant_ids)
         # tenant scope already narrowed to the selected account's tenant_id
 
-        for col in ("total_pnl", "realized_pnl", "unrealized_pnl",
-                    "num_individual_trades", "num_winners", "num_losers"):
-            if col in options_df.columns:
-                options_df.loc[:, col] = pd.to_numeric(options_df[col], errors="coerce").fillna(0)
-        for col in ("strategy", "dte_bucket", "moneyness_at_open", "symbol"):
-            if col in options_df.columns:
-                options_df.loc[:, col] = (
-                    options_df[col].fillna("Unknown").astype(str).str.strip().replace("", "Unknown")
-                )
+        options_df = _normalize_fit_columns(
+            options_df,
+            ("total_pnl", "realized_pnl", "unrealized_pnl",
+             "num_individual_trades", "num_winners", "num_losers"),
+            ("strategy", "dte_bucket", "moneyness_at_open", "symbol"),
+        )
 
         col_field = DIM_META[dim][0]
         # Equity-only strategies = strategies the user has in
@@ -3,6 +3,7 @@ import re
 import threading
 from contextlib import contextmanager
 from functools import wraps
+import numpy as np
 import requests
 import pandas as pd
 from io import StringIO
@@ -20,8 +21,11 @@ from app.utils import demo_block_writes
 from app.seed_store import (
     SeedStoreError,
     is_production_store,
-    read_seed_csv as _seed_store_read,
-    write_seed_csvs as _seed_store_write,
+    read_seed_frame as _seed_store_read,
+    read_seed_slice_frame as _seed_store_read_slice,
+    replace_seed_slices as _seed_store_replace_slices,
+    seed_frame_digest,
+    write_seed_frames as _seed_store_write,
 )
 
 
@@ -348,9 +352,9 @@ class SeedFetchError(RuntimeError):
 
 def _get_file_content(path):
     """
-    Fetch the current seed content (CSV text) from the BigQuery seed
-    store. Returns the CSV string, or ``None`` only when the raw table
-    truly does not exist yet (first-ever write — the analogue of the old
+    Fetch the current seed from the BigQuery seed store as a seed frame
+    (string cells, ``""`` for NULL — see ``app.seed_store.seed_cells``).
+    Returns ``None`` only when the raw table truly does not exist yet (first-ever write — the analogue of the old
     GitHub 404). Raises ``SeedFetchError`` on any other failure (network,
     auth, quota) so callers cannot accidentally treat a transient blip as
     "no existing data". See ``_merge_seed_with_existing`` and the Bug A
@@ -447,6 +451,44 @@ def _canonicalize_seed_cell(value):
     return out
 
 
+# Cells ``float()`` accepts that the column-wise path leaves to the scalar
+# canonicalizer: ``inf`` / ``nan`` spellings, digit-group underscores and
+# non-ASCII digits. Plain decimal / exponent text is parsed column-wise.
+_PLAIN_NUMBER_RE = r"[+-]?(?:[0-9]+\.?[0-9]*|\.[0-9]+)(?:[eE][+-]?[0-9]+)?"
+_ODD_NUMBER_RE = r"(?i)_|inf|nan|[^\x00-\x7f]"
+
+
+def _canonicalize_seed_series(values):
+    """Column-wise :func:`_canonicalize_seed_cell` — same canonical form for
+    every cell, without a Python call per cell.
+
+    Cells are stringified once, factorized (history columns repeat heavily:
+    dates, actions, symbols, quantities), and only the distinct values are
+    normalized: blank spellings → ``""``, plain numeric text parsed to float
+    in one cast and formatted ``"%.6f"`` (trailing-zero stripped), everything
+    else stripped text. The rare cells ``float()`` would accept in another
+    spelling fall back to the scalar helper, so the two never disagree.
+    """
+    codes, uniques = pd.factorize(values.astype(str))
+    txt = pd.Series(uniques, dtype=object).str.strip()
+    out = txt.copy()
+    blank = (txt == "") | txt.str.lower().isin(("nan", "none", "<na>"))
+    out[blank] = ""
+    num = ~blank & txt.str.fullmatch(_PLAIN_NUMBER_RE)
+    if num.any():
+        floats = txt[num].astype(float).to_numpy()
+        fmt = pd.Series(
+            np.char.mod("%.6f", floats), index=txt.index[num], dtype=object,
+        ).str.rstrip("0").str.rstrip(".")
+        out[num] = fmt.where(~fmt.isin(("", "-", "-0")), "0")
+    odd = ~blank & ~num & txt.str.contains(_ODD_NUMBER_RE)
+    if odd.any():
+        out[odd] = txt[odd].map(_canonicalize_seed_cell)
+    return pd.Series(
+        out.to_numpy(dtype=object)[codes], index=values.index, dtype=object,
+    )
+
+
 # Cross-source Price precision. SnapTrade's two feeds report a fill's Price at
 # DIFFERENT precision: the ``recent_orders`` feed derives it at full float
 # precision (e.g. 131.960622, 0.486667, 351.43513) while ``activities`` carries
@@ -482,6 +524,31 @@ def _canonicalize_cross_source_price(value):
     return out
 
 
+def _canonicalize_cross_source_price_series(values):
+    """Column-wise :func:`_canonicalize_cross_source_price`: the standard
+    canonical form, then numeric cells re-rounded to 4dp. Formatting a
+    canonical value ``"%.4f"`` equals formatting ``round(value, 4)`` for
+    any price-sized magnitude; larger values take the scalar path."""
+    base = _canonicalize_seed_series(values)
+    codes, uniques = pd.factorize(base)
+    txt = pd.Series(uniques, dtype=object)
+    out = txt.copy()
+    num = txt.str.fullmatch(_PLAIN_NUMBER_RE)
+    if num.any():
+        floats = txt[num].astype(float)
+        small = floats.abs() < 1e9
+        fmt = pd.Series(
+            np.char.mod(f"%.{_CROSS_SOURCE_PRICE_DP}f", floats[small].to_numpy()),
+            index=floats.index[small], dtype=object,
+        ).str.rstrip("0").str.rstrip(".")
+        out[fmt.index] = fmt.where(~fmt.isin(("", "-", "-0")), "0")
+        big = floats.index[~small]
+        out[big] = txt[big].map(_canonicalize_cross_source_price)
+    return pd.Series(
+        out.to_numpy(dtype=object)[codes], index=values.index, dtype=object,
+    )
+
+
 def _dedup_history_rows(df, seed_columns):
     """Collapse byte-different but value-identical history rows.
 
@@ -505,9 +572,22 @@ def _dedup_history_rows(df, seed_columns):
     ``existing_account_df.empty == True`` for a freshly-linked
     account). Regression test:
     ``tests/test_upload_merge.py::test_dedup_collapses_drift_within_new_df_even_when_existing_empty``.
+
+    Two passes: the strict full-key pass (``_dedup_history_strict``), then
+    the cross-source pass (``_dedup_history_cross_source``). Both key on
+    column-wise canonical cells (``_canonicalize_seed_series``) so a
+    full-history first sync costs vectorized column work, not a Python
+    call per cell.
     """
     if df is None or df.empty:
         return df
+    df = _dedup_history_strict(df, seed_columns)
+    return _dedup_history_cross_source(df, seed_columns)
+
+
+def _dedup_history_strict(df, seed_columns):
+    """First :func:`_dedup_history_rows` pass: last-write-wins on the
+    canonicalized full trade key."""
     # ``account`` and ``user_id`` are informational metadata, not part of
     # the trade's identity. ``tenant_id`` IS part of the dedup key under
     # v2 (see docs/V2_TENANT_KEY_DESIGN.md).
@@ -520,11 +600,14 @@ def _dedup_history_rows(df, seed_columns):
     canon = df[key_cols].copy()
     for c in key_cols:
         if c in canon.columns:
-            canon[c] = canon[c].map(_canonicalize_seed_cell)
+            canon[c] = _canonicalize_seed_series(canon[c])
     keep_mask = ~canon.duplicated(subset=key_cols, keep="last")
-    df = df.loc[keep_mask].reset_index(drop=True)
+    return df.loc[keep_mask].reset_index(drop=True)
+
 
-    # ---- Second pass: cross-source dedup -----------------------------------
+def _dedup_history_cross_source(df, seed_columns):
+    """Second :func:`_dedup_history_rows` pass: collapse the same fill
+    reported by both SnapTrade feeds."""
     # SnapTrade has TWO sources of truth for the same trade. The
     # ``recent_orders`` endpoint reflects executed orders within seconds
     # (real-time); the ``activities`` endpoint takes hours-to-days to
@@ -586,8 +669,8 @@ def _dedup_history_rows(df, seed_columns):
     df = df.reset_index(drop=True)
     sym_col = next((c for c in df.columns if str(c).lower() == "symbol"), None)
     price_col = next((c for c in cross_key_cols if str(c).lower() == "price"), None)
-    sym_blank = df[sym_col].map(lambda v: _canonicalize_seed_cell(v) == "")
-    price_blank = df[price_col].map(lambda v: _canonicalize_seed_cell(v) == "")
+    sym_blank = _canonicalize_seed_series(df[sym_col]) == ""
+    price_blank = _canonicalize_seed_series(df[price_col]) == ""
     eligible = ~(sym_blank | price_blank)
 
     canon2 = df[cross_key_cols].copy()
@@ -595,26 +678,20 @@ def _dedup_history_rows(df, seed_columns):
         if c == price_col:
             # Price drifts across sources by trailing precision (orders 6dp vs
             # activities 4dp) — round it in the key so the same fill collides.
-            canon2[c] = canon2[c].map(_canonicalize_cross_source_price)
+            canon2[c] = _canonicalize_cross_source_price_series(canon2[c])
         else:
-            canon2[c] = canon2[c].map(_canonicalize_seed_cell)
+            canon2[c] = _canonicalize_seed_series(canon2[c])
     desc_lens = df["Description"].fillna("").astype(str).str.len()
-    # Visit longer-description rows first so the richer one wins its group.
+    # Visit longer-description rows first so the richer one wins its group:
+    # in that order, every eligible row whose key was already seen drops.
+    # Non-fill events are never cross-source deduped.
     order = (-desc_lens.to_numpy()).argsort(kind="stable")
-
-    seen: set = set()
-    drop_positions: set = set()
-    for pos in order:
-        if not bool(eligible.iloc[pos]):
-            continue  # non-fill event — never cross-source deduped
-        key = tuple(canon2.iloc[pos][c] for c in cross_key_cols)
-        if key in seen:
-            drop_positions.add(pos)
-        else:
-            seen.add(key)
-    if not drop_positions:
+    order = order[eligible.to_numpy()[order]]
+    dup = canon2.take(order).duplicated(keep="first").to_numpy()
+    if not dup.any():
         return df
-    keep_mask2 = [i not in drop_positions for i in range(len(df))]
+    keep_mask2 = np.ones(len(df), dtype=bool)
+    keep_mask2[order[dup]] = False
     return df.loc[keep_mask2].reset_index(drop=True)
 
 
@@ -631,16 +708,19 @@ def _merge_seed_with_existing(
 ):
     """
     Merge new account data with existing seed data.
-    - Fetches current file from GitHub (unless ``existing_content`` is given)
+    - Fetches the current seed from the store (unless ``existing_content``
+      is given)
     - For current positions: replace that account's rows (snapshot semantics)
     - For history: append new rows for that account and de-duplicate
-    - Returns CSV string ready to commit
+    - Returns the merged DataFrame (``seed_columns`` order) ready to write
 
-    ``existing_content`` — by default the current file is fetched from GitHub.
-    A caller batching several accounts into ONE commit passes the running
-    merged CSV of the PREVIOUS account here so each account folds onto the
-    last instead of re-fetching (and clobbering) the branch. Pass the raw CSV
-    string, or ``None`` to mean "file does not exist yet" (same as a 404).
+    ``existing_content`` — by default the whole stored seed is fetched. A
+    tenant-slice write passes the slice it read (``_get_seed_slice``), and
+    a caller batching several accounts into ONE write passes the running
+    merged frame of the PREVIOUS account so each account folds onto the
+    last instead of re-fetching (and clobbering) it. Pass a seed frame, or
+    ``None`` to mean "seed does not exist yet" (same as a 404). The frame
+    is not modified.
 
     ``tenant_id`` (the syncing broker tenant key) MUST be passed for any
     merge that lands user-facing data. The dedup window is scoped to
@@ -657,56 +737,31 @@ def _merge_seed_with_existing(
     """
     if existing_content is _FETCH_FROM_GITHUB:
         existing_content = _get_file_content(path)
-    if existing_content is None:
-        # File truly does not exist yet (HTTP 404). Safe to use only new data.
-        for col in seed_columns:
-            if col not in new_df.columns:
-                new_df[col] = ""
-        merged = new_df[seed_columns]
-        if path == HISTORY_PATH:
-            merged = _dedup_history_rows(merged, seed_columns)
-        return merged.to_csv(index=False)
-    if not existing_content.strip():
-        # File exists but is empty (e.g. someone manually truncated it).
-        # Still safe to use only new data — there is nothing to preserve.
+    if existing_content is None or existing_content.empty:
+        # Seed truly does not exist yet (the 404 analogue), or exists but
+        # has no rows (e.g. someone manually truncated it). Safe to use
+        # only new data — there is nothing to preserve.
         for col in seed_columns:
             if col not in new_df.columns:
                 new_df[col] = ""
         merged = new_df[seed_columns]
         if path == HISTORY_PATH:
             merged = _dedup_history_rows(merged, seed_columns)
-        return merged.to_csv(index=False)
+        return merged.reset_index(drop=True)
 
-    # Parse existing CSV. Refuse to proceed on parse failure rather than
-    # silently overwriting — a corrupted file in the repo is something a
-    # human needs to look at, not something a sync should paper over by
-    # destroying every other tenant's data.
-    try:
-        existing_df = pd.read_csv(StringIO(existing_content))
-    except Exception as exc:
-        raise SeedFetchError(
-            f"Existing seed at {path} failed to parse: {exc}. "
-            "Refusing to overwrite to protect other tenants' data."
-        ) from exc
-
-    if existing_df.empty:
-        for col in seed_columns:
-            if col not in new_df.columns:
-                new_df[col] = ""
-        merged = new_df[seed_columns]
-        if path == HISTORY_PATH:
-            merged = _dedup_history_rows(merged, seed_columns)
-        return merged.to_csv(index=False)
+    # Work on a copy: callers keep the frame they passed (the slice no-op
+    # check hashes it after the merge).
+    existing_df = existing_content.copy()
 
-    # Normalize Account column name (may be "Account" or "account" from CSV)
+    # Normalize Account column name (may be "Account" or "account")
     acct_col = None
     for c in existing_df.columns:
         if c.strip().lower() == "account":
             acct_col = c
             break
     if acct_col is None:
-        # No account column in existing: same reasoning as the parse-fail
-        # branch — refuse rather than silently nuking other tenants.
+        # No account column in existing: refuse rather than silently
+        # nuking other tenants.
         raise SeedFetchError(
             f"Existing seed at {path} has no Account column. "
             "Refusing to overwrite to protect other tenants' data."
@@ -771,7 +826,13 @@ def _merge_seed_with_existing(
         new_tagged = new_df.copy()
         existing_account_df["__src"] = 0
         new_tagged["__src"] = 1
-        combined = pd.concat([existing_account_df, new_tagged], ignore_index=True)
+        # An empty slice is left out of the concat: its all-STRING columns
+        # would otherwise decide the dtypes of the new rows' columns.
+        combined = pd.concat(
+            [existing_account_df, new_tagged] if len(existing_account_df)
+            else [new_tagged],
+            ignore_index=True,
+        )
 
         # Normalize key columns so duplicates match: NaN != NaN in pandas,
         # so fill nulls with a sentinel before dedupe. ``account`` and
@@ -793,7 +854,7 @@ def _merge_seed_with_existing(
                         if _normalize_tid(v) == "" else _normalize_tid(v)
                     )
                 else:
-                    canon[c] = combined[c].map(_canonicalize_seed_cell)
+                    canon[c] = _canonicalize_seed_series(combined[c])
 
         combined = combined.sort_values("__src", kind="stable")  # 0 first, 1 last
         keep_mask = ~canon.duplicated(subset=key_cols, keep="last")
@@ -823,24 +884,25 @@ def _merge_seed_with_existing(
         merged_account = new_df
 
     merged = pd.concat([other_df, merged_account], ignore_index=True)
-    return merged[seed_columns].to_csv(index=False)
+    return merged[seed_columns]
 
 
-def _seed_contents_unchanged(path_contents):
-    """True iff every ``(path, content)`` already equals the seed currently
+def _seed_contents_unchanged(path_frames):
+    """True iff every ``(path, frame)`` already equals the seed currently
     in the store.
 
     Used to skip no-op writes: one changed write = one workflow dispatch =
     one dbt build, and rebuilding the entire warehouse for zero data change
     is wasted CI + BigQuery cost ("I don't need to run dbt if no new data is
     going in"). A missing table (``None``) counts as a change so first-ever
-    creation still writes. Byte-exact comparison — if a future pandas version
-    reformats output, this errs toward writing (safe), never toward
-    silently dropping a real change.
+    creation still writes. Compares ``seed_frame_digest`` content hashes of
+    the text each cell would be stored as, so a dtype difference alone
+    (``"10"`` read back vs ``10`` freshly synced) is not a change, while any
+    real cell, column or row-order change is.
     """
-    for path, content in path_contents:
+    for path, frame in path_frames:
         current = _get_file_content(path)
-        if current is None or current != content:
+        if current is None or seed_frame_digest(current) != seed_frame_digest(frame):
             return False
     return True
 
@@ -854,10 +916,35 @@ _WORKFLOW_FILE = "bigquery_update.yml"
 # knows about, so SHA-based lookup no longer works.)
 _DISPATCH_MARKER_PREFIX = "dispatch:"
 
+# A tenant-scoped rebuild replaces only the named tenants' rows (see
+# dbt/macros/tenant_rebuild.sql). Past this many tenants (the nightly
+# batch) the full build is as cheap.
+_SCOPED_REBUILD_MAX_TENANTS = 8
+
+
+def _rebuild_tenant_input(tenant_ids):
+    """The workflow's ``tenant_ids`` input for a rebuild of ``tenant_ids``:
+    sorted, sanitized and comma-joined, or ``None`` for a full build (no
+    ids, a blank/malformed id, or more than ``_SCOPED_REBUILD_MAX_TENANTS``).
+    """
+    from app.tenant_scope import sanitize_tenant_id
 
-def _dispatch_warehouse_rebuild(reason):
+    if not tenant_ids:
+        return None
+    ids = {sanitize_tenant_id(t) for t in tenant_ids}
+    if None in ids or len(ids) > _SCOPED_REBUILD_MAX_TENANTS:
+        return None
+    return ",".join(sorted(ids))
+
+
+def _dispatch_warehouse_rebuild(reason, tenant_ids=None):
     """POST a ``workflow_dispatch`` for the warehouse rebuild workflow.
 
+    ``tenant_ids`` — the tenants whose raw rows changed, when the write
+    was scoped to them. Passed as the workflow's ``tenant_ids`` input so
+    the build replaces only their rows (and flushes only their cached
+    queries); ``None`` rebuilds every tenant.
+
     Returns a ``dispatch:<unix_ts>`` marker string on success, ``None`` on
     failure. Log-don't-crash: the seed write already landed, so a dispatch
     failure must never fail the sync — the next changed sync (or a manual
@@ -884,12 +971,16 @@ def _dispatch_warehouse_rebuild(reason):
         f"https://api.github.com/repos/{repo}/actions/workflows/"
         f"{_WORKFLOW_FILE}/dispatches"
     )
+    payload = {"ref": _github_branch()}
+    tenant_input = _rebuild_tenant_input(tenant_ids)
+    if tenant_input:
+        payload["inputs"] = {"tenant_ids": tenant_input}
     dispatched_at = int(_time.time())
     try:
         resp = requests.post(
             url,
             headers=_github_headers(),
-            json={"ref": _github_branch()},
+            json=payload,
             timeout=20,
         )
     except requests.RequestException as exc:
@@ -903,7 +994,10 @@ def _dispatch_warehouse_rebuild(reason):
             reason, resp.status_code, resp.text[:200],
         )
         return None
-    app.logger.info("Dispatched warehouse rebuild (%s).", reason)
+    app.logger.info(
+        "Dispatched warehouse rebuild (%s; tenants=%s).",
+        reason, tenant_input or "all",
+    )
     return f"{_DISPATCH_MARKER_PREFIX}{dispatched_at}"
 
 
@@ -911,7 +1005,7 @@ def _commit_git_paths(path_contents, message):
     """
     Atomically replace the raw seed tables in the BigQuery store, then
     dispatch a warehouse rebuild.
-    path_contents: list of (seed_path, CSV text).
+    path_contents: list of (seed_path, merged DataFrame).
     Returns (success, error_message, build_marker or None, no_changes).
     ``no_changes=True`` means every seed already matched the store, so NO
     write happened (and therefore no dbt build will run). ``build_marker``
@@ -945,6 +1039,67 @@ def _commit_git_paths(path_contents, message):
     return True, None, marker, False
 
 
+def _tenant_slice_writes_enabled():
+    """Whether syncs read and rewrite only their own tenant slice of each
+    raw table (the default) instead of the whole multi-tenant table.
+    ``SEED_WRITE_MODE=table`` is the operator fallback to full-table
+    ``WRITE_TRUNCATE`` rewrites."""
+    return os.environ.get("SEED_WRITE_MODE", "").strip().lower() != "table"
+
+
+def _get_seed_slice(path, account_name, tenant_ids):
+    """Fetch the slice of a seed that a merge for ``account_name`` /
+    ``tenant_ids`` may rewrite, as a seed frame: rows under the label whose
+    ``tenant_id`` is one of ``tenant_ids`` or blank — the same rows each
+    tenant's merge scopes its dedup to (``_merge_seed_with_existing``).
+    The seed store filters server-side, so other tenants' rows are never
+    transferred or parsed. ``None`` means the raw table does not exist
+    yet; a zero-row frame means it exists but this slice is empty.
+    Raises ``SeedFetchError`` like ``_get_file_content``.
+
+    Read half of the tenant-slice storage seam that the merge tests stub.
+    """
+    try:
+        return _seed_store_read_slice(path, account_name, tenant_ids)
+    except SeedStoreError as exc:
+        raise SeedFetchError(str(exc)) from exc
+
+
+def _commit_seed_slices(slices, message):
+    """Write tenant slices to the seed store, then dispatch a rebuild.
+
+    ``slices`` — list of ``(path, account_name, tenant_ids, existing,
+    merged)`` frames where ``existing`` is the slice as read by
+    ``_get_seed_slice`` under the same seed lock. Slices whose merged
+    ``seed_frame_digest`` equals the one read are skipped; when every
+    slice is unchanged nothing is written and no build is dispatched.
+
+    The rebuild is scoped to the changed slices' tenants.
+
+    Same return contract as ``_commit_git_paths``: ``(success,
+    error_message, build_marker or None, no_changes)``.
+    """
+    changed = [
+        (path, account_name, tenant_ids, content)
+        for path, account_name, tenant_ids, existing, content in slices
+        if existing is None
+        or seed_frame_digest(existing) != seed_frame_digest(content)
+    ]
+    if not changed:
+        return True, None, None, True
+
+    try:
+        _seed_store_replace_slices(changed)
+    except SeedStoreError as exc:
+        return False, str(exc), None, False
+
+    tenant_ids = None
+    if all(ids for _p, _a, ids, _c in changed):
+        tenant_ids = sorted({t for _p, _a, ids, _c in changed for t in ids})
+    marker = _dispatch_warehouse_rebuild(message, tenant_ids=tenant_ids)
+    return True, None, marker, False
+
+
 EXISTING_ACCOUNTS_QUERY = """
     SELECT DISTINCT account
     FROM `ccwj-dbt.analytics.positions_summary`
@@ -1157,15 +1312,31 @@ def merge_and_push_seeds(
         skip_history=skip_history, balances_df=balances_df,
     )
 
-    path_contents = []
-    for path, prepared_df, seed_columns in specs:
-        content = _merge_seed_with_existing(
-            path, account_name, prepared_df, seed_columns, tenant_id=tenant_id_str,
-        )
-        path_contents.append((path, content))
+    slice_mode = _tenant_slice_writes_enabled()
+    if slice_mode:
+        # Read, merge and write only this tenant's slice of each table.
+        tenant_ids = (tenant_id_str,)
+        slices = []
+        for path, prepared_df, seed_columns in specs:
+            existing = _get_seed_slice(path, account_name, tenant_ids)
+            content = _merge_seed_with_existing(
+                path, account_name, prepared_df, seed_columns,
+                tenant_id=tenant_id_str, existing_content=existing,
+            )
+            slices.append((path, account_name, tenant_ids, existing, content))
+    else:
+        path_contents = []
+        for path, prepared_df, seed_columns in specs:
+            content = _merge_seed_with_existing(
+                path, account_name, prepared_df, seed_columns, tenant_id=tenant_id_str,
+            )
+            path_contents.append((path, content))
 
     try:
-        ok, err, head_sha, no_changes = _commit_git_paths(path_contents, commit_message)
+        if slice_mode:
+            ok, err, head_sha, no_changes = _commit_seed_slices(slices, commit_message)
+        else:
+            ok, err, head_sha, no_changes = _commit_git_paths(path_contents, commit_message)
         if not ok:
             return False, err or "Seed store write failed.", history_rows, current_rows, None, False
     except Exception as exc:
@@ -1187,7 +1358,7 @@ def merge_and_push_seeds_batch(entries, *, commit_message):
     one full ``Update Daily Position Performance`` workflow run — PER ACCOUNT
     (~14 near-simultaneous runs a night, most immediately cancelled by
     ``concurrency: cancel-in-progress``). This folds every account onto the
-    prior account's merged CSV in-memory (via ``_merge_seed_with_existing``'s
+    prior account's merged frame in-memory (via ``_merge_seed_with_existing``'s
     ``existing_content`` hand-off) and writes once, so the same monotonic
     merge semantics collapse to a single build.
 
@@ -1243,9 +1414,35 @@ def merge_and_push_seeds_batch(entries, *, commit_message):
                 (e["account_name"], tenant_id_str, prepared_df, seed_columns)
             )
 
-    # Fold each path once, in the canonical seed order (history, current,
-    # balances), fetching the stored seed a single time and threading the
-    # running merged CSV through each account.
+    slice_mode = _tenant_slice_writes_enabled()
+    if slice_mode:
+        slices = _fold_batch_slices(per_path)
+    else:
+        path_contents = _fold_batch_tables(per_path)
+
+    try:
+        if slice_mode:
+            ok, err, head_sha, no_changes = _commit_seed_slices(slices, commit_message)
+        else:
+            ok, err, head_sha, no_changes = _commit_git_paths(path_contents, commit_message)
+        if not ok:
+            return False, err or "Seed store write failed.", None, False, 0
+    except Exception as exc:
+        return False, str(exc), None, False, 0
+
+    # Per-account bookkeeping (idempotent), matching the single-push path.
+    for e, hr, cr in prepared_counts:
+        add_account_for_user(int(e["user_id"]), e["account_name"])
+        record_upload(int(e["user_id"]), e["account_name"], hr, cr)
+
+    return True, None, head_sha, no_changes, len(valid)
+
+
+def _fold_batch_tables(per_path):
+    """Fold each path once, in the canonical seed order (history, current,
+    balances), fetching the stored seed a single time and threading the
+    running merged frame through each account. Returns ``path_contents``
+    for ``_commit_git_paths``."""
     path_contents = []
     for path in (HISTORY_PATH, CURRENT_PATH, BALANCE_SEED_PATH):
         contributions = per_path.get(path)
@@ -1258,20 +1455,39 @@ def merge_and_push_seeds_batch(entries, *, commit_message):
                 tenant_id=tenant_id_str, existing_content=content,
             )
         path_contents.append((path, content))
+    return path_contents
 
-    try:
-        ok, err, head_sha, no_changes = _commit_git_paths(path_contents, commit_message)
-        if not ok:
-            return False, err or "Seed store write failed.", None, False, 0
-    except Exception as exc:
-        return False, str(exc), None, False, 0
 
-    # Per-account bookkeeping (idempotent), matching the single-push path.
-    for e, hr, cr in prepared_counts:
-        add_account_for_user(int(e["user_id"]), e["account_name"])
-        record_upload(int(e["user_id"]), e["account_name"], hr, cr)
+def _fold_batch_slices(per_path):
+    """Tenant-slice analogue of ``_fold_batch_tables``.
 
-    return True, None, head_sha, no_changes, len(valid)
+    Contributions are grouped by account label. Tenants sharing a label
+    also share that label's legacy unowned rows, so their slices overlap:
+    each label group reads ONE slice covering all of its tenants and folds
+    them in entry order, exactly as sequential pushes would (rows of the
+    group's other tenants ride through each merge as ``other_df``).
+    Returns slices for ``_commit_seed_slices``.
+    """
+    from collections import OrderedDict
+    slices = []
+    for path in (HISTORY_PATH, CURRENT_PATH, BALANCE_SEED_PATH):
+        contributions = per_path.get(path)
+        if not contributions:
+            continue
+        by_label = OrderedDict()
+        for contribution in contributions:
+            by_label.setdefault(contribution[0], []).append(contribution)
+        for account_name, group in by_label.items():
+            tenant_ids = tuple(OrderedDict.fromkeys(c[1] for c in group))
+            existing = _get_seed_slice(path, account_name, tenant_ids)
+            content = existing
+            for _name, tenant_id_str, prepared_df, seed_columns in group:
+                content = _merge_seed_with_existing(
+                    path, account_name, prepared_df, seed_columns,
+                    tenant_id=tenant_id_str, existing_content=content,
+                )
+            slices.append((path, account_name, tenant_ids, existing, content))
+    return slices
 
 
 @_serialized_seed_write
@@ -1340,17 +1556,10 @@ def purge_user_id_from_seeds(user_id, *, commit_message):
     rows_removed = {}
 
     for path, columns in seed_specs:
-        existing_content = _get_file_content(path)
-        if not existing_content or not existing_content.strip():
-            rows_removed[path] = 0
-            continue
-        try:
-            # dtype=str + keep_default_na=False so we never coerce ""→NaN→"nan"
-            # on round-trip, which would dirty every other tenant's row.
-            df = pd.read_csv(StringIO(existing_content), dtype=str, keep_default_na=False)
-        except Exception as exc:
-            return False, f"Could not parse {path}: {exc}", rows_removed, None
-        if df.empty:
+        # Seed frames carry the stored cell text ("" for NULL), so nothing
+        # is coerced on the way back — other tenants' rows stay byte-stable.
+        df = _get_file_content(path)
+        if df is None or df.empty:
             rows_removed[path] = 0
             continue
 
@@ -1403,7 +1612,7 @@ def purge_user_id_from_seeds(user_id, *, commit_message):
             if col not in cleaned.columns:
                 cleaned[col] = ""
         cleaned = cleaned[columns]
-        path_contents.append((path, cleaned.to_csv(index=False)))
+        path_contents.append((path, cleaned))
         rows_removed[path] = removed
 
     if not path_contents:
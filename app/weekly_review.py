@@ -50,12 +50,29 @@ def _bq_parallel(client, queries):
     movers, breakdowns) rendered em-dashes. Per-key isolation means one
     bad query produces one empty DataFrame, logged loudly, while the
     other eight sections still render real data. Mirrors the contract
-    on ``app.routes._bq_parallel``.
+    on ``app.routes._bq_parallel``, including its ``BQ_SCRIPT_BATCH``
+    single-script mode.
     """
+    from app.bq_script import run_batch
     from app.query_cache import cached_query_df, propagate_context
 
     results = {}
 
+    def _log_failure(name, exc):
+        try:
+            app.logger.error(
+                "_bq_parallel: query %r failed: %s", name, exc,
+            )
+        except Exception:
+            import logging
+            logging.getLogger(__name__).error(
+                "_bq_parallel: query %r failed: %s", name, exc,
+            )
+
+    scripted = run_batch(client, queries, _log_failure)
+    if scripted is not None:
+        return scripted
+
     def _run(name, spec):
         try:
             if isinstance(spec, tuple):
@@ -78,15 +95,7 @@ def _bq_parallel(client, queries):
             name, df, exc = f.result()
             results[name] = df
             if exc is not None:
-                try:
-                    app.logger.error(
-                        "_bq_parallel: query %r failed: %s", name, exc,
-                    )
-                except Exception:
-                    import logging
-                    logging.getLogger(__name__).error(
-                        "_bq_parallel: query %r failed: %s", name, exc,
-                    )
+                _log_failure(name, exc)
 
     return results
 
@@ -110,6 +119,13 @@ from app.execution_quality import (  # noqa: E402
     verdicts_landed as _verdicts_landed,
     verdicts_pending as _verdicts_pending,
 )
+from app.daily_review_page import (  # noqa: E402
+    PAGE_QUERY as DAILY_REVIEW_PAGE_QUERY,
+    note_page_coverage,
+    page_likely_serves,
+    page_mart_enabled,
+    split_page_frame,
+)
 
 
 def _classify_expiring_moneyness(*, instrument_type, option_type, stock_price, strike):
@@ -3069,6 +3085,14 @@ def _today_headline(today_pulse, today_movers, equity_snapshot):
     return f"Today: {sign}${abs(delta):,.0f}{pct_str}"
 
 
+def _daily_calendar_window(this_week):
+    """(start, end) dates of the Daily Review calendar heatmap."""
+    return (
+        this_week - timedelta(days=(DAILY_CALENDAR_WEEKS - 1) * 7),
+        this_week + timedelta(days=4),
+    )
+
+
 def build_daily_review_batch(tenant_filter, today, this_week, trades_as_of=None):
     """The tenant-scoped core of the Daily Review parallel batch.
 
@@ -3083,8 +3107,7 @@ def build_daily_review_batch(tenant_filter, today, this_week, trades_as_of=None)
     ET session before the open; calendar today once the session is open).
     Defaults to ``today`` so existing callers/tests keep their meaning.
     """
-    cal_start = this_week - timedelta(days=(DAILY_CALENDAR_WEEKS - 1) * 7)
-    cal_end = this_week + timedelta(days=4)
+    cal_start, cal_end = _daily_calendar_window(this_week)
 
     cal_cfg = bigquery.QueryJobConfig(query_parameters=[
         bigquery.ScalarQueryParameter("start_date", "DATE", cal_start),
@@ -3142,6 +3165,57 @@ def build_daily_review_batch(tenant_filter, today, this_week, trades_as_of=None)
     }
 
 
+def daily_review_page_query(tenant_filter):
+    """``mart_daily_review_page`` read for one scope (app/daily_review_page.py)."""
+    return DAILY_REVIEW_PAGE_QUERY.format(tenant_filter=tenant_filter)
+
+
+def fetch_daily_review_batch(client, tenant_ids, tenant_filter, today,
+                             this_week, trades_as_of=None, extra_queries=None):
+    """Run the Daily Review batch: from the page mart when it can serve
+    this request (ONE BigQuery job), else the live ``build_daily_review_batch``
+    fan-out. ``extra_queries`` (the view's session-dependent after-hours
+    query) always run live, in the same parallel wave as the first read.
+    Returns ``{name: DataFrame}`` like ``_bq_parallel``.
+
+    Unless the last page reads say the mart covers these tenants today
+    (``page_likely_serves``), the live batch joins that first wave too, so
+    a mart that cannot serve (00:00 UTC until the nightly build, a new
+    tenant) costs no second round trip.
+    """
+    extra = dict(extra_queries or {})
+    if page_mart_enabled():
+        live = build_daily_review_batch(
+            tenant_filter, today, this_week, trades_as_of=trades_as_of)
+        hedged = not page_likely_serves(tenant_ids)
+        batch = _bq_parallel(client, {
+            "page": daily_review_page_query(tenant_filter), **extra,
+            **(live if hedged else {}),
+        })
+        page_df = batch.pop("page", None)
+        note_page_coverage(page_df)
+        cal_start, cal_end = _daily_calendar_window(this_week)
+        frames = split_page_frame(
+            page_df, tenant_ids,
+            today=today, this_week=this_week,
+            trades_as_of=trades_as_of or today,
+            cal_start=cal_start, cal_end=cal_end,
+        )
+        if frames is not None:
+            batch.update(frames)
+            return batch
+        if not hedged:
+            app.logger.info(
+                "Daily review page mart cannot serve this request; running the live batch")
+            batch.update(_bq_parallel(client, live))
+        return batch
+    return _bq_parallel(client, {
+        **build_daily_review_batch(
+            tenant_filter, today, this_week, trades_as_of=trades_as_of),
+        **extra,
+    })
+
+
 # Decorator order is intentional: ``/daily-review`` is the inner (applied
 # first) so Flask registers it first in the url_map, and ``url_for(
 # 'weekly_review')`` returns ``/daily-review``. ``/weekly-review`` stays
@@ -3257,8 +3331,7 @@ def weekly_review():
         context["review_date"] = trades_as_of
         context["review_is_today"] = trades_as_of == today
 
-        batch_queries = build_daily_review_batch(
-            tenant_filter, today, this_week, trades_as_of=trades_as_of)
+        extra_queries = {}
         # After-hours drift compares the broker mark to today's *official*
         # close. Two conditions must hold or the reading is noise/wrong:
         #   1) the bell has rung (state == after_hours) so the close exists;
@@ -3287,11 +3360,13 @@ def weekly_review():
             and bool(ah_tenants)
         )
         if after_hours_ready:
-            batch_queries["after_hours"] = AFTER_HOURS_MOVERS_QUERY.format(
+            extra_queries["after_hours"] = AFTER_HOURS_MOVERS_QUERY.format(
                 tenant_filter=_tenant_sql_and(sorted(ah_tenants)))
 
         try:
-            batch = _bq_parallel(client, batch_queries)
+            batch = fetch_daily_review_batch(
+                client, tenant_ids, tenant_filter, today, this_week,
+                trades_as_of=trades_as_of, extra_queries=extra_queries)
         except Exception as e:
             app.logger.warning("Daily review parallel batch failed: %s", e)
             batch = {}
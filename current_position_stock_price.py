@@ -1,10 +1,20 @@
+import argparse
 import csv
+import json
 import os
 import re
 import sys
+import threading
+import uuid
+import numpy as np
 import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
 import yfinance as yf
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import date, timedelta
+from urllib.parse import quote
+from google.api_core.exceptions import NotFound
 from google.cloud import bigquery
 
 
@@ -14,7 +24,7 @@ from google.cloud import bigquery
 # yfinance is an unofficial API and DOES break (rate limits, endpoint
 # changes, Yahoo layoffs breaking the page the lib scrapes). Every failure
 # used to be swallowed per-symbol with a print(), so a total outage looked
-# identical to a healthy run in CI — and the WRITE_TRUNCATE below would
+# identical to a healthy run in CI — and the price write below would
 # happily replace a full price table with a nearly-empty one, silently
 # zeroing dividends, charts, and close-based pricing for every user.
 #
@@ -141,21 +151,34 @@ def _yahoo_symbol_candidates(broker_sym, crypto_symbols=None):
     return candidates
 
 
-def _fetch_history_for_symbol(broker_sym, start_iso, end_iso, crypto_symbols=None):
+def _fetch_history_for_symbol(
+    broker_sym, start_iso, end_iso, crypto_symbols=None, cache=None,
+    full_history=True,
+):
     """Fetch ``(history_df, ticker_used, yahoo_symbol_used)`` for one symbol.
 
     Returns ``(None, None, None)`` when no candidate yields any rows.
     Caller is responsible for the split-adjust pass and the rename/
     write-back into ``daily_position_performance`` under ``broker_sym``.
+
+    With a ``cache`` (``_PriceCache``), candidates recently seen empty are
+    not probed again. A candidate is recorded as empty only when
+    ``full_history`` says the window starts at the symbol's first trade
+    date: a short incremental window is legitimately empty over a weekend,
+    a holiday or a halt.
     """
     last_err = None
     for cand in _yahoo_symbol_candidates(broker_sym, crypto_symbols):
+        if cache is not None and cache.known_empty(cand):
+            continue
         try:
             t = yf.Ticker(cand)
             h = t.history(start=start_iso, end=end_iso)
         except Exception as e:
             last_err = e
             continue
+        if (h is None or h.empty) and cache is not None and full_history:
+            cache.mark_empty(cand)
         if h is not None and not h.empty:
             if cand != broker_sym:
                 print(
@@ -196,12 +219,714 @@ def _coverage_guard(symbols_ok, symbols_failed, min_coverage=None):
         return True, (
             summary
             + f"\nPRICES_GUARD_TRIPPED: {reason} "
-            "Skipping WRITE_TRUNCATE so yesterday's price table survives; "
+            "Skipping the price write so yesterday's price table survives; "
             "exiting non-zero to fail the workflow."
         )
     return False, summary
 
 
+# ---------------------------------------------------------------------------
+# Local price cache
+# ---------------------------------------------------------------------------
+# Each run used to re-download every symbol's history from Yahoo, even though
+# nothing before the last few sessions ever changes. With ``PRICE_CACHE_DIR``
+# set (refresh.sh and the CI workflows set it; unset or "off" disables), the
+# loader keeps one Parquet file per YAHOO symbol holding the adjusted close,
+# the raw (split-undone) close, dividends and the split list, and later runs
+# fetch only the cached tail — from ``OVERLAP_DAYS`` before the last cached
+# session — instead of the full range. A split that shows up in that tail
+# and isn't in the cached split list drops back to a full fetch, since it
+# rescales every earlier close. Only the tail is checked: reading
+# ``Ticker.splits`` makes yfinance download the symbol's whole history,
+# which is the request the cache exists to skip. A split Yahoo adds or
+# corrects BEFORE the tail is therefore not noticed until the entry is
+# rebuilt by a full fetch (``--full-refresh``, or a position opened before
+# the entry's first day).
+#
+# Candidates whose FULL history comes back empty (delisted names, a broker
+# form Yahoo only knows under its preferred spelling) are kept in a
+# negative cache for
+# ``PRICE_NEGATIVE_TTL_DAYS`` so each run doesn't re-probe them. It is only
+# persisted once the coverage guard passes: during a feed outage EVERY
+# symbol looks empty, and that must not be remembered.
+#
+# Closes older than the fetched tail are frozen at the time they were
+# cached, exactly like the incremental table merge below; ``--no-cache`` /
+# ``--full-refresh`` re-pull them.
+NEGATIVE_TTL_DAYS = int(os.environ.get("PRICE_NEGATIVE_TTL_DAYS", "7"))
+_NEGATIVE_FILE = "_empty.parquet"
+
+
+class _PriceCache:
+    """On-disk Parquet cache of yfinance price history, keyed by Yahoo symbol.
+
+    Safe to share across the fetch threads: each symbol is its own file
+    (written atomically) and the negative set is lock-protected.
+    """
+
+    def __init__(self, root, negative_ttl_days=None, today=None):
+        self.root = root
+        self.negative_ttl_days = (
+            NEGATIVE_TTL_DAYS if negative_ttl_days is None else negative_ttl_days
+        )
+        self.today = today or date.today()
+        os.makedirs(root, exist_ok=True)
+        self._lock = threading.Lock()
+        self._empty = self._load_negative()
+        self._empty_dirty = False
+        self.resume = True
+
+    @classmethod
+    def from_env(cls):
+        """The cache configured by ``PRICE_CACHE_DIR``, or ``None`` if off."""
+        root = os.environ.get("PRICE_CACHE_DIR", "").strip()
+        if not root or root.lower() in ("0", "off", "false", "no"):
+            return None
+        return cls(root)
+
+    def _path(self, yahoo_sym):
+        return os.path.join(self.root, quote(yahoo_sym, safe="") + ".parquet")
+
+    def _write_table(self, table, path):
+        tmp = f"{path}.{uuid.uuid4().hex}.tmp"
+        pq.write_table(table, tmp)
+        os.replace(tmp, path)
+
+    def read(self, yahoo_sym):
+        """``(frame, from_iso, splits)`` for a cached symbol, else ``None``.
+
+        ``splits`` maps ``split_date -> ratio``; an unreadable file counts as
+        a miss.
+        """
+        path = self._path(yahoo_sym)
+        if not os.path.exists(path):
+            return None
+        try:
+            table = pq.read_table(path)
+            meta = json.loads(table.schema.metadata[b"ccwj"])
+        except Exception as e:
+            print(f"Ignoring unreadable price cache for {yahoo_sym}: {e}")
+            return None
+        splits = {
+            date.fromisoformat(d): float(r) for d, r in meta.get("splits", [])
+        }
+        return table.to_pandas(), meta["from"], splits
+
+    def write(self, yahoo_sym, frame, from_iso, splits):
+        """Replace ``yahoo_sym``'s entry with ``frame`` (see ``_price_frame``)."""
+        meta = {
+            "from": from_iso,
+            "splits": [[d.isoformat(), r] for d, r in sorted(splits.items())],
+        }
+        table = pa.Table.from_pandas(frame.reset_index(drop=True), preserve_index=False)
+        table = table.replace_schema_metadata(
+            {**(table.schema.metadata or {}), b"ccwj": json.dumps(meta).encode()}
+        )
+        self._write_table(table, self._path(yahoo_sym))
+
+    def _load_negative(self):
+        path = os.path.join(self.root, _NEGATIVE_FILE)
+        if not os.path.exists(path):
+            return {}
+        try:
+            df = pq.read_table(path).to_pandas()
+        except Exception:
+            return {}
+        cutoff = self.today - timedelta(days=self.negative_ttl_days)
+        return {
+            sym: checked for sym, checked in zip(df["yahoo_symbol"], df["checked_on"])
+            if checked > cutoff
+        }
+
+    def known_empty(self, yahoo_sym):
+        with self._lock:
+            return yahoo_sym in self._empty
+
+    def mark_empty(self, yahoo_sym):
+        with self._lock:
+            self._empty[yahoo_sym] = self.today
+            self._empty_dirty = True
+
+    def flush_negative(self):
+        """Persist the negative cache (call only once the run is trusted)."""
+        with self._lock:
+            if not self._empty_dirty:
+                return
+            table = pa.table({
+                "yahoo_symbol": pa.array(list(self._empty), pa.string()),
+                "checked_on": pa.array(list(self._empty.values()), pa.date32()),
+            })
+            self._write_table(table, os.path.join(self.root, _NEGATIVE_FILE))
+            self._empty_dirty = False
+
+
+# ---------------------------------------------------------------------------
+# Symbol-grain fetch
+# ---------------------------------------------------------------------------
+# Prices are a property of the SYMBOL, not of the (account, user_id) that
+# holds it. The loader used to walk every (account, user_id, symbol) row and
+# download each one serially, so a symbol held by 40 tenants was fetched 40
+# times and the nightly wall time scaled with tenant × symbol pairs. Now each
+# distinct symbol is fetched ONCE, from the earliest open date any tenant
+# has, with bounded parallelism; the closes are then fanned back out to the
+# tenant rows with one join, each tenant keeping only dates on/after its own
+# ``position_open_date``.
+#
+# yfinance requests are I/O-bound, so a small thread pool overlaps them.
+# ``PRICE_FETCH_WORKERS`` bounds it (default 8) — enough to hide HTTP
+# latency without tripping Yahoo's rate limiter; 1 restores serial fetches.
+BENCHMARK_TICKERS = ["SPY", "QQQ"]
+FETCH_WORKERS = int(os.environ.get("PRICE_FETCH_WORKERS", "8"))
+
+
+def _with_benchmark_rows(positions_df, benchmark_start, tickers=None):
+    """Add one benchmark row per (account, user_id) and benchmark ticker the
+    tenant does not already hold, opening on ``benchmark_start``.
+
+    Benchmark prices propagate to every tenant (weekly review skips live
+    yfinance) — see docs/USER_ID_TENANCY.md. With no positions at all a
+    single ``_benchmark`` tenant keeps the benchmark feed (and the SPY
+    coverage check) alive.
+    """
+    tickers = list(tickers or BENCHMARK_TICKERS)
+    if positions_df.empty:
+        pairs = pd.DataFrame({"account": ["_benchmark"], "user_id": [None]})
+        held = None
+    else:
+        pairs = positions_df[["account", "user_id"]].drop_duplicates()
+        held = positions_df[["account", "user_id", "symbol"]].drop_duplicates()
+    bench = pairs.merge(pd.DataFrame({"symbol": tickers}), how="cross")
+    if held is not None:
+        bench = bench.merge(
+            held, on=["account", "user_id", "symbol"], how="left", indicator=True,
+        )
+        bench = bench.loc[bench["_merge"] == "left_only"].drop(columns="_merge")
+    if bench.empty:
+        return positions_df
+    bench["position_open_date"] = benchmark_start
+    return pd.concat([positions_df, bench], ignore_index=True)
+
+
+def _symbol_fetch_plan(positions_df):
+    """Distinct symbols with the earliest ``position_open_date`` any tenant
+    has for them — one fetch per symbol covers every tenant's window."""
+    if positions_df.empty:
+        return pd.DataFrame(columns=["symbol", "start_date"])
+    return (
+        positions_df.groupby("symbol", sort=True)["position_open_date"]
+        .min()
+        .rename("start_date")
+        .reset_index()
+    )
+
+
+def _calendar_days(index):
+    """Exchange-local calendar day of each timestamp, as ``datetime64[D]``."""
+    idx = pd.DatetimeIndex(index)
+    if idx.tz is not None:
+        idx = idx.tz_localize(None)
+    return idx.normalize().values.astype("datetime64[D]")
+
+
+def _split_factors(days, split_days, split_ratios):
+    """Cumulative split factor for each of ``days``.
+
+    ``factor(day) = PRODUCT(ratio for every split with split_day > day)`` —
+    the same definition as ``int_split_factors``. All arguments are array-
+    likes (``days``/``split_days`` as ``datetime64[D]``); splits need not be
+    sorted and non-positive / NaN ratios are ignored. Returns a float array
+    aligned with ``days``.
+    """
+    days = np.asarray(days, dtype="datetime64[D]")
+    split_days = np.asarray(split_days, dtype="datetime64[D]")
+    split_ratios = np.asarray(split_ratios, dtype=float)
+    usable = split_ratios > 0
+    split_days, split_ratios = split_days[usable], split_ratios[usable]
+    if not len(split_days):
+        return np.ones(len(days))
+    order = np.argsort(split_days, kind="stable")
+    split_days, split_ratios = split_days[order], split_ratios[order]
+    # suffix[i] = product of ratios[i:]; suffix[n] = 1 (no later splits).
+    suffix = np.append(np.cumprod(split_ratios[::-1])[::-1], 1.0)
+    return suffix[np.searchsorted(split_days, days, side="right")]
+
+
+def _undo_split_back_adjust(hist, splits):
+    """Raw (as-traded) closes for a yfinance history frame.
+
+    Returns ``(close, splits_seen)``: the ``Close`` column with the split
+    back-adjustment undone, and ``split_date -> ratio`` for every usable
+    split (the daily_split_events ledger).
+    """
+    # yfinance always returns historical close prices retroactively
+    # adjusted for splits — pre-split prices are scaled so that they
+    # are directly comparable, on a per-current-share basis, to
+    # post-split prices. For a 1-for-30 reverse split this means
+    # pre-split closes are *multiplied* by 30 (because 1 new share
+    # represents 30 old shares); two consecutive 1-for-30 reverse
+    # splits inflate pre-split closes by 900×.
+    #
+    # That convention is the wrong default for us because our share
+    # ledger is built from raw broker tickets (``stg_history``), not
+    # from current-shares. Marking 8000 raw RVSN shares against a
+    # back-adjusted $2,214 close produced a $17.7M phantom equity
+    # peak on the /accounts chart (real peak ~$10K). The user never
+    # held shares at $2,214 — that's just yfinance reverse-engineering
+    # 2026 splits onto 2024 prices.
+    #
+    # Fix: multiply each historical close by the product of split
+    # ratios for splits that occur AFTER its date (``_split_factors``,
+    # one searchsorted over the date index). For RVSN on 2024-12-30
+    # the future ratios are 0.033333 × 0.033333 ≈ 0.001111 → raw
+    # close $2.46. For dates after all known splits (or for symbols
+    # with no splits) the factor is 1 and we keep whatever yfinance
+    # returned. Dividends from yfinance are not consumed downstream
+    # (mart_daily_pnl reads them from stg_history), so we leave the
+    # Dividends column alone.
+    #
+    # Compare CALENDAR DATES, not timestamps. yfinance ships split
+    # timestamps at 09:30 ET (the moment of the split, at market open)
+    # while history rows are indexed at midnight ET. A naive
+    # timestamp comparison treats the split-day close (4:00 PM ET) as
+    # pre-split and incorrectly multiplies it by the ratio — producing
+    # a one-day chart spike (May 2026 XLU: 2025-12-05 close stored as
+    # $85.36 instead of the actual $42.68 post-split close, drawing a
+    # $137K MTM cliff on the chart for a single day). yfinance already
+    # returns the close in POST-split units on the split day itself;
+    # only PRE-split-DATE closes need un-adjustment.
+    close = hist["Close"].astype(float).copy()
+    if splits is None or not len(splits) or hist.empty:
+        return close, {}
+    split_days = _calendar_days(splits.index)
+    split_ratios = np.asarray(splits.values, dtype=float)
+    close *= _split_factors(_calendar_days(hist.index), split_days, split_ratios)
+    # One ledger row per (symbol, split_date) for daily_split_events.
+    splits_seen = {
+        pd.Timestamp(d).date(): float(r)
+        for d, r in zip(split_days, split_ratios) if r > 0
+    }
+    return close, splits_seen
+
+
+def _fetch_symbol_prices(
+    symbol, start_iso, end_iso, crypto_symbols=None, cache=None, full_history=True,
+):
+    """Fetch one symbol's daily closes with the split back-adjustment undone.
+
+    Returns ``(prices, splits)``: ``prices`` is a frame of ``date``,
+    ``close_price``, ``dividend`` (``None`` when no candidate has data) and
+    ``splits`` maps ``split_date -> ratio`` for the daily_split_events
+    ledger.
+
+    With a ``cache`` (``_PriceCache``) a symbol already cached from on/before
+    ``start_iso`` is resumed from its cached tail instead (see
+    ``_resume_from_cache``); a fresh full fetch is written to the cache.
+    ``full_history`` is False for an incremental window that starts after
+    the symbol's first trade date (see ``_fetch_history_for_symbol``).
+    """
+    if cache is not None and cache.resume:
+        resumed = _resume_from_cache(symbol, start_iso, end_iso, crypto_symbols, cache)
+        if resumed is not None:
+            return resumed
+
+    # Some preferred-share symbols (e.g. Schwab "GLOP-C") return no
+    # data when queried under the broker form because Yahoo uses
+    # "<root>-P<class>" for preferreds (e.g. "GLOP-PC"). The helper
+    # tries the broker form first, then falls back to the preferred
+    # form — see ``_yahoo_symbol_candidates``. Rows are still
+    # written back keyed on the broker symbol so downstream joins
+    # (``stg_history.underlying_symbol`` → ``stg_daily_prices.symbol``)
+    # don't need to know about the Yahoo translation.
+    hist, ticker, yahoo_sym = _fetch_history_for_symbol(
+        symbol, start_iso, end_iso, crypto_symbols, cache, full_history,
+    )
+    if hist is None or hist.empty:
+        return None, {}
+
+    # Undo yfinance's split back-adjustment (see ``_undo_split_back_adjust``).
+    try:
+        splits = ticker.splits
+    except Exception:
+        splits = None
+    raw_close, splits_seen = _undo_split_back_adjust(hist, splits)
+    frame = _price_frame(hist, raw_close)
+    if cache is not None:
+        cache.write(yahoo_sym, frame, start_iso, splits_seen)
+    return _loader_prices(frame), splits_seen
+
+
+def _price_frame(hist, raw_close):
+    """yfinance history → cache/loader frame: ``date``, ``close`` (Yahoo's
+    back-adjusted close), ``raw_close`` (split undo applied), ``dividend``."""
+    out = hist[["Close", "Dividends"]].copy()
+    out["raw_close"] = raw_close
+    out = out.reset_index()
+    out.rename(
+        columns={"Date": "date", "Close": "close", "Dividends": "dividend"},
+        inplace=True,
+    )
+    return out[["date", "close", "raw_close", "dividend"]]
+
+
+def _loader_prices(frame):
+    """The columns the loader writes: raw close as ``close_price``."""
+    return frame[["date", "raw_close", "dividend"]].rename(
+        columns={"raw_close": "close_price"}
+    ).reset_index(drop=True)
+
+
+def _resume_from_cache(symbol, start_iso, end_iso, crypto_symbols, cache):
+    """Serve ``symbol`` from its cache entry plus a fetched tail.
+
+    Returns ``(prices, splits)`` like ``_fetch_symbol_prices``, or ``None``
+    when the caller must do a full fetch: no entry starting on/before
+    ``start_iso``, the tail fetch failed or came back empty, or the tail
+    carries a split the entry doesn't know (every earlier close moves).
+
+    The tail always starts ``OVERLAP_DAYS`` before the last CACHED session,
+    even when ``start_iso`` is later (an entry restored from an older
+    actions/cache snapshot than the table's watermark): the entry is
+    written back whole, so skipping those days would leave a permanent
+    hole in it. Only the returned frame is cut to ``start_iso``.
+    """
+    for cand in _yahoo_symbol_candidates(symbol, crypto_symbols):
+        entry = cache.read(cand)
+        if entry is not None:
+            break
+    else:
+        return None
+    cached, from_iso, splits = entry
+    if cached.empty or from_iso > start_iso:
+        return None
+    cached_day = pd.to_datetime(cached["date"].dt.date)
+    tail_start = cached_day.max().date() - timedelta(days=OVERLAP_DAYS)
+    try:
+        hist = yf.Ticker(cand).history(start=tail_start.isoformat(), end=end_iso)
+    except Exception as e:
+        print(f"Cached tail fetch failed for {cand}: {e}")
+        return None
+    if hist is None or hist.empty:
+        return None
+    if "Stock Splits" in hist.columns:
+        tail_splits = hist.loc[hist["Stock Splits"] > 0, "Stock Splits"]
+        if any(ts.date() not in splits for ts in tail_splits.index):
+            print(f"New split in {cand}'s cached tail; fetching full history.")
+            return None
+
+    split_series = pd.Series(
+        list(splits.values()), index=pd.to_datetime(list(splits)), dtype=float,
+    )
+    raw_close, _ = _undo_split_back_adjust(hist, split_series)
+    tail = _price_frame(hist, raw_close)
+    keep = cached.loc[cached_day < pd.Timestamp(tail_start)]
+    frame = pd.concat([keep, tail], ignore_index=True) if len(keep) else tail
+    cache.write(cand, frame, from_iso, splits)
+    frame_day = pd.to_datetime(frame["date"].dt.date)
+    return _loader_prices(frame.loc[frame_day >= pd.Timestamp(start_iso)]), splits
+
+
+def _fetch_all_symbols(
+    plan, end_iso, crypto_symbols=None, max_workers=None, cache=None,
+    first_dates=None,
+):
+    """Fetch every symbol in ``plan`` once, ``max_workers`` at a time.
+
+    ``first_dates`` maps symbol -> first trade date (``_symbol_fetch_plan``);
+    a window starting after it is incremental. Omitted, every window in
+    ``plan`` is taken to be the symbol's full history.
+
+    Returns ``(prices, splits_seen, symbols_ok, symbols_failed)``:
+    ``prices`` maps symbol → price frame; ``splits_seen`` maps
+    ``(symbol, split_date) -> ratio``. A symbol that raises or has no data
+    is reported failed — never fatal for the run (the coverage guard
+    decides that).
+    """
+    if max_workers is None:
+        max_workers = FETCH_WORKERS
+    prices = {}
+    splits_seen = {}
+    symbols_ok = set()
+    symbols_failed = set()
+    jobs = [
+        (
+            row.symbol,
+            row.start_date.isoformat(),
+            first_dates is None or row.start_date <= first_dates[row.symbol],
+        )
+        for row in plan.itertuples(index=False)
+    ]
+    if not jobs:
+        return prices, splits_seen, symbols_ok, symbols_failed
+
+    def _one(job):
+        symbol, start_iso, full_history = job
+        return _fetch_symbol_prices(
+            symbol, start_iso, end_iso, crypto_symbols, cache, full_history,
+        )
+
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as pool:
+        futures = {pool.submit(_one, job): job for job in jobs}
+        for fut in as_completed(futures):
+            symbol, start_iso, _full = futures[fut]
+            try:
+                hist, splits = fut.result()
+            except Exception as e:
+                print(f"Error fetching data for {symbol}: {e}")
+                symbols_failed.add(symbol)
+                continue
+            if hist is None or hist.empty:
+                print(
+                    f"No yfinance data for {symbol} (start={start_iso}, "
+                    f"end={end_iso}); skipping."
+                )
+                symbols_failed.add(symbol)
+                continue
+            symbols_ok.add(symbol)
+            prices[symbol] = hist
+            for sd, ratio in splits.items():
+                splits_seen[(symbol, sd)] = ratio
+    return prices, splits_seen, symbols_ok, symbols_failed
+
+
+def _fan_out_prices(positions_df, prices):
+    """Join symbol-grain prices back onto the tenant rows.
+
+    One row per (account, user_id, symbol, date), keeping only dates on/after
+    each tenant's own ``position_open_date`` (calendar date of the yfinance
+    row, which is indexed at midnight exchange time).
+    """
+    cols = ["account", "user_id", "symbol", "date", "close_price", "dividend"]
+    if not prices or positions_df.empty:
+        return pd.DataFrame(columns=cols)
+    frames = []
+    for symbol, hist in prices.items():
+        h = hist[["date", "close_price", "dividend"]].copy()
+        h["symbol"] = symbol
+        h["_day"] = pd.to_datetime(h["date"].dt.date)
+        frames.append(h)
+    symbol_prices = pd.concat(frames, ignore_index=True)
+    tenants = positions_df[["account", "user_id", "symbol", "position_open_date"]].copy()
+    tenants["_open"] = pd.to_datetime(tenants["position_open_date"])
+    joined = tenants.merge(symbol_prices, on="symbol", how="inner")
+    joined = joined.loc[joined["_day"] >= joined["_open"]]
+    return joined[cols].reset_index(drop=True)
+
+
+# ---------------------------------------------------------------------------
+# Incremental loads
+# ---------------------------------------------------------------------------
+# Closes for past sessions do not change, so re-downloading every symbol's
+# full history back to ``position_open_date`` (and WRITE_TRUNCATE-ing both
+# tables) on every run is almost all wasted Yahoo round trips and BigQuery
+# load volume. The default run is INCREMENTAL:
+#
+#   - The watermark is the last loaded date per (account, user_id, symbol),
+#     read back from daily_position_performance itself — no side table to
+#     drift out of sync with the data it describes.
+#   - Each symbol is fetched from its oldest tenant watermark minus
+#     ``PRICE_OVERLAP_DAYS`` (default 5) so late corrections and the
+#     provisional intraday close are re-read. A tenant row with no watermark
+#     yet (new holder, new symbol) pulls the symbol from that tenant's open
+#     date instead.
+#   - The fetched window replaces exactly the rows it covers: one BigQuery
+#     transaction deletes each symbol's rows on/after its window start,
+#     drops rows of (account, user_id, symbol) pairs no longer in
+#     stg_history (deleted tenants — what the truncate used to clean up),
+#     inserts the new rows, and swaps the fetched symbols' split ledger.
+#   - A split that differs from the stored ledger forces a full-history
+#     fetch for that symbol: the un-adjusted closes of every earlier date
+#     depend on the split list.
+#
+# ``--full-refresh`` (or ``PRICES_FULL_REFRESH=1``) restores the full
+# fetch + WRITE_TRUNCATE of both tables; a run against a missing table is
+# always full.
+PRICES_TABLE_ID = "ccwj-dbt.analytics.daily_position_performance"
+SPLITS_TABLE_ID = "ccwj-dbt.analytics.daily_split_events"
+OVERLAP_DAYS = int(os.environ.get("PRICE_OVERLAP_DAYS", "5"))
+# A tenant's first stored row may trail its open date by a weekend plus a
+# market holiday; a bigger gap means its history now starts earlier.
+FIRST_ROW_SLACK_DAYS = 4
+_TENANT_KEY = ["account", "user_id", "symbol"]
+
+
+def _normalize_tenant_keys(df):
+    """user_id as nullable Int64 so stg_history rows (int / NaN) and
+    watermark rows join on the same key."""
+    df = df.copy()
+    df["user_id"] = pd.to_numeric(df["user_id"], errors="coerce").astype("Int64")
+    return df
+
+
+def _load_watermarks(client, table_id=PRICES_TABLE_ID):
+    """First and last loaded date per (account, user_id, symbol); ``None``
+    when the table does not exist yet (first run → full load)."""
+    sql = f"""
+        SELECT account, user_id, symbol,
+               DATE(MIN(date)) AS first_date, DATE(MAX(date)) AS last_date
+        FROM `{table_id}`
+        GROUP BY 1, 2, 3
+    """
+    try:
+        rows = client.query(sql).result()
+    except NotFound:
+        return None
+    df = pd.DataFrame([dict(row.items()) for row in rows])
+    if df.empty:
+        return pd.DataFrame(columns=_TENANT_KEY + ["first_date", "last_date"])
+    return df
+
+
+def _load_split_ledger(client, table_id=SPLITS_TABLE_ID):
+    """Stored splits as ``symbol -> {split_date: ratio}``; ``None`` when the
+    table does not exist yet."""
+    try:
+        rows = client.query(
+            f"SELECT symbol, split_date, split_ratio FROM `{table_id}`"
+        ).result()
+    except NotFound:
+        return None
+    ledger = {}
+    for row in rows:
+        ledger.setdefault(row["symbol"], {})[row["split_date"]] = float(
+            row["split_ratio"]
+        )
+    return ledger
+
+
+def _incremental_fetch_plan(positions_df, watermarks, overlap_days=None):
+    """Per-symbol fetch start for an incremental run.
+
+    Each tenant row starts at its watermark minus ``overlap_days`` (never
+    before its own open date), or at its open date when it has no
+    watermark; a symbol is fetched from the earliest of its tenants'
+    starts. A tenant whose first stored row is more than
+    ``FIRST_ROW_SLACK_DAYS`` after its open date (a sync backfilled older
+    history) starts at its open date too, so the gap gets filled. With no
+    watermarks this is exactly ``_symbol_fetch_plan``.
+    """
+    if overlap_days is None:
+        overlap_days = OVERLAP_DAYS
+    if positions_df.empty:
+        return pd.DataFrame(columns=["symbol", "start_date"])
+    tenants = _normalize_tenant_keys(positions_df)
+    marks = _normalize_tenant_keys(watermarks)
+    if "first_date" not in marks:
+        marks["first_date"] = None
+    marks = marks[_TENANT_KEY + ["first_date", "last_date"]]
+    merged = tenants.merge(marks, on=_TENANT_KEY, how="left")
+    opened = pd.to_datetime(merged["position_open_date"])
+    resume = pd.to_datetime(merged["last_date"]) - pd.Timedelta(days=overlap_days)
+    gap = pd.to_datetime(merged["first_date"]) - opened
+    backfilled = gap > pd.Timedelta(days=FIRST_ROW_SLACK_DAYS)
+    start = resume.where(resume.notna() & (resume > opened) & ~backfilled, opened)
+    merged["start_date"] = start.dt.date
+    return (
+        merged.groupby("symbol", sort=True)["start_date"].min().reset_index()
+    )
+
+
+def _splits_changed(splits_seen, ledger, symbols):
+    """Symbols whose fetched split list differs from the stored ledger."""
+    fetched = {}
+    for (sym, sd), ratio in splits_seen.items():
+        fetched.setdefault(sym, {})[sd] = float(ratio)
+    return {
+        sym for sym in symbols
+        if fetched.get(sym, {}) != (ledger or {}).get(sym, {})
+    }
+
+
+def _splits_frame(splits_seen):
+    df = pd.DataFrame(
+        [
+            {"symbol": sym, "split_date": sd, "split_ratio": float(ratio)}
+            for (sym, sd), ratio in splits_seen.items()
+            if ratio is not None and float(ratio) > 0
+        ],
+        columns=["symbol", "split_date", "split_ratio"],
+    )
+    if not df.empty:
+        df["split_date"] = pd.to_datetime(df["split_date"]).dt.date
+    return df
+
+
+_SPLITS_SCHEMA = [
+    bigquery.SchemaField("symbol", "STRING"),
+    bigquery.SchemaField("split_date", "DATE"),
+    bigquery.SchemaField("split_ratio", "FLOAT64"),
+]
+
+
+def _merge_incremental(client, final_df, windows, positions_df, splits_df):
+    """Swap the fetched windows into both tables in one transaction.
+
+    ``windows`` — ``symbol, start_date`` for the symbols fetched this run
+    (failed symbols are absent, so their stored rows are kept). Staging
+    tables are dropped whatever happens; a failed transaction leaves both
+    tables untouched.
+    """
+    suffix = uuid.uuid4().hex[:12]
+    staged_rows = f"{PRICES_TABLE_ID}__incr_rows_{suffix}"
+    staged_windows = f"{PRICES_TABLE_ID}__incr_windows_{suffix}"
+    staged_tenants = f"{PRICES_TABLE_ID}__incr_tenants_{suffix}"
+    staged_splits = f"{SPLITS_TABLE_ID}__incr_{suffix}"
+    tenants = _normalize_tenant_keys(positions_df)[_TENANT_KEY].drop_duplicates()
+    truncate = bigquery.LoadJobConfig(write_disposition="WRITE_TRUNCATE")
+    sql = f"""
+        BEGIN TRANSACTION;
+        DELETE FROM `{PRICES_TABLE_ID}` t
+        WHERE EXISTS (
+            SELECT 1 FROM `{staged_windows}` w
+            WHERE w.symbol = t.symbol AND DATE(t.date) >= w.start_date
+        );
+        DELETE FROM `{PRICES_TABLE_ID}` t
+        WHERE NOT EXISTS (
+            SELECT 1 FROM `{staged_tenants}` p
+            WHERE p.symbol = t.symbol AND p.account = t.account
+              AND p.user_id IS NOT DISTINCT FROM t.user_id
+        );
+        INSERT INTO `{PRICES_TABLE_ID}`
+            (account, user_id, symbol, date, close_price, dividend)
+        SELECT account, user_id, symbol, date, close_price, dividend
+        FROM `{staged_rows}`;
+        DELETE FROM `{SPLITS_TABLE_ID}`
+        WHERE symbol IN (SELECT symbol FROM `{staged_windows}`);
+        INSERT INTO `{SPLITS_TABLE_ID}` (symbol, split_date, split_ratio)
+        SELECT symbol, split_date, split_ratio FROM `{staged_splits}`;
+        COMMIT TRANSACTION;
+    """
+    try:
+        client.load_table_from_dataframe(
+            final_df, staged_rows, job_config=truncate
+        ).result()
+        client.load_table_from_dataframe(
+            windows, staged_windows,
+            job_config=bigquery.LoadJobConfig(
+                write_disposition="WRITE_TRUNCATE",
+                schema=[
+                    bigquery.SchemaField("symbol", "STRING"),
+                    bigquery.SchemaField("start_date", "DATE"),
+                ],
+            ),
+        ).result()
+        client.load_table_from_dataframe(
+            tenants, staged_tenants, job_config=truncate
+        ).result()
+        client.load_table_from_dataframe(
+            splits_df, staged_splits,
+            job_config=bigquery.LoadJobConfig(
+                write_disposition="WRITE_TRUNCATE", schema=_SPLITS_SCHEMA,
+            ),
+        ).result()
+        client.query(sql).result()
+    finally:
+        for table_id in (staged_rows, staged_windows, staged_tenants, staged_splits):
+            try:
+                client.delete_table(table_id, not_found_ok=True)
+            except Exception as e:
+                print(f"Could not drop staging table {table_id}: {e}")
+
+
 # ---------------------------------------------------------------------------
 # Main script body
 # ---------------------------------------------------------------------------
@@ -212,9 +937,14 @@ def _coverage_guard(symbols_ok, symbols_failed, min_coverage=None):
 #   - top-level ``client = bigquery.Client()``  → ADC required
 #   - top-level ``client.query(...).result()``  → live BQ query
 # Both made the test module uncollectable when running outside CI.
-def _main():
+def _main(full_refresh=False, use_cache=True):
     # Step 1: Initialize BigQuery client
     client = bigquery.Client()
+    # Local yfinance cache (PRICE_CACHE_DIR). An explicit --full-refresh
+    # still re-downloads every symbol, rewriting the cache as it goes.
+    cache = _PriceCache.from_env() if use_cache else None
+    if cache is not None and full_refresh:
+        cache.resume = False
 
     # Step 2: Query BigQuery to get all traded underlyings (equity AND option positions)
     # so we also have stock prices for symbols held only as options.
@@ -226,49 +956,28 @@ def _main():
     """
     positions = client.query(query).result()
     positions_df = pd.DataFrame([dict(row.items()) for row in positions])
+    if positions_df.empty:
+        positions_df = pd.DataFrame(
+            columns=["account", "user_id", "symbol", "position_open_date"]
+        )
 
     # Step 2b: Add benchmark tickers (SPY, QQQ) so weekly review can skip live yfinance.
-    # We mint one benchmark row per (account, user_id) so prices propagate to every
-    # tenant — see docs/USER_ID_TENANCY.md.
-    BENCHMARK_TICKERS = ["SPY", "QQQ"]
-    benchmark_start = date(date.today().year, 1, 1)
-    benchmark_rows = []
-    if not positions_df.empty:
-        tenant_pairs = positions_df[["account", "user_id"]].drop_duplicates().to_records(index=False)
-    else:
-        tenant_pairs = [("_benchmark", None)]
-    for account, user_id in tenant_pairs:
-        for sym in BENCHMARK_TICKERS:
-            already_present = not positions_df.empty and (
-                (positions_df["symbol"] == sym)
-                & (positions_df["account"] == account)
-                & (positions_df["user_id"].astype("object") == user_id)
-            ).any()
-            if not already_present:
-                benchmark_rows.append({
-                    "account": account,
-                    "user_id": user_id,
-                    "symbol": sym,
-                    "position_open_date": benchmark_start,
-                })
-    if benchmark_rows:
-        positions_df = pd.concat(
-            [positions_df, pd.DataFrame(benchmark_rows)], ignore_index=True
-        )
+    positions_df = _with_benchmark_rows(
+        positions_df, date(date.today().year, 1, 1)
+    )
 
-    # Step 3: Collect daily price & dividend data
+    # Step 3: Collect daily price & dividend data — once per distinct symbol,
+    # only the trailing window unless this is a full refresh.
     today = date.today()
     # yfinance's end is exclusive, so use tomorrow to include today's close price
     end_date = (today + timedelta(days=1)).isoformat()
-    all_data = []
 
     # Crypto whitelist (once) so each held symbol that is crypto is fetched
     # from Yahoo as "<SYM>-USD" rather than a colliding bare ticker.
     crypto_symbols = _load_crypto_symbols()
 
-    # Stock-split ledger. Per-symbol (de-duplicated below) so a single split
-    # event is not written N times when the same symbol appears across many
-    # (account, user_id) pairs. Schema: (symbol, split_date, split_ratio).
+    # Stock-split ledger, keyed (symbol, split_date) -> split_ratio. Schema of
+    # the uploaded table: (symbol, split_date, split_ratio).
     #
     # yfinance's `ticker.splits` ratio convention: 2.0 for a 2:1 forward
     # split (1 share becomes 2), 0.0333 for a 1:30 reverse (30 shares
@@ -283,116 +992,56 @@ def _main():
     # CI two-pass build's pass-2 bucket). Keeping them in their own source
     # means `int_split_factors` builds in pass 1 alongside `int_equity_sessions`,
     # which is where split-adjusted running quantities matter most.
-    splits_seen = {}  # (symbol, split_date) -> split_ratio (last write wins)
-
-    # Coverage bookkeeping (distinct symbols, not per-tenant rows).
-    symbols_ok = set()
-    symbols_failed = set()
-
-    for _, row in positions_df.iterrows():
-        account = row["account"]
-        user_id = row["user_id"] if "user_id" in row else None
-        symbol = row["symbol"]
-        start_date = row["position_open_date"].isoformat()
+    full_plan = _symbol_fetch_plan(positions_df)
+    watermarks = ledger = None
+    if not full_refresh:
+        watermarks = _load_watermarks(client)
+        ledger = _load_split_ledger(client)
+        if watermarks is None or ledger is None:
+            print("Price tables missing; running a full refresh.")
+            full_refresh = True
+    plan = (
+        full_plan if full_refresh
+        else _incremental_fetch_plan(positions_df, watermarks)
+    )
+    print(
+        f"Fetching {len(plan)} distinct symbols for {len(positions_df)} "
+        f"tenant rows ({FETCH_WORKERS} workers, "
+        f"{'full refresh' if full_refresh else 'incremental'})."
+    )
+    full_starts = full_plan.set_index("symbol")["start_date"]
+    prices, splits_seen, symbols_ok, symbols_failed = _fetch_all_symbols(
+        plan, end_date, crypto_symbols, cache=cache, first_dates=full_starts,
+    )
 
-        try:
-            # Some preferred-share symbols (e.g. Schwab "GLOP-C") return no
-            # data when queried under the broker form because Yahoo uses
-            # "<root>-P<class>" for preferreds (e.g. "GLOP-PC"). The helper
-            # tries the broker form first, then falls back to the preferred
-            # form — see ``_yahoo_symbol_candidates``. Rows are still
-            # written back keyed on the broker symbol so downstream joins
-            # (``stg_history.underlying_symbol`` → ``stg_daily_prices.symbol``)
-            # don't need to know about the Yahoo translation.
-            hist, ticker, yahoo_sym = _fetch_history_for_symbol(
-                symbol, start_date, end_date, crypto_symbols
+    if not full_refresh:
+        # A split the ledger doesn't know about (or one Yahoo dropped)
+        # changes every earlier un-adjusted close: re-fetch those symbols'
+        # full history.
+        partial = {
+            sym for sym, start in zip(plan["symbol"], plan["start_date"])
+            if start > full_starts[sym]
+        }
+        resplit = sorted(_splits_changed(splits_seen, ledger, symbols_ok) & partial)
+        if resplit:
+            print(f"Split change detected for {resplit}; fetching full history.")
+            redo = full_plan.loc[full_plan["symbol"].isin(resplit)]
+            r_prices, r_splits, r_ok, r_failed = _fetch_all_symbols(
+                redo, end_date, crypto_symbols, cache=cache
+            )
+            # A failed re-fetch keeps the symbol's stored rows untouched
+            # rather than writing a window under a stale split list.
+            for sym in r_failed:
+                prices.pop(sym, None)
+            prices.update(r_prices)
+            splits_seen.update(r_splits)
+            symbols_ok = (symbols_ok - r_failed) | r_ok
+            symbols_failed |= r_failed
+            plan = pd.concat(
+                [plan.loc[~plan["symbol"].isin(r_ok)],
+                 redo.loc[redo["symbol"].isin(r_ok)]],
+                ignore_index=True,
             )
-            if hist is None or hist.empty:
-                print(
-                    f"No yfinance data for {symbol} (start={start_date}, "
-                    f"end={end_date}); skipping."
-                )
-                symbols_failed.add(symbol)
-                continue
-            symbols_ok.add(symbol)
-
-            # Undo yfinance's split back-adjustment.
-            #
-            # yfinance always returns historical close prices retroactively
-            # adjusted for splits — pre-split prices are scaled so that they
-            # are directly comparable, on a per-current-share basis, to
-            # post-split prices. For a 1-for-30 reverse split this means
-            # pre-split closes are *multiplied* by 30 (because 1 new share
-            # represents 30 old shares); two consecutive 1-for-30 reverse
-            # splits inflate pre-split closes by 900×.
-            #
-            # That convention is the wrong default for us because our share
-            # ledger is built from raw broker tickets (``stg_history``), not
-            # from current-shares. Marking 8000 raw RVSN shares against a
-            # back-adjusted $2,214 close produced a $17.7M phantom equity
-            # peak on the /accounts chart (real peak ~$10K). The user never
-            # held shares at $2,214 — that's just yfinance reverse-engineering
-            # 2026 splits onto 2024 prices.
-            #
-            # Fix: multiply each historical close by the product of split
-            # ratios for splits that occur AFTER its date. For RVSN on
-            # 2024-12-30 the future ratios are 0.033333 × 0.033333 ≈
-            # 0.001111 → raw close $2.46. For dates after all known splits
-            # (or for symbols with no splits) the factor is 1 and we keep
-            # whatever yfinance returned. Dividends from yfinance are not
-            # consumed downstream (mart_daily_pnl reads them from
-            # stg_history), so we leave the Dividends column alone.
-            try:
-                splits = ticker.splits
-            except Exception:
-                splits = None
-            if splits is not None and len(splits) and not hist.empty:
-                split_dates = list(splits.index)
-                split_ratios = [float(r) for r in splits.values]
-                close = hist["Close"].astype(float).copy()
-                hist_dates = hist.index
-                for sd, ratio in zip(split_dates, split_ratios):
-                    if not (ratio > 0):
-                        continue
-                    # Compare CALENDAR DATES, not timestamps. yfinance ships
-                    # split timestamps at 09:30 ET (the moment of the split,
-                    # at market open) while history rows are indexed at
-                    # midnight ET. A naive ``hist_dates < sd`` comparison
-                    # treats the split-day close (4:00 PM ET) as pre-split
-                    # and incorrectly multiplies it by the ratio — producing
-                    # a one-day chart spike (May 2026 XLU: 2025-12-05 close
-                    # stored as $85.36 instead of the actual $42.68 post-
-                    # split close, drawing a $137K MTM cliff on the chart
-                    # for a single day). yfinance already returns the close
-                    # in POST-split units on the split day itself; only
-                    # PRE-split-DATE closes need un-adjustment.
-                    try:
-                        sd_date = sd.date() if hasattr(sd, "date") else sd
-                    except Exception:
-                        sd_date = sd
-                    mask = pd.Series(hist_dates).dt.date < sd_date
-                    mask.index = hist_dates
-                    if mask.any():
-                        close.loc[mask] = close.loc[mask] * ratio
-                    # Record this split for the daily_split_events table.
-                    # Same symbol may iterate many times (one per tenant) —
-                    # dict de-dup ensures one row per (symbol, split_date).
-                    splits_seen[(symbol, sd_date)] = ratio
-                hist["Close"] = close
-
-            hist = hist[["Close", "Dividends"]].reset_index()
-            hist["account"] = account
-            hist["user_id"] = user_id
-            hist["symbol"] = symbol
-            hist.rename(columns={"Date": "date", "Close": "close_price", "Dividends": "dividend"}, inplace=True)
-
-            # Ensure we're only keeping data from on/after position_open_date
-            hist = hist[hist["date"].dt.date >= row["position_open_date"]]
-
-            all_data.append(hist)
-        except Exception as e:
-            print(f"Error fetching data for {symbol}: {e}")
-            symbols_failed.add(symbol)
 
     # Step 3b: Coverage guard — refuse to replace a good table with a
     # gutted one when the price feed is down (see module comment).
@@ -400,20 +1049,39 @@ def _main():
     print(guard_msg)
     if tripped:
         sys.exit(1)
+    if cache is not None:
+        cache.flush_negative()
+
+    final_df = _fan_out_prices(positions_df, prices)
+    # user_id round-trips through pandas as object/Int64; coerce to nullable Int64
+    # so BigQuery loads it cleanly as INT64 NULLABLE alongside legacy NULL rows.
+    final_df["user_id"] = pd.to_numeric(final_df["user_id"], errors="coerce").astype("Int64")
+    final_df = final_df[["account", "user_id", "symbol", "date", "close_price", "dividend"]]
+    final_df = final_df.drop_duplicates()
+    splits_df = _splits_frame(
+        {k: v for k, v in splits_seen.items() if k[0] in prices}
+        if not full_refresh else splits_seen
+    )
+
+    if not full_refresh:
+        # Step 4 (incremental): swap only the fetched windows into both
+        # tables, atomically.
+        windows = plan.loc[plan["symbol"].isin(list(prices))]
+        if windows.empty:
+            print("No symbols fetched; nothing to merge.")
+            return
+        _merge_incremental(client, final_df, windows, positions_df, splits_df)
+        print(
+            f"Merged {len(final_df)} price row(s) for {len(windows)} symbol(s) "
+            f"and {len(splits_df)} split event(s)."
+        )
+        return
 
     # Step 4: Upload results to BigQuery
-    if all_data:
-        final_df = pd.concat(all_data, ignore_index=True)
-        # user_id round-trips through pandas as object/Int64; coerce to nullable Int64
-        # so BigQuery loads it cleanly as INT64 NULLABLE alongside legacy NULL rows.
-        final_df["user_id"] = pd.to_numeric(final_df["user_id"], errors="coerce").astype("Int64")
-        final_df = final_df[["account", "user_id", "symbol", "date", "close_price", "dividend"]]
-
-        table_id = "ccwj-dbt.analytics.daily_position_performance"
-        final_df = final_df.drop_duplicates()
+    if not final_df.empty:
         job = client.load_table_from_dataframe(
             final_df,
-            table_id,
+            PRICES_TABLE_ID,
             job_config=bigquery.LoadJobConfig(write_disposition="WRITE_TRUNCATE")
         )
         job.result()  # Waits for the job to complete
@@ -423,46 +1091,36 @@ def _main():
 
     # Step 5: Upload stock-split events to BigQuery (separate table).
     #
-    # WRITE_TRUNCATE on every run so a yfinance correction (e.g. retroactively
-    # de-listed split, mis-reported ratio) self-heals without manual cleanup.
-    # Schema is symbol-grain (no account/user_id) — splits are corporate
-    # actions and apply identically to every tenant who held the symbol.
-    splits_table_id = "ccwj-dbt.analytics.daily_split_events"
-    if splits_seen:
-        splits_df = pd.DataFrame(
-            [
-                {"symbol": sym, "split_date": sd, "split_ratio": float(ratio)}
-                for (sym, sd), ratio in splits_seen.items()
-                if ratio is not None and float(ratio) > 0
-            ]
-        )
-    else:
-        # Always emit an EMPTY table so the dbt source registration has a
-        # relation to bind to on first deploy. Without this, the very first
-        # CI build of a fresh deploy would fail when stg_split_events tries
-        # to read a non-existent table.
-        splits_df = pd.DataFrame(
-            columns=["symbol", "split_date", "split_ratio"]
-        )
-
-    if not splits_df.empty:
-        splits_df["split_date"] = pd.to_datetime(splits_df["split_date"]).dt.date
-
+    # WRITE_TRUNCATE on a full refresh so a yfinance correction (e.g.
+    # retroactively de-listed split, mis-reported ratio) self-heals without
+    # manual cleanup. Schema is symbol-grain (no account/user_id) — splits are
+    # corporate actions and apply identically to every tenant who held the
+    # symbol. An EMPTY frame still truncate-loads, so the dbt source
+    # registration has a relation to bind to on first deploy. Without this,
+    # the very first CI build of a fresh deploy would fail when
+    # stg_split_events tries to read a non-existent table.
     splits_job = client.load_table_from_dataframe(
         splits_df,
-        splits_table_id,
+        SPLITS_TABLE_ID,
         job_config=bigquery.LoadJobConfig(
             write_disposition="WRITE_TRUNCATE",
-            schema=[
-                bigquery.SchemaField("symbol", "STRING"),
-                bigquery.SchemaField("split_date", "DATE"),
-                bigquery.SchemaField("split_ratio", "FLOAT64"),
-            ],
+            schema=_SPLITS_SCHEMA,
         ),
     )
     splits_job.result()
-    print(f"Uploaded {len(splits_df)} split event(s) to {splits_table_id}.")
+    print(f"Uploaded {len(splits_df)} split event(s) to {SPLITS_TABLE_ID}.")
 
 
 if __name__ == "__main__":
-    _main()
+    parser = argparse.ArgumentParser(description="Load yfinance daily closes + splits.")
+    parser.add_argument(
+        "--full-refresh", action="store_true",
+        default=os.environ.get("PRICES_FULL_REFRESH", "").lower() in ("1", "true", "yes"),
+        help="Re-fetch every symbol's full history and WRITE_TRUNCATE both tables.",
+    )
+    parser.add_argument(
+        "--no-cache", action="store_true",
+        help="Ignore PRICE_CACHE_DIR: neither read nor write the local yfinance cache.",
+    )
+    args = parser.parse_args()
+    _main(full_refresh=args.full_refresh, use_cache=not args.no_cache)
@@ -0,0 +1,275 @@
+{#
+    Incremental daily models — shared recompute window.
+
+    The daily-grain models (int_option_marks_daily,
+    int_option_contract_daily_pnl, mart_account_equity_daily,
+    mart_daily_pnl, mart_wealth_daily) used to rebuild their multi-year
+    spines from scratch on every build, and a build is dispatched after
+    every changed sync. They are now incrementals that recompute, per
+    tenant, only the dates from ``rebuild_from`` onwards:
+
+      rebuild_from(tenant) = least(
+          current_date() - var('daily_lookback_days'),      -- recent dates
+          first date whose upstream rows CHANGED for the tenant,
+          first date of a GLOBAL change (split ledger) for everyone
+      )
+
+    CHANGE DETECTION: each model names the upstream relations whose rows
+    can move its history (``daily_change_sources`` below). Their rows are
+    fingerprinted per (tenant, date) and compared with the fingerprints
+    recorded after the model's last SUCCESSFUL build
+    (``<model>__rebuild_state`` in the model's dataset). A deleted row is a change too: its recorded
+    fingerprint has no fresh match. No state yet -> everything is
+    recomputed.
+
+    The fingerprints are captured BEFORE the build, by the pre-hook
+    (``prepare_daily_rebuild``), and the post-hook
+    (``record_daily_rebuild_state``) records exactly those — so a sync
+    landing mid-build is detected again by the next build rather than
+    recorded as seen. A failed build never records state, so the next run
+    re-detects the same changes.
+
+    DELETE + INSERT: in the same transaction the pre-hook pins each
+    tenant's window (``<model>__rebuild_window``) and deletes the model's
+    rows from ``rebuild_from`` onwards; the model then appends only the
+    recomputed rows (``merge`` strategy without a unique_key). Every
+    deleted date is rewritten or stays gone — including whole months a
+    tenant's upstream no longer covers — and no other tenant's rows are
+    read back or rewritten. Readers may miss the window's rows while the
+    model builds; the build's warehouse_builds stamp retires anything the
+    app cached meanwhile. Running totals and carried-forward values are
+    seeded from the last kept row before each key's window, so a
+    recomputed row equals what a full build produces.
+
+    Full refresh (``dbt build --full-refresh``) still rebuilds everything
+    — the workflow uses it for code pushes, the nightly backstop and
+    manual backfills. With ``is_incremental()`` false the models read
+    exactly as before; the hooks still capture and record fingerprints.
+
+    Every model keeps its OWN state / pending / window tables: dbt runs
+    models on several threads, and BigQuery aborts one of two concurrent
+    transactions that change the same table.
+#}
+
+{#-
+    daily_lookback_start() -> DATE expression for the start of the window
+    every tenant recomputes regardless of detected changes. Covers the
+    inputs that only ever move recent days (live snapshot, SCD2 captures,
+    the price loader's overlap).
+-#}
+{% macro daily_lookback_start() -%}
+    date_sub(current_date(), interval {{ var('daily_lookback_days', 10) }} day)
+{%- endmacro %}
+
+
+{#-
+    daily_change_sources() -> the upstream relations whose rows can change
+    the CURRENT model's history, each as {ref, date, columns?, global?}:
+      - date:    the earliest output date a row of that relation can affect
+      - columns: the columns the model actually reads (defaults to the
+                 whole row) — keeps columns that drift daily (marks,
+                 days-to-expiry) from triggering deep rebuilds
+      - global:  symbol-grain input; any change rebuilds every tenant
+                 from the beginning (splits re-base every prior day)
+    Models not listed here recompute the lookback window only.
+-#}
+{% macro daily_change_sources() %}
+    {%- set option_contracts = {
+        'ref': 'int_option_contracts', 'date': 'open_date',
+        'columns': ['account', 'user_id', 'underlying_symbol', 'trade_symbol',
+                    'open_date', 'close_date', 'status', 'net_cash_flow',
+                    'realized_pnl', 'realized_close_date']
+    } -%}
+    {%- set history = {'ref': 'stg_history', 'date': 'trade_date'} -%}
+    {%- set registry = {
+        'int_option_contract_daily_pnl': [option_contracts],
+        'mart_daily_pnl': [
+            history,
+            option_contracts,
+            {'ref': 'int_opening_balances', 'date': 'opening_date',
+             'columns': ['account', 'user_id', 'symbol', 'opening_date',
+                         'opening_qty', 'est_amount', 'price_source']},
+            {'ref': 'int_dividend_events', 'date': 'trade_date',
+             'columns': ['account', 'user_id', 'symbol', 'trade_date', 'amount']},
+            {'ref': 'stg_split_events', 'global': true,
+             'columns': ['symbol', 'split_date', 'split_ratio']},
+        ],
+        'mart_wealth_daily': [history],
+    } -%}
+    {{ return(registry.get(this.identifier, [])) }}
+{% endmacro %}
+
+
+{#-
+    daily_change_fingerprints(sources) -> rows of (tenant_key, date,
+    source, row_hash, row_count) over the given sources. ``tenant_key`` is
+    coalesce(tenant_id, '') so NULL tenants compare equal; global sources
+    use the '*' key and a single sentinel date.
+-#}
+{% macro daily_change_fingerprints(sources) %}
+    {%- for src in sources %}
+    select
+        {% if src.get('global') -%}
+        '*' as tenant_key,
+        date '1900-01-01' as date,
+        {%- else -%}
+        coalesce(t.tenant_id, '') as tenant_key,
+        t.{{ src.date }} as date,
+        {%- endif %}
+        '{{ src.ref }}' as source,
+        bit_xor(farm_fingerprint(to_json_string(
+            {%- if src.get('columns') %}struct({{ src.columns | join(', ') }}){% else %}t{% endif -%}
+        ))) as row_hash,
+        count(*) as row_count
+    from {{ ref(src.ref) }} t
+    {%- if not src.get('global') %}
+    where t.{{ src.date }} is not null
+    {%- endif %}
+    group by 1, 2, 3
+    {%- if not loop.last %}
+    union all
+    {%- endif %}
+    {%- endfor %}
+{% endmacro %}
+
+
+{% macro _daily_rebuild_relation(kind) -%}
+    `{{ this.database }}`.`{{ this.schema }}`.{{ this.identifier }}__rebuild_{{ kind }}
+{%- endmacro %}
+
+
+{#-
+    prepare_daily_rebuild(date_col) — pre-hook of every incremental daily
+    model. In one transaction: captures the model's upstream fingerprints
+    (``<model>__rebuild_pending``), pins each tenant's first changed date
+    (``<model>__rebuild_window``) and, on incremental runs, deletes the
+    rows the build is about to recompute.
+-#}
+{% macro prepare_daily_rebuild(date_col='date') %}
+    {%- set sources = daily_change_sources() -%}
+    {%- set state = _daily_rebuild_relation('state') -%}
+    {%- set pending = _daily_rebuild_relation('pending') -%}
+    {%- set window = _daily_rebuild_relation('window') -%}
+    {%- for fingerprints in [state, pending] %}
+    create table if not exists {{ fingerprints }} (
+        tenant_key string,
+        date       date,
+        source     string,
+        row_hash   int64,
+        row_count  int64
+    )
+    cluster by tenant_key;
+    {%- endfor %}
+
+    create table if not exists {{ window }} (
+        tenant_key   string,
+        rebuild_from date
+    );
+
+    begin transaction;
+
+    delete from {{ pending }} where true;
+    delete from {{ window }} where true;
+    {%- if sources %}
+
+    insert into {{ pending }} (tenant_key, date, source, row_hash, row_count)
+    select tenant_key, date, source, row_hash, row_count
+    from (
+        {{ daily_change_fingerprints(sources) }}
+    );
+
+    insert into {{ window }} (tenant_key, rebuild_from)
+    select
+        coalesce(f.tenant_key, r.tenant_key),
+        min(coalesce(f.date, r.date))
+    from {{ pending }} f
+    full outer join {{ state }} r
+        on  f.tenant_key = r.tenant_key
+        and f.date       = r.date
+        and f.source     = r.source
+    where f.row_hash  is distinct from r.row_hash
+       or f.row_count is distinct from r.row_count
+    group by 1
+
+    union all
+
+    -- Nothing recorded yet: recompute every tenant from the beginning.
+    select '*', date '1900-01-01'
+    from unnest([1])
+    where not exists (select 1 from {{ state }});
+    {%- endif %}
+    {%- if is_incremental() %}
+
+    delete from {{ this }} t
+    where t.{{ date_col }} >= least(
+        coalesce(
+            (select min(w.rebuild_from) from {{ window }} w
+             where w.tenant_key = coalesce(t.tenant_id, '')),
+            {{ daily_lookback_start() }}
+        ),
+        coalesce(
+            (select min(w.rebuild_from) from {{ window }} w
+             where w.tenant_key = '*'),
+            {{ daily_lookback_start() }}
+        )
+    );
+    {%- endif %}
+
+    commit transaction;
+{% endmacro %}
+
+
+{#-
+    daily_rebuild_window() -> body of the ``rebuild_window`` CTE every
+    incremental daily model declares: one row per tenant_key whose
+    upstream rows changed, with the first changed date — as pinned by
+    this build's pre-hook. Empty for models without change sources.
+-#}
+{% macro daily_rebuild_window() %}
+    select tenant_key, rebuild_from
+    from {{ _daily_rebuild_relation('window') }}
+{% endmacro %}
+
+
+{#-
+    rebuild_join(alias) / rebuild_from(alias) — per-row window lookup.
+    ``rebuild_join`` attaches the row's tenant entry from ``rebuild_window``
+    (by the alias's tenant_id); ``rebuild_from`` is then the DATE the row's
+    tenant recomputes from. Rows on or after it are rebuilt, rows before
+    it are kept. Must match the pre-hook's delete.
+-#}
+{% macro rebuild_join(alias) -%}
+    left join rebuild_window rw_{{ alias }}
+        on rw_{{ alias }}.tenant_key = coalesce({{ alias }}.tenant_id, '')
+{%- endmacro %}
+
+{% macro rebuild_from(alias) -%}
+    least(
+        coalesce(rw_{{ alias }}.rebuild_from, {{ daily_lookback_start() }}),
+        coalesce(
+            (select min(rebuild_from) from rebuild_window where tenant_key = '*'),
+            {{ daily_lookback_start() }}
+        )
+    )
+{%- endmacro %}
+
+
+{#-
+    record_daily_rebuild_state() — post-hook for models with change
+    sources. Replaces the model's recorded fingerprints with the ones the
+    pre-hook captured before this build, in one transaction. Runs only
+    after a successful build, so a failed build leaves the previous state
+    (and the pending changes) in place.
+-#}
+{% macro record_daily_rebuild_state() %}
+    {%- set state = _daily_rebuild_relation('state') -%}
+    begin transaction;
+
+    delete from {{ state }} where true;
+
+    insert into {{ state }} (tenant_key, date, source, row_hash, row_count)
+    select tenant_key, date, source, row_hash, row_count
+    from {{ _daily_rebuild_relation('pending') }};
+
+    commit transaction;
+{% endmacro %}
@@ -0,0 +1,121 @@
+{#
+    Tenant-scoped warehouse rebuild.
+
+    A sync changes one tenant's raw rows, but ``dbt build`` recreated every
+    table model for every tenant. When the app dispatches the rebuild with
+    the changed tenants (``_dispatch_warehouse_rebuild`` in app/upload.py
+    -> workflow input ``tenant_ids`` -> ``--vars "{rebuild_tenant_ids:
+    'a,b'}"``), table models materialized as ``tenant_table`` replace ONLY
+    those tenants' rows:
+
+        merge into <table> t using (<model sql> where <tenant scope>) s
+        on false
+        when not matched by target then insert (...)
+        when not matched by source and <tenant scope on t> then delete
+
+    One atomic DML statement per model, so readers never see the tenant's
+    rows missing.
+
+    Scope: this makes a sync's rebuild SMALLER, not concurrent. Scoped runs
+    still share the workflow's single concurrency group with full builds
+    and queue behind them, because the rest of the run (snapshots, loaders,
+    plain tables, the incremental models' rebuild state) is global — see
+    the concurrency note in .github/workflows/bigquery_update.yml. Syncs
+    for different tenants do NOT rebuild in parallel.
+
+    The tenant scope always includes legacy rows with a blank tenant_id
+    (a sync's seed slice rewrites its label's unowned rows too) and the
+    public demo tenant when its mirror source is among the changed ones.
+
+    Everything else builds exactly as ``table``: no var, --full-refresh,
+    a missing or non-table relation, a model without a tenant_id column,
+    or a model whose compiled columns no longer match the table's (a
+    column was added, renamed or dropped since the last full build — the
+    merge's column list comes from the table, so it would silently drop
+    the new column or fail on the old one). The incremental daily models (incremental_daily.sql) already
+    recompute only changed tenants and ignore the var.
+#}
+
+{#-
+    tenant_rebuild_ids() -> sorted list of the tenant ids this run is
+    scoped to; empty for a normal full build. Ids that are not well-formed
+    (same character set as app/tenant_scope.sanitize_tenant_id) are
+    dropped.
+-#}
+{% macro tenant_rebuild_ids() %}
+    {%- set raw = var('rebuild_tenant_ids', '') -%}
+    {%- if raw is string -%}
+        {%- set raw = raw.split(',') -%}
+    {%- endif -%}
+    {%- set ids = [] -%}
+    {%- for t in raw or [] -%}
+        {%- set t = (t | string).strip() -%}
+        {%- if t and modules.re.match('^[A-Za-z0-9_:.-]+$', t) and t not in ids -%}
+            {%- do ids.append(t) -%}
+        {%- endif -%}
+    {%- endfor -%}
+    {%- set demo_source = var('demo_source_tenant_id', '') -%}
+    {%- if demo_source and demo_source in ids and 'demo:demo-account' not in ids -%}
+        {%- do ids.append('demo:demo-account') -%}
+    {%- endif -%}
+    {{ return(ids | sort) }}
+{% endmacro %}
+
+
+{#-
+    tenant_rebuild_predicate(tenant_ids, column) -> boolean SQL selecting
+    the rows a scoped run replaces.
+-#}
+{% macro tenant_rebuild_predicate(tenant_ids, column='tenant_id') -%}
+    coalesce({{ column }}, '') in ('', {% for t in tenant_ids %}'{{ t }}'{% if not loop.last %}, {% endif %}{% endfor %})
+{%- endmacro %}
+
+
+{% materialization tenant_table, adapter='bigquery' -%}
+    {%- set tenant_ids = tenant_rebuild_ids() -%}
+    {%- set existing = load_cached_relation(this) -%}
+    {%- set column_names = [] -%}
+    {%- if tenant_ids and existing is not none and existing.is_table
+          and not should_full_refresh() -%}
+        {%- for col in adapter.get_columns_in_relation(existing) -%}
+            {%- do column_names.append(col.name) -%}
+        {%- endfor -%}
+    {%- endif -%}
+
+    {%- if 'tenant_id' not in column_names -%}
+        {{ return(materialization_table_bigquery()) }}
+    {%- endif -%}
+
+    {%- set target_columns = column_names | map('lower') | sort -%}
+    {%- set model_columns = get_columns_in_query(compiled_code) | map('lower') | sort -%}
+    {%- if model_columns != target_columns -%}
+        {{ log(this ~ ': columns changed since the last build; rebuilding every tenant', info=true) }}
+        {{ return(materialization_table_bigquery()) }}
+    {%- endif -%}
+
+    {%- set column_list -%}
+        {%- for name in column_names %}{{ adapter.quote(name) }}{% if not loop.last %}, {% endif %}{% endfor -%}
+    {%- endset -%}
+
+    {{ run_hooks(pre_hooks) }}
+
+    {%- call statement('main') -%}
+        merge into {{ existing }} as t
+        using (
+            select {{ column_list }}
+            from (
+                {{ compiled_code }}
+            )
+            where {{ tenant_rebuild_predicate(tenant_ids) }}
+        ) as s
+        on false
+        when not matched by target then
+            insert ({{ column_list }}) values ({{ column_list }})
+        when not matched by source and {{ tenant_rebuild_predicate(tenant_ids, 't.tenant_id') }} then
+            delete
+    {%- endcall -%}
+
+    {{ run_hooks(post_hooks) }}
+
+    {{ return({'relations': [this]}) }}
+{%- endmaterialization %}
@@ -0,0 +1,37 @@
+{#
+    Warehouse build generations for the app's query cache.
+
+    ``record_warehouse_build()`` runs on-run-end and stamps
+    ``warehouse_builds`` (tenant_key, built_at): a tenant-scoped build
+    (rebuild_tenant_ids) stamps each of its tenants, any other build stamps
+    '*'. The app folds the stamps that cover a query's tenants into its
+    cache key (app/query_cache.py, ``warehouse_token``), so a rebuild
+    retires that query's cached results even when the flush webhook never
+    arrives — and a single tenant's sync retires only that tenant's keys
+    (plus unscoped admin reads).
+
+    Only ``dbt build`` / ``run`` / ``seed`` stamp; a failed build still
+    does, since dbt is not transactional across models.
+#}
+{% macro record_warehouse_build() %}
+    {%- if execute and flags.WHICH in ('build', 'run', 'seed') -%}
+        {%- set tenant_keys = tenant_rebuild_ids() or ['*'] -%}
+        {%- set relation -%}
+            `{{ target.database }}`.`{{ target.schema }}`.warehouse_builds
+        {%- endset -%}
+        create table if not exists {{ relation }} (
+            tenant_key string,
+            built_at   timestamp
+        );
+
+        merge into {{ relation }} t
+        using (
+            select tenant_key
+            from unnest([{% for k in tenant_keys %}'{{ k }}'{% if not loop.last %}, {% endif %}{% endfor %}]) as tenant_key
+        ) s
+        on t.tenant_key = s.tenant_key
+        when matched then update set built_at = current_timestamp()
+        when not matched then insert (tenant_key, built_at)
+            values (s.tenant_key, current_timestamp());
+    {%- endif -%}
+{% endmacro %}
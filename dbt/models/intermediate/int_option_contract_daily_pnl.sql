@@ -1,3 +1,13 @@
+{{
+    config(
+        materialized='incremental',
+        incremental_strategy='merge',
+        pre_hook="{{ prepare_daily_rebuild() }}",
+        partition_by={'field': 'date', 'data_type': 'date', 'granularity': 'month'},
+        cluster_by=['tenant_id', 'symbol', 'trade_symbol'],
+        post_hook="{{ record_daily_rebuild_state() }}"
+    )
+}}
 /*
     Daily option P&L attribution per contract.
 
@@ -56,9 +66,22 @@
     The chart helper reads both fields and adds them. There is NO
     third "options_amount" cash flow contribution — that would
     triple-count.
+
+    INCREMENTAL: builds recompute each tenant from its ``rebuild_from``
+    (the trailing ``daily_lookback_days``, or the open_date of the
+    earliest contract whose row changed) and keep older rows — see
+    dbt/macros/incremental_daily.sql. The last snapshot before the window
+    is kept in the spine so the carry-forward into the window's first
+    days matches a full build.
 */
 
-with contracts as (
+with {% if is_incremental() -%}
+rebuild_window as (
+    {{ daily_rebuild_window() }}
+),
+
+{% endif -%}
+contracts as (
     select
         tenant_id,
         account,
@@ -235,9 +258,16 @@ contract_lifetime as (
         and (c.user_id is not distinct from co.user_id)
         and (c.tenant_id is not distinct from co.tenant_id)
         and c.trade_symbol = co.trade_symbol
+    {%- if is_incremental() %}
+    {{ rebuild_join('c') }}
+    {%- endif %}
     cross join unnest(
         generate_date_array(
+            {% if is_incremental() -%}
+            greatest(c.open_date, {{ rebuild_from('c') }}),
+            {%- else -%}
             c.open_date,
+            {%- endif %}
             case
                 -- Closed: spine ends day before close_date (realized
                 -- branch owns close_date itself).
@@ -303,6 +333,13 @@ contract_lifetime as (
 -- for this contract yet, mtm_unrealized stays NULL (pre-snapshot
 -- warm-up window) and downstream COALESCE-to-0 emits a $0
 -- contribution for that day.
+{% if is_incremental() -%}
+snapshots_scoped as (
+    select s.*, {{ rebuild_from('s') }} as window_from
+    from snapshots s
+    {{ rebuild_join('s') }}
+),
+{% endif -%}
 spine_with_snapshots as (
     select
         cl.tenant_id,
@@ -324,7 +361,18 @@ spine_with_snapshots as (
         s.date,
         s.mtm_unrealized_pnl as snap_mtm,
         false as in_lifetime
+    {%- if is_incremental() %}
+    from snapshots_scoped s
+    -- In-window snapshots plus the last one before the window.
+    qualify s.date >= s.window_from
+        or row_number() over (
+            partition by s.tenant_id, s.account, s.user_id, s.trade_symbol,
+                         s.date >= s.window_from
+            order by s.date desc
+        ) = 1
+    {%- else %}
     from snapshots s
+    {%- endif %}
 ),
 spine_filled as (
     select
@@ -405,7 +453,13 @@ realized_close as (
         c.realized_pnl as pnl_today,
         true as is_realized_close
     from contracts c
+    {%- if is_incremental() %}
+    {{ rebuild_join('c') }}
+    {%- endif %}
     where c.realized_close_date is not null
+    {%- if is_incremental() %}
+      and c.realized_close_date >= {{ rebuild_from('c') }}
+    {%- endif %}
 ),
 
 -- v2 tenant_id is carried natively from staging through the contract grain.
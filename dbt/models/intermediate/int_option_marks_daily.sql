@@ -1,6 +1,10 @@
 {{
     config(
-        materialized='table'
+        materialized='incremental',
+        incremental_strategy='merge',
+        pre_hook="{{ prepare_daily_rebuild() }}",
+        partition_by={'field': 'date', 'data_type': 'date', 'granularity': 'month'},
+        cluster_by=['tenant_id', 'trade_symbol']
     )
 }}
 /*
@@ -9,6 +13,11 @@
     not on every downstream read (int_option_contract_daily_pnl,
     int_option_pnl_series, and the runtime consumers above them).
 
+    INCREMENTAL: a day's marks only move while a version covering it is
+    open, i.e. recently — so builds unfold just the trailing
+    ``daily_lookback_days`` (see dbt/macros/incremental_daily.sql).
+    Changing ``demo_source_tenant_id`` needs a --full-refresh.
+
     ``snapshot_options_market_values_daily`` captures every change to the
     live option snapshot (check strategy on market_value / quantity /
     cost_basis / current_price), but until this model existed NOTHING in
@@ -45,7 +54,13 @@
     strengthen automatically as data accrues.
 */
 
-with versions as (
+with {% if is_incremental() -%}
+rebuild_window as (
+    {{ daily_rebuild_window() }}
+),
+
+{% endif -%}
+versions as (
     select
         nullif(trim(tenant_id), '')       as tenant_id,
         account,
@@ -107,7 +122,11 @@ unfolded as (
     from versions v
     cross join unnest(
         generate_date_array(
+            {% if is_incremental() -%}
+            greatest(date(v.dbt_valid_from), {{ daily_lookback_start() }}),
+            {%- else -%}
             date(v.dbt_valid_from),
+            {%- endif %}
             least(
                 date(coalesce(v.dbt_valid_to, current_timestamp())),
                 date_sub(current_date(), interval 1 day)
@@ -1,4 +1,4 @@
-{{ config(materialized='table') }}
+{{ config(materialized='tenant_table') }}
 
 /*
     Rolling per-account baselines evaluated at the moment each trade opened.
@@ -1,4 +1,4 @@
-{{ config(materialized='table') }}
+{{ config(materialized='tenant_table') }}
 
 /*
     Trade-grain feature table for behavioral anomaly modeling.
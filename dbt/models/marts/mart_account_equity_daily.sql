@@ -1,4 +1,12 @@
-{{ config(materialized='table') }}
+{{
+    config(
+        materialized='incremental',
+        incremental_strategy='merge',
+        pre_hook="{{ prepare_daily_rebuild() }}",
+        partition_by={'field': 'date', 'data_type': 'date', 'granularity': 'month'},
+        cluster_by=['tenant_id', 'account']
+    )
+}}
 
 /*
     Daily account value, broken into equity vs options vs cash.
@@ -56,9 +64,20 @@
     fold into ``equity_value`` (``option_value = 0``). ``account_value`` /
     ``cash_value`` — the numbers the comparisons / calendar / wealth deltas
     depend on — are fully historical and tenant-correct regardless.
+
+    INCREMENTAL: the balance snapshot only ever changes today's version, so
+    builds respread just the trailing ``daily_lookback_days`` of the spine
+    and keep older days (see dbt/macros/incremental_daily.sql). Changing
+    ``demo_source_tenant_id`` needs a --full-refresh.
 */
 
-with bal_versions as (
+with {% if is_incremental() -%}
+rebuild_window as (
+    {{ daily_rebuild_window() }}
+),
+
+{% endif -%}
+bal_versions as (
     select
         account,
         -- snapshot stores legacy NULL user_id as the sentinel -1 to keep
@@ -105,7 +124,11 @@ with bal_versions as (
 spine as (
     select day
     from unnest(generate_date_array(
+        {% if is_incremental() -%}
+        greatest((select min(valid_from) from bal_versions), {{ daily_lookback_start() }}),
+        {%- else -%}
         (select min(valid_from) from bal_versions),
+        {%- endif %}
         current_date()
     )) as day
 ),
@@ -272,5 +295,5 @@ all_rows as (
     where account_value > 0
 )
 
-select * from all_rows f
-order by f.tenant_id, f.account, f.user_id, f.date
+select * from all_rows
+order by tenant_id, account, user_id, date
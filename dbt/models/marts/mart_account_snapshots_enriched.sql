@@ -1,4 +1,10 @@
-{{ config(materialized='table') }}
+{{
+    config(
+        materialized='tenant_table',
+        partition_by={'field': 'date', 'data_type': 'date', 'granularity': 'month'},
+        cluster_by=['tenant_id', 'account']
+    )
+}}
 
 /*
     Enriched daily account snapshots — per account.
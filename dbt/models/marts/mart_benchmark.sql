@@ -1,3 +1,10 @@
+{{
+    config(
+        materialized='tenant_table',
+        cluster_by=['tenant_id', 'symbol']
+    )
+}}
+
 /*
     "If You Did Nothing" benchmark — precomputed hold P&L per position.
     Uses close prices from stg_daily_prices (yfinance pipeline) instead of
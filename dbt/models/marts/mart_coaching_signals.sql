@@ -1,4 +1,9 @@
-{{ config(materialized='table') }}
+{{
+    config(
+        materialized='tenant_table',
+        cluster_by=['tenant_id', 'strategy']
+    )
+}}
 
 /*
     Aggregated coaching signals per (account, strategy).
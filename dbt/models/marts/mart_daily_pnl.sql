@@ -1,3 +1,16 @@
+{{
+    config(
+        materialized='incremental',
+        incremental_strategy='merge',
+        pre_hook="{{ prepare_daily_rebuild() }}",
+        partition_by={'field': 'date', 'data_type': 'date', 'granularity': 'month'},
+        cluster_by=['tenant_id', 'symbol', 'account'],
+        post_hook="{{ record_daily_rebuild_state() }}"
+    )
+}}
+
+-- depends_on: {{ ref('int_option_contracts') }}
+
 /*
     Daily P&L building blocks — pre-aggregated for chart rendering.
 
@@ -61,6 +74,16 @@
       yfinance close for today's row, creating a structural disagreement
       hidden only by `_align_position_pnl_chart_with_kpi` rescaling — now
       both surfaces agree on close, so no rescaling is needed.)
+
+    INCREMENTAL (see dbt/macros/incremental_daily.sql): builds recompute
+    each tenant from its ``rebuild_from`` — the trailing
+    ``daily_lookback_days``, or the first date whose fills / opening
+    balances / dividends / option contracts changed — and keep older rows.
+    The running totals, the carried close and the carried option mark /
+    basis are seeded from the last kept row per (tenant_id, account,
+    user_id, symbol), so a recomputed row equals what a full build
+    produces. A change to the split ledger
+    re-bases every prior day and recomputes everything.
 */
 
 -- Split-adjust equity quantities. The chart's running average-cost
@@ -75,7 +98,13 @@
 -- 2026-04-27 (1500 sold shares × pre-split avg cost vs post-split sell
 -- price), even though int_equity_sessions / int_closed_equity_legs
 -- already report the true +$1,822.50.
-with trade_daily_history as (
+with {% if is_incremental() -%}
+rebuild_window as (
+    {{ daily_rebuild_window() }}
+),
+
+{% endif -%}
+trade_daily_history as (
     select
         h.tenant_id,
         h.account,
@@ -336,7 +365,7 @@ known_tenants as (
 ),
 
 all_dates as (
-    select distinct tenant_id, account, user_id, symbol, date from (
+    select distinct x.tenant_id, x.account, x.user_id, x.symbol, x.date from (
         select tenant_id, account, user_id, symbol, date from trade_daily
         union distinct
         select tenant_id, account, user_id, symbol, date from dividend_daily
@@ -352,9 +381,41 @@ all_dates as (
         join prices p
             on kt.account = p.account
             and kt.symbol = p.symbol
-    )
+    ) x
+    {%- if is_incremental() %}
+    -- The spine is the expensive part: keep only each tenant's window.
+    {{ rebuild_join('x') }}
+    where x.date >= {{ rebuild_from('x') }}
+    {%- endif %}
 ),
 
+{% if is_incremental() -%}
+-- Running totals, the carried close and the carried option mark / basis
+-- as of the last row KEPT before each key's window; the window's rows
+-- continue from them.
+carried as (
+    select
+        t.tenant_id,
+        t.account,
+        t.user_id,
+        t.symbol,
+        t.close_price,
+        t.option_market_value,
+        t.option_cost_basis,
+        t.cumulative_options_pnl,
+        t.cumulative_dividends_pnl,
+        t.cumulative_other_pnl
+    from {{ this }} t
+    {{ rebuild_join('t') }}
+    where t.date < {{ rebuild_from('t') }}
+    qualify row_number() over (
+        partition by t.tenant_id, t.account, t.user_id, t.symbol
+        order by t.date desc
+    ) = 1
+),
+
+{% endif -%}
+
 daily_option as (
     select tenant_id, account, user_id, symbol, date, option_market_value, option_cost_basis
     from {{ ref('int_daily_option_value') }}
@@ -428,7 +489,23 @@ joined as (
             when td.date is not null then true
             when dd.date is not null then true
             else false
-        end as has_trade
+        end as has_trade,
+
+        {% if is_incremental() -%}
+        c.close_price                            as carried_close_price,
+        c.option_market_value                    as carried_option_market_value,
+        c.option_cost_basis                      as carried_option_cost_basis,
+        coalesce(c.cumulative_options_pnl, 0)    as carried_options_pnl,
+        coalesce(c.cumulative_dividends_pnl, 0)  as carried_dividends_pnl,
+        coalesce(c.cumulative_other_pnl, 0)      as carried_other_pnl
+        {%- else -%}
+        cast(null as float64)                    as carried_close_price,
+        cast(null as float64)                    as carried_option_market_value,
+        cast(null as float64)                    as carried_option_cost_basis,
+        cast(0 as float64)                       as carried_options_pnl,
+        cast(0 as float64)                       as carried_dividends_pnl,
+        cast(0 as float64)                       as carried_other_pnl
+        {%- endif %}
 
     from all_dates ad
     left join trade_daily td
@@ -473,6 +550,13 @@ joined as (
         and (ad.tenant_id is not distinct from opd.tenant_id)
         and ad.symbol = opd.symbol
         and ad.date = opd.date
+    {%- if is_incremental() %}
+    left join carried c
+        on ad.account = c.account
+        and (ad.user_id is not distinct from c.user_id)
+        and (ad.tenant_id is not distinct from c.tenant_id)
+        and ad.symbol = c.symbol
+    {%- endif %}
 ),
 
 -- Carry forward latest snapshot option values so every date (on or
@@ -493,18 +577,27 @@ filled as (
         equity_sell_proceeds,
         equity_sell_qty,
         other_amount,
-        last_value(close_price ignore nulls) over (
-            partition by tenant_id, account, user_id, symbol order by date
-            rows between unbounded preceding and current row
+        coalesce(
+            last_value(close_price ignore nulls) over (
+                partition by tenant_id, account, user_id, symbol order by date
+                rows between unbounded preceding and current row
+            ),
+            carried_close_price
         ) as close_price,
         has_trade,
-        last_value(option_market_value ignore nulls) over (
-            partition by tenant_id, account, user_id, symbol order by date
-            rows between unbounded preceding and current row
+        coalesce(
+            last_value(option_market_value ignore nulls) over (
+                partition by tenant_id, account, user_id, symbol order by date
+                rows between unbounded preceding and current row
+            ),
+            carried_option_market_value
         ) as option_market_value,
-        last_value(option_cost_basis ignore nulls) over (
-            partition by tenant_id, account, user_id, symbol order by date
-            rows between unbounded preceding and current row
+        coalesce(
+            last_value(option_cost_basis ignore nulls) over (
+                partition by tenant_id, account, user_id, symbol order by date
+                rows between unbounded preceding and current row
+            ),
+            carried_option_cost_basis
         ) as option_cost_basis,
         -- ``cumulative_options_pnl`` is now realize-on-close cumulative.
         -- Each closed contract's realized P&L lands ONCE on close_date
@@ -512,7 +605,7 @@ filled as (
         -- date) which credited STO premium on STO date — see
         -- int_option_contract_daily_pnl docstring for why that was
         -- wrong.
-        sum(options_realized_today) over w as cumulative_options_pnl,
+        carried_options_pnl + sum(options_realized_today) over w as cumulative_options_pnl,
         -- ``open_options_unrealized_pnl`` is point-in-time MTM of all
         -- currently-open contracts at this date. The per-contract
         -- spine is dense (one row per day per open contract via
@@ -522,8 +615,8 @@ filled as (
         -- last open contract closed (the per-contract spine
         -- terminates at close_date).
         open_unrealized_today as open_options_unrealized_pnl,
-        sum(dividends_amount) over w  as cumulative_dividends_pnl,
-        sum(other_amount) over w      as cumulative_other_pnl
+        carried_dividends_pnl + sum(dividends_amount) over w as cumulative_dividends_pnl,
+        carried_other_pnl + sum(other_amount) over w as cumulative_other_pnl
     from joined
     window w as (partition by tenant_id, account, user_id, symbol order by date)
 ),
@@ -561,5 +654,5 @@ final as (
 -- (account_name, user_id) mapped to multiple tenant_ids (e.g. several
 -- Schwab accounts sharing the "Schwab Account" display label).
 ---------------------------------------------------------------------
-select * from final f
-order by f.tenant_id, f.account, f.user_id, f.symbol, f.date
+select * from final
+order by tenant_id, account, user_id, symbol, date
@@ -0,0 +1,691 @@
+{{
+    config(
+        materialized='tenant_table',
+        cluster_by=['tenant_id', 'section']
+    )
+}}
+
+/*
+    Daily Review page mart — the page's whole tenant-scoped state in one
+    table, so the view fetches it with ONE BigQuery job instead of the 16
+    of ``build_daily_review_batch`` (each paying BigQuery's ~1-2s fixed
+    per-job latency). Read and split back into the batch's frames by
+    app/daily_review_page.py.
+
+    GRAIN: one row per (tenant_id, section, result row):
+      - tenant_id  the tenant the row belongs to; '*' for market-wide
+                   sections (benchmark_snapshot, market_perf, _meta)
+      - section    the build_daily_review_batch key the row feeds
+      - row_json   TO_JSON_STRING of one result row, columns as the live
+                   query projects them
+      - built_on   CURRENT_DATE() of the build
+
+    Each section is the live query (app/weekly_review.py,
+    app/execution_quality.py) computed PER TENANT. Where the live query
+    aggregates across the caller's tenants (symbol-grain movers,
+    dividends, earnings / ex-div watch lists), the rows here are the
+    per-tenant partial sums and Python finishes the aggregate over the
+    requested tenants. The ``calendar`` section is derived from
+    ``snapshots`` in Python (same mart, same filter).
+
+    Parameterized sections are precomputed for every value the page can
+    ask for on the build date — a user's local "today" is within one day
+    of UTC, so:
+      - weekly_trades / attribution: each candidate ISO week_start
+      - market_perf: each candidate (week_start, ytd_start)
+      - today_trades: fills since ``trades_from`` (14 days back)
+    The '_meta' row lists the candidates. CURRENT_DATE()-relative windows
+    match the live queries only on the build date, so the app serves from
+    this mart only when every row it reads has built_on = today (UTC) and
+    falls back to the live batch otherwise (before the nightly build, or
+    for a tenant the mart has not seen yet).
+
+    Keep in step with the live queries: a change to one of them must be
+    mirrored here. tests/test_daily_review_page_parity.py (RUN_BQ_TESTS=1)
+    runs both paths for the same tenants on the build date and compares
+    every section.
+*/
+
+with params as (
+    select
+        current_date() as built_on,
+        array(
+            select distinct w
+            from unnest([
+                date_trunc(date_sub(current_date(), interval 1 day), isoweek),
+                date_trunc(date_add(current_date(), interval 1 day), isoweek)
+            ]) as w
+        ) as week_starts,
+        array(
+            select distinct y
+            from unnest([
+                date_trunc(date_sub(current_date(), interval 1 day), year),
+                date_trunc(date_add(current_date(), interval 1 day), year)
+            ]) as y
+        ) as ytd_starts,
+        date_sub(current_date(), interval 14 day) as trades_from
+),
+
+weeks as (
+    select week_start
+    from params, unnest(params.week_starts) as week_start
+),
+
+open_holdings as (
+    select *
+    from {{ ref('int_enriched_current') }}
+    where quantity is not null and quantity != 0
+),
+
+-- ── account_value (ACCOUNT_VALUE_QUERY) ───────────────────────────────
+account_value as (
+    select
+        tenant_id,
+        struct(
+            tenant_id,
+            any_value(account) as account,
+            coalesce(sum(case when row_type = 'account_total' then market_value else 0 end), 0) as account_value,
+            coalesce(sum(case when row_type = 'cash' then market_value else 0 end), 0) as cash_balance
+        ) as payload
+    from {{ ref('stg_account_balances') }}
+    group by tenant_id
+),
+
+-- ── snapshots (TODAY_SNAPSHOT_ENRICHED_QUERY; also feeds calendar) ────
+snapshots as (
+    select
+        tenant_id,
+        struct(
+            account, tenant_id, date, account_value,
+            base_1d_date, base_1d_value, delta_1d, delta_1d_pct,
+            base_1w_date, base_1w_value, delta_1w, delta_1w_pct,
+            base_1m_date, base_1m_value, delta_1m, delta_1m_pct
+        ) as payload
+    from {{ ref('mart_account_snapshots_enriched') }}
+),
+
+-- ── positions (OPEN_POSITIONS_QUERY) ──────────────────────────────────
+latest_prices as (
+    select symbol, close_price
+    from (
+        select symbol, close_price,
+               row_number() over (partition by symbol order by date desc) as rn
+        from {{ ref('stg_daily_prices') }}
+        where close_price is not null and close_price > 0
+    )
+    where rn = 1
+),
+
+positions as (
+    select
+        e.tenant_id,
+        struct(
+            e.account,
+            e.tenant_id,
+            e.underlying_symbol as symbol,
+            e.instrument_type,
+            e.trade_symbol,
+            e.description,
+            e.quantity,
+            e.current_price,
+            e.market_value,
+            e.cost_basis,
+            e.unrealized_pnl,
+            e.unrealized_pnl_pct,
+            e.option_expiry,
+            e.option_strike,
+            e.option_type,
+            lp.close_price as latest_stock_price
+        ) as payload
+    from open_holdings e
+    left join latest_prices lp on e.underlying_symbol = lp.symbol
+),
+
+-- ── earnings (EARNINGS_UPCOMING_QUERY), per tenant's holdings ─────────
+earnings as (
+    select
+        h.tenant_id,
+        struct(
+            e.symbol,
+            e.next_earnings_date,
+            e.earnings_window_start,
+            e.earnings_window_end,
+            m.long_name,
+            m.sector,
+            m.subsector
+        ) as payload
+    from {{ ref('stg_earnings_calendar') }} e
+    join (
+        select distinct tenant_id, upper(trim(underlying_symbol)) as symbol
+        from open_holdings
+    ) h using (symbol)
+    left join {{ ref('stg_symbol_metadata') }} m using (symbol)
+    where e.next_earnings_date between date_sub(current_date(), interval 1 day)
+                                   and date_add(current_date(), interval 15 day)
+),
+
+-- ── today_moves (TODAY_MOVES_QUERY), per-tenant share counts ──────────
+move_holdings as (
+    select
+        tenant_id,
+        underlying_symbol as symbol,
+        sum(case when instrument_type = 'Equity' then abs(coalesce(quantity, 0)) else 0 end) as shares,
+        sum(case when instrument_type = 'Equity' then coalesce(market_value, 0) else 0 end) as market_value
+    from open_holdings
+    group by 1, 2
+),
+
+recent_prices as (
+    select
+        symbol,
+        date,
+        close_price,
+        row_number() over (partition by symbol order by date desc) as rn
+    from {{ ref('stg_daily_prices') }}
+    where date >= date_sub(current_date(), interval 10 day)
+      and close_price is not null and close_price > 0
+),
+
+price_pair as (
+    select
+        cur.symbol,
+        cur.date as today_date,
+        cur.close_price as today_close,
+        prev.date as prev_date,
+        prev.close_price as prev_close
+    from recent_prices cur
+    join recent_prices prev
+      on cur.symbol = prev.symbol and cur.rn = 1 and prev.rn = 2
+),
+
+today_moves as (
+    select
+        h.tenant_id,
+        struct(
+            h.symbol,
+            h.shares,
+            h.market_value as current_value,
+            p.today_close,
+            p.prev_close,
+            p.today_date,
+            p.prev_date
+        ) as payload
+    from move_holdings h
+    join price_pair p using (symbol)
+    where h.shares > 0
+),
+
+-- ── today_options_moves (TODAY_OPTIONS_MOVES_QUERY), per-tenant sums ──
+close_as_of as (
+    select symbol, max(date) as as_of_date
+    from {{ ref('stg_daily_prices') }}
+    where date >= date_sub(current_date(), interval 10 day)
+      and close_price is not null
+      and close_price > 0
+    group by symbol
+),
+
+opt_ranked as (
+    select
+        m.tenant_id, m.account, m.user_id, m.symbol, m.date,
+        coalesce(m.cumulative_options_pnl, 0)
+          + coalesce(m.open_options_unrealized_pnl, 0) as opt_total,
+        coalesce(m.open_options_unrealized_pnl, 0) as open_mtm,
+        row_number() over (
+            partition by m.tenant_id, m.account, m.user_id, m.symbol
+            order by m.date desc
+        ) as rn
+    from {{ ref('mart_daily_pnl') }} m
+    join close_as_of c
+      on m.symbol = c.symbol
+     and m.date <= c.as_of_date
+    where m.date >= date_sub(current_date(), interval 10 day)
+),
+
+opt_delta as (
+    select
+        cur.tenant_id,
+        cur.symbol,
+        cur.date as today_date,
+        cur.opt_total - coalesce(prev.opt_total, 0) as day_change,
+        cur.open_mtm,
+        coalesce(prev.open_mtm, 0) as prev_open_mtm
+    from opt_ranked cur
+    left join opt_ranked prev
+        on (cur.tenant_id is not distinct from prev.tenant_id)
+        and cur.account = prev.account
+        and (cur.user_id is not distinct from prev.user_id)
+        and cur.symbol = prev.symbol
+        and prev.rn = 2
+    where cur.rn = 1
+),
+
+today_options_moves as (
+    select
+        tenant_id,
+        struct(
+            symbol,
+            max(today_date) as today_date,
+            sum(day_change) as day_change
+        ) as payload
+    from opt_delta
+    where open_mtm != 0 or prev_open_mtm != 0 or day_change != 0
+    group by tenant_id, symbol
+),
+
+-- ── today_dividends (TODAY_DIVIDENDS_QUERY), per-tenant sums ──────────
+today_dividends as (
+    select
+        tenant_id,
+        struct(symbol, trade_date, sum(amount) as amount) as payload
+    from {{ ref('int_dividend_events') }}
+    where trade_date >= date_sub(current_date(), interval 5 day)
+    group by tenant_id, symbol, trade_date
+),
+
+-- ── upcoming_divs (UPCOMING_DIVIDENDS_QUERY), per tenant's holdings ───
+ex_divs as (
+    select
+        upper(trim(symbol)) as symbol,
+        date as ex_div_date,
+        dividend as amount_per_share,
+        row_number() over (partition by upper(trim(symbol)) order by date desc) as rn
+    from {{ ref('stg_daily_prices') }}
+    where dividend is not null and dividend > 0
+),
+
+div_cadence as (
+    select
+        symbol,
+        approx_quantiles(spacing_days, 2)[offset(1)] as median_spacing_days
+    from (
+        select
+            symbol,
+            date_diff(
+                ex_div_date,
+                lag(ex_div_date) over (partition by symbol order by ex_div_date),
+                day
+            ) as spacing_days
+        from ex_divs
+        where rn <= 6
+    )
+    where spacing_days is not null
+    group by symbol
+),
+
+projected_divs as (
+    select
+        le.symbol,
+        le.ex_div_date as last_ex_div_date,
+        le.amount_per_share as last_amount_per_share,
+        c.median_spacing_days,
+        date_add(le.ex_div_date,
+                 interval coalesce(c.median_spacing_days, 91) day) as projected_next_ex_div_date
+    from ex_divs le
+    left join div_cadence c using (symbol)
+    where le.rn = 1
+),
+
+upcoming_divs as (
+    select
+        h.tenant_id,
+        struct(
+            h.symbol,
+            p.last_ex_div_date,
+            p.last_amount_per_share,
+            p.median_spacing_days,
+            p.projected_next_ex_div_date,
+            m.sector,
+            m.subsector,
+            m.long_name
+        ) as payload
+    from (
+        select distinct tenant_id, upper(trim(underlying_symbol)) as symbol
+        from open_holdings
+        where instrument_type = 'Equity'
+    ) h
+    join projected_divs p using (symbol)
+    left join {{ ref('stg_symbol_metadata') }} m using (symbol)
+    where p.projected_next_ex_div_date between date_sub(current_date(), interval 1 day)
+                                           and date_add(current_date(), interval 31 day)
+),
+
+-- ── weekly_trades (WEEKLY_TRADES_MART_QUERY), candidate weeks ─────────
+weekly_trades as (
+    select
+        t.tenant_id,
+        struct(
+            t.week_start,
+            t.account,
+            t.tenant_id,
+            t.symbol,
+            t.strategy,
+            t.trade_symbol,
+            t.open_date,
+            t.close_date,
+            t.status,
+            t.trade_cost,
+            t.current_market_value,
+            t.current_unrealized_pnl,
+            t.total_pnl,
+            t.num_trades
+        ) as payload
+    from {{ ref('mart_weekly_trades') }} t
+    join weeks w using (week_start)
+),
+
+-- ── today_trades (DAY_TRADES_QUERY), every day since trades_from ──────
+today_trades as (
+    select
+        h.tenant_id,
+        struct(
+            h.tenant_id, h.account, h.user_id, h.trade_date, h.action, h.trade_symbol,
+            h.underlying_symbol, h.description, h.quantity, h.price, h.amount,
+            h.instrument_type
+        ) as payload
+    from {{ ref('stg_history') }} h
+    cross join params
+    where h.trade_date >= params.trades_from
+      and h.action != 'dividend'
+),
+
+-- ── attribution (POSITION_ATTRIBUTION_QUERY), candidate weeks ─────────
+attr_pnl as (
+    select
+        w.week_start,
+        c.tenant_id, c.account, c.user_id, c.symbol,
+        sum(case when c.trade_group_type = 'equity_session'
+                  and (c.status = 'Open' or c.close_date >= w.week_start)
+                 then c.total_pnl else 0 end) as equity_pnl,
+        sum(case when c.trade_group_type = 'option_contract'
+                  and (c.status = 'Open' or c.close_date >= w.week_start)
+                 then c.total_pnl else 0 end) as option_pnl,
+        countif(c.trade_group_type = 'equity_session'  and c.status = 'Open') as num_equity_open,
+        countif(c.trade_group_type = 'option_contract' and c.status = 'Open') as num_option_open,
+        countif(c.trade_group_type = 'option_contract' and c.status = 'Closed') as num_option_closed,
+        countif(c.trade_group_type = 'equity_session'  and c.status = 'Closed') as num_equity_closed,
+        min(c.open_date) as first_open_date,
+        max(coalesce(c.close_date, current_date())) as last_activity_date
+    from {{ ref('int_strategy_classification') }} c
+    cross join weeks w
+    group by 1, 2, 3, 4, 5
+),
+
+attr_div as (
+    select tenant_id, account, user_id, symbol,
+           total_dividend_income as dividend_income,
+           dividend_count, last_dividend_date
+    from {{ ref('int_dividends') }}
+),
+
+attr_capital as (
+    select
+        tenant_id, account, user_id, upper(trim(underlying_symbol)) as symbol,
+        sum(case when action = 'equity_buy' then abs(amount) else 0 end) as equity_capital,
+        sum(case when action = 'option_buy' then abs(amount) else 0 end) as option_capital_paid,
+        sum(case when action = 'option_sell' then abs(amount) else 0 end) as option_premium_collected
+    from (
+        select tenant_id, account, user_id, underlying_symbol, action, amount
+        from {{ ref('stg_history') }}
+        where underlying_symbol is not null
+        union all
+        select tenant_id, account, user_id, symbol as underlying_symbol,
+               'equity_buy' as action, est_amount as amount
+        from {{ ref('int_opening_balances') }}
+        where price_source != 'unpriced'
+    )
+    group by 1, 2, 3, 4
+),
+
+attr_holdings as (
+    select
+        tenant_id, account, user_id, underlying_symbol as symbol,
+        sum(case when instrument_type = 'Equity' then coalesce(cost_basis, 0) else 0 end) as current_equity_cost,
+        sum(case when instrument_type = 'Equity' then coalesce(market_value, 0) else 0 end) as current_equity_value,
+        sum(case when instrument_type in ('Call', 'Put')
+                 then coalesce(market_value, 0) else 0 end) as current_option_value,
+        sum(case when instrument_type in ('Call', 'Put')
+                 then coalesce(unrealized_pnl, 0) else 0 end) as current_option_unrealized,
+        sum(case when instrument_type = 'Equity' then coalesce(unrealized_pnl, 0) else 0 end) as current_equity_unrealized,
+        sum(case when instrument_type = 'Equity' then abs(coalesce(quantity, 0)) else 0 end) as current_equity_shares,
+        countif(instrument_type = 'Equity') as num_equity_legs,
+        countif(instrument_type in ('Call', 'Put')) as num_option_legs,
+        max(current_price) as current_price
+    from open_holdings
+    group by 1, 2, 3, 4
+),
+
+attribution as (
+    select
+        p.tenant_id,
+        struct(
+            p.week_start,
+            p.tenant_id,
+            p.account,
+            p.user_id,
+            p.symbol,
+            round(coalesce(p.equity_pnl, 0), 2) as equity_pnl,
+            round(coalesce(p.option_pnl, 0), 2) as option_pnl,
+            round(coalesce(d.dividend_income, 0), 2) as dividend_income,
+            round(coalesce(p.equity_pnl, 0) + coalesce(p.option_pnl, 0)
+                  + coalesce(d.dividend_income, 0), 2) as net_pnl,
+            round(coalesce(c.equity_capital, 0), 2)            as equity_capital,
+            round(coalesce(c.option_capital_paid, 0), 2)       as option_capital_paid,
+            round(coalesce(c.option_premium_collected, 0), 2)  as option_premium_collected,
+            round(coalesce(h.current_equity_cost, 0), 2)       as current_equity_cost,
+            round(coalesce(h.current_equity_value, 0), 2)      as current_equity_value,
+            round(coalesce(h.current_option_value, 0), 2)      as current_option_value,
+            round(coalesce(h.current_option_unrealized, 0), 2) as current_option_unrealized,
+            round(coalesce(h.current_equity_unrealized, 0), 2) as current_equity_unrealized,
+            coalesce(h.current_equity_shares, 0)               as current_equity_shares,
+            coalesce(h.num_equity_legs, 0)                     as num_equity_legs,
+            coalesce(h.num_option_legs, 0)                     as num_option_legs,
+            coalesce(p.num_equity_open + p.num_option_open, 0) as num_open_groups,
+            coalesce(p.num_equity_closed + p.num_option_closed, 0) as num_closed_groups,
+            h.current_price,
+            p.first_open_date,
+            p.last_activity_date,
+            date_diff(p.last_activity_date, p.first_open_date, day) as days_held,
+            case
+                when (coalesce(p.num_equity_open, 0) + coalesce(p.num_option_open, 0)
+                      + coalesce(h.num_equity_legs, 0) + coalesce(h.num_option_legs, 0)) > 0
+                then 'Open'
+                else 'Closed'
+            end as status,
+            coalesce(m.sector, 'Unknown')    as sector,
+            coalesce(m.subsector, 'Unknown') as subsector,
+            m.long_name                      as company_name,
+            d.last_dividend_date,
+            coalesce(d.dividend_count, 0)    as dividend_count
+        ) as payload
+    from attr_pnl p
+    left join attr_div d
+        on (p.tenant_id is not distinct from d.tenant_id)
+        and p.account = d.account
+        and (p.user_id is not distinct from d.user_id)
+        and p.symbol = d.symbol
+    left join attr_capital c
+        on (p.tenant_id is not distinct from c.tenant_id)
+        and p.account = c.account
+        and (p.user_id is not distinct from c.user_id)
+        and p.symbol = c.symbol
+    left join attr_holdings h
+        on (p.tenant_id is not distinct from h.tenant_id)
+        and p.account = h.account
+        and (p.user_id is not distinct from h.user_id)
+        and p.symbol = h.symbol
+    left join {{ ref('stg_symbol_metadata') }} m
+        on upper(trim(p.symbol)) = m.symbol
+),
+
+-- ── exit_verdicts / open_options (app/execution_quality.py) ───────────
+exit_verdicts as (
+    select
+        tenant_id,
+        struct(
+            tenant_id, account, symbol, trade_symbol, option_type, option_strike,
+            option_expiry, direction, open_date, close_date, close_type,
+            days_held, dte_at_close, contracts,
+            premium_received, cost_to_close, proceeds_from_close, realized_pnl,
+            underlying_close_at_expiry, intrinsic_at_expiry, expiry_settlement_value,
+            expired_worthless, gradeable_early_close, early_close_vs_expiry_delta,
+            was_rolled, roll_new_strike, roll_new_expiry, net_roll_credit,
+            peak_unrealized_pnl, snapshot_count, snapshot_density, data_reliable,
+            pnl_given_back, giveback_pct
+        ) as payload
+    from {{ ref('int_option_exit_quality') }}
+),
+
+open_options as (
+    select
+        tenant_id,
+        struct(
+            tenant_id, account,
+            underlying_symbol as symbol,
+            trade_symbol, option_type, option_strike, option_expiry,
+            direction, open_date,
+            contracts_sold_to_open, contracts_bought_to_open,
+            premium_received, premium_paid,
+            current_market_value, current_unrealized_pnl
+        ) as payload
+    from {{ ref('int_option_contracts') }}
+    where status = 'Open'
+      and option_expiry is not null
+),
+
+-- ── benchmark_snapshot (BENCHMARK_SNAPSHOT_QUERY), market-wide ────────
+bench_prices as (
+    select p.symbol, p.date, p.close_price, l.latest_date
+    from {{ ref('stg_daily_prices') }} p
+    join (
+        select symbol, max(date) as latest_date
+        from {{ ref('stg_daily_prices') }}
+        where symbol in ('SPY', 'QQQ')
+          and close_price is not null and close_price > 0
+          and date >= date_sub(current_date(), interval 70 day)
+        group by symbol
+    ) l using (symbol)
+    where p.symbol in ('SPY', 'QQQ')
+      and p.close_price is not null and p.close_price > 0
+      and p.date >= date_sub(current_date(), interval 70 day)
+),
+
+benchmark_snapshot as (
+    select
+        '*' as tenant_id,
+        struct(
+            symbol,
+            any_value(if(date = latest_date, close_price, null)) as latest_close,
+            array_agg(if(date < latest_date, close_price, null)
+                      ignore nulls order by date desc limit 1)[safe_offset(0)] as day_close,
+            array_agg(if(date <= date_sub(latest_date, interval 7 day), close_price, null)
+                      ignore nulls order by date desc limit 1)[safe_offset(0)] as week_close,
+            array_agg(if(date <= date_sub(latest_date, interval 30 day), close_price, null)
+                      ignore nulls order by date desc limit 1)[safe_offset(0)] as month_close
+        ) as payload
+    from bench_prices
+    group by symbol
+),
+
+-- ── market_perf (MARKET_PERF_QUERY), candidate (week, ytd) pairs ──────
+market_prices as (
+    select w.week_start, y as ytd_start, p.symbol, p.date, p.close_price
+    from weeks w
+    cross join params
+    cross join unnest(params.ytd_starts) as y
+    join {{ ref('stg_daily_prices') }} p
+      on p.symbol in ('SPY', 'QQQ')
+     and p.date >= y
+     and p.close_price is not null and p.close_price > 0
+),
+
+market_week as (
+    select week_start, ytd_start, symbol,
+           min(close_price) as week_open
+    from market_prices
+    where date >= week_start
+    group by 1, 2, 3
+),
+
+market_ytd as (
+    select week_start, ytd_start, symbol,
+           min(if(date = first_date, close_price, null)) as ytd_open
+    from (
+        select *, min(date) over (partition by week_start, ytd_start, symbol) as first_date
+        from market_prices
+    )
+    group by 1, 2, 3
+),
+
+market_latest as (
+    select week_start, ytd_start, symbol, close_price as latest_close
+    from (
+        select *, max(date) over (partition by week_start, ytd_start, symbol) as max_date
+        from market_prices
+    )
+    where date = max_date
+),
+
+market_perf as (
+    select
+        '*' as tenant_id,
+        struct(
+            w.week_start,
+            w.ytd_start,
+            w.symbol,
+            round(safe_divide(l.latest_close - w.week_open, w.week_open) * 100, 2) as week_pct,
+            round(safe_divide(l.latest_close - y.ytd_open, y.ytd_open) * 100, 2) as ytd_pct
+        ) as payload
+    from market_week w
+    join market_ytd y using (week_start, ytd_start, symbol)
+    join market_latest l using (week_start, ytd_start, symbol)
+),
+
+meta as (
+    select
+        '*' as tenant_id,
+        struct(week_starts, ytd_starts, trades_from) as payload
+    from params
+),
+
+sections as (
+    select tenant_id, 'account_value' as section, to_json_string(payload) as row_json from account_value
+    union all
+    select tenant_id, 'snapshots', to_json_string(payload) from snapshots
+    union all
+    select tenant_id, 'positions', to_json_string(payload) from positions
+    union all
+    select tenant_id, 'earnings', to_json_string(payload) from earnings
+    union all
+    select tenant_id, 'today_moves', to_json_string(payload) from today_moves
+    union all
+    select tenant_id, 'today_options_moves', to_json_string(payload) from today_options_moves
+    union all
+    select tenant_id, 'today_dividends', to_json_string(payload) from today_dividends
+    union all
+    select tenant_id, 'upcoming_divs', to_json_string(payload) from upcoming_divs
+    union all
+    select tenant_id, 'weekly_trades', to_json_string(payload) from weekly_trades
+    union all
+    select tenant_id, 'today_trades', to_json_string(payload) from today_trades
+    union all
+    select tenant_id, 'attribution', to_json_string(payload) from attribution
+    union all
+    select tenant_id, 'exit_verdicts', to_json_string(payload) from exit_verdicts
+    union all
+    select tenant_id, 'open_options', to_json_string(payload) from open_options
+    union all
+    select tenant_id, 'benchmark_snapshot', to_json_string(payload) from benchmark_snapshot
+    union all
+    select tenant_id, 'market_perf', to_json_string(payload) from market_perf
+    union all
+    select tenant_id, '_meta', to_json_string(payload) from meta
+)
+
+select
+    s.tenant_id,
+    s.section,
+    s.row_json,
+    params.built_on
+from sections s
+cross join params
@@ -1,3 +1,11 @@
+{{
+    config(
+        materialized='tenant_table',
+        partition_by={'field': 'trade_date', 'data_type': 'date', 'granularity': 'month'},
+        cluster_by=['tenant_id', 'account']
+    )
+}}
+
 /*
     Daily trading activity metrics — one row per (account, trade_date).
     Pre-aggregates trade-level data so Mirror Score computation in Flask
@@ -1,4 +1,9 @@
-{{ config(materialized='table') }}
+{{
+    config(
+        materialized='tenant_table',
+        cluster_by=['tenant_id', 'underlying_symbol']
+    )
+}}
 
 /*
     Option Win/Loss matrix cells — pre-bucketed DTE x Strike-Distance grid.
@@ -1,4 +1,9 @@
-{{ config(materialized='table') }}
+{{
+    config(
+        materialized='tenant_table',
+        cluster_by=['tenant_id', 'strategy']
+    )
+}}
 
 /*
     Strategy performance over time — one row per (account, strategy, month).
@@ -1,4 +1,9 @@
-{{ config(materialized='table') }}
+{{
+    config(
+        materialized='tenant_table',
+        cluster_by=['tenant_id', 'underlying_symbol']
+    )
+}}
 
 /*
     mart_trade_observations — pure-SQL behavioral observations.
@@ -1,4 +1,13 @@
-{{ config(materialized='table') }}
+{{
+    config(
+        materialized='incremental',
+        incremental_strategy='merge',
+        pre_hook="{{ prepare_daily_rebuild() }}",
+        partition_by={'field': 'date', 'data_type': 'date', 'granularity': 'month'},
+        cluster_by=['tenant_id', 'account'],
+        post_hook="{{ record_daily_rebuild_state() }}"
+    )
+}}
 
 /*
     Daily wealth view backing the /wealth page.
@@ -56,9 +65,21 @@
     (account, user_id) and uses ``IS NOT DISTINCT FROM`` so a user_id
     NULL on the demo path doesn't get double-counted. See
     docs/USER_ID_TENANCY.md and .cursor/rules/bigquery-tenant-isolation.mdc.
+
+    INCREMENTAL: builds recompute each tenant from its ``rebuild_from``
+    (the trailing ``daily_lookback_days``, or the first trade date whose
+    history rows changed) and keep older rows; the day-over-day delta and
+    the running totals continue from the last kept row. See
+    dbt/macros/incremental_daily.sql.
 */
 
-with equity as (
+with {% if is_incremental() -%}
+rebuild_window as (
+    {{ daily_rebuild_window() }}
+),
+
+{% endif -%}
+equity as (
     select
         account,
         user_id,
@@ -68,9 +89,37 @@ with equity as (
         cash_value,
         equity_value,
         option_value
-    from {{ ref('mart_account_equity_daily') }}
+    from {{ ref('mart_account_equity_daily') }} e
+    {%- if is_incremental() %}
+    {{ rebuild_join('e') }}
+    where e.date >= {{ rebuild_from('e') }}
+    {%- endif %}
+),
+
+{% if is_incremental() -%}
+-- Account value and running totals as of the last row KEPT before each
+-- account's window; the window's rows continue from them.
+carried as (
+    select
+        t.tenant_id,
+        t.account,
+        t.user_id,
+        t.account_value,
+        t.cumulative_dividends,
+        t.cumulative_net_deposits,
+        t.cumulative_interest_net,
+        t.cumulative_fees
+    from {{ this }} t
+    {{ rebuild_join('t') }}
+    where t.date < {{ rebuild_from('t') }}
+    qualify row_number() over (
+        partition by t.tenant_id, t.account, t.user_id
+        order by t.date desc
+    ) = 1
 ),
 
+{% endif -%}
+
 -- Daily history aggregates. Bucketed by trade_date so the join below
 -- is a tight equi-join; rows where no history exists for the day stay
 -- NULL and get coalesced to 0 at the final select.
@@ -111,67 +160,93 @@ joined as (
         coalesce(h.dividend_today, 0)      as dividend_today,
         coalesce(h.interest_net_today, 0)  as interest_net_today,
         coalesce(h.fees_today, 0)          as fees_today,
-        coalesce(h.net_deposit_today, 0)   as net_deposit_today
+        coalesce(h.net_deposit_today, 0)   as net_deposit_today,
+        {% if is_incremental() -%}
+        c.account_value                          as carried_account_value,
+        coalesce(c.cumulative_dividends, 0)      as carried_dividends,
+        coalesce(c.cumulative_net_deposits, 0)   as carried_net_deposits,
+        coalesce(c.cumulative_interest_net, 0)   as carried_interest_net,
+        coalesce(c.cumulative_fees, 0)           as carried_fees
+        {%- else -%}
+        cast(null as float64)                    as carried_account_value,
+        cast(0 as float64)                       as carried_dividends,
+        cast(0 as float64)                       as carried_net_deposits,
+        cast(0 as float64)                       as carried_interest_net,
+        cast(0 as float64)                       as carried_fees
+        {%- endif %}
     from equity e
     left join history_by_day h
       on h.account = e.account
      and (h.user_id is not distinct from e.user_id)
      and (h.tenant_id is not distinct from e.tenant_id)
      and h.date    = e.date
+    {%- if is_incremental() %}
+    left join carried c
+      on c.account = e.account
+     and (c.user_id is not distinct from e.user_id)
+     and (c.tenant_id is not distinct from e.tenant_id)
+    {%- endif %}
+),
+
+final as (
+    select
+        account,
+        user_id,
+        tenant_id,
+        date,
+        account_value,
+        cash_value,
+        equity_value,
+        option_value,
+
+        -- Day-over-day account-value change. NULL on the first day per
+        -- (tenant_id, account, user_id) so charts can render a gap rather than
+        -- pretending the first observation was a delta from zero.
+        account_value - coalesce(
+            lag(account_value) over (
+                partition by tenant_id, account, user_id
+                order by date
+            ),
+            carried_account_value
+        ) as account_value_delta,
+
+        dividend_today,
+        interest_net_today,
+        fees_today,
+        net_deposit_today,
+
+        -- Running totals scoped to (tenant_id, account, user_id) so two
+        -- physical accounts sharing a display label never have their tallies
+        -- merged.
+        carried_dividends + sum(dividend_today) over (
+            partition by tenant_id, account, user_id
+            order by date
+            rows between unbounded preceding and current row
+        ) as cumulative_dividends,
+
+        -- Cumulative net external cash flow (deposits − withdrawals) from the
+        -- start of each account's history through this day. The /wealth +
+        -- /accounts toggle subtracts this from account_value to strip out
+        -- money the trader added/removed.
+        carried_net_deposits + sum(net_deposit_today) over (
+            partition by tenant_id, account, user_id
+            order by date
+            rows between unbounded preceding and current row
+        ) as cumulative_net_deposits,
+
+        carried_interest_net + sum(interest_net_today) over (
+            partition by tenant_id, account, user_id
+            order by date
+            rows between unbounded preceding and current row
+        ) as cumulative_interest_net,
+
+        carried_fees + sum(fees_today) over (
+            partition by tenant_id, account, user_id
+            order by date
+            rows between unbounded preceding and current row
+        ) as cumulative_fees
+    from joined
 )
 
-select
-    account,
-    user_id,
-    tenant_id,
-    date,
-    account_value,
-    cash_value,
-    equity_value,
-    option_value,
-
-    -- Day-over-day account-value change. NULL on the first day per
-    -- (tenant_id, account, user_id) so charts can render a gap rather than
-    -- pretending the first observation was a delta from zero.
-    account_value - lag(account_value) over (
-        partition by tenant_id, account, user_id
-        order by date
-    ) as account_value_delta,
-
-    dividend_today,
-    interest_net_today,
-    fees_today,
-    net_deposit_today,
-
-    -- Running totals scoped to (tenant_id, account, user_id) so two
-    -- physical accounts sharing a display label never have their tallies
-    -- merged.
-    sum(dividend_today) over (
-        partition by tenant_id, account, user_id
-        order by date
-        rows between unbounded preceding and current row
-    ) as cumulative_dividends,
-
-    -- Cumulative net external cash flow (deposits − withdrawals) from the
-    -- start of each account's history through this day. The /wealth +
-    -- /accounts toggle subtracts this from account_value to strip out
-    -- money the trader added/removed.
-    sum(net_deposit_today) over (
-        partition by tenant_id, account, user_id
-        order by date
-        rows between unbounded preceding and current row
-    ) as cumulative_net_deposits,
-
-    sum(interest_net_today) over (
-        partition by tenant_id, account, user_id
-        order by date
-        rows between unbounded preceding and current row
-    ) as cumulative_interest_net,
-
-    sum(fees_today) over (
-        partition by tenant_id, account, user_id
-        order by date
-        rows between unbounded preceding and current row
-    ) as cumulative_fees
-from joined
+select * from final
 order by tenant_id, account, user_id, date
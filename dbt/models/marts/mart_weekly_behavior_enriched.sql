@@ -1,4 +1,10 @@
-{{ config(materialized='table') }}
+{{
+    config(
+        materialized='tenant_table',
+        partition_by={'field': 'week_start', 'data_type': 'date', 'granularity': 'month'},
+        cluster_by=['tenant_id', 'account']
+    )
+}}
 
 /*
     Weekly behavior-enriched summary — one row per (account, week_start).
@@ -1,3 +1,11 @@
+{{
+    config(
+        materialized='tenant_table',
+        partition_by={'field': 'week_start', 'data_type': 'date', 'granularity': 'month'},
+        cluster_by=['tenant_id', 'account']
+    )
+}}
+
 /*
     Weekly trading summary — one row per (account, iso_week_start).
     Pre-aggregates closed trades, best/worst trade details, strategy stats,
@@ -1,3 +1,10 @@
+{{
+    config(
+        materialized='tenant_table',
+        cluster_by=['tenant_id', 'symbol', 'strategy']
+    )
+}}
+
 /*
     Positions summary — the mart that powers the Positions Dashboard.
 
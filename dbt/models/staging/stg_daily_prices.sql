@@ -11,7 +11,8 @@
     One row per (account, user_id, symbol, trading_day). user_id is
     NULL on legacy rows written before the user_id-tenancy migration —
     see docs/USER_ID_TENANCY.md. The pipeline rebuilds this source
-    table with WRITE_TRUNCATE on every cron run, so the user_id column
+    table (full refresh) or merges each symbol's trailing window
+    (incremental default) on every cron run, so the user_id column
     appears the first time the new loader runs. Until then we use a
     defensive check so dbt build doesn't fail mid-deploy.
 */
@@ -0,0 +1,47 @@
+/*
+    mart_daily_pnl's per-day option cash (``options_amount``) must equal
+    the tenant's stg_history option fills on that day — in particular,
+    no row may keep cash from fills that are no longer in the history.
+
+    Regression (review of the incremental daily models): when a tenant's
+    history lost a month (a re-import that starts later, a purged
+    account), incremental builds replaced only the month partitions that
+    received new rows. A month left with no rows for anyone kept its stale
+    rows, still carrying the deleted fills' cash into every cumulative
+    total after it. The builds now delete each tenant's window before
+    inserting it (dbt/macros/incremental_daily.sql), so the deleted days
+    either come back recomputed or stay gone.
+*/
+
+with history as (
+    select
+        tenant_id,
+        account,
+        user_id,
+        underlying_symbol as symbol,
+        trade_date        as date,
+        sum(amount)       as options_amount
+    from {{ ref('stg_history') }}
+    where instrument_type in ('Call', 'Put')
+      and trade_date is not null
+      and underlying_symbol is not null
+      and action <> 'cash_transfer'
+    group by 1, 2, 3, 4, 5
+)
+
+select
+    p.tenant_id,
+    p.account,
+    p.user_id,
+    p.symbol,
+    p.date,
+    p.options_amount,
+    h.options_amount as history_options_amount
+from {{ ref('mart_daily_pnl') }} p
+left join history h
+    on  h.account = p.account
+    and (h.user_id   is not distinct from p.user_id)
+    and (h.tenant_id is not distinct from p.tenant_id)
+    and h.symbol = p.symbol
+    and h.date   = p.date
+where abs(p.options_amount - coalesce(h.options_amount, 0)) > 0.005
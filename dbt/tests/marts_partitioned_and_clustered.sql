@@ -0,0 +1,58 @@
+/*
+    Every table / incremental mart MUST be clustered, tenant-bearing marts
+    MUST lead their clustering with ``tenant_id``, and daily / weekly grain
+    marts (a ``date``, ``trade_date`` or ``week_start`` column) MUST be
+    partitioned.
+
+    Why: every app read is ``WHERE ... AND tenant_id IN (...)``, usually
+    with a date window. On a plain table each page query scans the whole
+    multi-tenant mart, so bytes billed per page grow with the total tenant
+    count. Clustering on tenant_id lets BigQuery prune storage blocks to the
+    caller's tenants; month partitions on the date column prune the
+    chart / Wealth / Weekly Review windows.
+
+    Reads the built tables' INFORMATION_SCHEMA rather than the model
+    configs, so a new mart added without the config — or one whose config
+    was dropped — fails here. Marts not built in this run are skipped.
+*/
+
+{%- set marts = [] -%}
+{%- if execute -%}
+    {%- for node in graph.nodes.values() -%}
+        {%- if node.resource_type == 'model'
+              and node.original_file_path.startswith('models/marts/')
+              and node.config.materialized in ('table', 'tenant_table', 'incremental') -%}
+            {%- do marts.append(node.alias) -%}
+        {%- endif -%}
+    {%- endfor -%}
+{%- endif %}
+
+with marts as (
+    select table_name
+    from unnest(array<string>[
+        {%- for m in marts %}'{{ m }}'{% if not loop.last %}, {% endif %}{% endfor -%}
+    ]) as table_name
+),
+
+layout as (
+    select
+        table_name,
+        logical_or(column_name = 'tenant_id') as has_tenant_id,
+        max(if(clustering_ordinal_position = 1, column_name, null)) as first_cluster_column,
+        max(if(is_partitioning_column = 'YES', column_name, null)) as partition_column,
+        max(if(column_name in ('date', 'trade_date', 'week_start'), column_name, null))
+            as grain_date_column
+    from `{{ target.database }}`.`{{ target.schema }}`.INFORMATION_SCHEMA.COLUMNS
+    group by table_name
+)
+
+select
+    l.table_name,
+    l.first_cluster_column,
+    l.partition_column,
+    l.grain_date_column
+from marts m
+join layout l using (table_name)
+where l.first_cluster_column is null
+   or (l.has_tenant_id and l.first_cluster_column != 'tenant_id')
+   or (l.grain_date_column is not null and l.partition_column is null)
@@ -14,6 +14,10 @@
 # Usage:
 #   ./refresh.sh            — full pipeline
 #   ./refresh.sh --prices   — skip git pull + pass 1 (prices + downstream only)
+#
+# Step 3 keeps a local yfinance cache in .cache/yfinance (override with
+# PRICE_CACHE_DIR, "off" to disable) so repeat runs only fetch each symbol's
+# newest sessions.
 
 set -euo pipefail
 
@@ -36,7 +40,8 @@ if [[ "${1:-}" != "--prices" ]]; then
 fi
 
 echo "==> Step 3: fetch daily stock prices"
-python "$SCRIPT_DIR/current_position_stock_price.py"
+PRICE_CACHE_DIR="${PRICE_CACHE_DIR:-$SCRIPT_DIR/.cache/yfinance}" \
+  python "$SCRIPT_DIR/current_position_stock_price.py"
 
 echo "==> Step 4: dbt build (prices downstream only)"
 cd "$DBT_DIR"
@@ -0,0 +1,176 @@
+"""Script-batch execution for ``_bq_parallel`` (app/bq_script.py).
+
+With ``BQ_SCRIPT_BATCH=1`` a page's cache misses run as ONE BigQuery
+script job. The mode must keep ``_bq_parallel``'s contracts: one failing
+query blanks only its own key, every query still shows up under its own
+label in REQUEST_TIMING, and cache hits never reach BigQuery.
+"""
+from datetime import date, datetime, timedelta
+from types import SimpleNamespace
+
+import pandas as pd
+import pytest
+from google.cloud import bigquery
+
+from app import query_cache
+from app.bq_script import ScriptQueryError, build_script, run_script
+from app.routes import _bq_parallel
+from app.weekly_review import _bq_parallel as _review_bq_parallel
+
+
+class _Child:
+    def __init__(self, line, df=None, error=None):
+        self.script_statistics = SimpleNamespace(
+            stack_frames=[SimpleNamespace(start_line=line)])
+        self.started = datetime(2026, 10, 17, 12, 0, 0)
+        self.ended = self.started + timedelta(milliseconds=40)
+        self.error_result = None
+        self._df = df
+        self._error = error
+
+    def to_dataframe(self):
+        return self._df
+
+    def result(self):
+        return iter([(self._error,)])
+
+
+class _ScriptClient:
+    """Executes scripts from ``build_script`` statement by statement: a
+    statement containing ``boom`` fails (its handler reports the error),
+    any other returns a one-row frame holding its own SQL text."""
+
+    def __init__(self, fail_script=False):
+        self.calls = []
+        self.fail_script = fail_script
+        self._children = []
+
+    def query(self, sql, job_config=None, **kwargs):
+        self.calls.append((sql, job_config))
+        if "BEGIN" not in sql:  # per-query fallback path
+            if "boom" in sql:
+                raise RuntimeError("boom")
+            return SimpleNamespace(to_dataframe=lambda: pd.DataFrame({"sql": [sql]}))
+        if self.fail_script:
+            raise RuntimeError("Syntax error")
+        lines = sql.splitlines()
+        self._children = []
+        i = 0
+        while i < len(lines):
+            if lines[i] == "BEGIN":
+                end = lines.index(";", i)
+                statement = "\n".join(lines[i + 1:end])
+                handler = end + 3  # 1-based line of the handler SELECT
+                if "boom" in statement:
+                    self._children.append(_Child(handler, error="Unrecognized name: boom"))
+                else:
+                    self._children.append(
+                        _Child(i + 2, df=pd.DataFrame({"sql": [statement]})))
+                i = end
+            i += 1
+        return SimpleNamespace(job_id="script-1", result=lambda: None)
+
+    def list_jobs(self, parent_job=None):
+        assert parent_job == "script-1"
+        return list(reversed(self._children))
+
+
+@pytest.fixture(autouse=True)
+def _clean_cache():
+    query_cache.clear()
+    yield
+    query_cache.clear()
+
+
+@pytest.fixture
+def script_mode(monkeypatch):
+    monkeypatch.setenv("BQ_SCRIPT_BATCH", "1")
+
+
+def _day_cfg(day):
+    return bigquery.QueryJobConfig(query_parameters=[
+        bigquery.ScalarQueryParameter("day", "DATE", day),
+    ])
+
+
+def test_build_script_renames_parameters_per_statement():
+    cfg = _day_cfg(date(2026, 10, 16))
+    script, params, spans = build_script({
+        "a": ("SELECT @day AS d  -- trailing comment", cfg),
+        "b": ("SELECT @day AS d, @@error.message;", _day_cfg(date(2026, 10, 17))),
+    })
+    assert [p.name for p in params] == ["q0_day", "q1_day"]
+    assert [p.value for p in params] == [date(2026, 10, 16), date(2026, 10, 17)]
+    assert cfg.query_parameters[0].name == "day"  # caller's config untouched
+    assert "@q1_day AS d, @@error.message" in script
+    lines = script.splitlines()
+    first, last, handler = spans["a"]
+    assert lines[first - 1].startswith("SELECT @q0_day")
+    assert lines[last - 1] == ";"
+    assert "@@error.message" in lines[handler - 1]
+
+
+def test_run_script_isolates_a_failing_statement():
+    client = _ScriptClient()
+    out = run_script(client, {
+        "ok": ("SELECT 1", None),
+        "bad": ("SELECT boom", None),
+        "also_ok": ("SELECT 2", None),
+    })
+    assert len(client.calls) == 1
+    assert out["ok"][0]["sql"].tolist() == ["SELECT 1"]
+    assert out["also_ok"][0]["sql"].tolist() == ["SELECT 2"]
+    assert isinstance(out["bad"][0], ScriptQueryError)
+    assert "boom" in str(out["bad"][0])
+    assert out["ok"][1] == pytest.approx(40.0)
+
+
+def test_bq_parallel_runs_misses_as_one_job_and_times_each_label(script_mode, monkeypatch):
+    monkeypatch.setenv("QUERY_CACHE_ENABLED", "1")
+    stats = query_cache.start_request_stats()
+    client = _ScriptClient()
+    queries = {
+        "snapshots": "SELECT 1 FROM t WHERE tenant_id IN ('t:a')",
+        "attribution": "SELECT boom FROM t WHERE tenant_id IN ('t:a')",
+        "today_trades": ("SELECT @day", _day_cfg(date(2026, 10, 16))),
+    }
+    batch = _bq_parallel(client, queries)
+
+    assert len(client.calls) == 1
+    assert batch["attribution"].empty and list(batch["attribution"].columns) == []
+    assert batch["today_trades"]["sql"].tolist() == ["SELECT @q2_day"]
+    assert sorted(label for label, _ms, hit in stats.queries if not hit) == [
+        "snapshots", "today_trades",
+    ]
+
+    # Warm: only the failed (never cached) query is left to run.
+    again = _bq_parallel(client, queries)
+    assert len(client.calls) == 2 and "BEGIN" not in client.calls[1][0]
+    assert again["snapshots"]["sql"].tolist() == batch["snapshots"]["sql"].tolist()
+    assert stats.query_hits == 2
+
+
+def test_review_bq_parallel_shares_the_script_mode(script_mode):
+    client = _ScriptClient()
+    batch = _review_bq_parallel(client, {"a": "SELECT 1", "b": "SELECT boom"})
+    assert len(client.calls) == 1 and "BEGIN" in client.calls[0][0]
+    assert batch["a"]["sql"].tolist() == ["SELECT 1"]
+    assert batch["b"].empty
+
+
+@pytest.mark.parametrize("run", [_bq_parallel, _review_bq_parallel])
+def test_bq_parallel_falls_back_per_query_when_the_script_fails(script_mode, run):
+    client = _ScriptClient(fail_script=True)
+    batch = run(client, {"a": "SELECT 1", "b": "SELECT boom"})
+    assert "BEGIN" in client.calls[0][0]
+    assert len(client.calls) == 3
+    assert batch["a"]["sql"].tolist() == ["SELECT 1"]
+    assert batch["b"].empty
+
+
+def test_bq_parallel_uses_the_pool_by_default(monkeypatch):
+    monkeypatch.delenv("BQ_SCRIPT_BATCH", raising=False)
+    client = _ScriptClient()
+    _bq_parallel(client, {"a": "SELECT 1", "b": "SELECT 2"})
+    assert len(client.calls) == 2
+    assert all("BEGIN" not in sql for sql, _cfg in client.calls)
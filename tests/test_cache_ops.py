@@ -6,6 +6,8 @@ fail closed (no token / wrong token / unset env -> 403) and flush + kick
 the warm thread on a valid token.
 """
 
+from types import SimpleNamespace
+
 import pytest
 
 from app import app as flask_app
@@ -53,8 +55,9 @@ def test_flush_ok_clears_and_warms(client, monkeypatch):
     started = {}
 
     class _FakeThread:
-        def __init__(self, target=None, name=None, daemon=None):
+        def __init__(self, target=None, args=(), name=None, daemon=None):
             started["target"] = target
+            started["args"] = args
 
         def start(self):
             started["started"] = True
@@ -62,7 +65,9 @@ def test_flush_ok_clears_and_warms(client, monkeypatch):
             # the endpoint acquired so later tests aren't wedged.
             cache_ops._warm_lock.release()
 
-    monkeypatch.setattr(cache_ops.threading, "Thread", _FakeThread)
+    # Stub only cache_ops' view of threading: patching threading.Thread
+    # itself breaks the rate limiter's expiry Timer mid-request.
+    monkeypatch.setattr(cache_ops, "threading", SimpleNamespace(Thread=_FakeThread))
 
     resp = client.post(
         "/internal/cache/flush",
@@ -75,6 +80,7 @@ def test_flush_ok_clears_and_warms(client, monkeypatch):
     assert cleared["n"] == 1
     assert started.get("started") is True
     assert started.get("target") is cache_ops._warm_worker
+    assert started.get("args") == (None,)
 
 
 def test_flush_warm_skippable(client, monkeypatch):
@@ -92,3 +98,167 @@ def test_flush_warm_skippable(client, monkeypatch):
     # Lock must not be held after a warm-skipped flush.
     assert cache_ops._warm_lock.acquire(blocking=False)
     cache_ops._warm_lock.release()
+
+
+def test_stats_403_on_wrong_token(client, monkeypatch):
+    monkeypatch.setenv("CACHE_FLUSH_TOKEN", "correct-token")
+    resp = client.get(
+        "/internal/cache/stats", headers={"X-Cache-Flush-Token": "nope"},
+    )
+    assert resp.status_code == 403
+
+
+def test_stats_reports_l1_bytes_per_label(client, monkeypatch):
+    import app.cache_ops as cache_ops
+
+    monkeypatch.setenv("CACHE_FLUSH_TOKEN", "correct-token")
+    monkeypatch.setattr(cache_ops.query_cache, "l1_stats", lambda: {
+        "entries": 1, "bytes": 10, "budget_bytes": 100,
+        "labels": {"kpi": {"entries": 1, "bytes": 10}},
+    })
+    resp = client.get(
+        "/internal/cache/stats", headers={"X-Cache-Flush-Token": "correct-token"},
+    )
+    assert resp.status_code == 200
+    body = resp.get_json()
+    assert body["labels"]["kpi"]["bytes"] == 10
+    assert "pid" in body
+
+
+def test_flush_with_tenant_ids_invalidates_only_those(client, monkeypatch):
+    import app.cache_ops as cache_ops
+
+    monkeypatch.setenv("CACHE_FLUSH_TOKEN", "correct-token")
+    monkeypatch.setattr(
+        cache_ops.query_cache, "clear",
+        lambda: pytest.fail("targeted flush must not clear everything"),
+    )
+    invalidated = []
+    monkeypatch.setattr(
+        cache_ops.query_cache, "invalidate_tenants", invalidated.append,
+    )
+
+    resp = client.post(
+        "/internal/cache/flush?warm=0",
+        json={"tenant_ids": ["schwab:b", "schwab:a", "bad id'"]},
+        headers={"X-Cache-Flush-Token": "correct-token"},
+    )
+    assert resp.status_code == 200
+    assert resp.get_json()["tenant_ids"] == ["schwab:a", "schwab:b"]
+    assert invalidated == [["schwab:a", "schwab:b"]]
+
+
+def test_flush_rejects_tenant_ids_that_sanitize_to_nothing(client, monkeypatch):
+    import app.cache_ops as cache_ops
+
+    monkeypatch.setenv("CACHE_FLUSH_TOKEN", "correct-token")
+    monkeypatch.setattr(
+        cache_ops.query_cache, "clear",
+        lambda: pytest.fail("an invalid tenant list must not flush globally"),
+    )
+    resp = client.post(
+        "/internal/cache/flush?tenant_ids=%27%3B",
+        headers={"X-Cache-Flush-Token": "correct-token"},
+    )
+    assert resp.status_code == 400
+
+
+def test_targeted_warm_covers_only_affected_users(monkeypatch):
+    import app.cache_ops as cache_ops
+    import app.db
+    import app.models
+
+    monkeypatch.setattr(app.db, "fetch_all", lambda sql: [
+        {"user_id": 1}, {"user_id": 2},
+    ])
+    monkeypatch.setattr(app.models, "get_broker_tenants_for_user", lambda uid: [
+        {"tenant_id": f"t{uid}"},
+    ])
+    assert cache_ops._warm_scopes(frozenset({"t2"})) == [(2, ["t2"]), (None, None)]
+    assert len(cache_ops._warm_scopes()) == 3
+
+
+def test_warm_pass_runs_scopes_concurrently_and_reports_progress(monkeypatch):
+    import threading
+
+    import app.bigquery_client
+    import app.cache_ops as cache_ops
+
+    scopes = [(1, ["t1"]), (2, ["t2"]), (3, ["t3"]), (None, None)]
+    monkeypatch.setattr(cache_ops, "_warm_scopes", lambda targets=None: scopes)
+    monkeypatch.setattr(app.bigquery_client, "get_bigquery_client", lambda: object())
+    monkeypatch.setenv("CACHE_WARM_WORKERS", "2")
+
+    both_running = threading.Barrier(2, timeout=5)
+    seen = []
+
+    def fake_scope(client, uid, tenant_ids):
+        seen.append(uid)
+        if uid in (1, 2):
+            both_running.wait()  # deadlocks if scopes ran serially
+        if uid == 3:
+            raise RuntimeError("boom")
+
+    monkeypatch.setattr(cache_ops, "_warm_one_scope", fake_scope)
+    # The rebuild's stamps are read before any scope is warmed.
+    monkeypatch.setattr(cache_ops.query_cache, "refresh_warehouse_tokens",
+                        lambda: seen.append("tokens"))
+    assert cache_ops._warm_lock.acquire(blocking=False)
+    cache_ops._warm_worker()
+
+    assert seen.pop(0) == "tokens"
+    assert seen[:2] in ([1, 2], [2, 1])  # most active users start first
+    assert cache_ops._warm_progress["done"] == 4
+    assert cache_ops._warm_progress["failed"] == 1
+    assert cache_ops._warm_progress["running"] is False
+    assert cache_ops._warm_lock.acquire(blocking=False)
+    cache_ops._warm_lock.release()
+
+
+def test_warm_scope_covers_most_viewed_positions(monkeypatch):
+    import app.cache_ops as cache_ops
+    import app.models
+    import app.position_detail
+    import app.trader_story
+    import app.weekly_review
+
+    batches = []
+    monkeypatch.setattr(app.weekly_review, "_bq_parallel", lambda c, q: batches.append(q) or {})
+    monkeypatch.setattr(app.weekly_review, "build_daily_review_batch", lambda *a, **k: {})
+    monkeypatch.setattr(app.trader_story, "story_query_batch", lambda ids: {})
+    monkeypatch.setattr(app.models, "get_user_profile", lambda uid: {})
+    monkeypatch.setattr("app.query_cache.cached_query_df", lambda *a, **k: None)
+    monkeypatch.setattr(
+        app.models, "list_top_viewed_symbols", lambda uid, limit: ["AAPL", "BRK'B"],
+    )
+
+    cache_ops._warm_one_scope(object(), 7, ["t7"])
+
+    position_batches = batches[2:]
+    assert len(position_batches) == 2
+    expected = app.position_detail.position_query_batch("BRK''B", ["t7"], ["t7"])
+    assert position_batches[1] == expected
+    assert "'t7'" in position_batches[0]["summary"]
+
+
+def test_symbol_views_are_buffered_and_flushed_in_one_upsert(monkeypatch):
+    import app.models as models
+
+    writes = []
+    monkeypatch.setattr(models, "execute", lambda sql, params=(): writes.append((sql, params)))
+    monkeypatch.setattr(models, "_flush_symbol_views_later", lambda: None)
+    monkeypatch.setattr(models, "_pending_symbol_views", {})
+    monkeypatch.setattr(models, "_symbol_view_flush_scheduled", False)
+
+    models.bump_symbol_view(7, "AAPL")
+    models.bump_symbol_view(7, "AAPL")
+    models.bump_symbol_view(8, "MSFT")
+    assert writes == []  # nothing on the render path
+
+    models.flush_symbol_views()
+    assert len(writes) == 1
+    sql, params = writes[0]
+    assert "EXCLUDED.view_count" in sql
+    assert params == [7, "AAPL", 2, 8, "MSFT", 1]
+    models.flush_symbol_views()
+    assert len(writes) == 1
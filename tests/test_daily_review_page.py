@@ -0,0 +1,193 @@
+"""Unit tests for app/daily_review_page.py — the Daily Review page mart.
+
+``split_page_frame`` must hand the view the same frames the live batch
+would have, scoped to the requested tenants, and must refuse (``None``)
+whenever the mart's build-time windows can't answer the request so the
+view falls back to the live queries.
+"""
+import json
+from datetime import date, datetime, timezone
+
+import pandas as pd
+import pytest
+
+import app.daily_review_page as daily_review_page
+import app.weekly_review as weekly_review
+from app.daily_review_page import _SECTION_COLUMNS, split_page_frame
+
+BUILT = date(2026, 10, 17)
+KW = dict(
+    today=date(2026, 10, 17),
+    this_week=date(2026, 10, 12),
+    trades_as_of=date(2026, 10, 16),
+    cal_start=date(2026, 7, 27),
+    cal_end=date(2026, 10, 16),
+    utc_today=BUILT,
+)
+
+
+@pytest.fixture(autouse=True)
+def _no_coverage(monkeypatch):
+    monkeypatch.setattr(daily_review_page, "_coverage",
+                        {"built_on": None, "tenants": frozenset()})
+
+
+def _row(tenant, section, built_on=BUILT, **payload):
+    return {"tenant_id": tenant, "section": section,
+            "row_json": json.dumps(payload), "built_on": built_on}
+
+
+def _meta(**overrides):
+    payload = {"week_starts": ["2026-10-05", "2026-10-12"],
+               "ytd_starts": ["2026-01-01"], "trades_from": "2026-10-03"}
+    payload.update(overrides)
+    return _row("*", "_meta", **payload)
+
+
+def _move(tenant, symbol, shares):
+    return _row(tenant, "today_moves", symbol=symbol, shares=shares,
+                current_value=shares * 11.0, today_close=11.0, prev_close=10.0,
+                today_date="2026-10-16", prev_date="2026-10-15")
+
+
+def _page(*rows):
+    return pd.DataFrame([_meta(), *rows])
+
+
+def test_every_live_batch_key_is_served_with_its_columns():
+    out = split_page_frame(_page(_move("a", "X", 1)), ["a"], **KW)
+    live = weekly_review.build_daily_review_batch("", KW["today"], KW["this_week"])
+    assert set(out) == set(live)
+    assert list(out["positions"].columns) == list(_SECTION_COLUMNS["positions"])
+    assert out["exit_verdicts"].empty
+    assert list(out["weekly_trades"].columns)[0] == "account"  # week_start dropped
+
+
+def test_today_moves_sum_only_the_requested_tenants():
+    page = _page(_move("a", "X", 10), _move("b", "X", 5), _move("c", "Q", 7))
+    moves = split_page_frame(page, ["a", "b"], **KW)["today_moves"]
+    assert moves["symbol"].tolist() == ["X"]
+    row = moves.iloc[0]
+    assert row["shares"] == 15
+    assert row["price_change_pct"] == 10.0
+    assert row["dollar_impact"] == 15.0
+    assert row["today_date"] == date(2026, 10, 16)
+
+    admin = split_page_frame(page, None, **KW)["today_moves"]
+    assert sorted(admin["symbol"]) == ["Q", "X"]
+
+
+def test_week_and_fill_date_rows_are_picked_from_the_precomputed_set():
+    page = _page(
+        _row("a", "weekly_trades", week_start="2026-10-05", symbol="OLD"),
+        _row("a", "weekly_trades", week_start="2026-10-12", symbol="NEW"),
+        _row("a", "today_trades", tenant_id="a", trade_date="2026-10-15",
+             underlying_symbol="Z", amount=1.0),
+        _row("a", "today_trades", tenant_id="a", trade_date="2026-10-16",
+             underlying_symbol="Z", amount=5.0),
+        _row("a", "today_trades", tenant_id="a", trade_date="2026-10-16",
+             underlying_symbol="Z", amount=-80.0),
+        _row("a", "today_trades", tenant_id="a", trade_date="2026-10-16",
+             underlying_symbol=None, amount=-3.0),
+    )
+    out = split_page_frame(page, ["a"], **KW)
+    assert out["weekly_trades"]["symbol"].tolist() == ["NEW"]
+    # ORDER BY underlying_symbol, ABS(amount) DESC (NULLs first).
+    assert out["today_trades"]["amount"].tolist() == [-3.0, -80.0, 5.0]
+
+
+def test_calendar_is_summed_from_snapshots_inside_the_window():
+    page = _page(
+        _row("a", "snapshots", account="A", tenant_id="a", date="2026-10-16",
+             account_value=100.0, delta_1d=2.0),
+        _row("b", "snapshots", account="B", tenant_id="b", date="2026-10-16",
+             account_value=50.0, delta_1d=None),
+        _row("a", "snapshots", account="A", tenant_id="a", date="2026-01-02",
+             account_value=90.0, delta_1d=1.0),
+    )
+    cal = split_page_frame(page, ["a", "b"], **KW)["calendar"]
+    assert cal.to_dict("records") == [
+        {"date": date(2026, 10, 16), "account_value": 150.0, "daily_change": 2.0},
+    ]
+
+
+def test_falls_back_when_the_mart_cannot_answer():
+    page = _page(_move("a", "X", 1))
+    assert split_page_frame(page, ["a"], **KW) is not None
+    # Built before today (UTC).
+    assert split_page_frame(page, ["a"], **{**KW, "utc_today": date(2026, 10, 18)}) is None
+    # A tenant connected after the last build.
+    assert split_page_frame(page, ["a", "new"], **KW) is None
+    # Week / fill date outside the precomputed windows.
+    assert split_page_frame(page, ["a"], **{**KW, "this_week": date(2026, 9, 28)}) is None
+    assert split_page_frame(page, ["a"], **{**KW, "trades_as_of": date(2026, 10, 1)}) is None
+    # No build at all.
+    assert split_page_frame(pd.DataFrame([_move("a", "X", 1)]), ["a"], **KW) is None
+    assert split_page_frame(pd.DataFrame(), ["a"], **KW) is None
+
+
+def test_coverage_memo_tracks_build_date_and_tenants():
+    assert not daily_review_page.page_likely_serves(["a"], utc_today=BUILT)
+    daily_review_page.note_page_coverage(_page(_move("a", "X", 1)))
+    assert daily_review_page.page_likely_serves(["a"], utc_today=BUILT)
+    assert daily_review_page.page_likely_serves(None, utc_today=BUILT)
+    # A tenant with no rows yet, and the next UTC day before the build.
+    assert not daily_review_page.page_likely_serves(["a", "new"], utc_today=BUILT)
+    assert not daily_review_page.page_likely_serves(["a"], utc_today=date(2026, 10, 18))
+    # Reads of the same build add up; a failed read forgets everything.
+    daily_review_page.note_page_coverage(_page(_move("b", "X", 1)))
+    assert daily_review_page.page_likely_serves(["a", "b"], utc_today=BUILT)
+    daily_review_page.note_page_coverage(pd.DataFrame())
+    assert not daily_review_page.page_likely_serves(["a"], utc_today=BUILT)
+
+
+def _fetch(monkeypatch, page, **kw):
+    calls = []
+
+    def fake_parallel(client, queries):
+        calls.append(sorted(queries))
+        return {name: page.copy() if name == "page" else pd.DataFrame()
+                for name in queries}
+
+    monkeypatch.setattr(weekly_review, "_bq_parallel", fake_parallel)
+    args = dict(today=KW["today"], this_week=KW["this_week"],
+                trades_as_of=KW["trades_as_of"],
+                extra_queries={"after_hours": "SELECT 1"})
+    args.update(kw)
+    batch = weekly_review.fetch_daily_review_batch(
+        object(), ["a"], "AND tenant_id IN ('a')", **args)
+    return calls, batch
+
+
+def test_fetch_runs_the_live_batch_in_the_first_wave_when_coverage_is_unknown(monkeypatch):
+    monkeypatch.delenv("DAILY_REVIEW_PAGE_MART", raising=False)
+    # The mart was built yesterday (UTC): nothing to serve today.
+    stale = pd.DataFrame([_meta(), _move("a", "X", 1)]).assign(built_on=date(2000, 1, 3))
+    calls, batch = _fetch(monkeypatch, stale)
+    assert len(calls) == 1
+    assert {"page", "after_hours", "snapshots"} <= set(calls[0])
+    assert "after_hours" in batch and "snapshots" in batch and "page" not in batch
+
+
+def test_fetch_reads_only_the_page_once_it_is_known_to_serve(monkeypatch):
+    monkeypatch.delenv("DAILY_REVIEW_PAGE_MART", raising=False)
+    page = pd.DataFrame([_meta(), _move("a", "X", 1)]).assign(
+        built_on=datetime.now(timezone.utc).date())
+    calls, _batch = _fetch(monkeypatch, page)
+    assert "snapshots" in calls[0]  # first read: coverage unknown
+
+    calls, batch = _fetch(monkeypatch, page)
+    assert calls == [["after_hours", "page"]]
+    assert batch["today_moves"]["symbol"].tolist() == ["X"]
+
+    # Known to serve, but not this request (a fill date before the build's
+    # window): the live batch follows in a second wave.
+    calls, batch = _fetch(monkeypatch, page, trades_as_of=date(2026, 10, 1))
+    assert calls[0] == ["after_hours", "page"]
+    assert "snapshots" in calls[1] and "after_hours" not in calls[1]
+
+
+def test_fetch_skips_the_page_when_the_mart_is_switched_off(monkeypatch):
+    monkeypatch.setenv("DAILY_REVIEW_PAGE_MART", "0")
+    calls, _batch = _fetch(monkeypatch, pd.DataFrame())
+    assert len(calls) == 1 and "page" not in calls[0]
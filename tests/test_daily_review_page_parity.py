@@ -0,0 +1,119 @@
+"""The Daily Review page mart must agree with the live batch it replaces.
+
+``mart_daily_review_page`` (dbt/models/marts/mart_daily_review_page.sql)
+re-implements the 16 queries of ``build_daily_review_batch`` per tenant,
+and ``split_page_frame`` finishes them in Python. The two are kept in step
+by hand, so these tests run BOTH paths for the same tenants against live
+BigQuery and compare every section: a change to a live query that is not
+mirrored in the mart fails here instead of showing different numbers
+depending on which path served the page.
+
+They only mean something on the mart's build date (its CURRENT_DATE()
+windows match the live queries only then), so they skip when the mart was
+not built today (UTC). Skipped by default; set RUN_BQ_TESTS=1 to enable.
+"""
+from __future__ import annotations
+
+import datetime as dt
+import decimal
+import os
+
+import pytest
+
+
+_SKIP_REASON = (
+    "Daily Review page mart parity tests against live BigQuery. "
+    "Set RUN_BQ_TESTS=1 to enable."
+)
+
+# Tenants compared per run: the mart's largest few, so the check covers
+# real multi-account holdings without running 16 live queries per tenant.
+_TENANTS = 3
+
+
+@pytest.fixture(scope="module")
+def bq_client():
+    if not os.environ.get("RUN_BQ_TESTS"):
+        pytest.skip(_SKIP_REASON)
+    from google.cloud import bigquery
+
+    return bigquery.Client(project="ccwj-dbt")
+
+
+def _norm(value):
+    """A cell as a comparable scalar: JSON rows carry dates as ISO strings
+    and NUMERICs as floats, live frames carry dates and Decimals."""
+    if value is None or value != value:  # NaN / NaT
+        return None
+    if isinstance(value, (dt.datetime, dt.date)):
+        return value.isoformat()[:10]
+    if isinstance(value, bool):
+        return value
+    if isinstance(value, (int, float, decimal.Decimal)) or (
+        hasattr(value, "dtype") and getattr(value.dtype, "kind", "") in "iuf"
+    ):
+        return round(float(value), 6)
+    return value
+
+
+def _rows(df, columns):
+    return sorted(
+        (tuple(_norm(v) for v in row) for row in df[list(columns)].itertuples(index=False)),
+        key=repr,
+    )
+
+
+def _live(client, batch):
+    frames = {}
+    for name, spec in batch.items():
+        sql, cfg = spec if isinstance(spec, tuple) else (spec, None)
+        frames[name] = client.query(sql, job_config=cfg).to_dataframe()
+    return frames
+
+
+def _built_tenants(client, utc_today):
+    rows = list(client.query(
+        """
+        SELECT tenant_id, COUNT(*) AS n, MAX(built_on) AS built_on
+        FROM `ccwj-dbt.analytics.mart_daily_review_page`
+        WHERE tenant_id != '*'
+        GROUP BY 1
+        ORDER BY n DESC
+        """
+    ).result())
+    if not rows or any(r["built_on"] != utc_today for r in rows):
+        pytest.skip("mart_daily_review_page was not built today (UTC)")
+    return [r["tenant_id"] for r in rows[:_TENANTS]]
+
+
+@pytest.mark.skipif(not os.environ.get("RUN_BQ_TESTS"), reason=_SKIP_REASON)
+def test_page_mart_sections_match_the_live_batch(bq_client):
+    from app import weekly_review
+    from app.daily_review_page import PAGE_QUERY, split_page_frame
+
+    today = dt.datetime.now(dt.timezone.utc).date()
+    this_week = weekly_review._iso_week_start(today)
+    cal_start, cal_end = weekly_review._daily_calendar_window(this_week)
+
+    mismatched = []
+    for tenant in _built_tenants(bq_client, today):
+        tenant_filter = weekly_review._tenant_sql_and([tenant])
+        page_df = bq_client.query(
+            PAGE_QUERY.format(tenant_filter=tenant_filter)).to_dataframe()
+        served = split_page_frame(
+            page_df, [tenant], today=today, this_week=this_week,
+            trades_as_of=today, cal_start=cal_start, cal_end=cal_end,
+            utc_today=today,
+        )
+        assert served is not None, f"mart cannot serve {tenant} on its build date"
+        live = _live(bq_client, weekly_review.build_daily_review_batch(
+            tenant_filter, today, this_week, trades_as_of=today))
+        assert set(served) == set(live)
+        for section, expected in live.items():
+            got = served[section]
+            if set(got.columns) != set(expected.columns):
+                mismatched.append((tenant, section, "columns",
+                                   sorted(set(got.columns) ^ set(expected.columns))))
+            elif _rows(got, expected.columns) != _rows(expected, expected.columns):
+                mismatched.append((tenant, section, "rows", len(got), len(expected)))
+    assert not mismatched, mismatched
@@ -0,0 +1,234 @@
+"""Postgres connection reuse in app/db.py: the opt-in pool and the
+request-scoped connection.
+
+The old ``psycopg_pool`` wedged behind Render's idle-session killer: its
+background refill thread kept failing and ``pool.connection()`` blocked into
+``PoolTimeout`` while Postgres was healthy. The replacement has no thread,
+validates every checkout, retires connections past a max idle age and never
+blocks — these tests pin those properties against fake connections.
+
+Inside a Flask request the helpers share one lazily-opened connection, closed
+in teardown; worker threads and non-request callers keep per-call ones.
+"""
+
+import threading
+
+import psycopg
+import pytest
+from flask import Flask
+
+from app import db, query_cache
+
+
+class _FakeCursor:
+    def __init__(self, conn):
+        self._conn = conn
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, sql, params=()):
+        if self._conn.dead:
+            self._conn.broken = True
+            raise psycopg.OperationalError("server closed the connection")
+        self._conn.executed.append(sql)
+        self._conn.info.transaction_status = psycopg.pq.TransactionStatus.INTRANS
+
+    def fetchone(self):
+        return {"v": 1}
+
+    def fetchall(self):
+        return [{"v": 1}]
+
+
+class _Info:
+    transaction_status = psycopg.pq.TransactionStatus.IDLE
+
+
+class _FakeConn:
+    def __init__(self, n):
+        self.n = n
+        self.closed = False
+        self.broken = False
+        self.dead = False
+        self.executed = []
+        self.commits = 0
+        self.info = _Info()
+
+    def cursor(self):
+        return _FakeCursor(self)
+
+    def commit(self):
+        self.commits += 1
+        self.info.transaction_status = psycopg.pq.TransactionStatus.IDLE
+
+    def rollback(self):
+        self.info.transaction_status = psycopg.pq.TransactionStatus.IDLE
+
+    def close(self):
+        self.closed = True
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, *exc):
+        (self.rollback if exc_type else self.commit)()
+        self.close()
+        return False
+
+
+@pytest.fixture
+def conns(monkeypatch):
+    opened = []
+
+    def fake_connect():
+        conn = _FakeConn(len(opened))
+        opened.append(conn)
+        return conn
+
+    monkeypatch.setattr(db, "_connect", fake_connect)
+    monkeypatch.setattr(db, "_POOL", None)
+    return opened
+
+
+@pytest.fixture
+def pooled(monkeypatch, conns):
+    monkeypatch.setenv("DATABASE_POOL", "1")
+    monkeypatch.setenv("DATABASE_POOL_SIZE", "2")
+    return conns
+
+
+def test_pool_off_by_default_opens_and_closes_each_call(monkeypatch, conns):
+    monkeypatch.delenv("DATABASE_POOL", raising=False)
+    db.fetch_one("SELECT 1")
+    db.fetch_one("SELECT 1")
+    assert len(conns) == 2
+    assert all(c.closed for c in conns)
+
+
+def test_pooled_calls_reuse_one_connection(pooled):
+    stats = query_cache.start_request_stats()
+    db.fetch_one("SELECT a")
+    db.execute("UPDATE t SET x = 1")
+    db.fetch_all("SELECT b")
+    assert len(pooled) == 1
+    assert not pooled[0].closed
+    assert pooled[0].commits >= 3
+    assert (stats.pg_hits, stats.pg_miss) == (2, 1)
+    assert "pghit=2 pgmiss=1" in query_cache.format_stats(stats)
+
+
+def test_dead_idle_connection_is_replaced_on_checkout(pooled):
+    db.fetch_one("SELECT 1")
+    pooled[0].dead = True  # Render killed the idle session
+    assert db.fetch_one("SELECT 1") == {"v": 1}
+    assert len(pooled) == 2
+    assert pooled[0].closed
+
+
+def test_connection_past_max_idle_is_retired(pooled, monkeypatch):
+    monkeypatch.setenv("DATABASE_POOL_MAX_IDLE", "0")
+    db.fetch_one("SELECT 1")
+    db.fetch_one("SELECT 1")
+    assert len(pooled) == 2
+    assert pooled[0].closed and pooled[0].executed == ["SELECT 1"]
+
+
+def test_failed_statement_rolls_back_and_keeps_healthy_connection(pooled):
+    with pytest.raises(ValueError):
+        with db.get_conn() as conn:
+            with conn.cursor() as cur:
+                cur.execute("INSERT INTO t VALUES (1)")
+            raise ValueError("boom")
+    assert pooled[0].commits == 0
+    db.fetch_one("SELECT 1")
+    assert len(pooled) == 1
+
+
+def test_checkout_never_blocks_beyond_idle_cap(pooled):
+    pool = db._get_pool()
+    held = [pool.checkout() for _ in range(4)]
+    assert len(pooled) == 4
+    for conn in held:
+        pool.checkin(conn)
+    # Only DATABASE_POOL_SIZE stay idle; the rest are closed.
+    assert sum(c.closed for c in held) == 2
+
+
+def test_pool_rebuilt_after_fork(pooled, monkeypatch):
+    pool = db._get_pool()
+    monkeypatch.setattr(db.os, "getpid", lambda: pool.pid + 1)
+    assert db._get_pool() is not pool
+
+
+# ---------------------------------------------------------------------------
+# Request-scoped connection
+# ---------------------------------------------------------------------------
+
+@pytest.fixture
+def request_scope(monkeypatch, conns):
+    monkeypatch.delenv("DATABASE_POOL", raising=False)
+    app = Flask(__name__)
+    with app.test_request_context("/"):
+        db.begin_request_scope()
+        yield conns
+        db.end_request_scope()
+
+
+def test_helpers_share_one_connection_per_request(request_scope):
+    stats = query_cache.start_request_stats()
+    db.fetch_one("SELECT a")
+    db.execute("UPDATE t SET x = 1")
+    db.execute_returning("INSERT INTO t VALUES (1) RETURNING id")
+    assert len(request_scope) == 1
+    assert request_scope[0].commits == 3
+    assert not request_scope[0].closed
+    db.end_request_scope()
+    assert request_scope[0].closed
+    assert stats.pg_ms > 0
+    assert "pg_conns=" in query_cache.format_stats(stats)
+
+
+def test_nothing_opened_until_first_helper_call(request_scope):
+    assert request_scope == []
+
+
+def test_transient_error_retries_on_fresh_connection(request_scope, monkeypatch):
+    monkeypatch.setattr(db.time, "sleep", lambda s: None)
+    db.fetch_one("SELECT 1")
+    request_scope[0].dead = True
+    assert db.fetch_one("SELECT 1") == {"v": 1}
+    assert len(request_scope) == 2
+    assert request_scope[0].closed
+    db.fetch_one("SELECT 1")
+    assert len(request_scope) == 2  # the replacement is shared from now on
+
+
+def test_worker_threads_keep_per_call_connections(request_scope):
+    import contextvars
+
+    ctx = contextvars.copy_context()
+    t = threading.Thread(target=ctx.run, args=(db.fetch_one, "SELECT 1"))
+    t.start()
+    t.join()
+    assert len(request_scope) == 1 and request_scope[0].closed
+    db.fetch_one("SELECT 1")
+    assert len(request_scope) == 2 and not request_scope[1].closed
+
+
+def test_explicit_get_conn_keeps_its_own_transaction(request_scope):
+    db.fetch_one("SELECT 1")
+    with db.get_conn() as conn:
+        assert conn is not request_scope[0]
+    assert len(request_scope) == 2
+
+
+def test_request_connection_returns_to_pool_in_teardown(request_scope, monkeypatch):
+    monkeypatch.setenv("DATABASE_POOL", "1")
+    db.fetch_one("SELECT 1")
+    db.end_request_scope()
+    assert not request_scope[0].closed
+    assert db._get_pool()._idle[0][0] is request_scope[0]
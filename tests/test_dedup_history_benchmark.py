@@ -0,0 +1,96 @@
+"""Benchmark for the history dedup (``app.upload._dedup_history_rows``).
+
+Times the strict full-key pass and the cross-source pass separately on a
+synthetic 200k-row history — the size of a full-history first sync for a
+busy account, and of every merge once the table has grown — and checks
+the passes collapse exactly the duplicates planted in it.
+
+Opt-in: set ``RUN_BENCHMARKS=1``. Timings print with ``-s``; the budget is
+loose enough for a shared CI runner and only catches a regression back to
+per-cell Python work.
+"""
+
+import os
+import time
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from app import upload as _upload
+
+
+_SKIP_REASON = "Set RUN_BENCHMARKS=1 to run the dedup benchmark."
+
+_ROWS = 200_000
+_BUDGET_SECONDS = 20.0
+
+pytestmark = pytest.mark.skipif(
+    not os.environ.get("RUN_BENCHMARKS"), reason=_SKIP_REASON,
+)
+
+
+def _synthetic_history(n_rows, seed=7):
+    """``n_rows`` distinct fills, then planted duplicates:
+
+    - 5% float-drift copies (``100`` → ``100.0000000001``) — strict pass;
+    - 5% orders-feed copies (thin Description, 6dp Price, no fees) —
+      cross-source pass;
+    - 2% blank-Symbol fee lines that share a day and differ only by
+      Amount — must survive both passes.
+    """
+    rng = np.random.default_rng(seed)
+    symbols = np.array([f"SYM{i:03d}" for i in range(400)])
+    dates = pd.date_range("2019-01-01", periods=1800).strftime("%m/%d/%Y")
+    n = n_rows
+    qty = rng.integers(1, 500, n).astype(float)
+    price = np.round(rng.uniform(1, 900, n), 4) + np.arange(n) * 1e-4
+    sym = symbols[rng.integers(0, len(symbols), n)]
+    base = pd.DataFrame({
+        "Account": "Bench Account",
+        "user_id": "1",
+        "tenant_id": "snaptrade:bench",
+        "Date": np.asarray(dates)[rng.integers(0, len(dates), n)],
+        "Action": np.where(rng.random(n) < 0.5, "Buy", "Sell"),
+        "Symbol": sym,
+        "Description": np.char.add("Bought shares of ", sym),
+        "Quantity": qty,
+        "Price": price,
+        "fees_and_comm": "",
+        "Amount": np.round(-qty * price, 2),
+    })
+
+    k = n // 20
+    drift = base.sample(k, random_state=1).copy()
+    drift["Quantity"] = drift["Quantity"] + 1e-10
+    orders = base.sample(k, random_state=2).copy()
+    orders["Description"] = orders["Symbol"]
+    orders["Price"] = orders["Price"] + 3e-6
+    fees = base.head(n // 50).copy()
+    fees["Symbol"] = ""
+    fees["Price"] = ""
+    fees["Quantity"] = ""
+    fees["Description"] = "ADR FEE"
+    fees["Amount"] = -np.arange(1, len(fees) + 1) / 100.0
+    fees["Date"] = "01/02/2019"
+    df = pd.concat([base, orders, drift, fees], ignore_index=True)
+    return df[_upload.HISTORY_SEED_COLUMNS], n + len(fees)
+
+
+def test_dedup_history_passes_on_200k_rows():
+    df, expected = _synthetic_history(_ROWS)
+    cols = _upload.HISTORY_SEED_COLUMNS
+
+    t0 = time.perf_counter()
+    strict = _upload._dedup_history_strict(df, cols)
+    t1 = time.perf_counter()
+    out = _upload._dedup_history_cross_source(strict, cols)
+    t2 = time.perf_counter()
+
+    print(
+        f"\ndedup {len(df):,} rows → {len(out):,}: "
+        f"strict {t1 - t0:.2f}s, cross-source {t2 - t1:.2f}s"
+    )
+    assert len(out) == expected
+    assert (out["Description"] == "ADR FEE").sum() == _ROWS // 50
+    assert t2 - t0 < _BUDGET_SECONDS
@@ -0,0 +1,138 @@
+"""Page builders must accept frames served by the query cache.
+
+Cache hits hand out shallow copies of READ-ONLY arrays (app/query_cache.py,
+"Shared read-only frames"). The cache is off under pytest, so these tests
+turn it on and feed each builder a frame that came back as a cache hit:
+an in-place write (``.loc[:, col] =``, ``.at``, ``.loc[mask, col] =``)
+into one fails here instead of on the first warm page view.
+"""
+import warnings
+from datetime import date
+from types import SimpleNamespace
+
+import pandas as pd
+import pytest
+
+from app import query_cache
+from app.daily_review_page import split_page_frame
+from app.strategy_fit import _build_strategy_fit_matrix, _normalize_fit_columns
+from app.weekly_review import (
+    _build_account_breakdown,
+    _build_position_breakdown,
+    _build_today_movers,
+)
+
+from tests.test_daily_review_page import KW, _move, _page
+
+
+class _Client:
+    def __init__(self, df):
+        self.df = df
+        self.calls = 0
+
+    def query(self, sql, job_config=None, **kwargs):
+        self.calls += 1
+        return SimpleNamespace(to_dataframe=lambda: self.df.copy())
+
+
+@pytest.fixture
+def frozen(monkeypatch):
+    """Return ``df`` the way a warm cache serves it: read-only arrays."""
+    monkeypatch.setenv("QUERY_CACHE_ENABLED", "1")
+    monkeypatch.delenv("QUERY_CACHE_SHARED_FRAMES", raising=False)
+    query_cache.clear()
+    counter = iter(range(1_000_000))
+
+    def serve(df):
+        client = _Client(df)
+        sql = f"SELECT {next(counter)} FROM t WHERE tenant_id IN ('t:a')"
+        query_cache.cached_query_df(client, sql)
+        hit = query_cache.cached_query_df(client, sql)
+        assert client.calls == 1
+        assert not any(a.flags.writeable for a in query_cache._frame_arrays(hit))
+        return hit
+
+    with warnings.catch_warnings():
+        # pandas' warning for a ``.loc`` write that can't happen in place.
+        warnings.filterwarnings("error", message=".*incompatible dtype")
+        yield serve
+    query_cache.clear()
+
+
+def _attribution_row(**kw):
+    row = {
+        "account": "main", "user_id": 1, "symbol": "JEPI",
+        "equity_pnl": 1000.0, "option_pnl": 0.0, "dividend_income": 250.0,
+        "net_pnl": 1250.0,
+        "equity_capital": 10000.0, "option_capital_paid": 0.0,
+        "option_premium_collected": 0.0,
+        "current_equity_cost": 10000.0, "current_equity_value": 11000.0,
+        "current_option_value": 0.0, "current_equity_unrealized": 1000.0,
+        "current_option_unrealized": 0.0,
+        "current_equity_shares": 100, "num_equity_legs": 1, "num_option_legs": 0,
+        "num_open_groups": 1, "num_closed_groups": 0,
+        "current_price": 110.0,
+        "first_open_date": date(2025, 5, 1),
+        "last_activity_date": date(2026, 5, 1),
+        "days_held": 365,
+        "status": "Open",
+        "sector": "Financial Services", "subsector": "Asset Management",
+        "company_name": "JPMorgan Equity Premium Income",
+        "last_dividend_date": date(2026, 4, 15),
+        "dividend_count": 12,
+    }
+    row.update(kw)
+    return row
+
+
+def test_strategy_fit_normalizes_a_cached_frame(frozen):
+    raw = pd.DataFrame({
+        "account": ["main", "main", "main"],
+        "symbol": ["A", "B", "C"],
+        "strategy": ["Wheel", None, " "],
+        "sector": ["Tech", "Energy", None],
+        "total_pnl": ["10.5", None, "x"],
+        "realized_pnl": [1, 2, None],
+        "unrealized_pnl": [0.0, 0.0, 0.0],
+        "num_individual_trades": [1, 1, 1],
+        "num_winners": [1, 0, 0],
+        "num_losers": [0, 1, 0],
+    })
+    df = _normalize_fit_columns(
+        frozen(raw),
+        ("total_pnl", "realized_pnl", "unrealized_pnl",
+         "num_individual_trades", "num_winners", "num_losers"),
+        ("sector", "strategy"),
+    )
+    assert df["total_pnl"].tolist() == [10.5, 0.0, 0.0]
+    assert df["strategy"].tolist() == ["Wheel", "Unknown", "Unknown"]
+    assert df["sector"].tolist() == ["Tech", "Energy", "Unknown"]
+    matrix = _build_strategy_fit_matrix(df, col_field="sector")
+    assert matrix
+
+
+def test_daily_review_builders_accept_cached_frames(frozen):
+    raw = pd.DataFrame([
+        _attribution_row(),
+        _attribution_row(account="ira", symbol="MSFT", status="Closed",
+                         current_equity_shares=0, num_open_groups=0,
+                         num_closed_groups=1, net_pnl=-40.0),
+    ])
+    expected = _build_position_breakdown(raw.copy(), {"JEPI": "Dividend"})
+    assert _build_position_breakdown(frozen(raw), {"JEPI": "Dividend"}) == expected
+    assert _build_account_breakdown(frozen(raw)) == _build_account_breakdown(raw.copy())
+
+    moves = pd.DataFrame({
+        "symbol": ["X", "Y"], "shares": [10, 5],
+        "today_close": [11.0, 9.0], "prev_close": [10.0, 10.0],
+        "price_change": [1.0, -1.0], "price_change_pct": [10.0, -10.0],
+        "dollar_impact": [10.0, -5.0], "current_value": [110.0, 45.0],
+        "today_date": [date(2026, 10, 16)] * 2, "prev_date": [date(2026, 10, 15)] * 2,
+    })
+    assert _build_today_movers(frozen(moves)) == _build_today_movers(moves.copy())
+
+
+def test_page_mart_splits_a_cached_frame(frozen):
+    page = _page(_move("a", "X", 10), _move("b", "X", 5))
+    out = split_page_frame(frozen(page), ["a", "b"], **KW)
+    assert out["today_moves"]["shares"].tolist() == [15]
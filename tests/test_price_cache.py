@@ -0,0 +1,190 @@
+"""Local Parquet cache for the yfinance price loader.
+
+WHY: every run re-downloaded each symbol's full history from Yahoo. With
+``PRICE_CACHE_DIR`` set, a cached symbol is resumed from its last cached
+session (minus the overlap), a split in that tail forces a full re-fetch, and
+candidates that returned nothing are skipped for a while — but only once the
+run has passed the coverage guard. These tests pin which windows hit Yahoo.
+"""
+
+import datetime as dt
+
+import pandas as pd
+import pytest
+
+import current_position_stock_price as cpsp
+
+
+DAYS = pd.bdate_range("2025-01-02", "2025-03-31", tz="America/New_York")
+
+
+class _FakeTicker:
+    def __init__(self, sym, state):
+        self._sym = sym
+        self._state = state
+
+    @property
+    def splits(self):
+        self._state["splits_calls"].append(self._sym)
+        return self._state["splits"].get(self._sym, pd.Series(dtype=float))
+
+    def history(self, start, end):
+        self._state["starts"].append((self._sym, start))
+        if self._sym in self._state["empty"]:
+            return pd.DataFrame()
+        idx = DAYS[(DAYS.date >= dt.date.fromisoformat(start))
+                   & (DAYS.date < dt.date.fromisoformat(end))]
+        closes = [self._state["close"]] * len(idx)
+        h = pd.DataFrame(
+            {"Close": closes, "Dividends": [0.0] * len(idx),
+             "Stock Splits": [0.0] * len(idx)},
+            index=pd.DatetimeIndex(idx, name="Date"),
+        )
+        for ts, ratio in self._state["splits"].get(self._sym, {}).items():
+            h.loc[h.index.date == ts.date(), "Stock Splits"] = ratio
+        return h
+
+
+@pytest.fixture()
+def yahoo(monkeypatch):
+    state = {"starts": [], "splits_calls": [], "splits": {}, "empty": set(),
+             "close": 100.0}
+    monkeypatch.setattr(
+        "current_position_stock_price.yf.Ticker", lambda sym: _FakeTicker(sym, state),
+    )
+    return state
+
+
+def _fetch(cache, end="2025-03-01", start="2025-01-02", symbol="AAPL"):
+    plan = pd.DataFrame({"symbol": [symbol], "start_date": [dt.date.fromisoformat(start)]})
+    return cpsp._fetch_all_symbols(plan, end, frozenset(), cache=cache)
+
+
+def test_cached_symbol_fetches_only_the_tail(tmp_path, yahoo):
+    cache = cpsp._PriceCache(str(tmp_path))
+    _fetch(cache, end="2025-02-01")
+    yahoo["starts"].clear()
+    yahoo["splits_calls"].clear()
+    yahoo["close"] = 101.0
+
+    prices, splits, ok, _ = _fetch(cpsp._PriceCache(str(tmp_path)), end="2025-03-01")
+    # Last cached session 2025-01-31, minus the 5-day overlap.
+    assert yahoo["starts"] == [("AAPL", "2025-01-26")]
+    assert yahoo["splits_calls"] == []
+    assert ok == {"AAPL"} and splits == {}
+    closes = prices["AAPL"].set_index(prices["AAPL"]["date"].dt.date)["close_price"]
+    assert closes[dt.date(2025, 1, 2)] == 100.0
+    assert closes[dt.date(2025, 1, 27)] == 101.0  # overlap re-fetched
+    assert closes.index.max() == dt.date(2025, 2, 28)
+    assert closes.index.is_unique
+
+
+def test_earlier_start_than_cached_refetches_in_full(tmp_path, yahoo):
+    cache = cpsp._PriceCache(str(tmp_path))
+    _fetch(cache, start="2025-02-03")
+    yahoo["starts"].clear()
+    _fetch(cache, start="2025-01-02")
+    assert yahoo["starts"] == [("AAPL", "2025-01-02")]
+
+
+def test_stale_entry_tail_starts_at_cached_end_not_window_start(tmp_path, yahoo):
+    # Entry restored from an older actions/cache snapshot: it ends 2025-01-31
+    # but the table's watermark already asks for 2025-02-20 onwards.
+    cache = cpsp._PriceCache(str(tmp_path))
+    _fetch(cache, end="2025-02-01")
+    yahoo["starts"].clear()
+
+    prices, *_ = _fetch(cache, start="2025-02-20", end="2025-03-01")
+    assert yahoo["starts"] == [("AAPL", "2025-01-26")]
+    assert prices["AAPL"]["date"].dt.date.min() == dt.date(2025, 2, 20)
+    # The rewritten entry has no hole between its old end and the window.
+    cached, *_ = cache.read("AAPL")
+    days = set(cached["date"].dt.date)
+    assert {d.date() for d in DAYS if d.date() < dt.date(2025, 3, 1)} <= days
+
+
+def test_empty_incremental_window_is_not_negatively_cached(tmp_path, yahoo):
+    yahoo["empty"].add("HALT")
+    cache = cpsp._PriceCache(str(tmp_path), today=dt.date(2025, 3, 1))
+    plan = pd.DataFrame({"symbol": ["HALT"], "start_date": [dt.date(2025, 2, 24)]})
+    first = pd.Series({"HALT": dt.date(2025, 1, 2)})
+    *_, failed = cpsp._fetch_all_symbols(
+        plan, "2025-03-01", frozenset(), cache=cache, first_dates=first,
+    )
+    assert failed == {"HALT"} and cache.known_empty("HALT") is False
+
+    full = pd.DataFrame({"symbol": ["HALT"], "start_date": [dt.date(2025, 1, 2)]})
+    cpsp._fetch_all_symbols(full, "2025-03-01", frozenset(), cache=cache, first_dates=first)
+    assert cache.known_empty("HALT") is True
+
+
+def test_split_in_tail_forces_full_fetch(tmp_path, yahoo):
+    cache = cpsp._PriceCache(str(tmp_path))
+    _fetch(cache, end="2025-02-01")
+    yahoo["starts"].clear()
+    yahoo["splits"]["AAPL"] = pd.Series(
+        [2.0], index=pd.DatetimeIndex([pd.Timestamp("2025-02-10 09:30")]),
+    )
+    prices, splits, *_ = _fetch(cache, end="2025-03-01")
+    assert yahoo["starts"] == [("AAPL", "2025-01-26"), ("AAPL", "2025-01-02")]
+    assert splits == {("AAPL", dt.date(2025, 2, 10)): 2.0}
+    closes = prices["AAPL"].set_index(prices["AAPL"]["date"].dt.date)["close_price"]
+    assert closes[dt.date(2025, 2, 7)] == 200.0
+    assert closes[dt.date(2025, 2, 10)] == 100.0
+    # The rewritten entry carries the split, so the next tail is served.
+    yahoo["starts"].clear()
+    _fetch(cache, end="2025-03-01")
+    assert yahoo["starts"] == [("AAPL", "2025-02-23")]
+
+
+def test_negative_cache_skips_empty_candidates_until_ttl(tmp_path, yahoo):
+    yahoo["empty"].add("GONE")
+    cache = cpsp._PriceCache(str(tmp_path), today=dt.date(2025, 3, 1))
+    *_, failed = _fetch(cache, symbol="GONE")
+    assert yahoo["starts"] == [("GONE", "2025-01-02")] and failed == {"GONE"}
+    cache.flush_negative()
+
+    yahoo["starts"].clear()
+    later = cpsp._PriceCache(
+        str(tmp_path), negative_ttl_days=7, today=dt.date(2025, 3, 5),
+    )
+    *_, failed = _fetch(later, symbol="GONE")
+    assert yahoo["starts"] == [] and failed == {"GONE"}
+
+    expired = cpsp._PriceCache(
+        str(tmp_path), negative_ttl_days=7, today=dt.date(2025, 3, 9),
+    )
+    _fetch(expired, symbol="GONE")
+    assert yahoo["starts"] == [("GONE", "2025-01-02")]
+
+
+def test_negative_cache_not_persisted_when_guard_trips(tmp_path, yahoo, monkeypatch):
+    # Feed outage: every candidate comes back empty.
+    yahoo["empty"].update({"SPY", "QQQ", "AAPL"})
+    monkeypatch.setenv("PRICE_CACHE_DIR", str(tmp_path))
+
+    class _Rows:
+        def result(self):
+            return [{"account": "A", "user_id": 1, "symbol": "AAPL",
+                     "position_open_date": dt.date(2025, 1, 2)}]
+
+    class _Client:
+        def query(self, sql):
+            assert "stg_history" in sql, "guard should exit before any other read"
+            return _Rows()
+
+    monkeypatch.setattr(cpsp.bigquery, "Client", lambda: _Client())
+    monkeypatch.setattr(cpsp, "_load_crypto_symbols", lambda: frozenset())
+    with pytest.raises(SystemExit):
+        cpsp._main(full_refresh=True)
+    assert not (tmp_path / cpsp._NEGATIVE_FILE).exists()
+    assert cpsp._PriceCache(str(tmp_path)).known_empty("SPY") is False
+
+
+def test_cache_disabled_unless_dir_configured(monkeypatch, tmp_path):
+    monkeypatch.delenv("PRICE_CACHE_DIR", raising=False)
+    assert cpsp._PriceCache.from_env() is None
+    monkeypatch.setenv("PRICE_CACHE_DIR", "off")
+    assert cpsp._PriceCache.from_env() is None
+    monkeypatch.setenv("PRICE_CACHE_DIR", str(tmp_path / "yf"))
+    assert cpsp._PriceCache.from_env().root == str(tmp_path / "yf")
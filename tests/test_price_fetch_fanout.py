@@ -0,0 +1,159 @@
+"""Symbol-grain fetch + tenant fan-out for the yfinance price loader.
+
+WHY: the loader used to download every (account, user_id, symbol) row
+serially, so a symbol held by 40 tenants was fetched 40 times and the
+nightly price job's wall time scaled with tenant × symbol pairs. It now
+fetches each distinct symbol once (from the earliest open date any tenant
+has) and joins the closes back onto the tenant rows. These tests pin that
+the fan-out still gives every tenant exactly the rows the per-row loop did.
+"""
+
+import datetime as dt
+import threading
+
+import pandas as pd
+
+import current_position_stock_price as cpsp
+
+
+class _FakeTicker:
+    def __init__(self, hist, splits=None):
+        self._hist = hist
+        self.splits = splits if splits is not None else pd.Series(dtype=float)
+
+    def history(self, start, end):
+        return self._hist.loc[self._hist.index >= pd.Timestamp(start)].copy()
+
+
+def _hist(days, closes):
+    return pd.DataFrame(
+        {"Close": closes, "Dividends": [0.0] * len(closes)},
+        index=pd.DatetimeIndex(pd.to_datetime(days), name="Date"),
+    )
+
+
+def _positions(rows):
+    return pd.DataFrame(
+        rows, columns=["account", "user_id", "symbol", "position_open_date"],
+    )
+
+
+def _install(monkeypatch, histories, calls):
+    lock = threading.Lock()
+
+    def fake_ticker(sym):
+        with lock:
+            calls.append(sym)
+        if sym not in histories:
+            return _FakeTicker(pd.DataFrame())
+        return histories[sym]
+
+    monkeypatch.setattr("current_position_stock_price.yf.Ticker", fake_ticker)
+
+
+DAYS = ["2025-01-02", "2025-01-03", "2025-01-06", "2025-01-07"]
+
+
+def test_symbol_held_by_many_tenants_is_fetched_once(monkeypatch):
+    calls = []
+    _install(monkeypatch, {"AAPL": _FakeTicker(_hist(DAYS, [1.0, 2.0, 3.0, 4.0]))}, calls)
+    positions = _positions([
+        (f"Acct {i}", i, "AAPL", dt.date(2025, 1, 2 + (i % 3))) for i in range(40)
+    ])
+    plan = cpsp._symbol_fetch_plan(positions)
+    assert list(plan["symbol"]) == ["AAPL"]
+    assert plan["start_date"].iloc[0] == dt.date(2025, 1, 2)
+
+    prices, _splits, ok, failed = cpsp._fetch_all_symbols(
+        plan, "2025-01-08", frozenset(), max_workers=4,
+    )
+    assert calls == ["AAPL"]
+    assert ok == {"AAPL"} and failed == set()
+
+
+def test_fan_out_keeps_each_tenant_from_its_own_open_date(monkeypatch):
+    _install(monkeypatch, {
+        "AAPL": _FakeTicker(_hist(DAYS, [1.0, 2.0, 3.0, 4.0])),
+        "MSFT": _FakeTicker(_hist(DAYS, [10.0, 20.0, 30.0, 40.0])),
+    }, [])
+    positions = _positions([
+        ("A", 1, "AAPL", dt.date(2025, 1, 2)),
+        ("B", 2, "AAPL", dt.date(2025, 1, 6)),
+        ("B", 2, "MSFT", dt.date(2025, 1, 7)),
+    ])
+    prices, *_ = cpsp._fetch_all_symbols(
+        cpsp._symbol_fetch_plan(positions), "2025-01-08", frozenset(),
+    )
+    out = cpsp._fan_out_prices(positions, prices)
+    by_key = out.groupby(["account", "symbol"])["close_price"].apply(list).to_dict()
+    assert by_key == {
+        ("A", "AAPL"): [1.0, 2.0, 3.0, 4.0],
+        ("B", "AAPL"): [3.0, 4.0],
+        ("B", "MSFT"): [40.0],
+    }
+    assert list(out.columns) == [
+        "account", "user_id", "symbol", "date", "close_price", "dividend",
+    ]
+
+
+def test_failed_symbols_are_reported_not_fatal(monkeypatch):
+    def boom(start, end):
+        raise RuntimeError("rate limited")
+
+    broken = _FakeTicker(pd.DataFrame())
+    broken.history = boom
+    _install(monkeypatch, {
+        "SPY": _FakeTicker(_hist(DAYS, [500.0, 501.0, 502.0, 503.0])),
+        "BAD": broken,
+    }, [])
+    positions = _positions([
+        ("A", 1, "SPY", dt.date(2025, 1, 2)),
+        ("A", 1, "BAD", dt.date(2025, 1, 2)),
+        ("A", 1, "GONE", dt.date(2025, 1, 2)),
+    ])
+    prices, _splits, ok, failed = cpsp._fetch_all_symbols(
+        cpsp._symbol_fetch_plan(positions), "2025-01-08", frozenset(),
+    )
+    assert ok == {"SPY"}
+    assert failed == {"BAD", "GONE"}
+    assert set(prices) == {"SPY"}
+
+
+def test_split_undo_and_ledger_are_symbol_grain(monkeypatch):
+    splits = pd.Series(
+        [2.0], index=pd.DatetimeIndex([pd.Timestamp("2025-01-06 09:30")]),
+    )
+    _install(monkeypatch, {
+        "XLU": _FakeTicker(_hist(DAYS, [40.0, 41.0, 42.0, 43.0]), splits),
+    }, [])
+    positions = _positions([
+        ("A", 1, "XLU", dt.date(2025, 1, 2)),
+        ("B", 2, "XLU", dt.date(2025, 1, 2)),
+    ])
+    prices, splits_seen, *_ = cpsp._fetch_all_symbols(
+        cpsp._symbol_fetch_plan(positions), "2025-01-08", frozenset(),
+    )
+    assert splits_seen == {("XLU", dt.date(2025, 1, 6)): 2.0}
+    # Pre-split-date closes un-adjusted once; the split day is post-split.
+    assert list(prices["XLU"]["close_price"]) == [80.0, 82.0, 42.0, 43.0]
+
+
+def test_benchmark_rows_added_per_tenant_unless_held():
+    positions = _positions([
+        ("A", 1, "SPY", dt.date(2020, 5, 1)),
+        ("A", 1, "AAPL", dt.date(2020, 5, 1)),
+        ("B", 2, "MSFT", dt.date(2021, 1, 4)),
+    ])
+    start = dt.date(2025, 1, 1)
+    out = cpsp._with_benchmark_rows(positions, start)
+    added = out.iloc[len(positions):]
+    assert sorted(zip(added["account"], added["symbol"])) == [
+        ("A", "QQQ"), ("B", "QQQ"), ("B", "SPY"),
+    ]
+    assert (added["position_open_date"] == start).all()
+
+
+def test_benchmark_rows_without_positions_use_placeholder_tenant():
+    out = cpsp._with_benchmark_rows(_positions([]), dt.date(2025, 1, 1))
+    assert list(out["account"]) == ["_benchmark", "_benchmark"]
+    assert list(out["symbol"]) == ["SPY", "QQQ"]
@@ -0,0 +1,228 @@
+"""Incremental mode of the yfinance price loader.
+
+WHY: every run used to re-download each symbol's full history and
+WRITE_TRUNCATE both price tables. The default run now resumes each symbol
+from its stored watermark (minus a small overlap for corrections) and swaps
+just that window in with one BigQuery transaction; a full refresh stays
+available behind ``--full-refresh`` and is forced per symbol when its split
+list changes. These tests drive ``_main`` against a fake BigQuery client and
+a fake yfinance, so they pin which windows are fetched and written without
+touching the network.
+"""
+
+import datetime as dt
+
+import pandas as pd
+import pytest
+from google.api_core.exceptions import NotFound
+
+import current_position_stock_price as cpsp
+
+
+DAYS = pd.bdate_range("2025-01-02", "2026-12-31")
+
+
+class _Rows:
+    def __init__(self, rows):
+        self._rows = rows
+
+    def result(self):
+        return [dict(r) for r in self._rows]
+
+
+class _Job:
+    def result(self):
+        return None
+
+
+class _FakeBQ:
+    """Answers the loader's three reads and records loads/DML/drops."""
+
+    def __init__(self, positions, watermarks=None, ledger=None):
+        self.positions = positions
+        self.watermarks = watermarks
+        self.ledger = ledger
+        self.loads = {}
+        self.dml = []
+        self.deleted = []
+
+    def query(self, sql):
+        if "stg_history" in sql:
+            return _Rows(self.positions)
+        if "BEGIN TRANSACTION" in sql:
+            self.dml.append(sql)
+            return _Job()
+        if "MAX(date)" in sql:
+            if self.watermarks is None:
+                raise NotFound("daily_position_performance")
+            return _Rows(self.watermarks)
+        if "split_ratio" in sql:
+            if self.ledger is None:
+                raise NotFound("daily_split_events")
+            return _Rows(self.ledger)
+        raise AssertionError(f"unexpected query: {sql}")
+
+    def load_table_from_dataframe(self, df, table_id, job_config=None):
+        self.loads[table_id] = (df.copy(), job_config.write_disposition)
+        return _Job()
+
+    def delete_table(self, table_id, not_found_ok=False):
+        self.deleted.append(table_id)
+
+
+class _FakeTicker:
+    def __init__(self, sym, starts, splits):
+        self._sym = sym
+        self._starts = starts
+        self.splits = splits
+
+    def history(self, start, end):
+        self._starts.append((self._sym, start))
+        idx = DAYS[DAYS >= pd.Timestamp(start)]
+        return pd.DataFrame(
+            {"Close": [100.0] * len(idx), "Dividends": [0.0] * len(idx)},
+            index=pd.DatetimeIndex(idx, name="Date"),
+        )
+
+
+@pytest.fixture()
+def yahoo(monkeypatch):
+    state = {"starts": [], "splits": {}}
+
+    def fake_ticker(sym):
+        splits = state["splits"].get(sym, pd.Series(dtype=float))
+        return _FakeTicker(sym, state["starts"], splits)
+
+    monkeypatch.setattr("current_position_stock_price.yf.Ticker", fake_ticker)
+    monkeypatch.setattr(cpsp, "_load_crypto_symbols", lambda: frozenset())
+    return state
+
+
+def _run(monkeypatch, client, full_refresh=False):
+    monkeypatch.setattr(cpsp.bigquery, "Client", lambda: client)
+    cpsp._main(full_refresh=full_refresh)
+
+
+def _positions():
+    return [
+        {"account": "A", "user_id": 1, "symbol": "AAPL",
+         "position_open_date": dt.date(2025, 1, 2)},
+        {"account": "B", "user_id": 2, "symbol": "AAPL",
+         "position_open_date": dt.date(2025, 2, 3)},
+    ]
+
+
+def _marks(last_date):
+    return [
+        {"account": a, "user_id": u, "symbol": s, "last_date": last_date}
+        for a, u in (("A", 1), ("B", 2))
+        for s in ("AAPL", "SPY", "QQQ")
+    ]
+
+
+def test_missing_tables_fall_back_to_full_refresh(monkeypatch, yahoo):
+    client = _FakeBQ(_positions())
+    _run(monkeypatch, client)
+    assert ("AAPL", "2025-01-02") in yahoo["starts"]
+    assert client.loads[cpsp.PRICES_TABLE_ID][1] == "WRITE_TRUNCATE"
+    assert client.dml == []
+
+
+def test_incremental_fetches_trailing_window_and_merges(monkeypatch, yahoo):
+    client = _FakeBQ(_positions(), _marks(dt.date(2025, 3, 20)), [])
+    _run(monkeypatch, client)
+    # Watermark minus the overlap — not the open date.
+    assert ("AAPL", "2025-03-15") in yahoo["starts"]
+    assert cpsp.PRICES_TABLE_ID not in client.loads  # no truncate
+    assert len(client.dml) == 1
+    rows = next(
+        df for tid, (df, _) in client.loads.items() if "__incr_rows_" in tid
+    )
+    assert rows["date"].min() >= pd.Timestamp("2025-03-15")
+    assert set(rows["account"]) == {"A", "B"}
+    windows = next(
+        df for tid, (df, _) in client.loads.items() if "__incr_windows_" in tid
+    )
+    assert dict(zip(windows["symbol"], windows["start_date"]))["AAPL"] == dt.date(2025, 3, 15)
+    # Every staging table is dropped.
+    assert len(client.deleted) == 4
+    assert all("__incr_" in t for t in client.deleted)
+
+
+def test_new_tenant_pulls_symbol_from_its_open_date(monkeypatch, yahoo):
+    marks = [m for m in _marks(dt.date(2025, 3, 20)) if m["account"] == "A"]
+    client = _FakeBQ(_positions(), marks, [])
+    _run(monkeypatch, client)
+    assert ("AAPL", "2025-02-03") in yahoo["starts"]
+
+
+def test_split_change_forces_full_history_for_that_symbol(monkeypatch, yahoo):
+    yahoo["splits"]["AAPL"] = pd.Series(
+        [2.0], index=pd.DatetimeIndex([pd.Timestamp("2025-02-10 09:30")]),
+    )
+    client = _FakeBQ(_positions(), _marks(dt.date(2025, 3, 20)), [])
+    _run(monkeypatch, client)
+    aapl_starts = [s for sym, s in yahoo["starts"] if sym == "AAPL"]
+    assert aapl_starts == ["2025-03-15", "2025-01-02"]
+    windows = next(
+        df for tid, (df, _) in client.loads.items() if "__incr_windows_" in tid
+    )
+    assert dict(zip(windows["symbol"], windows["start_date"]))["AAPL"] == dt.date(2025, 1, 2)
+    splits = next(
+        df for tid, (df, _) in client.loads.items()
+        if tid.startswith(cpsp.SPLITS_TABLE_ID + "__incr_")
+    )
+    assert list(splits["symbol"]) == ["AAPL"]
+
+
+def test_known_split_does_not_force_full_history(monkeypatch, yahoo):
+    yahoo["splits"]["AAPL"] = pd.Series(
+        [2.0], index=pd.DatetimeIndex([pd.Timestamp("2025-02-10 09:30")]),
+    )
+    ledger = [{"symbol": "AAPL", "split_date": dt.date(2025, 2, 10), "split_ratio": 2.0}]
+    client = _FakeBQ(_positions(), _marks(dt.date(2025, 3, 20)), ledger)
+    _run(monkeypatch, client)
+    assert [s for sym, s in yahoo["starts"] if sym == "AAPL"] == ["2025-03-15"]
+
+
+def test_full_refresh_flag_truncates_both_tables(monkeypatch, yahoo):
+    client = _FakeBQ(_positions(), _marks(dt.date(2025, 3, 20)), [])
+    _run(monkeypatch, client, full_refresh=True)
+    assert ("AAPL", "2025-01-02") in yahoo["starts"]
+    assert client.loads[cpsp.PRICES_TABLE_ID][1] == "WRITE_TRUNCATE"
+    assert client.loads[cpsp.SPLITS_TABLE_ID][1] == "WRITE_TRUNCATE"
+    assert client.dml == []
+
+
+def test_incremental_plan_never_starts_before_open_date():
+    positions = pd.DataFrame([
+        {"account": "A", "user_id": 1, "symbol": "X",
+         "position_open_date": dt.date(2025, 3, 18)},
+    ])
+    marks = pd.DataFrame([
+        {"account": "A", "user_id": 1, "symbol": "X", "last_date": dt.date(2025, 3, 20)},
+    ])
+    plan = cpsp._incremental_fetch_plan(positions, marks, overlap_days=5)
+    assert plan.to_dict("records") == [{"symbol": "X", "start_date": dt.date(2025, 3, 18)}]
+
+
+def test_incremental_plan_refetches_from_open_date_when_history_was_backfilled():
+    positions = pd.DataFrame([
+        {"account": "A", "user_id": 1, "symbol": "X",
+         "position_open_date": dt.date(2025, 1, 2)},
+        # Opened on a Saturday: its first priced row is the Monday after.
+        {"account": "B", "user_id": 2, "symbol": "Y",
+         "position_open_date": dt.date(2025, 3, 1)},
+    ])
+    marks = pd.DataFrame([
+        # A sync moved X's open date back to January; prices start in March.
+        {"account": "A", "user_id": 1, "symbol": "X",
+         "first_date": dt.date(2025, 3, 3), "last_date": dt.date(2025, 6, 20)},
+        {"account": "B", "user_id": 2, "symbol": "Y",
+         "first_date": dt.date(2025, 3, 3), "last_date": dt.date(2025, 6, 20)},
+    ])
+    plan = cpsp._incremental_fetch_plan(positions, marks, overlap_days=5)
+    assert plan.to_dict("records") == [
+        {"symbol": "X", "start_date": dt.date(2025, 1, 2)},
+        {"symbol": "Y", "start_date": dt.date(2025, 6, 15)},
+    ]
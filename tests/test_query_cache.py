@@ -7,15 +7,26 @@ or a cache hit could return the wrong tenant's / wrong slice's rows — a
 security incident per .cursor/rules/bigquery-tenant-isolation.mdc.
 """
 
+import json
+import pickle
+import threading
 import time
 from concurrent.futures import ThreadPoolExecutor
 
+import numpy as np
 import pandas as pd
 import pytest
 from google.cloud import bigquery
 
 from app import query_cache
-from app.query_cache import cached_query_df, cached_payload, frame_fingerprint, make_key
+from app.query_cache import (
+    cached_json,
+    cached_payload,
+    cached_query_df,
+    frame_fingerprint,
+    make_key,
+    value_fingerprint,
+)
 
 
 class _FakeJob:
@@ -25,6 +36,9 @@ class _FakeJob:
     def to_dataframe(self):
         return self._df
 
+    def result(self):
+        return self._df
+
 
 class _FakeClient:
     """Records every query() call and returns a fresh DataFrame each time.
@@ -106,6 +120,102 @@ def test_make_key_folds_dataset_override(monkeypatch):
     assert prod_key != dev_key
 
 
+@pytest.fixture
+def warehouse(monkeypatch):
+    """Warehouse token on, served by a fake client whose warehouse_builds
+    stamps the test controls. Refreshes only happen when the test calls
+    ``refresh_warehouse_tokens`` (the background thread is stubbed out)."""
+    import app.bigquery_client
+
+    state = {"stamps": {"*": "2026-10-17 04:30:00"}, "reads": 0}
+
+    class _Meta:
+        def query(self, sql):
+            assert "warehouse_builds" in sql
+            state["reads"] += 1
+            return _FakeJob(list(state["stamps"].items()))
+
+    monkeypatch.setenv("QUERY_CACHE_WAREHOUSE_TOKEN", "1")
+    monkeypatch.setattr(app.bigquery_client, "get_bigquery_client", lambda: _Meta())
+    monkeypatch.setattr(query_cache, "_wh_stamps", None)
+    monkeypatch.setattr(query_cache, "_wh_token_at", float("-inf"))
+    monkeypatch.setattr(query_cache, "_maybe_refresh_warehouse_tokens", lambda: None)
+    return state
+
+
+_SQL_A = "SELECT 1 FROM t WHERE tenant_id IN ('t:a')"
+_SQL_B = "SELECT 1 FROM t WHERE tenant_id IN ('t:b')"
+_SQL_ALL = "SELECT 1 FROM t"
+
+
+def test_rebuild_changes_keys_without_a_flush(warehouse):
+    query_cache.refresh_warehouse_tokens()
+    before = make_key(_SQL_A)
+    assert make_key(_SQL_A) == before
+    assert warehouse["reads"] == 1  # make_key never queries
+
+    warehouse["stamps"]["*"] = "2026-10-18 04:30:00"  # nightly full build
+    query_cache.refresh_warehouse_tokens()
+    assert make_key(_SQL_A) != before
+
+
+def test_tenant_rebuild_changes_only_that_tenants_keys(warehouse):
+    query_cache.refresh_warehouse_tokens()
+    a, b, admin = make_key(_SQL_A), make_key(_SQL_B), make_key(_SQL_ALL)
+
+    warehouse["stamps"]["t:a"] = "2026-10-17 12:00:00"  # t:a synced
+    query_cache.refresh_warehouse_tokens()
+    assert make_key(_SQL_A) != a
+    assert make_key(_SQL_B) == b
+    assert make_key(_SQL_ALL) != admin  # unscoped reads include t:a's rows
+
+
+def test_keys_before_the_first_read_are_process_local(warehouse):
+    placeholder = make_key(_SQL_A)
+    assert warehouse["reads"] == 0
+    query_cache.refresh_warehouse_tokens()
+    assert make_key(_SQL_A) != placeholder
+
+
+def test_make_key_does_not_wait_for_the_token_read(monkeypatch):
+    import app.bigquery_client
+
+    release = threading.Event()
+    started = threading.Event()
+
+    class _Slow:
+        def query(self, sql):
+            started.set()
+            release.wait(5)
+            return _FakeJob([("*", "2026-10-17 04:30:00")])
+
+    monkeypatch.setenv("QUERY_CACHE_WAREHOUSE_TOKEN", "1")
+    monkeypatch.setattr(app.bigquery_client, "get_bigquery_client", lambda: _Slow())
+    monkeypatch.setattr(query_cache, "_wh_stamps", None)
+    monkeypatch.setattr(query_cache, "_wh_token_at", float("-inf"))
+    monkeypatch.setattr(query_cache, "_wh_refreshing", False)
+    try:
+        make_key(_SQL_A)  # returns while the read is still in flight
+        assert started.wait(5)
+    finally:
+        release.set()
+
+
+def test_failed_token_read_keeps_previous_token(warehouse, monkeypatch):
+    import app.bigquery_client
+
+    query_cache.refresh_warehouse_tokens()
+    before = make_key(_SQL_A)
+
+    class _Down:
+        def query(self, sql):
+            raise RuntimeError("bq unavailable")
+
+    monkeypatch.setattr(app.bigquery_client, "get_bigquery_client", lambda: _Down())
+    query_cache.refresh_warehouse_tokens()
+    assert make_key(_SQL_A) == before
+
+
 # ---------------------------------------------------------------------------
 # Behaviour
 # ---------------------------------------------------------------------------
@@ -132,15 +242,52 @@ def test_returned_frame_is_a_copy_no_poisoning(cache_on):
     sql = "SELECT v FROM t WHERE tenant_id IN ('snaptrade:aaa')"
 
     first = cached_query_df(client, sql)
-    first.loc[0, "v"] = 999          # caller mutates its copy
+    first["v"] = first["v"] * 10     # column rewrites stay on the caller's frame
     first["extra"] = "poison"
+    with pytest.raises(ValueError, match="read-only"):
+        cached_query_df(client, sql).loc[0, "v"] = 999  # in-place needs .copy()
+    own = cached_query_df(client, sql).copy()
+    own.loc[0, "v"] = 999
 
     second = cached_query_df(client, sql)  # served from cache
     assert len(client.calls) == 1
-    assert second.loc[0, "v"] == 1         # not poisoned by first caller
+    assert list(second["v"]) == [1, 2, 3]  # not poisoned by earlier callers
     assert "extra" not in second.columns
 
 
+def test_hits_share_frozen_data_instead_of_copying(cache_on):
+    client = _FakeClient(df_factory=lambda: pd.DataFrame({"v": [1.0, 2.0], "s": ["a", "b"]}))
+    a = cached_query_df(client, "SELECT v FROM t")
+    b = cached_query_df(client, "SELECT v FROM t")
+    assert a is not b
+    assert np.shares_memory(a["v"].to_numpy(), b["v"].to_numpy())
+
+
+def test_shared_frames_can_be_turned_off(cache_on, monkeypatch):
+    monkeypatch.setenv("QUERY_CACHE_SHARED_FRAMES", "0")
+    client = _FakeClient(df_factory=lambda: pd.DataFrame({"v": [1.0, 2.0]}))
+    first = cached_query_df(client, "SELECT v FROM t")
+    first.loc[0, "v"] = 999.0
+    assert cached_query_df(client, "SELECT v FROM t").loc[0, "v"] == 1.0
+
+
+def test_payload_hits_are_fresh_objects_from_bytes(cache_on):
+    calls = []
+
+    def producer():
+        calls.append(1)
+        return {"points": [{"x": 1, "y": 2.5}], "label": "pnl"}
+
+    first = cached_payload(("chart", "k"), producer)
+    first["points"].append("poison")
+    second = cached_payload(("chart", "k"), producer)
+    assert calls == [1]
+    assert second == {"points": [{"x": 1, "y": 2.5}], "label": "pnl"}
+    assert second is not cached_payload(("chart", "k"), producer)
+    with query_cache._lock:
+        assert isinstance(query_cache._cache[("chart", "k")][0], bytes)
+
+
 def test_cache_disabled_under_pytest_by_default(monkeypatch):
     monkeypatch.delenv("QUERY_CACHE_ENABLED", raising=False)
     assert query_cache.cache_enabled() is False
@@ -225,6 +372,29 @@ def test_cached_payload_disabled_runs_producer_each_time(monkeypatch):
     assert calls["n"] == 2
 
 
+def test_cached_json_hands_back_the_stored_string(cache_on):
+    calls = {"n": 0}
+
+    def producer():
+        calls["n"] += 1
+        return json.dumps({"dates": ["2026-01-01"], "total": [1.0]})
+
+    key = ("pos_chart_final", "2026-07-13", "fp1", "json")
+    stats = query_cache.start_request_stats()
+    first = cached_json(key, producer)
+    second = cached_json(key, producer)
+    assert calls["n"] == 1
+    assert second is first               # immutable: no copy, no decode
+    assert (stats.payload_hits, stats.payload_miss) == (1, 1)
+
+
+def test_value_fingerprint_tracks_content():
+    kpis = {"total_return": 12.5, "legs": [1, 2]}
+    assert value_fingerprint(kpis) == value_fingerprint({"total_return": 12.5, "legs": [1, 2]})
+    assert value_fingerprint(kpis) != value_fingerprint({"total_return": 12.6, "legs": [1, 2]})
+    assert value_fingerprint(kpis, None) != value_fingerprint(kpis)
+
+
 # ---------------------------------------------------------------------------
 # Per-request profiling stats (thread-aware)
 # ---------------------------------------------------------------------------
@@ -298,3 +468,557 @@ def test_stats_helpers_noop_without_active_request(cache_on):
     # cached_query_df must still work when there's no stats object.
     df = cached_query_df(client, "SELECT 1 FROM t", label="x")
     assert not df.empty
+
+
+# ---------------------------------------------------------------------------
+# Single-flight (in-flight dedup)
+# ---------------------------------------------------------------------------
+
+class _FakeRedis:
+    """Just enough of redis-py for the L2 + lease paths (bytes values)."""
+
+    def __init__(self):
+        self.data = {}
+        self.pttls = {}
+        self.lock = threading.Lock()
+
+    def get(self, k):
+        with self.lock:
+            return self.data.get(k)
+
+    def set(self, k, v, nx=False, px=None):
+        with self.lock:
+            if nx and k in self.data:
+                return None
+            self.data[k] = v.encode() if isinstance(v, str) else v
+            return True
+
+    def setex(self, k, ttl, v):
+        self.set(k, v)
+        self.pttls[k] = ttl * 1000
+
+    def pttl(self, k):
+        with self.lock:
+            if k not in self.data:
+                return -2
+            return self.pttls.get(k, -1)
+
+    def pipeline(self, transaction=True):
+        return _FakePipeline(self)
+
+    def exists(self, k):
+        with self.lock:
+            return int(k in self.data)
+
+    def delete(self, *keys):
+        with self.lock:
+            for k in keys:
+                self.data.pop(k, None)
+
+    def incr(self, k):
+        with self.lock:
+            self.data[k] = str(int(self.data.get(k) or 0) + 1).encode()
+            return int(self.data[k])
+
+    def mget(self, keys):
+        with self.lock:
+            return [self.data.get(k) for k in keys]
+
+    def sadd(self, k, *members):
+        with self.lock:
+            self.data.setdefault(k, set()).update(members)
+
+    def smembers(self, k):
+        with self.lock:
+            return set(self.data.get(k) or ())
+
+    def expire(self, k, ttl):
+        with self.lock:
+            return k in self.data
+
+    def scan_iter(self, match="*", count=None):
+        prefix = match.rstrip("*")
+        with self.lock:
+            return [k for k in list(self.data) if k.startswith(prefix)]
+
+
+class _FakePipeline:
+    def __init__(self, redis):
+        self._redis = redis
+        self._calls = []
+
+    def __getattr__(self, name):
+        def queue(*args, **kwargs):
+            self._calls.append((getattr(self._redis, name), args, kwargs))
+            return self
+        return queue
+
+    def execute(self):
+        return [fn(*a, **kw) for fn, a, kw in self._calls]
+
+
+@pytest.fixture
+def fake_redis(monkeypatch):
+    r = _FakeRedis()
+    monkeypatch.setattr(query_cache, "_redis_client", r)
+    monkeypatch.setattr(query_cache, "_redis_init_done", True)
+    return r
+
+
+def _blocking_client(release):
+    """A client whose query blocks until ``release`` is set."""
+    def factory():
+        release.wait(5)
+        return pd.DataFrame({"v": [1, 2, 3]})
+    return _FakeClient(factory)
+
+
+def _wait_for_flight(sql):
+    key = make_key(sql)
+    deadline = time.monotonic() + 5
+    while key not in query_cache._inflight and time.monotonic() < deadline:
+        time.sleep(0.005)
+
+
+def test_concurrent_misses_run_the_query_once(cache_on):
+    release = threading.Event()
+    client = _blocking_client(release)
+    sql = "SELECT * FROM t WHERE tenant_id IN ('a')"
+    stats = query_cache.start_request_stats()
+    ctx = [query_cache.propagate_context() for _ in range(4)]
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        leader = pool.submit(ctx[0].run, cached_query_df, client, sql, None, "kpi")
+        _wait_for_flight(sql)
+        followers = [
+            pool.submit(c.run, cached_query_df, client, sql, None, "kpi") for c in ctx[1:]
+        ]
+        time.sleep(0.05)
+        release.set()
+        frames = [leader.result()] + [f.result() for f in followers]
+    assert len(client.calls) == 1
+    assert all(list(f["v"]) == [1, 2, 3] for f in frames)
+    assert len({id(f) for f in frames}) == 4  # each caller owns its copy
+    assert stats.query_miss == 1 and stats.query_coalesced == 3
+    assert "qwait=3" in query_cache.format_stats(stats)
+    assert query_cache._inflight == {}
+
+
+def test_followers_run_themselves_when_leader_fails(cache_on):
+    release = threading.Event()
+    attempts = []
+
+    def factory():
+        attempts.append(1)
+        if len(attempts) == 1:
+            release.wait(5)
+            raise RuntimeError("bq boom")
+        return pd.DataFrame({"v": [1]})
+
+    client = _FakeClient(factory)
+    sql = "SELECT * FROM t"
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        leader = pool.submit(cached_query_df, client, sql)
+        _wait_for_flight(sql)
+        follower = pool.submit(cached_query_df, client, sql)
+        time.sleep(0.05)
+        release.set()
+        with pytest.raises(RuntimeError):
+            leader.result()
+        assert list(follower.result()["v"]) == [1]
+    assert len(attempts) == 2
+
+
+def test_other_workers_lease_is_waited_on_via_l2(cache_on, fake_redis):
+    sql = "SELECT * FROM t WHERE tenant_id IN ('a')"
+    key = make_key(sql)
+    lease = query_cache._redis_key(key) + ":lease"
+    fake_redis.set(lease, "other-worker", nx=True)
+
+    def peer_finishes():
+        time.sleep(0.1)
+        fake_redis.setex(
+            query_cache._redis_key(key), 60,
+            query_cache._encode_l2(pd.DataFrame({"v": [7]})),
+        )
+        fake_redis.delete(lease)
+
+    threading.Thread(target=peer_finishes).start()
+    client = _FakeClient()
+    stats = query_cache.start_request_stats()
+    df = cached_query_df(client, sql, label="kpi")
+    assert list(df["v"]) == [7]
+    assert client.calls == []
+    assert stats.query_coalesced == 1 and stats.query_miss == 0
+
+
+def test_leader_takes_and_releases_lease(cache_on, fake_redis):
+    client = _FakeClient()
+    cached_query_df(client, "SELECT 1")
+    assert len(client.calls) == 1
+    assert not any(k.endswith(":lease") for k in fake_redis.data)
+
+
+# ---------------------------------------------------------------------------
+# Stale-while-revalidate
+# ---------------------------------------------------------------------------
+
+class _Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def swr(monkeypatch, cache_on):
+    """Soft TTL 10s, stale window 50s, on a controllable clock."""
+    from cachetools import TTLCache
+
+    clock = _Clock()
+    monkeypatch.setattr(query_cache, "_TTL_SECONDS", 10)
+    monkeypatch.setattr(query_cache, "_STALE_SECONDS", 50)
+    monkeypatch.setattr(query_cache, "_cache", TTLCache(maxsize=64, ttl=60, timer=clock))
+    return clock
+
+
+def _wait_refreshed():
+    deadline = time.monotonic() + 5
+    while query_cache._refreshing and time.monotonic() < deadline:
+        time.sleep(0.005)
+
+
+def _counting_client():
+    n = iter(range(1, 100))
+    return _FakeClient(lambda: pd.DataFrame({"v": [next(n)]}))
+
+
+def test_stale_entry_served_immediately_and_refreshed_behind(swr):
+    client = _counting_client()
+    assert list(cached_query_df(client, "SELECT 1")["v"]) == [1]
+    swr.now += 15  # past soft, before hard
+    stats = query_cache.start_request_stats()
+    assert list(cached_query_df(client, "SELECT 1")["v"]) == [1]  # stale, no wait
+    assert stats.stale == 1 and stats.query_hits == 1
+    _wait_refreshed()
+    assert len(client.calls) == 2
+    assert list(cached_query_df(client, "SELECT 1")["v"]) == [2]
+    # Background refresh is not billed to the request that served stale.
+    assert stats.query_miss == 0
+
+
+def test_past_hard_expiry_is_a_plain_miss(swr):
+    client = _counting_client()
+    cached_query_df(client, "SELECT 1")
+    swr.now += 61
+    assert list(cached_query_df(client, "SELECT 1")["v"]) == [2]
+    assert not query_cache._refreshing
+
+
+def test_clear_hard_invalidates_and_drops_inflight_refresh(swr):
+    release = threading.Event()
+    calls = []
+
+    def factory():
+        calls.append(1)
+        if len(calls) > 1:
+            release.wait(5)
+        return pd.DataFrame({"v": [len(calls)]})
+
+    client = _FakeClient(factory)
+    cached_query_df(client, "SELECT 1")
+    swr.now += 15
+    cached_query_df(client, "SELECT 1")  # stale → refresh starts, blocks
+    query_cache.clear()                   # rebuild flush
+    release.set()
+    _wait_refreshed()
+    assert query_cache.get(make_key("SELECT 1")) is None
+
+
+def test_stale_payload_is_refreshed_behind(swr):
+    produced = []
+
+    def producer():
+        produced.append(1)
+        return {"n": len(produced)}
+
+    assert cached_payload(("chart", 1), producer) == {"n": 1}
+    swr.now += 15
+    assert cached_payload(("chart", 1), producer) == {"n": 1}
+    _wait_refreshed()
+    assert cached_payload(("chart", 1), producer) == {"n": 2}
+
+
+def test_l2_entry_ages_from_its_insertion_time(swr, fake_redis):
+    key = make_key("SELECT 1")
+    rkey = query_cache._redis_key(key)
+
+    def store(age):
+        frame = pd.DataFrame({"v": [9]})
+        # A day-long Redis TTL must not make an old entry look fresh.
+        fake_redis.setex(rkey, 86400, query_cache._encode_l2(frame, time.time() - age))
+        query_cache._cache.clear()
+
+    store(15)  # past the 10s soft TTL, inside the 50s stale window
+    val, stale = query_cache._lookup(key)
+    assert list(val["v"]) == [9] and stale
+    store(3)
+    assert query_cache._lookup(key)[1] is False
+    swr.now += 8  # the promoted entry keeps its age in L1
+    assert query_cache._lookup(key)[1] is True
+    store(61)  # past the hard expiry
+    assert query_cache._lookup(key) == (None, False)
+
+
+def test_l2_promotion_respects_the_incoherent_worker_guard(cache_on, fake_redis, monkeypatch):
+    monkeypatch.setattr(query_cache, "_TTL_SECONDS", 4 * 3600)
+    monkeypatch.setattr(query_cache, "_coherent", False)
+    monkeypatch.setattr(query_cache, "_sync_generation", lambda: None)
+    key = make_key("SELECT 1")
+    rkey = query_cache._redis_key(key)
+    old = time.time() - query_cache._FALLBACK_TTL_SECONDS - 1
+    fake_redis.setex(rkey, 86400, query_cache._encode_l2(pd.DataFrame({"v": [9]}), old))
+    assert query_cache._lookup(key) == (None, False)
+    fake_redis.setex(rkey, 86400, query_cache._encode_l2(pd.DataFrame({"v": [9]})))
+    assert list(query_cache._lookup(key)[0]["v"]) == [9]
+
+
+def test_l2_value_without_insertion_stamp_is_a_miss(cache_on, fake_redis):
+    key = make_key("SELECT 1")
+    fake_redis.setex(query_cache._redis_key(key), 60, pickle.dumps(pd.DataFrame({"v": [9]})))
+    assert query_cache._lookup(key) == (None, False)
+
+
+
+# ---------------------------------------------------------------------------
+# Byte-budgeted L1
+# ---------------------------------------------------------------------------
+
+@pytest.fixture
+def budget(monkeypatch, cache_on):
+    """An L1 with a small byte budget."""
+    from cachetools import TTLCache
+
+    def install(max_bytes):
+        monkeypatch.setattr(query_cache, "_MAX_BYTES", max_bytes)
+        monkeypatch.setattr(query_cache, "_cache", TTLCache(
+            maxsize=max_bytes, ttl=600, getsizeof=query_cache._entry_bytes,
+        ))
+    return install
+
+
+def _frame(rows):
+    return pd.DataFrame({"v": range(rows), "s": ["x" * 20] * rows})
+
+
+def test_l1_charges_deep_frame_size_per_label(budget):
+    budget(10_000_000)
+    small, big = _frame(3), _frame(5000)
+    query_cache.set("k1", small, "kpi")
+    query_cache.set("k2", big, "daily_pnl")
+    query_cache.set(("chart", "abc"), {"x": [1, 2, 3]})
+    stats = query_cache.l1_stats()
+    assert stats["entries"] == 3
+    labels = stats["labels"]
+    assert labels["daily_pnl"]["bytes"] == int(big.memory_usage(deep=True).sum())
+    assert labels["kpi"]["bytes"] < labels["daily_pnl"]["bytes"]
+    assert labels["chart"]["entries"] == 1
+    assert list(labels)[0] == "daily_pnl"  # heaviest first
+    assert stats["bytes"] == sum(v["bytes"] for v in labels.values())
+
+
+def test_l1_evicts_least_recently_used_over_budget(budget):
+    one = int(_frame(1000).memory_usage(deep=True).sum())
+    budget(int(one * 2.5))
+    query_cache.set("a", _frame(1000))
+    query_cache.set("b", _frame(1000))
+    query_cache.get("a")                # a is now most recently used
+    query_cache.set("c", _frame(1000))  # over budget → evict b
+    assert query_cache.get("a") is not None
+    assert query_cache.get("b") is None
+    assert query_cache.get("c") is not None
+    assert query_cache.l1_stats()["bytes"] <= int(one * 2.5)
+
+
+def test_value_larger_than_budget_skips_l1(budget):
+    budget(1000)
+    client = _FakeClient(lambda: _frame(5000))
+    df = cached_query_df(client, "SELECT big")
+    assert len(df) == 5000
+    assert query_cache.l1_stats()["entries"] == 0
+    cached_query_df(client, "SELECT big")
+    assert len(client.calls) == 2
+
+
+# ---------------------------------------------------------------------------
+# L2 value format (Arrow IPC + compression, versioned header)
+# ---------------------------------------------------------------------------
+
+def _bq_like_frame():
+    import datetime as dt
+    import decimal
+
+    import db_dtypes  # noqa: F401  registers the dbdate dtype
+
+    return pd.DataFrame({
+        "user_id": pd.array([1, None, 3], dtype="Int64"),
+        "trade_date": pd.array(
+            [dt.date(2025, 1, 2), None, dt.date(2025, 1, 6)], dtype="dbdate",
+        ),
+        "ts": pd.to_datetime(["2025-01-02", "2025-01-03", None]).tz_localize("UTC"),
+        "symbol": ["AAPL", None, "SPY"],
+        "amount": [1.5, float("nan"), -2.25],
+        "price": [decimal.Decimal("1.10"), None, decimal.Decimal("2.5")],
+    })
+
+
+def test_l2_arrow_round_trip_keeps_bigquery_dtypes():
+    df = _bq_like_frame()
+    blob = query_cache._encode_l2(df)
+    assert blob[:4] == b"QC\x02A"
+    pd.testing.assert_frame_equal(query_cache._decode_l2(blob), df)
+
+
+def test_l2_arrow_is_compressed_below_pickle():
+    df = pd.DataFrame({
+        "symbol": ["AAPL", "MSFT", "SPY", "QQQ"] * 25_000,
+        "account": ["Individual ...123"] * 100_000,
+        "v": range(100_000),
+    })
+    assert len(query_cache._encode_l2(df)) < len(pickle.dumps(df))
+
+
+def test_l2_payloads_and_odd_frames_use_pickle_kind():
+    payload = {"series": [1, 2, 3]}
+    blob = query_cache._encode_l2(payload)
+    assert blob[:4] == b"QC\x02P"
+    assert query_cache._decode_l2(blob) == payload
+    mixed = pd.DataFrame({"x": [1, "a", 2.5]})  # not Arrow-representable
+    blob = query_cache._encode_l2(mixed)
+    assert blob[:4] == b"QC\x02P"
+    pd.testing.assert_frame_equal(query_cache._decode_l2(blob), mixed)
+
+
+def test_l2_unknown_version_is_a_miss_and_legacy_pickle_reads():
+    assert query_cache._decode_l2(b"QC\x03A" + b"whatever") is None
+    assert query_cache._decode_l2(pickle.dumps({"a": 1})) == {"a": 1}
+
+
+def test_l2_hit_decodes_arrow_frame(cache_on, fake_redis):
+    df = _bq_like_frame()
+    client = _FakeClient(lambda: df.copy())
+    cached_query_df(client, "SELECT * FROM t")
+    stored = fake_redis.get(query_cache._redis_key(make_key("SELECT * FROM t")))
+    assert stored[:4] == b"QC\x02A"
+    query_cache._cache.clear()  # another worker: L1 cold, L2 warm
+    out = cached_query_df(client, "SELECT * FROM t")
+    assert len(client.calls) == 1
+    pd.testing.assert_frame_equal(out, df)
+
+
+# ---------------------------------------------------------------------------
+# Tenant-targeted invalidation
+# ---------------------------------------------------------------------------
+
+def test_tenant_tags_follow_the_inlined_filter():
+    assert query_cache.tenant_tags(
+        "SELECT * FROM t h WHERE x AND h.tenant_id IN ('a:1', 'b:2')"
+    ) == frozenset({"a:1", "b:2"})
+    assert query_cache.tenant_tags("SELECT * FROM t") == frozenset({"*"})
+    assert query_cache.tenant_tags("SELECT * FROM t WHERE 1 = 0") == frozenset()
+
+
+def test_invalidate_tenants_keeps_other_tenants_warm(cache_on, fake_redis):
+    client = _FakeClient()
+    a = "SELECT * FROM t WHERE x AND tenant_id IN ('a')"
+    b = "SELECT * FROM t WHERE x AND tenant_id IN ('b')"
+    admin = "SELECT * FROM t WHERE x"
+    for sql in (a, b, admin):
+        cached_query_df(client, sql, label="q")
+    assert len(client.calls) == 3
+
+    assert query_cache.invalidate_tenants(["a"]) == 2  # a + unscoped
+    assert query_cache._redis_key(make_key(b, None)) in fake_redis.data
+    assert query_cache._redis_key(make_key(a, None)) not in fake_redis.data
+
+    for sql in (a, b, admin):
+        cached_query_df(client, sql, label="q")
+    assert [sql for sql, _ in client.calls[3:]] == [a, admin]
+
+
+# ---------------------------------------------------------------------------
+# Cross-worker L1 coherence
+# ---------------------------------------------------------------------------
+
+@pytest.fixture
+def gen_sync(monkeypatch, fake_redis):
+    monkeypatch.setattr(query_cache, "_GEN_CHECK_S", 0)
+    monkeypatch.setattr(query_cache, "_gen_seen", None)
+    monkeypatch.setattr(query_cache, "_gen_checked_at", float("-inf"))
+    monkeypatch.setattr(query_cache, "_coherent", True)
+    return fake_redis
+
+
+def _other_worker_publishes(redis, payload):
+    n = redis.incr(query_cache._GEN_KEY)
+    redis.setex(query_cache._gen_event_key(n), 60, payload)
+
+
+def test_other_workers_flush_drops_this_workers_l1(cache_on, gen_sync):
+    client = _FakeClient()
+    sql = "SELECT * FROM t WHERE x AND tenant_id IN ('a')"
+    cached_query_df(client, sql, label="q")
+    cached_query_df(client, sql, label="q")
+    assert len(client.calls) == 1
+
+    # The flushing worker emptied the shared L2 and announced it.
+    for k in list(gen_sync.data):
+        if k.startswith(query_cache._REDIS_PREFIX):
+            del gen_sync.data[k]
+    _other_worker_publishes(gen_sync, "*")
+    cached_query_df(client, sql, label="q")
+    assert len(client.calls) == 2
+
+
+def test_other_workers_tenant_flush_keeps_unrelated_entries(cache_on, gen_sync):
+    client = _FakeClient()
+    a = "SELECT * FROM t WHERE x AND tenant_id IN ('a')"
+    b = "SELECT * FROM t WHERE x AND tenant_id IN ('b')"
+    cached_query_df(client, a, label="q")
+    cached_query_df(client, b, label="q")
+
+    _other_worker_publishes(gen_sync, "a")
+    assert query_cache.get(make_key(b, None)) is not None
+    with query_cache._lock:
+        assert make_key(a, None) not in query_cache._cache
+
+
+def test_own_flush_is_not_replayed(cache_on, gen_sync):
+    client = _FakeClient()
+    query_cache.get("prime")  # first check records the current generation
+    query_cache.clear()
+    cached_query_df(client, "SELECT 1 FROM t", label="q")
+    gen_sync.data = {k: v for k, v in gen_sync.data.items() if k.startswith("qc:gen")}
+    cached_query_df(client, "SELECT 1 FROM t", label="q")
+    assert len(client.calls) == 1  # still served from L1
+
+
+def test_old_l1_entries_distrusted_while_redis_unreachable(cache_on, gen_sync, monkeypatch):
+    from cachetools import TTLCache
+
+    clock = _Clock()
+    monkeypatch.setattr(query_cache, "_TTL_SECONDS", 4 * 3600)
+    monkeypatch.setattr(query_cache, "_cache", TTLCache(maxsize=64, ttl=4 * 3600, timer=clock))
+    client = _FakeClient()
+    cached_query_df(client, "SELECT 1 FROM t", label="q")
+
+    def down(*a, **k):
+        raise ConnectionError("redis down")
+
+    monkeypatch.setattr(gen_sync, "get", down)
+    clock.now += 300
+    cached_query_df(client, "SELECT 1 FROM t", label="q")
+    assert len(client.calls) == 1
+    clock.now += query_cache._FALLBACK_TTL_SECONDS
+    cached_query_df(client, "SELECT 1 FROM t", label="q")
+    assert len(client.calls) == 2
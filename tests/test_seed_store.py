@@ -20,7 +20,12 @@ from app.seed_store import (
     SeedStoreError,
     is_production_store,
     read_seed_csv,
+    read_seed_frame,
+    read_seed_slice_frame,
+    replace_seed_slices,
+    seed_frame_digest,
     write_seed_csvs,
+    write_seed_frames,
 )
 
 HISTORY_PATH = "dbt/seeds/trade_history.csv"
@@ -43,6 +48,18 @@ class _FakeJob:
         return None
 
 
+class _FakeField:
+    def __init__(self, name):
+        self.name = name
+
+
+class _FakeTable:
+    def __init__(self, table_id, schema, clustering_fields=None):
+        self.table_id = table_id
+        self.schema = schema
+        self.clustering_fields = clustering_fields
+
+
 class _FakeClient:
     """Stores loaded DataFrames per table id. Rows are stored REVERSED to
     simulate BigQuery's undefined SELECT order; ``query`` honors an
@@ -51,6 +68,9 @@ class _FakeClient:
 
     def __init__(self):
         self.tables = {}
+        self.clustering = {}
+        self.sliced_reads = []
+        self.deleted = []
         self.datasets_created = []
         self.fail_next_query = None
         self.fail_next_load = None
@@ -58,18 +78,65 @@ class _FakeClient:
     def create_dataset(self, dataset_ref, exists_ok=False):
         self.datasets_created.append(str(dataset_ref))
 
-    def query(self, sql):
+    def get_table(self, table_id):
+        if table_id not in self.tables:
+            raise NotFound(f"Not found: table {table_id}")
+        fields = [
+            _FakeField(c) for c in self.tables[table_id].columns
+        ]
+        return _FakeTable(table_id, fields, self.clustering.get(table_id))
+
+    def update_table(self, table, fields):
+        self.clustering[table.table_id] = table.clustering_fields
+        return table
+
+    def delete_table(self, table_id, not_found_ok=False):
+        self.tables.pop(table_id, None)
+        self.deleted.append(table_id)
+
+    def query(self, sql, job_config=None):
         if self.fail_next_query is not None:
             exc, self.fail_next_query = self.fail_next_query, None
             raise exc
+        if "BEGIN TRANSACTION" in sql:
+            return self._slice_swap(sql, job_config)
         table_id = sql.split("`")[1]
         if table_id not in self.tables:
             raise NotFound(f"Not found: table {table_id}")
         df = self.tables[table_id].copy()
+        if job_config is not None:
+            self.sliced_reads.append(table_id)
+            df = df.loc[self._in_slice(df, job_config)]
         if "ORDER BY _row_seq" in sql:
             df = df.sort_values("_row_seq").reset_index(drop=True)
         return _FakeJob(df)
 
+    @staticmethod
+    def _in_slice(df, job_config):
+        """Evaluate the slice predicate from its bound parameters."""
+        params = {p.name: p for p in job_config.query_parameters}
+        account = params["account"].value
+        tenant_ids = set(params["tenant_ids"].values)
+        acct_col = next(c for c in df.columns if c.lower() == "account")
+        tid = df["tenant_id"].fillna("").str.strip()
+        return (df[acct_col].fillna("").str.strip() == account) & (
+            tid.str.lower().isin(["", "nan", "none", "<na>"]) | tid.isin(tenant_ids)
+        )
+
+    def _slice_swap(self, sql, job_config):
+        """Apply the DELETE + INSERT transaction: drop the slice rows, then
+        append the staged rows with _row_seq past the remaining maximum."""
+        ticks = sql.split("`")
+        table_id = ticks[1]
+        staging_id = ticks[-2]
+        table = self.tables[table_id]
+        kept = table.loc[~self._in_slice(table, job_config)]
+        staged = self.tables[staging_id].copy()
+        base = (int(kept["_row_seq"].max()) + 1) if len(kept) else 0
+        staged["_row_seq"] = staged["_row_seq"] + base
+        self.tables[table_id] = pd.concat([kept, staged], ignore_index=True)
+        return _FakeJob()
+
     def load_table_from_dataframe(self, df, table_id, job_config=None):
         if self.fail_next_load is not None:
             exc, self.fail_next_load = self.fail_next_load, None
@@ -105,7 +172,7 @@ def test_write_then_read_round_trips_byte_identical(client):
 def test_read_preserves_write_order_despite_storage_shuffle(client):
     """The fake stores rows reversed — original order must come back via
     _row_seq. (BigQuery tables have no inherent order; the merge layer's
-    byte-exact no-op check depends on deterministic reads.)"""
+    content-hash no-op check depends on deterministic reads.)"""
     write_seed_csvs([(HISTORY_PATH, _CSV)], client=client)
     out = pd.read_csv(
         StringIO(read_seed_csv(HISTORY_PATH, client=client)),
@@ -145,6 +212,176 @@ def test_header_only_seed_round_trips(client):
     assert read_seed_csv(HISTORY_PATH, client=client) == header_only
 
 
+# ---------------------------------------------------------------------------
+# Frame exchange
+# ---------------------------------------------------------------------------
+
+
+def _frame(csv_text):
+    return pd.read_csv(StringIO(csv_text), dtype=str, keep_default_na=False)
+
+
+def test_typed_frame_is_stored_as_the_csv_cell_text(client):
+    """A sync frame with float/NaN columns is stored as the same text a
+    CSV round trip produced — no serialize/parse in between."""
+    typed = pd.read_csv(StringIO(_CSV))
+    assert typed["Price"].dtype == float
+    write_seed_frames([(HISTORY_PATH, typed)], client=client)
+    assert read_seed_csv(HISTORY_PATH, client=client) == typed.to_csv(index=False)
+
+
+def test_read_seed_frame_returns_stored_strings_in_order(client):
+    write_seed_csvs([(HISTORY_PATH, _CSV)], client=client)
+    out = read_seed_frame(HISTORY_PATH, client=client)
+    assert list(out["Symbol"]) == ["AAPL", "AAPL", "MSFT"]
+    assert list(out["fees_and_comm"]) == ["", "0.04", ""]
+    assert "_row_seq" not in out.columns
+    assert read_seed_frame(CURRENT_PATH, client=client) is None
+
+
+def test_digest_matches_stored_text_not_dtypes(client):
+    typed = pd.read_csv(StringIO(_CSV))
+    write_seed_frames([(HISTORY_PATH, typed)], client=client)
+    stored = read_seed_frame(HISTORY_PATH, client=client)
+    assert seed_frame_digest(stored) == seed_frame_digest(typed)
+    assert seed_frame_digest(stored) == seed_frame_digest(_frame(_CSV))
+
+
+def test_digest_is_sensitive_to_values_order_and_columns():
+    base = _frame(_CSV)
+    digest = seed_frame_digest(base)
+    changed = base.copy()
+    changed.loc[2, "Quantity"] = "6"
+    assert seed_frame_digest(changed) != digest
+    assert seed_frame_digest(base.iloc[::-1]) != digest
+    assert seed_frame_digest(base.rename(columns={"Amount": "amount"})) != digest
+    assert seed_frame_digest(base.iloc[:0]) != digest
+    assert seed_frame_digest(None) is None
+
+
+# ---------------------------------------------------------------------------
+# Tenant-slice writes
+# ---------------------------------------------------------------------------
+
+_SLICE_BASE = (
+    "Account,user_id,tenant_id,Date,Action,Symbol,Description,Quantity,Price,fees_and_comm,Amount\n"
+    "Schwab Account,9,snaptrade:aaa,01/02/2025,Buy,AAPL,APPLE INC,10,200.0,,-2000.0\n"
+    "Schwab Account,,,01/01/2025,Buy,IBM,IBM,1,100.0,,-100.0\n"
+    "Alpaca Paper Account,18,snaptrade:bbb,01/04/2025,Buy,MSFT,MICROSOFT,5,400.0,,-2000.0\n"
+    "Schwab Account,7,snaptrade:ccc,01/05/2025,Buy,TSLA,TESLA,2,250.0,,-500.0\n"
+)
+_SLICE_NEW = (
+    "Account,user_id,tenant_id,Date,Action,Symbol,Description,Quantity,Price,fees_and_comm,Amount\n"
+    "Schwab Account,9,snaptrade:aaa,01/02/2025,Buy,AAPL,APPLE INC,10,200.0,,-2000.0\n"
+    "Schwab Account,9,snaptrade:aaa,01/06/2025,Sell,AAPL,APPLE INC,10,210.0,,2100.0\n"
+)
+
+
+def test_replace_slice_rewrites_only_label_tenant_and_legacy_rows(client):
+    write_seed_csvs([(HISTORY_PATH, _SLICE_BASE)], client=client)
+    replace_seed_slices(
+        [(HISTORY_PATH, "Schwab Account", ("snaptrade:aaa",), _frame(_SLICE_NEW))],
+        client=client,
+    )
+    out = pd.read_csv(
+        StringIO(read_seed_csv(HISTORY_PATH, client=client)),
+        dtype=str, keep_default_na=False,
+    )
+    # Other tenants (including one sharing the label) keep their rows in
+    # their original order; the slice (AAPL + the legacy IBM row) is
+    # replaced and lands at the end, like the full-table merge output.
+    assert list(out["Symbol"]) == ["MSFT", "TSLA", "AAPL", "AAPL"]
+    assert list(out["Action"][-2:]) == ["Buy", "Sell"]
+
+
+def test_read_slice_returns_only_label_tenant_and_legacy_rows(client):
+    write_seed_csvs([(HISTORY_PATH, _SLICE_BASE)], client=client)
+    out = read_seed_slice_frame(
+        HISTORY_PATH, "Schwab Account", ("snaptrade:aaa",), client=client,
+    )
+    # Filtered server-side (bound parameters), in write order, with the
+    # legacy unowned IBM row but not the other Schwab tenant's TSLA.
+    assert client.sliced_reads == [
+        f"{seed_store.raw_project()}.{seed_store.raw_dataset()}.trade_history"
+    ]
+    assert list(out["Symbol"]) == ["AAPL", "IBM"]
+    assert "_row_seq" not in out.columns
+
+
+def test_read_slice_empty_slice_keeps_columns(client):
+    write_seed_csvs([(HISTORY_PATH, _SLICE_BASE)], client=client)
+    out = read_seed_slice_frame(
+        HISTORY_PATH, "Nobody", ("manual:nobody",), client=client,
+    )
+    assert out.empty
+    assert list(out.columns) == _SLICE_BASE.splitlines()[0].split(",")
+
+
+def test_read_slice_missing_table_is_none_and_errors_fail_closed(client):
+    assert read_seed_slice_frame(
+        HISTORY_PATH, "Schwab Account", ("snaptrade:aaa",), client=client,
+    ) is None
+    write_seed_csvs([(HISTORY_PATH, _SLICE_BASE)], client=client)
+    client.fail_next_query = RuntimeError("BigQuery unavailable")
+    with pytest.raises(SeedStoreError):
+        read_seed_slice_frame(
+            HISTORY_PATH, "Schwab Account", ("snaptrade:aaa",), client=client,
+        )
+
+
+def test_replace_slice_drops_staging_table(client):
+    write_seed_csvs([(HISTORY_PATH, _SLICE_BASE)], client=client)
+    replace_seed_slices(
+        [(HISTORY_PATH, "Schwab Account", ("snaptrade:aaa",), _frame(_SLICE_NEW))],
+        client=client,
+    )
+    assert len(client.deleted) == 1
+    assert seed_store._SLICE_STAGING_SUFFIX in client.deleted[0]
+    assert all(seed_store._SLICE_STAGING_SUFFIX not in t for t in client.tables)
+
+
+def test_replace_slice_clusters_table_on_tenant_id(client):
+    write_seed_csvs([(HISTORY_PATH, _SLICE_BASE)], client=client)
+    replace_seed_slices(
+        [(HISTORY_PATH, "Schwab Account", ("snaptrade:aaa",), _frame(_SLICE_NEW))],
+        client=client,
+    )
+    table_id = f"{seed_store.raw_project()}.{seed_store.raw_dataset()}.trade_history"
+    assert client.clustering[table_id] == ["tenant_id"]
+
+
+def test_replace_slice_creates_missing_table(client):
+    replace_seed_slices(
+        [(HISTORY_PATH, "Schwab Account", ("snaptrade:aaa",), _frame(_SLICE_NEW))],
+        client=client,
+    )
+    assert read_seed_csv(HISTORY_PATH, client=client) == _SLICE_NEW
+
+
+def test_replace_slice_failure_raises_and_leaves_table(client):
+    write_seed_csvs([(HISTORY_PATH, _SLICE_BASE)], client=client)
+    client.fail_next_query = RuntimeError("transaction aborted")
+    with pytest.raises(SeedStoreError):
+        replace_seed_slices(
+            [(HISTORY_PATH, "Schwab Account", ("snaptrade:aaa",), _frame(_SLICE_NEW))],
+            client=client,
+        )
+    assert read_seed_csv(HISTORY_PATH, client=client) == _SLICE_BASE
+    assert len(client.deleted) == 1  # staging still cleaned up
+
+
+def test_replace_slice_refuses_columns_missing_from_table(client):
+    write_seed_csvs([(HISTORY_PATH, _SLICE_BASE)], client=client)
+    widened = _SLICE_NEW.replace("Amount\n", "Amount,extra\n", 1).replace(
+        "-2000.0\n", "-2000.0,x\n"
+    ).replace("2100.0\n", "2100.0,y\n")
+    with pytest.raises(SeedStoreError):
+        replace_seed_slices(
+            [(HISTORY_PATH, "Schwab Account", ("snaptrade:aaa",), _frame(widened))],
+            client=client,
+        )
+
+
 # ---------------------------------------------------------------------------
 # Fail-closed contract
 # ---------------------------------------------------------------------------
@@ -260,6 +497,29 @@ def test_dispatch_returns_marker_on_204(monkeypatch):
     assert calls["json"] == {"ref": "master"}
 
 
+def test_dispatch_passes_changed_tenants_as_workflow_input(monkeypatch):
+    monkeypatch.delenv("BQ_RAW_DATASET", raising=False)
+    monkeypatch.setenv("GITHUB_PAT", "x" * 20)
+    up = _upload()
+    calls = []
+
+    class _Resp:
+        status_code = 204
+        text = ""
+
+    monkeypatch.setattr(
+        up.requests, "post", lambda url, json=None, **k: calls.append(json) or _Resp(),
+    )
+    assert up._dispatch_warehouse_rebuild("test", tenant_ids=["t:b", "t:a", "t:a"])
+    assert calls[-1] == {"ref": "master", "inputs": {"tenant_ids": "t:a,t:b"}}
+
+    # A malformed id or a batch past the cap falls back to a full build.
+    up._dispatch_warehouse_rebuild("test", tenant_ids=["t:a", "bad id"])
+    many = [f"t:{i}" for i in range(up._SCOPED_REBUILD_MAX_TENANTS + 1)]
+    up._dispatch_warehouse_rebuild("test", tenant_ids=many)
+    assert calls[-2:] == [{"ref": "master"}, {"ref": "master"}]
+
+
 def test_dispatch_failure_returns_none_not_raise(monkeypatch):
     """A dispatch failure must never fail the sync — the write already
     landed; the scheduled nightly build is the backstop."""
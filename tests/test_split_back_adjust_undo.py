@@ -13,6 +13,8 @@ The fix multiplies each historical close by the product of split
 ratios for splits whose effective date is after that close — undoing
 yfinance's adjustment exactly.
 
+The undo is one cumulative-product factor series applied over the date
+index (``_split_factors``, the same definition as ``int_split_factors``).
 These tests use synthetic split / price data so they don't reach
 out to Yahoo; they pin the math, not the upstream data.
 """
@@ -20,28 +22,18 @@ from __future__ import annotations
 
 import datetime as dt
 
+import numpy as np
 import pandas as pd
 import pytest
 
+import current_position_stock_price as cpsp
+
 
 def _undo_split_back_adjust(closes: pd.Series, splits: pd.Series) -> pd.Series:
-    """Mirror the in-pipeline transform.
-
-    Implemented as a standalone helper inside the test so we can pin
-    the math even though the production version lives inline in a
-    standalone script (``current_position_stock_price.py``).
-    """
-    out = closes.astype(float).copy()
-    if splits is None or len(splits) == 0:
-        return out
-    hist_dates = out.index
-    for sd, ratio in zip(list(splits.index), [float(r) for r in splits.values]):
-        if not (ratio > 0):
-            continue
-        mask = hist_dates < sd
-        if mask.any():
-            out.loc[mask] = out.loc[mask] * ratio
-    return out
+    """Run a bare close series through the loader's transform."""
+    hist = pd.DataFrame({"Close": closes})
+    out, _ = cpsp._undo_split_back_adjust(hist, splits)
+    return out.rename(closes.name)
 
 
 def _ts(d: dt.date) -> pd.Timestamp:
@@ -162,3 +154,52 @@ class TestSplitBackAdjustUndo:
         out = _undo_split_back_adjust(closes, splits)
         # Only the 2.0 split should apply.
         assert out.iloc[0] == pytest.approx(20.0)
+
+    def test_split_day_close_is_already_post_split(self):
+        # XLU: yfinance stamps the split at 09:30 ET but indexes the
+        # split-day close at midnight. Only earlier calendar days move.
+        idx = pd.DatetimeIndex(
+            ["2025-12-04", "2025-12-05", "2025-12-08"], tz="America/New_York",
+        )
+        closes = pd.Series([42.68, 42.68, 43.0], index=idx)
+        splits = pd.Series(
+            [2.0],
+            index=pd.DatetimeIndex(["2025-12-05 09:30"], tz="America/New_York"),
+        )
+        out = _undo_split_back_adjust(closes, splits)
+        assert list(out) == pytest.approx([85.36, 42.68, 43.0])
+
+    def test_ledger_records_usable_splits_by_calendar_date(self):
+        hist = pd.DataFrame(
+            {"Close": [1.0]}, index=pd.DatetimeIndex([_ts(dt.date(2024, 1, 1))]),
+        )
+        splits = pd.Series(
+            [0.0, 1.0 / 30.0],
+            index=pd.DatetimeIndex(["2026-02-03 09:30", "2026-02-04 09:30"]),
+        )
+        _, seen = cpsp._undo_split_back_adjust(hist, splits)
+        assert seen == {dt.date(2026, 2, 4): pytest.approx(1.0 / 30.0)}
+
+
+class TestSplitFactors:
+    def test_unsorted_splits_match_per_day_product(self):
+        rng = np.random.default_rng(7)
+        days = np.arange(
+            np.datetime64("2010-01-01"), np.datetime64("2026-01-01"), dtype="datetime64[D]",
+        )
+        split_days = rng.choice(days, size=25, replace=False)
+        ratios = rng.choice([0.1, 1.0 / 30.0, 2.0, 3.0, 4.0, 0.0, np.nan], size=25)
+        got = cpsp._split_factors(days, split_days, ratios)
+        sample = rng.choice(len(days), size=200, replace=False)
+        for i in sample:
+            want = np.prod([
+                r for d, r in zip(split_days, ratios) if d > days[i] and r > 0
+            ])
+            assert got[i] == pytest.approx(want, rel=1e-12)
+
+    def test_no_usable_splits_is_all_ones(self):
+        days = np.array(["2024-01-01", "2024-01-02"], dtype="datetime64[D]")
+        assert list(cpsp._split_factors(days, [], [])) == [1.0, 1.0]
+        assert list(
+            cpsp._split_factors(days, np.array(["2025-01-01"], dtype="datetime64[D]"), [-1.0])
+        ) == [1.0, 1.0]
@@ -20,8 +20,9 @@ Two production-impacting bugs sit here. Both are exercised below:
    steal them depending on the sort direction. The fix scopes the merge
    to (syncing user's rows | legacy unowned rows).
 
-Tests use small in-memory CSV strings and monkeypatch ``_get_file_content``
-so they stay unit-fast and don't touch GitHub or pandas IO machinery.
+Tests build small in-memory CSV strings, load them into seed frames the way
+the store returns them, and monkeypatch ``_get_file_content`` so they stay
+unit-fast and don't touch BigQuery.
 """
 import io
 from contextlib import contextmanager
@@ -31,6 +32,7 @@ import pytest
 
 from app import db as _db
 from app import upload as _upload
+from app.seed_store import seed_cells, seed_frame_digest
 
 
 HISTORY_PATH = _upload.HISTORY_PATH
@@ -48,9 +50,23 @@ def _stub_seed_write_lock(monkeypatch):
     _upload._seed_write_lock_state.depth = 0
 
 
+def _seed_frame(csv_text):
+    """Load CSV text into a seed frame shaped like a store read (every
+    cell the stored string, "" for NULL). ``None`` stays ``None`` (404)."""
+    if csv_text is None:
+        return None
+    if not csv_text.strip():
+        return pd.DataFrame()
+    return pd.read_csv(io.StringIO(csv_text), dtype=str, keep_default_na=False)
+
+
 def _stub_existing(monkeypatch, csv_text):
-    """Make ``_get_file_content`` return a deterministic existing CSV."""
-    monkeypatch.setattr(_upload, "_get_file_content", lambda path: csv_text)
+    """Make ``_get_file_content`` return a deterministic existing seed."""
+    frame = _seed_frame(csv_text)
+    monkeypatch.setattr(
+        _upload, "_get_file_content",
+        lambda path: None if frame is None else frame.copy(),
+    )
 
 
 def _row(account, user_id, date, action, symbol, qty, price, amount, *, tenant_id="", desc="", fees=""):
@@ -117,7 +133,7 @@ def test_purge_user_removes_owned_tenants_even_with_null_or_stale_user_id(
     monkeypatch.setattr(
         _upload,
         "_get_file_content",
-        lambda path: existing if path == HISTORY_PATH else None,
+        lambda path: _seed_frame(existing) if path == HISTORY_PATH else None,
     )
     committed = {}
 
@@ -133,23 +149,22 @@ def test_purge_user_removes_owned_tenants_even_with_null_or_stale_user_id(
 
     assert ok is True and err is None and marker == "dispatch:123"
     assert removed[HISTORY_PATH] == 3
-    kept = pd.read_csv(
-        io.StringIO(committed[HISTORY_PATH]), dtype=str, keep_default_na=False
-    )
+    kept = seed_cells(committed[HISTORY_PATH])
     assert set(kept["Symbol"]) == {"MSFT", "NVDA"}
     assert set(kept["tenant_id"]) == {other_tenant}
 
 
-def _parse(csv_text):
-    """Round-trip the merged CSV the way dbt reads it.
+def _parse(merged):
+    """Render a merged seed frame as the STRING cells the raw table stores
+    (what dbt reads).
 
-    ``user_id`` round-trips as the string ``"9.0"`` (not ``"9"``) because
-    pandas reads the column as float — empty/legacy rows force float
-    inference. Normalize on read so assertions can compare against the
-    canonical integer-string form (``"9"``) regardless of how pandas
-    chose to stringify the cell.
+    ``user_id`` can be stored as ``"9.0"`` (not ``"9"``) when a sync frame
+    carried it as float — empty/legacy rows force float columns.
+    Normalize so assertions can compare against the canonical
+    integer-string form (``"9"``) regardless of how the cell was
+    stringified.
     """
-    df = pd.read_csv(io.StringIO(csv_text), dtype=str, keep_default_na=False)
+    df = seed_cells(merged)
     if "user_id" in df.columns:
         df["user_id"] = df["user_id"].astype(str).str.replace(r"\.0$", "", regex=True).str.strip()
     return df
@@ -577,17 +592,16 @@ def test_merge_treats_true_404_as_empty_seed(monkeypatch):
 
 
 def test_merge_refuses_to_overwrite_when_existing_unparseable(monkeypatch):
-    """Garbage in the seed file must abort, not blank out other tenants."""
-    monkeypatch.setattr(
-        _upload, "_get_file_content",
-        lambda path: "this,is,not,a,valid\nheader\x00row\nwith,bad,bytes",
+    """Garbage in the stored seed must abort, not blank out other tenants."""
+    _stub_existing(
+        monkeypatch, "this,is,not,a,valid\nheader\x00row\nwith,bad,bytes",
     )
     new_df = pd.DataFrame([
         _row("Sara Investment", 9, "05/01/2026", "Buy", "AAPL", 1, 100.0, -100.0,
              tenant_id=TENANT_SARA_9),
     ])
-    # Either parse raises or the no-Account-column branch raises. Both
-    # land in SeedFetchError; either way the merge refuses to overwrite.
+    # No Account column to scope the merge by → SeedFetchError; the merge
+    # refuses to overwrite.
     with pytest.raises(_upload.SeedFetchError):
         _upload._merge_seed_with_existing(
             HISTORY_PATH, "Sara Investment", new_df, HISTORY_SEED_COLUMNS,
@@ -655,7 +669,7 @@ def test_merge_full_resync_does_not_double_count_after_three_runs(monkeypatch):
     base_with_legacy = _csv_from_rows(sync_rows + [
         _row("Schwab Account", "", "12/31/2023", "Buy", "TSLA", 1, 200.0, -200.0),
     ])
-    state = {"csv": base_with_legacy}
+    state = {"csv": _seed_frame(base_with_legacy)}
     monkeypatch.setattr(_upload, "_get_file_content", lambda path: state["csv"])
 
     for _ in range(3):
@@ -843,8 +857,8 @@ def test_dedup_collapses_drift_within_new_df_even_when_existing_empty(monkeypatc
     ))
     assert len(out) == 1, f"Path 1 (404) failed to dedup, got {len(out)} rows"
 
-    # Path 2: file exists but content is whitespace-only.
-    monkeypatch.setattr(_upload, "_get_file_content", lambda path: "   ")
+    # Path 2: table exists but is empty (no columns, no rows).
+    _stub_existing(monkeypatch, "   ")
     out = _parse(_upload._merge_seed_with_existing(
         HISTORY_PATH, "Sara Investment", new_with_drift.copy(),
         HISTORY_SEED_COLUMNS, tenant_id=TENANT_SARA_9,
@@ -921,6 +935,29 @@ def test_canonicalize_seed_cell_collapses_known_drift_forms():
     assert c(" 11/14/2024 ") == "11/14/2024"
 
 
+def test_canonicalize_seed_series_matches_scalar_canonical_form():
+    """The column-wise canonicalizer the dedup keys on must agree with the
+    scalar helper cell for cell — including the spellings ``float()``
+    accepts that the vectorized parse leaves to the fallback."""
+    cells = [
+        None, float("nan"), pd.NA, "", "  ", "nan", "None", "<NA>",
+        "-0", -0.0, "0.0000001", 1e-7, "1E5", ".5", "5.", "+3", "-.5e-3",
+        "1_000", "inf", "-Infinity", "+nan", "1e999", True,
+        26.990000000000002, -16.189999999999998, 27.000000000000004,
+        40, 40.0, "40.000000", 1e16, 131.960622, 0.486667, "0.00005",
+        "Buy to Close", "CFLT  241220C00030000", " 11/14/2024 ", "1.2.3",
+    ]
+    series = pd.Series(cells, dtype=object)
+    assert list(_upload._canonicalize_seed_series(series)) == [
+        _upload._canonicalize_seed_cell(v) for v in cells
+    ]
+    assert list(_upload._canonicalize_cross_source_price_series(series)) == [
+        _upload._canonicalize_cross_source_price(v) for v in cells
+    ]
+    floats = pd.Series([1.5, float("nan"), 100.0, 1e-7])
+    assert list(_upload._canonicalize_seed_series(floats)) == ["1.5", "", "100", "0"]
+
+
 # ---------------------------------------------------------------------------
 # Cross-source dedup — orders endpoint vs activities endpoint for the
 # same trade. SnapTrade exposes both with hours-to-days lag between the
@@ -1289,31 +1326,42 @@ def test_normalize_tid_collapses_known_empty_forms():
 
 
 def test_seed_contents_unchanged_true_when_all_match(monkeypatch):
-    files = {"a.csv": "x\n1\n", "b.csv": "y\n2\n"}
+    files = {"a.csv": _seed_frame("x\n1\n"), "b.csv": _seed_frame("y\n2\n")}
     monkeypatch.setattr(_upload, "_get_file_content", lambda path: files.get(path))
     assert _upload._seed_contents_unchanged(
-        [("a.csv", "x\n1\n"), ("b.csv", "y\n2\n")]
+        [("a.csv", _seed_frame("x\n1\n")), ("b.csv", _seed_frame("y\n2\n"))]
     ) is True
 
 
 def test_seed_contents_unchanged_false_when_one_differs(monkeypatch):
-    files = {"a.csv": "x\n1\n", "b.csv": "y\n2\n"}
+    files = {"a.csv": _seed_frame("x\n1\n"), "b.csv": _seed_frame("y\n2\n")}
     monkeypatch.setattr(_upload, "_get_file_content", lambda path: files.get(path))
     assert _upload._seed_contents_unchanged(
-        [("a.csv", "x\n1\n"), ("b.csv", "y\n9\n")]
+        [("a.csv", _seed_frame("x\n1\n")), ("b.csv", _seed_frame("y\n9\n"))]
     ) is False
 
 
 def test_seed_contents_unchanged_false_when_file_missing(monkeypatch):
     """A 404 (None) counts as a change so first-ever creation still commits."""
     monkeypatch.setattr(_upload, "_get_file_content", lambda path: None)
-    assert _upload._seed_contents_unchanged([("new.csv", "x\n1\n")]) is False
+    assert _upload._seed_contents_unchanged([("new.csv", _seed_frame("x\n1\n"))]) is False
+
+
+def test_seed_contents_unchanged_ignores_dtype_drift(monkeypatch):
+    """The no-op check compares stored cell text, not pandas dtypes: a
+    float-typed sync column that renders to the stored strings is still
+    "unchanged"."""
+    stored = _seed_frame("Account,Quantity\nA,1.5\nA,\n")
+    monkeypatch.setattr(_upload, "_get_file_content", lambda path: stored)
+    fresh = pd.DataFrame({"Account": ["A", "A"], "Quantity": [1.5, None]})
+    assert seed_frame_digest(fresh) == seed_frame_digest(stored)
+    assert _upload._seed_contents_unchanged([("a.csv", fresh)]) is True
 
 
 def test_commit_git_paths_skips_commit_when_unchanged(monkeypatch):
     """Identical content → no_changes=True, marker=None, and NO seed-store
     write (and no rebuild dispatch) is made."""
-    monkeypatch.setattr(_upload, "_get_file_content", lambda path: "same\n")
+    monkeypatch.setattr(_upload, "_get_file_content", lambda path: _seed_frame("same\n"))
 
     def _boom(*a, **k):  # would be the actual seed-store write
         raise AssertionError("must not write when nothing changed")
@@ -1321,7 +1369,7 @@ def test_commit_git_paths_skips_commit_when_unchanged(monkeypatch):
     monkeypatch.setattr(_upload, "_seed_store_write", _boom)
     monkeypatch.setattr(_upload, "_dispatch_warehouse_rebuild", _boom)
     ok, err, sha, no_changes = _upload._commit_git_paths(
-        [("dbt/seeds/x.csv", "same\n")], "msg",
+        [("dbt/seeds/x.csv", _seed_frame("same\n"))], "msg",
     )
     assert ok is True and err is None and sha is None and no_changes is True
 
@@ -1329,7 +1377,7 @@ def test_commit_git_paths_skips_commit_when_unchanged(monkeypatch):
 def test_commit_git_paths_commits_when_changed(monkeypatch):
     """Different content → falls through to the real seed-store write,
     dispatches a rebuild, and returns the dispatch marker."""
-    monkeypatch.setattr(_upload, "_get_file_content", lambda path: "old\n")
+    monkeypatch.setattr(_upload, "_get_file_content", lambda path: _seed_frame("old\n"))
     calls = {}
 
     def _fake_store_write(path_contents):
@@ -1340,7 +1388,7 @@ def test_commit_git_paths_commits_when_changed(monkeypatch):
         _upload, "_dispatch_warehouse_rebuild", lambda reason: "dispatch:1700000000"
     )
     ok, err, sha, no_changes = _upload._commit_git_paths(
-        [("dbt/seeds/x.csv", "new\n")], "msg",
+        [("dbt/seeds/x.csv", _seed_frame("new\n"))], "msg",
     )
     assert ok is True and sha == "dispatch:1700000000" and no_changes is False
     assert calls["paths"] == ["dbt/seeds/x.csv"]
@@ -1349,7 +1397,7 @@ def test_commit_git_paths_commits_when_changed(monkeypatch):
 def test_commit_git_paths_write_failure_fails_closed(monkeypatch):
     """A seed-store write failure must surface as ok=False (sync aborts
     loudly) and must NOT dispatch a rebuild."""
-    monkeypatch.setattr(_upload, "_get_file_content", lambda path: "old\n")
+    monkeypatch.setattr(_upload, "_get_file_content", lambda path: _seed_frame("old\n"))
 
     def _fail_write(path_contents):
         raise _upload.SeedStoreError("load job failed")
@@ -1360,7 +1408,7 @@ def test_commit_git_paths_write_failure_fails_closed(monkeypatch):
     monkeypatch.setattr(_upload, "_seed_store_write", _fail_write)
     monkeypatch.setattr(_upload, "_dispatch_warehouse_rebuild", _no_dispatch)
     ok, err, sha, no_changes = _upload._commit_git_paths(
-        [("dbt/seeds/x.csv", "new\n")], "msg",
+        [("dbt/seeds/x.csv", _seed_frame("new\n"))], "msg",
     )
     assert ok is False and "load job failed" in err
     assert sha is None and no_changes is False
@@ -1385,27 +1433,68 @@ def _cur_df(symbol, qty, price, *, sectype="Equity", desc=""):
 
 
 class _FakeSeedStore:
-    """In-memory stand-in for the GitHub seed files. ``get`` mirrors
+    """In-memory stand-in for the raw seed tables. ``get`` mirrors
     ``_get_file_content`` (None == 404); ``commit`` mirrors
-    ``_commit_git_paths`` (no-op when unchanged)."""
+    ``_commit_git_paths`` (no-op when unchanged). ``get_slice`` /
+    ``commit_slices`` mirror the tenant-slice seam: a slice is replaced by
+    dropping its rows and appending the new ones, like the seed store's
+    DELETE + INSERT swap. Frames are kept as the STRING cells the raw
+    tables hold (``seed_cells``), so comparisons are cell-text exact."""
 
     def __init__(self):
         self.files = {}
+        self.slice_commits = []
 
     def get(self, path):
-        return self.files.get(path)
+        df = self.files.get(path)
+        return None if df is None else df.copy()
 
     def commit(self, path_contents, message):
-        no_changes = all(self.files.get(p) == c for p, c in path_contents)
+        no_changes = all(
+            seed_frame_digest(self.files.get(p)) == seed_frame_digest(c)
+            for p, c in path_contents
+        )
         for p, c in path_contents:
-            self.files[p] = c
+            self.files[p] = seed_cells(c)
         return True, None, "sha", no_changes
 
+    def _slice_mask(self, df, account_name, tenant_ids):
+        acct_col = next(c for c in df.columns if c.lower() == "account")
+        tid = df["tenant_id"].str.strip()
+        return (df[acct_col].str.strip() == account_name) & (
+            tid.isin(list(tenant_ids)) | tid.eq("")
+        )
+
+    def get_slice(self, path, account_name, tenant_ids):
+        if path not in self.files:
+            return None
+        df = self.files[path]
+        return df.loc[self._slice_mask(df, account_name, tenant_ids)].reset_index(drop=True)
+
+    def commit_slices(self, slices, message):
+        changed = [
+            s for s in slices
+            if s[3] is None or seed_frame_digest(s[3]) != seed_frame_digest(s[4])
+        ]
+        self.slice_commits.append([(p, a, t) for p, a, t, _e, _c in changed])
+        for path, account_name, tenant_ids, _existing, content in changed:
+            new = seed_cells(content)
+            if path not in self.files:
+                self.files[path] = new
+                continue
+            df = self.files[path]
+            kept = df.loc[~self._slice_mask(df, account_name, tenant_ids)]
+            self.files[path] = pd.concat([kept, new], ignore_index=True)
+        return True, None, "sha", not changed
+
 
 def _install_store(monkeypatch, store):
     monkeypatch.setattr(_upload, "_get_file_content", lambda path: store.get(path))
     monkeypatch.setattr(_upload, "_commit_git_paths",
                         lambda pc, msg: store.commit(pc, msg))
+    monkeypatch.setattr(_upload, "_get_seed_slice", store.get_slice)
+    monkeypatch.setattr(_upload, "_commit_seed_slices",
+                        lambda slices, msg: store.commit_slices(slices, msg))
     monkeypatch.setattr(_upload, "add_account_for_user", lambda *a, **k: None)
     monkeypatch.setattr(_upload, "record_upload", lambda *a, **k: None)
 
@@ -1514,9 +1603,9 @@ def test_batch_push_is_byte_identical_to_sequential_pushes(monkeypatch):
 
     assert set(seq_store.files.keys()) == set(batch_store.files.keys())
     for path in seq_store.files:
-        assert batch_store.files[path] == seq_store.files[path], (
-            f"batched seed for {path} diverged from sequential result"
-        )
+        assert seed_frame_digest(batch_store.files[path]) == seed_frame_digest(
+            seq_store.files[path]
+        ), f"batched seed for {path} diverged from sequential result"
 
 
 def test_batch_push_preserves_every_tenant(monkeypatch):
@@ -1648,3 +1737,147 @@ def test_intraday_history_only_reruns_are_noop_when_no_new_fills(monkeypatch):
         [_entry()], commit_message="intraday 2",
     )
     assert ok2 and nc2 is True            # identical re-poll → no change → no build
+
+
+# ---------------------------------------------------------------------------
+# Tenant-slice writes — a sync reads, diffs and rewrites only its own slice.
+# ---------------------------------------------------------------------------
+
+
+def _history_csv_with_neighbours():
+    """Another tenant's rows under a different label, stored with int-text
+    cells (``9`` / ``10``) that a full-table pandas round-trip would
+    rewrite as ``9.0`` / ``10.0``."""
+    return (
+        "Account,user_id,tenant_id,Date,Action,Symbol,Description,Quantity,Price,fees_and_comm,Amount\n"
+        "Alpaca Paper Account,18,snaptrade:tenant-alpaca-paper,01/04/2025,Buy,MSFT,MICROSOFT,5,400,,-2000\n"
+        "Schwab Account,,,01/01/2025,Buy,IBM,IBM,1,100,,-100\n"
+        "Schwab Account,9,snaptrade:tenant-schwab-5167,01/05/2025,Buy,TSLA,TESLA,2,250,,-500\n"
+    )
+
+
+def test_get_seed_slice_reads_filtered_slice_from_store(monkeypatch):
+    calls = []
+
+    def _read(path, account, tenant_ids):
+        calls.append((path, account, tenant_ids))
+        return "csv"
+
+    monkeypatch.setattr(_upload, "_seed_store_read_slice", _read)
+    assert _upload._get_seed_slice(
+        HISTORY_PATH, "Schwab Account", (TENANT_SCHWAB_5989,),
+    ) == "csv"
+    assert calls == [(HISTORY_PATH, "Schwab Account", (TENANT_SCHWAB_5989,))]
+
+
+def test_get_seed_slice_store_error_raises_seed_fetch_error(monkeypatch):
+    def _boom(*a):
+        raise _upload.SeedStoreError("BigQuery unavailable")
+
+    monkeypatch.setattr(_upload, "_seed_store_read_slice", _boom)
+    with pytest.raises(_upload.SeedFetchError):
+        _upload._get_seed_slice(HISTORY_PATH, "X", ("manual:X",))
+
+
+def test_slice_push_leaves_other_tenants_rows_byte_identical(monkeypatch):
+    store = _FakeSeedStore()
+    store.files[HISTORY_PATH] = _seed_frame(_history_csv_with_neighbours())
+    _install_store(monkeypatch, store)
+    hist = pd.DataFrame([
+        _row("Schwab Account", 9, "01/02/2025", "Buy", "AAPL", 10, 200.0, -2000.0,
+             tenant_id=TENANT_SCHWAB_5989, desc="APPLE INC"),
+    ])
+    ok, err, *_ = _upload.merge_and_push_seeds(
+        "Schwab Account", hist, None, commit_message="sync",
+        user_id=9, tenant_id=TENANT_SCHWAB_5989,
+    )
+    assert ok, err
+    assert store.slice_commits == [
+        [(HISTORY_PATH, "Schwab Account", (TENANT_SCHWAB_5989,))]
+    ]
+    rows = store.files[HISTORY_PATH].values.tolist()
+    for untouched in _seed_frame(_history_csv_with_neighbours()).values.tolist():
+        if "IBM" in untouched:
+            continue  # legacy row belongs to the slice and is re-emitted
+        assert untouched in rows
+    assert set(_parse(store.files[HISTORY_PATH])["Symbol"]) == {
+        "MSFT", "IBM", "TSLA", "AAPL",
+    }
+
+
+def test_batch_folds_tenants_sharing_a_label_into_one_slice(monkeypatch):
+    store = _FakeSeedStore()
+    _install_store(monkeypatch, store)
+    ok, err, *_ = _upload.merge_and_push_seeds_batch(
+        _clone_entries(_sample_entries()), commit_message="nightly batch",
+    )
+    assert ok, err
+    shared = ("Schwab Account", (TENANT_SCHWAB_5989, TENANT_SCHWAB_5167))
+    assert store.slice_commits == [[
+        (HISTORY_PATH, *shared),
+        (_upload.CURRENT_PATH, *shared),
+        (_upload.CURRENT_PATH, "Alpaca Paper Account", (TENANT_ALPACA,)),
+    ]]
+
+
+def test_table_write_mode_falls_back_to_full_rewrite(monkeypatch):
+    monkeypatch.setenv("SEED_WRITE_MODE", "table")
+    store = _FakeSeedStore()
+    _install_store(monkeypatch, store)
+    ok, err, *_ = _upload.merge_and_push_seeds_batch(
+        _clone_entries(_sample_entries()), commit_message="nightly batch",
+    )
+    assert ok, err
+    assert store.slice_commits == []
+    assert set(store.files) == {HISTORY_PATH, _upload.CURRENT_PATH}
+
+
+def test_commit_seed_slices_writes_only_changed_slices(monkeypatch):
+    written = []
+    monkeypatch.setattr(
+        _upload, "_seed_store_replace_slices", lambda s: written.extend(s),
+    )
+    dispatched = {}
+
+    def _fake_dispatch(reason, tenant_ids=None):
+        dispatched["tenant_ids"] = tenant_ids
+        return "dispatch:1"
+
+    monkeypatch.setattr(_upload, "_dispatch_warehouse_rebuild", _fake_dispatch)
+    ok, err, marker, no_changes = _upload._commit_seed_slices([
+        ("a.csv", "A", ("t:a",), _seed_frame("x\n1\n"), _seed_frame("x\n1\n")),
+        ("b.csv", "B", ("t:b",), _seed_frame("y\n2\n"), _seed_frame("y\n3\n")),
+        ("c.csv", "C", ("t:c",), None, _seed_frame("z\n")),
+    ], "msg")
+    assert ok and marker == "dispatch:1" and no_changes is False
+    assert [w[0] for w in written] == ["b.csv", "c.csv"]
+    # The rebuild is scoped to the tenants whose slices changed.
+    assert dispatched["tenant_ids"] == ["t:b", "t:c"]
+
+
+def test_commit_seed_slices_unchanged_skips_write_and_dispatch(monkeypatch):
+    def _boom(*a, **k):
+        raise AssertionError("must not write when nothing changed")
+
+    monkeypatch.setattr(_upload, "_seed_store_replace_slices", _boom)
+    monkeypatch.setattr(_upload, "_dispatch_warehouse_rebuild", _boom)
+    ok, err, marker, no_changes = _upload._commit_seed_slices(
+        [("a.csv", "A", ("t:a",), _seed_frame("x\n1\n"), _seed_frame("x\n1\n"))], "msg",
+    )
+    assert ok is True and marker is None and no_changes is True
+
+
+def test_commit_seed_slices_write_failure_fails_closed(monkeypatch):
+    def _fail(_slices):
+        raise _upload.SeedStoreError("transaction aborted")
+
+    def _no_dispatch(reason):
+        raise AssertionError("must not dispatch after a failed write")
+
+    monkeypatch.setattr(_upload, "_seed_store_replace_slices", _fail)
+    monkeypatch.setattr(_upload, "_dispatch_warehouse_rebuild", _no_dispatch)
+    ok, err, marker, no_changes = _upload._commit_seed_slices(
+        [("a.csv", "A", ("t:a",), _seed_frame("x\n1\n"), _seed_frame("x\n2\n"))], "msg",
+    )
+    assert ok is False and "transaction aborted" in err
+    assert marker is None and no_changes is False